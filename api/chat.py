@@ -2,52 +2,64 @@ from http.server import BaseHTTPRequestHandler
 import json
 import os
 import sys
+import threading
 import traceback
 
-# Add python directory to path
-# Try multiple paths for Vercel deployment
-# Vercel deploys the entire project, so python/ directory should be available
-python_paths = [
-    os.path.join(os.path.dirname(__file__), '..', 'python'),  # Vercel: api/../python
-    os.path.join(os.path.dirname(__file__), 'llm_chat'),  # If copied to api/llm_chat
-    '/var/task/python',  # Vercel Lambda absolute path
-    '/var/task/api/llm_chat',  # Vercel Lambda if copied
-    os.path.join(os.getcwd(), 'python'),  # Current working directory
-    os.path.join(os.getcwd(), 'api', 'llm_chat'),  # If copied to api/llm_chat
-]
-
-for path in python_paths:
-    if os.path.exists(path):
-        # If it's the python directory, add the llm_chat subdirectory
-        if path.endswith('python') and os.path.exists(os.path.join(path, 'llm_chat')):
-            sys.path.insert(0, os.path.join(path, 'llm_chat'))
-            print(f"[INIT] Added Python path: {os.path.join(path, 'llm_chat')}")
-        else:
-            sys.path.insert(0, path)
-            print(f"[INIT] Added Python path: {path}")
+# llm_chat is copied next to this file at build time (scripts/copy-python-to-api.js);
+# locally it lives in ../python
+_HERE = os.path.dirname(os.path.abspath(__file__))
+for _path in (_HERE, os.path.join(_HERE, '..', 'python')):
+    if os.path.isdir(os.path.join(_path, 'llm_chat')):
+        sys.path.insert(0, os.path.normpath(_path))
         break
 else:
-    print(f"[INIT] Warning: Python directory not found. Tried: {python_paths}")
-    print(f"[INIT] Current working directory: {os.getcwd()}")
-    print(f"[INIT] Script directory: {os.path.dirname(__file__)}")
-    print(f"[INIT] Files in script directory: {os.listdir(os.path.dirname(__file__))}")
+    print(f"[INIT] Warning: llm_chat package not found next to {_HERE} or in ../python")
 
 # Disable Langfuse for Vercel (optional dependency issue)
 os.environ['LANGFUSE_PUBLIC_KEY'] = ''
 os.environ['LANGFUSE_SECRET_KEY'] = ''
 
-try:
-    from llm_chat import handle_chat_request
-    HAS_LLM_CHAT = True
-    print("[INIT] Successfully imported llm_chat module")
-except ImportError as e:
-    HAS_LLM_CHAT = False
-    print(f"[INIT] Warning: llm_chat module not available: {e}")
-    print(f"[INIT] Python path: {sys.path}")
-    traceback.print_exc()
+# llm_chat (and langchain / google.generativeai behind it) is imported on first
+# use; the warm-up thread started below usually gets there before the first request
+_llm_chat = None
+_llm_chat_error = None
+
+
+def _load_llm_chat():
+    """Import llm_chat once; returns the module, or None if it is unavailable"""
+    global _llm_chat, _llm_chat_error
+    if _llm_chat is None and _llm_chat_error is None:
+        try:
+            import llm_chat
+            _llm_chat = llm_chat
+            print("[INIT] Successfully imported llm_chat module")
+        except ImportError as e:
+            _llm_chat_error = e
+            print(f"[INIT] Warning: llm_chat module not available: {e}")
+            traceback.print_exc()
+    return _llm_chat
+
+
+def _runtime():
+    """Event loop that lives as long as the container (see llm_chat/serverless.py)"""
+    from llm_chat.serverless import get_serverless_runtime
+    return get_serverless_runtime()
+
+
+def _warm_up():
+    if _load_llm_chat() is not None:
+        _runtime().start_warm_up()
+
+
+if os.getenv('CHAT_SERVERLESS_WARM_UP', 'true').strip().lower() in ('1', 'true', 'yes', 'on'):
+    threading.Thread(target=_warm_up, name='llm-chat-import', daemon=True).start()
 
 
 class handler(BaseHTTPRequestHandler):
+    # Set once _send_stream has sent its headers; errors after that cannot
+    # change the status and are reported in the stream instead
+    _stream_started = False
+
     def log_message(self, format, *args):
         """Override to use print instead of stderr"""
         print(f"[HTTP] {format % args}")
@@ -76,6 +88,7 @@ class handler(BaseHTTPRequestHandler):
             message = data.get('message', '')
             history = data.get('history', [])
             session_id = data.get('sessionId')
+            stream = bool(data.get('stream')) or 'stream' in self.path
 
             # Validate message
             if not message:
@@ -88,7 +101,8 @@ class handler(BaseHTTPRequestHandler):
                 }).encode())
                 return
 
-            if not HAS_LLM_CHAT:
+            llm_chat = _load_llm_chat()
+            if llm_chat is None:
                 print("[POST] ERROR: LLM chat module not available")
                 self.send_response(503)
                 self.send_header('Content-type', 'application/json')
@@ -99,10 +113,13 @@ class handler(BaseHTTPRequestHandler):
                 }).encode())
                 return
 
+            if stream:
+                self._send_stream(llm_chat, message, history, session_id)
+                return
+
             print("[POST] Calling handle_chat_request...")
-            # Handle chat request (sync version for Vercel)
-            import asyncio
-            result = asyncio.run(handle_chat_request(
+            # Run on the container's persistent event loop
+            result = _runtime().run(llm_chat.handle_chat_request(
                 message=message,
                 history=history,
                 session_id=session_id
@@ -120,6 +137,9 @@ class handler(BaseHTTPRequestHandler):
         except Exception as e:
             print(f"[POST] Error in chat handler: {e}")
             traceback.print_exc()
+            if self._stream_started:
+                # The 200 status line is already out; _send_stream ended the body
+                return
             self.send_response(500)
             self.send_header('Content-type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
@@ -129,6 +149,59 @@ class handler(BaseHTTPRequestHandler):
                 'details': str(e)
             }).encode())
 
+    def _write_chunk(self, payload: bytes):
+        """Write a single HTTP/1.1 chunk"""
+        self.wfile.write(f"{len(payload):X}\r\n".encode() + payload + b"\r\n")
+        self.wfile.flush()
+
+    def _send_stream(self, llm_chat, message, history, session_id):
+        """
+        Stream the answer as chunked newline-delimited JSON events
+
+        Each line is one event from handle_chat_request_stream
+        ({"type": "token" | "done" | "error", ...}). The status line is sent
+        first, so a failure mid-stream ends the body with an error event.
+        """
+        print("[POST] Calling handle_chat_request_stream...")
+
+        # Chunked transfer encoding requires HTTP/1.1; close afterwards so
+        # non-chunked responses on this handler keep their HTTP/1.0 semantics
+        self.protocol_version = 'HTTP/1.1'
+        self.send_response(200)
+        self.send_header('Content-type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self._stream_started = True
+
+        try:
+            events = llm_chat.handle_chat_request_stream(
+                message=message,
+                history=history,
+                session_id=session_id
+            )
+            for event in _runtime().iterate(events):
+                self._write_chunk((json.dumps(event, ensure_ascii=False) + "\n").encode('utf-8'))
+        except Exception as e:
+            print(f"[POST] Error while streaming: {e}")
+            traceback.print_exc()
+            try:
+                self._write_chunk((json.dumps({
+                    'type': 'error',
+                    'error': '서버 오류가 발생했습니다.'
+                }, ensure_ascii=False) + "\n").encode('utf-8'))
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+            except OSError:
+                # Client already gone
+                pass
+            return
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+        print("[POST] Stream sent successfully")
+
     def do_OPTIONS(self):
         """Handle CORS preflight"""
         print("[OPTIONS] Handling CORS preflight")
@@ -0,0 +1,170 @@
+"""
+Cold Start Benchmark
+Import time of the serverless entry point (api/chat.py) and latency of the
+first and following requests in a fresh process, against a local stub of
+the Gemini REST API (no API key or network needed)
+
+Each run starts a new Python process, like a new container: it imports
+api/chat.py, serves it on a local port and sends --requests chat requests.
+"warm-up" starts the background warm-up at import (CHAT_SERVERLESS_WARM_UP);
+"no warm-up" builds everything inside the first request. --gap is the idle
+time between import and the first request. The heaviest modules come from
+python -X importtime of the whole cold path.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs 3] [--requests 4] [--gap 0] [--json]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_model_registry import StubHandler  # noqa: E402
+
+PYTHON_DIR = Path(__file__).resolve().parent.parent
+ENTRY_POINT = PYTHON_DIR.parent / "api" / "chat.py"
+
+QUESTIONS = [
+    "Tell me about Kangbeen's research",
+    "Which projects has Kangbeen worked on?",
+    "What did Kangbeen study?",
+    "What awards has Kangbeen received?",
+    "Where has Kangbeen worked?",
+    "What papers has Kangbeen published?",
+]
+
+# Runs in the child process: import the entry point, serve it, send requests
+CHILD = r"""
+import importlib.util, json, sys, threading, time, urllib.request
+from http.server import ThreadingHTTPServer
+
+entry, count, gap, questions = sys.argv[1], int(sys.argv[2]), float(sys.argv[3]), json.loads(sys.argv[4])
+started = time.perf_counter()
+spec = importlib.util.spec_from_file_location("chat_entry", entry)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+imported = time.perf_counter()
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), module.handler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+time.sleep(gap)
+
+latencies = []
+for index in range(count):
+    body = json.dumps({"message": questions[index % len(questions)], "history": [], "sessionId": "cold-start"}).encode()
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{server.server_port}/api/chat", data=body, headers={"Content-Type": "application/json"}
+    )
+    sent = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        result = json.loads(response.read())
+    latencies.append((time.perf_counter() - sent) * 1000)
+    if "response" not in result:
+        raise SystemExit(f"unexpected response: {result}")
+
+from llm_chat.serverless import get_serverless_runtime
+print("RESULT " + json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "latencies_ms": latencies,
+    "warm_up": get_serverless_runtime().get_stats()["warm_up"],
+}))
+"""
+
+
+def child_env(endpoint, warm_up):
+    env = dict(os.environ)
+    env.update(
+        GEMINI_API_KEY="stub-key",
+        CHAT_LLM_TRANSPORT="rest",
+        CHAT_LLM_API_ENDPOINT=endpoint,
+        CHAT_SESSION_BACKEND="memory",
+        CHAT_SERVERLESS_WARM_UP="true" if warm_up else "false",
+        PYTHONWARNINGS="ignore",
+    )
+    return env
+
+
+def run_child(endpoint, warm_up, requests, gap, importtime=False):
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", CHILD, str(ENTRY_POINT), str(requests), str(gap), json.dumps(QUESTIONS)]
+    completed = subprocess.run(
+        command, env=child_env(endpoint, warm_up), capture_output=True, text=True, cwd=PYTHON_DIR
+    )
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("RESULT ")]
+    if completed.returncode != 0 or not lines:
+        raise SystemExit(f"child process failed:\n{completed.stdout[-2000:]}\n{completed.stderr[-2000:]}")
+    return json.loads(lines[-1][len("RESULT "):]), completed.stderr
+
+
+def heaviest_imports(stderr, limit):
+    """Modules with the largest cumulative import time (top-level and first-level imports)"""
+    rows = []
+    for line in stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)", line)
+        if match and len(match.group(3)) <= 3:
+            rows.append((int(match.group(2)) / 1000, match.group(4).strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=4)
+    parser.add_argument("--gap", type=float, default=0.0, help="seconds between import and the first request")
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--json", action="store_true", help="print one JSON summary (for tracking regressions)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_port}"
+
+    summary = {}
+    for label, warm_up in (("warm-up", True), ("no warm-up", False)):
+        runs = [run_child(endpoint, warm_up, args.requests, args.gap)[0] for _ in range(args.runs)]
+        summary[label] = {
+            "import_ms": statistics.median(run["import_ms"] for run in runs),
+            "first_request_ms": statistics.median(run["latencies_ms"][0] for run in runs),
+            "cold_start_ms": statistics.median(run["import_ms"] + run["latencies_ms"][0] for run in runs),
+            "warm_request_ms": statistics.median(
+                latency for run in runs for latency in run["latencies_ms"][1:]
+            ) if args.requests > 1 else None,
+            "warm_up": runs[-1]["warm_up"],
+        }
+    _, stderr = run_child(endpoint, False, 1, 0, importtime=True)
+    summary["heaviest_imports_ms"] = heaviest_imports(stderr, args.top)
+    server.shutdown()
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"{args.runs} fresh processes each, {args.requests} requests, gap {args.gap}s (medians)")
+    print(f"{'':<12} {'import':>9} {'1st request':>12} {'import+1st':>11} {'later requests':>15}")
+    for label in ("warm-up", "no warm-up"):
+        row = summary[label]
+        warm = f"{row['warm_request_ms']:>12.1f} ms" if row["warm_request_ms"] is not None else f"{'-':>15}"
+        print(f"{label:<12} {row['import_ms']:>6.1f} ms {row['first_request_ms']:>9.1f} ms "
+              f"{row['cold_start_ms']:>8.1f} ms {warm}")
+    timings = summary["warm-up"]["warm_up"]
+    if timings:
+        print("warm-up steps: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in timings.items()))
+    print("heaviest imports on the cold path (python -X importtime, cumulative):")
+    for milliseconds, module in summary["heaviest_imports_ms"]:
+        print(f"  {milliseconds:8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Context Mode Benchmark
+Compares prompt size and context-build latency of the "full" and
+"retrieval" profile context modes as the profile grows
+
+Usage:
+    python benchmarks/bench_context_modes.py [--scales 1 5 20] [--live]
+
+--live additionally times one Gemini call per mode (needs GEMINI_API_KEY).
+"""
+
+import argparse
+import copy
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_chat.config import config  # noqa: E402
+from llm_chat.long_term_memory import LongTermMemory  # noqa: E402
+from llm_chat.retrieval import (  # noqa: E402
+    ProfileRetriever,
+    build_profile_passages,
+    format_passages,
+    select_prompt_links,
+)
+from llm_chat.response_generator import _build_direct_prompt  # noqa: E402
+from llm_chat.text_utils import estimate_tokens  # noqa: E402
+
+QUERIES = [
+    "What is his latest research?",
+    "Tell me about the LEGOLAS paper",
+    "Which programming languages does he use?",
+    "What awards has he won?",
+    "고강빈 학력 알려줘",
+    "어떤 프로젝트를 했어?",
+]
+
+
+def scale_profile(data, factor):
+    """Replicate every list item `factor` times with distinct titles"""
+    scaled = {}
+    for category, items in data.items():
+        if not isinstance(items, list):
+            scaled[category] = items
+            continue
+        scaled[category] = []
+        for copy_index in range(factor):
+            for item in items:
+                clone = copy.deepcopy(item)
+                if copy_index and isinstance(clone, dict):
+                    for field in ("title", "degree", "school"):
+                        if clone.get(field):
+                            clone[field] = f"{clone[field]} (variant {copy_index})"
+                scaled[category].append(clone)
+    return scaled
+
+
+def measure(build_context):
+    """Return (mean prompt tokens, mean build ms) over QUERIES"""
+    tokens, timings = [], []
+    now = datetime.utcnow().isoformat()
+    for query in QUERIES:
+        started = time.perf_counter()
+        context, links = build_context(query)
+        timings.append((time.perf_counter() - started) * 1000)
+        prompt = _build_direct_prompt(query, "", context, links, now)
+        tokens.append(estimate_tokens(prompt))
+    return statistics.mean(tokens), statistics.mean(timings)
+
+
+def time_live(build_context):
+    """Mean Gemini latency (ms) over QUERIES for a context builder"""
+    import google.generativeai as genai
+    model = genai.GenerativeModel("gemini-2.5-flash")
+    now = datetime.utcnow().isoformat()
+    timings = []
+    for query in QUERIES:
+        context, links = build_context(query)
+        prompt = _build_direct_prompt(query, "", context, links, now)
+        started = time.perf_counter()
+        model.generate_content(prompt)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.mean(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 5, 20], help="profile size multipliers")
+    parser.add_argument("--top-k", type=int, default=config.retrieval_top_k, help="passages in retrieval mode")
+    parser.add_argument("--live", action="store_true", help="also time real Gemini calls")
+    args = parser.parse_args()
+
+    base = LongTermMemory()
+    print(f"{'scale':>5} | {'mode':<9} | {'prompt tokens':>13} | {'context ms':>10} | {'index build ms':>14}"
+          + (" | gemini ms" if args.live else ""))
+    print("-" * (66 + (12 if args.live else 0)))
+
+    for factor in args.scales:
+        ltm = copy.copy(base)
+        ltm.data = scale_profile(base.data, factor)
+
+        started = time.perf_counter()
+        retriever = ProfileRetriever(build_profile_passages(ltm.data))
+        index_ms = (time.perf_counter() - started) * 1000
+
+        site_links = ltm.get_site_links()
+
+        def full_context(query):
+            return ltm.get_context_for_llm(), site_links
+
+        def retrieval_context(query):
+            passages = retriever.retrieve(query, args.top_k)
+            return format_passages(passages), select_prompt_links(passages, site_links)
+
+        modes = [
+            ("full", full_context, 0.0),
+            ("retrieval", retrieval_context, index_ms),
+        ]
+        for mode, build_context, build_ms in modes:
+            tokens, context_ms = measure(build_context)
+            row = f"{factor:>5} | {mode:<9} | {tokens:>13.0f} | {context_ms:>10.3f} | {build_ms:>14.1f}"
+            if args.live:
+                row += f" | {time_live(build_context):>9.0f}"
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
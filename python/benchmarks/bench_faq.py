@@ -0,0 +1,153 @@
+"""
+FAQ Table Benchmark
+Builds the FAQ answer table with the fake LLM backend, then measures the
+local matcher and what a hit saves end to end (no API key or network)
+
+1. matching: rephrased FAQ questions (should hit the right entry) and
+   other profile, off-topic or look-alike questions (should fall back to
+   live generation), with the similarity score and the lookup time; exits
+   with status 1 if any query is not served as expected
+2. end to end: first-turn latency of handle_chat_request for FAQ hits and
+   for questions that are generated live (fake LLM --latency seconds)
+3. rebuild: the profile changes, lookups miss while the table is rebuilt in
+   the background, then hit again with the new profile hash
+
+Usage:
+    python benchmarks/bench_faq.py [--latency 0.8] [--iterations 2000]
+"""
+
+import argparse
+import asyncio
+import copy
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# (language, query, FAQ entry it should be answered from)
+SHOULD_HIT = [
+    ("en", "What are his publications?", "publications"),
+    ("en", "what papers has kangbeen ko published", "publications"),
+    ("en", "Where did Kangbeen study?", "education"),
+    ("en", "What's his latest research?", "latest_research"),
+    ("en", "What awards has he received?", "awards"),
+    ("en", "Where did he work?", "experience"),
+    ("ko", "고강빈의 최근 연구는 뭔가요?", "latest_research"),
+    ("ko", "수상 경력 있나요?", "awards"),
+]
+
+# Questions that must be generated live: other profile questions, off-topic
+# ones, and ones that share most characters with an FAQ question but ask
+# something else (earliest vs latest, project vs paper, speak vs program)
+SHOULD_MISS = [
+    ("en", "What did the LEGOLAS paper find about golf swings?"),
+    ("en", "Which projects used PyTorch in 2023?"),
+    ("en", "What is the capital of France?"),
+    ("en", "What is his earliest paper?"),
+    ("en", "What is his latest project?"),
+    ("en", "What is his GPA?"),
+    ("en", "What languages does he speak?"),
+    ("en", "What programming languages does he not use?"),
+    ("ko", "LEGOLAS 논문의 실험 결과는?"),
+    ("ko", "오늘 날씨 어때?"),
+    ("ko", "첫 논문이 뭐야?"),
+]
+
+
+def matching(iterations):
+    """Returns the number of queries answered from the wrong entry or not as expected"""
+    from llm_chat.faq_table import get_faq_table
+    from llm_chat.config import config
+
+    table = get_faq_table()
+    print(f"1. matching (threshold {config.faq_threshold}, {table.get_stats()['entries']} answers)")
+    cases = SHOULD_HIT + [(language, query, None) for language, query in SHOULD_MISS]
+    errors = 0
+    for language, query, expected in cases:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            entry = table.lookup(query, language)
+        micros = (time.perf_counter() - started) / iterations * 1e6
+        result = table._matcher.match(query, language)
+        score = result[1] if result else 0.0
+        served = entry["id"] if entry is not None else None
+        flag = "" if served == expected else f"  <-- expected {expected or 'miss'}"
+        errors += served != expected
+        print(f"  {served or 'miss':<16} {score:5.2f} {micros:6.1f} us  {query}{flag}")
+    print(f"  {len(cases) - errors}/{len(cases)} as expected")
+    return errors
+
+
+async def end_to_end():
+    from llm_chat.chat_handler import handle_chat_request
+
+    print("2. end to end (first turn of a new session)")
+    for label, queries in (("faq hit", SHOULD_HIT[:4]), ("live", SHOULD_MISS[:2])):
+        latencies = []
+        for index, (language, query, *_) in enumerate(queries):
+            started = time.perf_counter()
+            await handle_chat_request(message=query, session_id=f"{label}-{index}")
+            latencies.append((time.perf_counter() - started) * 1000)
+        print(f"  {label:<8} " + "  ".join(f"{latency:8.2f} ms" for latency in latencies))
+
+
+async def rebuild():
+    from llm_chat.faq_table import get_faq_table
+    from llm_chat.long_term_memory import get_long_term_memory
+
+    print("3. rebuild after a profile change")
+    table = get_faq_table()
+    ltm = get_long_term_memory()
+    before = table.get_stats()["profile_hash"]
+    data = copy.deepcopy(ltm.get_all())
+    data["awards"].append({"title": "Benchmark Award", "organization": "Bench", "time": "2025", "description": ""})
+    ltm.data = data
+    language, query, _ = SHOULD_HIT[0]
+    print(f"  profile {before} -> {ltm.content_hash}: lookup {'hit' if table.lookup(query, language) else 'miss'}")
+    started = time.perf_counter()
+    while table.get_stats()["profile_hash"] != ltm.content_hash:
+        await asyncio.sleep(0.05)
+    print(f"  rebuilt in {time.perf_counter() - started:.1f}s: lookup "
+          f"{'hit' if table.lookup(query, language) else 'miss'}, stats {table.get_stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.8)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    table_path = Path(tempfile.mkdtemp()) / "faq_answers.json"
+    # llm_chat reads its config on first import, so set the environment first
+    os.environ.update(
+        CHAT_LLM_BACKEND="fake",
+        CHAT_SESSION_BACKEND="memory",
+        CHAT_FAKE_LLM_LATENCY=f"fixed:{args.latency}",
+        CHAT_FAKE_LLM_TOKEN_RATE="0",
+        CHAT_FAQ_TABLE_PATH=str(table_path),
+        CHAT_FAQ_AUTO_REBUILD="true",
+        CHAT_RESPONSE_CACHE="false",
+    )
+    logging.disable(logging.CRITICAL)
+
+    async def run():
+        from llm_chat.faq_table import get_faq_table
+
+        started = time.perf_counter()
+        await get_faq_table().rebuild()
+        print(f"built {table_path} in {time.perf_counter() - started:.1f}s")
+        errors = matching(args.iterations)
+        await end_to_end()
+        await rebuild()
+        return errors
+
+    if asyncio.run(run()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Linkify Benchmark
+Per-response cost of linkify_response as the number of site links grows,
+against the previous implementation that scanned every link for every
+<link> tag, plus how many paraphrased labels each one resolves
+
+Synthetic publications are appended to the real site links to reach each
+link count; the response has the same tags and mentions at every size.
+Auto-linking is then checked on sentences that mention a title and on
+ordinary prose that only looks like one; the script exits with status 1
+if a sentence is linked differently than expected.
+
+Usage:
+    python benchmarks/bench_linkify.py [--link-counts 15 150 1500] [--repeat 2000]
+"""
+
+import argparse
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_chat.link_resolver import LinkResolver  # noqa: E402
+from llm_chat.long_term_memory import get_long_term_memory  # noqa: E402
+from llm_chat.response_generator import linkify_response  # noqa: E402
+
+RESPONSE = (
+    "Kangbeen's latest paper is <link>the LEGOLAS paper</link>, published at CHI. "
+    "You can find all of his work on the <link>Papers</link> page and in the <link>CV</link>. "
+    "His <link>Reserch</link> page covers Soridam and Peach Seoga, and <link>Be With You</link> "
+    "is a wearable project. More in <link>Projects page</link> and <link>Awards</link>."
+)
+
+# Labels the model writes instead of the exact site link label
+PARAPHRASES = [
+    "the LEGOLAS paper", "LEGOLAS", "legolas", "Reserch", "CV page", "Peach Seoga project",
+    "Soridam", "A Survey on 3D Scene Graphs", "Leveraging voice", "Project",
+]
+
+# (untagged sentence, labels of the links it should get)
+AUTO_LINK_CASES = [
+    ("Be With You is a wearable project.", ["Be With You: A Soft Hug for Every Silent Struggle"]),
+    ("He built soridam and Peach Seoga.", [
+        "Soridam: Keeping Family Voices and Emotions Alive, Wherever You Are",
+        "Peach Seoga: Text Simplification Platform for Slow Learners",
+    ]),
+    ("Feel free to ask, I'll be with you through any question about his work.", []),
+    ("I will Be with you all the way.", []),
+]
+
+
+def check_auto_links(links):
+    """Returns the number of sentences linked differently than expected"""
+    hrefs = {link["href"]: link["label"] for link in links}
+    errors = 0
+    print("auto-linking")
+    for sentence, expected in AUTO_LINK_CASES:
+        linked = [hrefs.get(href, href) for href in re.findall(r'<a href="([^"]+)"', linkify_response(sentence, links))]
+        flag = "" if linked == expected else f"  <-- expected {expected}"
+        errors += linked != expected
+        print(f"  {len(linked)} links  {sentence}{flag}")
+    return errors
+
+
+def legacy_linkify(response_text, links):
+    """linkify_response before the resolver: linear scan over links per tag"""
+    link_map = {link["label"]: link["href"] for link in links}
+
+    def replace_link(match):
+        label = match.group(1).strip()
+        href = None
+        for link_label, link_href in link_map.items():
+            if link_label.lower() == label.lower():
+                href = link_href
+                break
+        if href is None:
+            return label
+        return f'<a href="{href}">{label}</a>'
+
+    return re.sub(r'<link>([^<]+)</link>', replace_link, response_text)
+
+
+def synthetic_links(base, count):
+    """Real site links followed by synthetic publication links"""
+    links = list(base)
+    for index in range(count - len(links)):
+        links.append({
+            "label": f"Synthetic Study {index}: Sensing Workloads in Distributed Systems Part {index}",
+            "href": f"https://example.org/papers/{index}",
+        })
+    return links
+
+
+def mean_us(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--link-counts", type=int, nargs="+", default=[15, 150, 1500])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    base = [dict(link) for link in get_long_term_memory().get_site_links()]
+    print(f"{'links':>6} | {'build':>8} | {'legacy':>9} | {'resolver':>9} | {'+auto-link':>10} | paraphrases resolved")
+    for count in args.link_counts:
+        links = synthetic_links(base, count)
+        started = time.perf_counter()
+        resolver = LinkResolver(links)
+        build_ms = (time.perf_counter() - started) * 1000
+        linkify_response(RESPONSE, links)  # caches the resolver for this list
+
+        legacy = mean_us(lambda: legacy_linkify(RESPONSE, links), args.repeat)
+        tagged = mean_us(lambda: linkify_response(RESPONSE, links, auto_link=False), args.repeat)
+        auto = mean_us(lambda: linkify_response(RESPONSE, links, auto_link=True), args.repeat)
+        legacy_hits = sum(
+            any(link["label"].lower() == label.lower() for link in links) for label in PARAPHRASES
+        )
+        resolver_hits = sum(resolver.resolve(label) is not None for label in PARAPHRASES)
+        print(f"{len(links):>6} | {build_ms:>6.1f}ms | {legacy:>7.1f}us | {tagged:>7.1f}us | {auto:>8.1f}us | "
+              f"legacy {legacy_hits}/{len(PARAPHRASES)}, resolver {resolver_hits}/{len(PARAPHRASES)}")
+
+    if check_auto_links(base):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
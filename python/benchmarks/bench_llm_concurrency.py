@@ -0,0 +1,219 @@
+"""
+LLM Concurrency Benchmark
+Parallel relevance checks and direct-prompt generations against a slow local
+stub of the Gemini REST API (no API key or network needed)
+
+"before" calls the synchronous generate_content() inside a coroutine, as
+check_relevance and generate_response used to: every call blocks the event
+loop, so parallel requests run one after another. "async" goes through the
+registry's async path (the bounded LLM executor with the rest transport),
+so the calls overlap and the loop stays responsive. A heartbeat task
+measures the worst event-loop stall during each run.
+
+Every async run is checked: no failures, at least half of the requests
+at the stub at once, a wall time under 5x the stub delay (serialized
+calls take N times the delay) and no loop stall as long as one call.
+Runs past a stage deadline must end before the stub answers, with the
+fallback result for every request. The script exits with status 1 if a
+check fails.
+
+Usage:
+    python benchmarks/bench_llm_concurrency.py [--requests 50] [--delay 0.5] [--skip-before]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+RESPONSE_BODY = json.dumps({
+    "candidates": [{"content": {"parts": [{"text": "{\"relevant\": true}"}], "role": "model"},
+                    "finishReason": "STOP", "index": 0}]
+}).encode("utf-8")
+
+
+class QuietServer(ThreadingHTTPServer):
+    """Ignores clients that hang up after their deadline"""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+class SlowStubHandler(BaseHTTPRequestHandler):
+    """Answers every generateContent call after a fixed delay"""
+
+    protocol_version = "HTTP/1.1"
+    delay = 0.5
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with SlowStubHandler.lock:
+            SlowStubHandler.active += 1
+            SlowStubHandler.peak = max(SlowStubHandler.peak, SlowStubHandler.active)
+        time.sleep(self.delay)
+        with SlowStubHandler.lock:
+            SlowStubHandler.active -= 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE_BODY)))
+        self.end_headers()
+        self.wfile.write(RESPONSE_BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+async def heartbeat(stop, interval=0.01):
+    """Largest delay between scheduled and actual wake-ups of the loop"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def measure(label, make_call, requests, delay):
+    """
+    Run requests calls concurrently; report wall time, overlap and loop lag
+
+    Returns:
+        Dictionary with results, failures, elapsed, peak (overlap) and lag (seconds)
+    """
+    # Let requests abandoned by an earlier run finish at the stub first
+    while SlowStubHandler.active:
+        await asyncio.sleep(0.05)
+    SlowStubHandler.peak = 0
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(stop))
+    started = time.perf_counter()
+    # Deadline warnings would print once per request
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results = await asyncio.gather(*(make_call(index) for index in range(requests)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    lag = await monitor
+    failures = sum(isinstance(result, BaseException) for result in results)
+    print(f"  {label:<44} {elapsed:6.2f} s  ({elapsed / delay:5.1f}x stub delay)  "
+          f"peak overlap {SlowStubHandler.peak:>3}  max loop stall {lag * 1000:7.1f} ms  failures {failures}")
+    return {"results": results, "failures": failures, "elapsed": elapsed, "peak": SlowStubHandler.peak, "lag": lag}
+
+
+def check(failed, condition, message):
+    """Print and record a failed check"""
+    if not condition:
+        print(f"    FAILED: {message}")
+        failed.append(message)
+
+
+def check_overlap(failed, run, requests, delay):
+    """The calls of a run overlapped instead of running one after another"""
+    check(failed, run["failures"] == 0, f"{run['failures']} requests failed")
+    check(failed, run["peak"] >= requests / 2, f"only {run['peak']} calls at the stub at once")
+    check(failed, run["elapsed"] < delay * 5, f"took {run['elapsed']:.2f}s, calls did not overlap")
+    check(failed, run["lag"] < delay, f"event loop stalled for {run['lag'] * 1000:.0f} ms")
+
+
+async def run(args):
+    from llm_chat.config import config
+    from llm_chat.llm_backends import get_model_registry
+    from llm_chat.relevance_filter import _llm_relevance_check, check_relevance
+    from llm_chat.response_generator import GENERATION_ERROR_MESSAGE, generate_response
+
+    registry = get_model_registry()
+    model = registry.get_generative_model("gemini-2.0-flash-lite")
+
+    async def blocking_call(index):
+        # The old pattern: a sync client call inside a coroutine
+        return model.generate_content(f"question {index}").text
+
+    async def relevance_call(index):
+        return await _llm_relevance_check(f"question {index}")
+
+    async def generation_call(index):
+        return await generate_response(f"question {index}", "")
+
+    failed = []
+    print(f"{args.requests} concurrent requests, stub delay {args.delay}s, "
+          f"transport {config.llm_transport}, executor {registry.executor._max_workers} workers")
+    print("relevance check")
+    if not args.skip_before:
+        await measure("before: sync generate_content in coroutine", blocking_call, args.requests, args.delay)
+    run = await measure("async: _llm_relevance_check", relevance_call, args.requests, args.delay)
+    check_overlap(failed, run, args.requests, args.delay)
+    print("direct-prompt generation")
+    run = await measure("async: generate_response", generation_call, args.requests, args.delay)
+    check_overlap(failed, run, args.requests, args.delay)
+
+    print(f"stage deadline (CHAT_RELEVANCE_TIMEOUT / CHAT_GENERATION_TIMEOUT = {args.delay / 2}s)")
+    config.relevance_timeout_seconds = args.delay / 2
+    config.generation_timeout_seconds = args.delay / 2
+    # Fallbacks are the plain error message, and every request reaches the stub
+    config.degraded_answers_enabled = False
+    config.breaker_enabled = False
+    run = await measure(
+        "check_relevance past its deadline",
+        lambda index: check_relevance(f"unmatched words {index}"), args.requests, args.delay
+    )
+    verdicts = run["results"]
+    relevant = sum(verdict["relevant"] for verdict in verdicts if isinstance(verdict, dict))
+    print(f"    fallback verdicts relevant: {relevant}/{len(verdicts)}")
+    check(failed, run["elapsed"] < args.delay, f"took {run['elapsed']:.2f}s, past the stage deadline")
+    check(failed, relevant == len(verdicts), "not every check fell back to relevant")
+    run = await measure("generate_response past its deadline", generation_call, args.requests, args.delay)
+    answers = run["results"]
+    errors = sum(answer == GENERATION_ERROR_MESSAGE for answer in answers)
+    print(f"    error messages returned: {errors}/{len(answers)}")
+    check(failed, run["elapsed"] < args.delay, f"took {run['elapsed']:.2f}s, past the stage deadline")
+    check(failed, errors == len(answers), "not every generation fell back to the error message")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--skip-before", action="store_true", help="skip the serialized baseline (N x delay)")
+    args = parser.parse_args()
+
+    SlowStubHandler.delay = args.delay
+    server = QuietServer(("127.0.0.1", 0), SlowStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    workers = str(max(args.requests, 1))
+    os.environ.update(
+        GEMINI_API_KEY="stub-key",
+        CHAT_LLM_TRANSPORT="rest",
+        CHAT_LLM_API_ENDPOINT=f"http://127.0.0.1:{server.server_port}",
+        CHAT_LLM_EXECUTOR_WORKERS=workers,
+        CHAT_LLM_POOL_SIZE=workers,
+        CHAT_RELEVANCE_CLASSIFIER="false",
+    )
+    logging.disable(logging.WARNING)
+    failed = asyncio.run(run(args))
+    server.shutdown()
+    if failed:
+        print(f"FAILED: {len(failed)} check(s)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
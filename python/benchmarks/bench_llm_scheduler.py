@@ -0,0 +1,236 @@
+"""
+LLM Scheduler Benchmark
+Drives the outbound LLM scheduler with a fake limiter, a fake clock and a
+local Gemini REST stub that answers 429 (no API key or network needed)
+
+1. priority: with quota exhausted, queued background, relevance and
+   generation calls are admitted generation-first as quota frees up
+2. token buckets: RPM and estimated-TPM buckets on a fake clock
+3. backoff: a call that hits quota errors is retried with jittered,
+   doubling delays and gives up with QuotaExceededError
+4. end to end: relevance checks and generations through the stub, which
+   rejects the first requests with 429 (RESOURCE_EXHAUSTED)
+
+Usage:
+    python benchmarks/bench_llm_scheduler.py [--calls 30] [--rejections 3]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_llm_concurrency import QuietServer, RESPONSE_BODY  # noqa: E402
+
+QUOTA_BODY = json.dumps({
+    "error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota).", "status": "RESOURCE_EXHAUSTED"}
+}).encode("utf-8")
+
+
+class FakeLimiter:
+    """Grants only as many calls as have been released (QuotaLimiter interface)"""
+
+    def __init__(self):
+        self.available = 0
+        self.penalties = []
+
+    def release(self, count: int):
+        self.available += count
+
+    def acquire(self, model, tokens):
+        if self.available <= 0:
+            return 0.01
+        self.available -= 1
+        return 0.0
+
+    def penalize(self, model, seconds):
+        self.penalties.append(round(seconds, 3))
+
+    def get_stats(self):
+        return {"available": self.available}
+
+
+class FakeQuotaError(Exception):
+    """Stands in for google.api_core.exceptions.ResourceExhausted"""
+
+    code = 429
+
+
+class FlakyStubHandler(BaseHTTPRequestHandler):
+    """Rejects the first `rejections` calls with 429, then answers"""
+
+    protocol_version = "HTTP/1.1"
+    rejections = 3
+    calls = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with FlakyStubHandler.lock:
+            FlakyStubHandler.calls += 1
+            rejected = FlakyStubHandler.calls <= FlakyStubHandler.rejections
+        body = QUOTA_BODY if rejected else RESPONSE_BODY
+        self.send_response(429 if rejected else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def check(label, passed, detail=""):
+    print(f"  [{'ok' if passed else 'FAIL'}] {label}{': ' + detail if detail else ''}")
+    return passed
+
+
+async def priority_order(calls):
+    from llm_chat.llm_scheduler import LLMScheduler, Priority
+
+    limiter = FakeLimiter()
+    scheduler = LLMScheduler(limiter=limiter)
+    order = []
+
+    async def call(priority, index):
+        await scheduler.acquire("model", priority, tokens=100)
+        order.append(Priority(priority).name)
+
+    priorities = [Priority.BACKGROUND, Priority.RELEVANCE, Priority.GENERATION] * (calls // 3)
+    tasks = [asyncio.create_task(call(priority, index)) for index, priority in enumerate(priorities)]
+    await asyncio.sleep(0.05)
+    depths = scheduler.queue_depths()
+    for _ in range(len(tasks)):
+        limiter.release(1)
+        await asyncio.sleep(0.02)
+    await asyncio.gather(*tasks)
+    expected = sorted(order, key=lambda name: Priority[name])
+    stats = scheduler.get_stats()["wait"]
+    ok = check("queued while out of quota", sum(depths.values()) == len(tasks), str(depths))
+    ok &= check("admitted in priority order", order == expected,
+                f"first {order[:3]} ... last {order[-3:]}")
+    ok &= check("wait grows with lower priority",
+                stats["generation"]["mean_ms"] < stats["relevance"]["mean_ms"] < stats["background"]["mean_ms"],
+                ", ".join(f"{name} {value['mean_ms']:.0f} ms" for name, value in stats.items()))
+    return ok
+
+
+def token_buckets():
+    from llm_chat.llm_scheduler import TokenBucketLimiter
+
+    now = [0.0]
+    limiter = TokenBucketLimiter({"model": (60, 10000), "*": (0, 0)}, clock=lambda: now[0])
+    granted = sum(limiter.acquire("model", 100) == 0 for _ in range(100))
+    ok = check("RPM bucket allows one minute's burst", granted == 60, f"{granted}/100 granted at t=0")
+    now[0] += 1.0
+    ok &= check("RPM bucket refills per second", limiter.acquire("model", 100) == 0 and limiter.acquire("model", 100) > 0)
+    limiter = TokenBucketLimiter({"model": (0, 10000)}, clock=lambda: now[0])
+    granted = sum(limiter.acquire("model", 3000) == 0 for _ in range(10))
+    wait = limiter.acquire("model", 3000)
+    ok &= check("TPM bucket limits by estimated tokens", granted == 3, f"3000-token calls: {granted} granted, "
+                f"next waits {wait:.1f}s")
+    ok &= check("unlisted models are unlimited", all(limiter.acquire("other", 10 ** 6) == 0 for _ in range(1000)))
+    limiter.penalize("other", 2.0)
+    ok &= check("penalized model is held back", limiter.acquire("other", 1) > 1.9)
+    return ok
+
+
+async def backoff():
+    from llm_chat.llm_scheduler import LLMScheduler, Priority, QuotaExceededError
+
+    delays = []
+
+    async def fake_sleep(seconds):
+        delays.append(seconds)
+
+    limiter = FakeLimiter()
+    limiter.release(100)
+    scheduler = LLMScheduler(limiter=limiter, max_retries=3, backoff_base=0.5, backoff_max=8.0, sleep=fake_sleep)
+    attempts = [0]
+
+    async def flaky():
+        attempts[0] += 1
+        if attempts[0] <= 2:
+            raise FakeQuotaError("429")
+        return "ok"
+
+    result = await scheduler.submit("model", flaky, Priority.RELEVANCE)
+    ok = check("retried after two 429s", result == "ok" and attempts[0] == 3, f"delays {[round(d, 3) for d in delays]}")
+    ok &= check("delays jittered within doubling caps", 0 <= delays[0] <= 0.5 and 0 <= delays[1] <= 1.0)
+    ok &= check("limiter penalized per 429", len(limiter.penalties) == 2, str(limiter.penalties))
+
+    async def always_429():
+        raise FakeQuotaError("429")
+
+    try:
+        await scheduler.submit("model", always_429)
+        ok &= check("gives up after max_retries", False)
+    except QuotaExceededError as error:
+        ok &= check("gives up after max_retries", error.attempts == 4, str(error))
+    return ok
+
+
+async def end_to_end(rejections):
+    from llm_chat.llm_scheduler import get_llm_scheduler
+    from llm_chat.relevance_filter import _llm_relevance_check
+    from llm_chat.response_generator import ERROR_MESSAGES, generate_response
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(_llm_relevance_check(f"question {index}") for index in range(3)),
+        *(generate_response(f"question {index}", "") for index in range(3)),
+    )
+    elapsed = time.perf_counter() - started
+    stats = get_llm_scheduler().get_stats()
+    ok = check("calls succeed after 429s", all(results[:3]) and not set(results[3:]) & set(ERROR_MESSAGES),
+               f"{FlakyStubHandler.calls} stub calls, {rejections} rejected, {elapsed:.2f}s")
+    ok &= check("retries counted", stats["retries"] == rejections and stats["quota_errors"] == rejections,
+                f"retries {stats['retries']}, quota_errors {stats['quota_errors']}, failures {stats['failures']}")
+    print(f"  scheduler stats: {json.dumps(stats)}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=30)
+    parser.add_argument("--rejections", type=int, default=3)
+    args = parser.parse_args()
+
+    FlakyStubHandler.rejections = args.rejections
+    server = QuietServer(("127.0.0.1", 0), FlakyStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # llm_chat reads its config on first import, so set the environment first
+    os.environ.update(
+        GEMINI_API_KEY="stub-key",
+        CHAT_LLM_TRANSPORT="rest",
+        CHAT_LLM_API_ENDPOINT=f"http://127.0.0.1:{server.server_port}",
+        CHAT_LLM_BACKOFF_BASE="0.05",
+        CHAT_SESSION_BACKEND="memory",
+    )
+    logging.disable(logging.WARNING)
+
+    ok = True
+    print("1. priority queue (fake limiter)")
+    ok &= asyncio.run(priority_order(args.calls))
+    print("2. token buckets (fake clock)")
+    ok &= token_buckets()
+    print("3. jittered backoff on 429 (fake sleep)")
+    ok &= asyncio.run(backoff())
+    print(f"4. end to end (stub rejects the first {args.rejections} calls with 429)")
+    ok &= asyncio.run(end_to_end(args.rejections))
+    server.shutdown()
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
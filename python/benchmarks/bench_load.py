@@ -0,0 +1,212 @@
+"""
+Chat Load Test
+Drives multi-turn chat sessions through handle_chat_request (or main.py's
+/api/chat via an in-process ASGI client) against the fake LLM backend, at
+growing concurrency, with no API key or network
+
+Each virtual user picks a session script (Korean/English questions,
+follow-ups, off-topic turns), sends its turns with a think time in between
+and starts a new session when the script ends. Per stage it reports
+throughput, latency p50/p95/p99, errors and event-loop lag (how late a
+10 ms heartbeat wakes up), which shows blocking work on the loop.
+
+Fake LLM behaviour comes from CHAT_FAKE_LLM_* (see .env.example); the
+flags below override the latency, token rate and error rates.
+
+Usage:
+    python benchmarks/bench_load.py [--target handler|asgi] [--concurrency 1,5,10,25,50]
+        [--duration 10] [--think 0.2] [--latency lognormal:0.8,0.4] [--token-rate 80]
+        [--error-rate 0] [--quota-error-rate 0]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SESSION_SCRIPTS = [
+    [
+        "What is Kangbeen Ko's latest research?",
+        "Which conference was it published at?",
+        "What other projects has he worked on?",
+    ],
+    [
+        "고강빈의 최근 연구는 무엇인가요?",
+        "그 연구는 어디에 발표됐나요?",
+        "다른 프로젝트도 알려주세요",
+    ],
+    [
+        "Tell me about his education",
+        "What programming languages does he use?",
+    ],
+    [
+        "What's the weather like today?",
+        "Okay, what awards has he won?",
+    ],
+    [
+        "수상 경력이 있나요?",
+        "Hi!",
+        "Where can I find his papers?",
+    ],
+]
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic heartbeat wakes up on the event loop"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags = []
+        self._task = None
+
+    async def _beat(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(time.perf_counter() - started - self.interval, 0.0))
+
+    def start(self):
+        self.lags = []
+        self._task = asyncio.create_task(self._beat())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def handler_target():
+    from llm_chat.chat_handler import handle_chat_request
+
+    async def send(message, history, session_id):
+        return await handle_chat_request(message=message, history=history, session_id=session_id)
+
+    return send, None
+
+
+def asgi_target():
+    import httpx
+    from main import app
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=60)
+
+    async def send(message, history, session_id):
+        response = await client.post(
+            "/api/chat", json={"message": message, "history": history, "sessionId": session_id})
+        if response.status_code != 200:
+            return {"response": None, "error": f"HTTP {response.status_code}"}
+        return response.json()
+
+    return send, client
+
+
+async def virtual_user(send, deadline, think, rng, latencies, counters):
+    while time.perf_counter() < deadline:
+        script = rng.choice(SESSION_SCRIPTS)
+        session_id = str(uuid.uuid4())
+        history = []
+        for message in script:
+            if time.perf_counter() >= deadline:
+                return
+            started = time.perf_counter()
+            try:
+                result = await send(message, history, session_id)
+            except Exception:
+                result = {"response": None, "error": "exception"}
+            latencies.append(time.perf_counter() - started)
+            if result.get("error") or not result.get("response"):
+                counters["errors"] += 1
+            else:
+                # Same shape as the frontend (main.ChatMessage)
+                history += [{"role": "user", "parts": [{"text": message}]},
+                            {"role": "model", "parts": [{"text": result["response"]}]}]
+            counters["requests"] += 1
+            await asyncio.sleep(rng.expovariate(1.0 / think) if think > 0 else 0)
+
+
+async def stage(send, users, duration, think, seed):
+    latencies = []
+    counters = {"requests": 0, "errors": 0}
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        virtual_user(send, deadline, think, random.Random(seed + index), latencies, counters)
+        for index in range(users)
+    ))
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+    if not latencies:
+        print(f"  {users:>5} users: no requests completed")
+        return
+    lag_ms = [lag * 1000 for lag in monitor.lags] or [0.0]
+    print(f"  {users:>5} {counters['requests'] / elapsed:9.1f} "
+          f"{statistics.median(latencies) * 1000:8.0f} {percentile(latencies, 0.95) * 1000:8.0f} "
+          f"{percentile(latencies, 0.99) * 1000:8.0f} {counters['errors']:7d} "
+          f"{statistics.mean(lag_ms):8.1f} {max(lag_ms):8.1f}")
+
+
+async def run(args):
+    from llm_chat.llm_backends import get_model_registry
+
+    send, client = asgi_target() if args.target == "asgi" else handler_target()
+    backend = get_model_registry().backend
+    # Warm-up turn, so imports and model creation do not land in the first stage
+    await send(SESSION_SCRIPTS[0][0], [], str(uuid.uuid4()))
+    print(f"target: {args.target}, backend: {backend.name}, latency {args.latency}, "
+          f"{args.token_rate} tok/s, think {args.think}s, {args.duration}s per stage")
+    print(f"  {'users':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} "
+          f"{'lag avg':>8} {'lag max':>8}")
+    for index, users in enumerate(int(value) for value in args.concurrency.split(",")):
+        await stage(send, users, args.duration, args.think, args.seed + 1000 * index)
+    print(f"backend: {backend.get_stats()}")
+    if client is not None:
+        await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["handler", "asgi"], default="handler")
+    parser.add_argument("--concurrency", default="1,5,10,25,50")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--think", type=float, default=0.2, help="Mean think time between turns (s)")
+    parser.add_argument("--latency", default=os.getenv("CHAT_FAKE_LLM_LATENCY", "lognormal:0.8,0.4"))
+    parser.add_argument("--token-rate", type=float, default=float(os.getenv("CHAT_FAKE_LLM_TOKEN_RATE", "80")))
+    parser.add_argument("--error-rate", type=float, default=float(os.getenv("CHAT_FAKE_LLM_ERROR_RATE", "0")))
+    parser.add_argument("--quota-error-rate", type=float,
+                        default=float(os.getenv("CHAT_FAKE_LLM_QUOTA_ERROR_RATE", "0")))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # llm_chat reads its config on first import, so set the environment first
+    os.environ.update(
+        CHAT_LLM_BACKEND="fake",
+        CHAT_SESSION_BACKEND="memory",
+        CHAT_FAKE_LLM_LATENCY=args.latency,
+        CHAT_FAKE_LLM_TOKEN_RATE=str(args.token_rate),
+        CHAT_FAKE_LLM_ERROR_RATE=str(args.error_rate),
+        CHAT_FAKE_LLM_QUOTA_ERROR_RATE=str(args.quota_error_rate),
+        CHAT_FAKE_LLM_SEED=str(args.seed),
+    )
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
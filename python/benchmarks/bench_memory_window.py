@@ -0,0 +1,106 @@
+"""
+Conversation Memory Benchmark
+Sends 100 turns through a session's ConversationChain and reports the
+prompt size per turn for the "buffer" memory mode (whole history) and the
+"budget" mode (recent turns under a token budget plus a background
+summary), showing where the budgeted prompt levels off
+
+Runs offline: the chat model is LangChain's GenericFakeChatModel, so it
+measures prompt construction only.
+
+Usage:
+    python benchmarks/bench_memory_window.py [--turns 100] [--budget 1200]
+"""
+
+import argparse
+import asyncio
+import itertools
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.language_models import GenericFakeChatModel  # noqa: E402
+from langchain_core.messages import AIMessage  # noqa: E402
+
+from llm_chat.config import config  # noqa: E402
+from llm_chat.langchain_memory import LangChainMemoryManager  # noqa: E402
+from llm_chat.long_term_memory import get_long_term_memory  # noqa: E402
+from llm_chat.text_utils import estimate_tokens  # noqa: E402
+
+QUESTIONS = [
+    "What is Kangbeen's latest research about?",
+    "Tell me more about that paper.",
+    "Which programming languages does he use?",
+    "어떤 프로젝트를 했어?",
+    "그 프로젝트에서 어떤 역할을 했어?",
+    "Where did he study?",
+    "What awards has he received?",
+    "How does LEGOLAS relate to his other work?",
+]
+
+ANSWER = (
+    "Kangbeen Ko worked on <link>LEGOLAS</link>, a study on golf swing analysis with wearable sensors, "
+    "and several machine learning projects described on the <link>Research</link> page."
+)
+SUMMARY = "The visitor asked about Kangbeen Ko's research (LEGOLAS), projects, education and awards."
+
+
+def fake_model():
+    """Chat model that answers with a fixed ~60-token reply (summaries included)"""
+    replies = (AIMessage(content=SUMMARY if index % 5 == 4 else ANSWER) for index in itertools.count())
+    return GenericFakeChatModel(messages=replies)
+
+
+async def run_mode(mode, turns, profile_context, site_links):
+    """Per-turn prompt token counts for one memory mode"""
+    config.memory_mode = mode
+    manager = LangChainMemoryManager(f"bench-{mode}")
+    manager.llm = fake_model()
+    chain = manager.create_chain(profile_context, site_links, datetime.utcnow().isoformat())
+
+    sizes = []
+    for turn in range(turns):
+        question = QUESTIONS[turn % len(QUESTIONS)]
+        inputs = manager.memory.load_memory_variables({})
+        inputs["input"] = question
+        sizes.append(estimate_tokens(chain.prompt.format(**inputs)))
+        await chain.apredict(input=question)
+        task = manager.schedule_summary()
+        if task is not None:
+            await task  # in the server this runs in the background after the response
+    return sizes, manager
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--budget", type=int, default=config.memory_token_budget, help="token budget of the window")
+    parser.add_argument("--max-turns", type=int, default=config.memory_max_turns)
+    args = parser.parse_args()
+
+    config.memory_token_budget = args.budget
+    config.memory_max_turns = args.max_turns
+    config.memory_summary_enabled = True
+
+    ltm = get_long_term_memory()
+    profile_context = ltm.get_context_for_llm()
+    site_links = ltm.get_site_links()
+
+    buffer_sizes, _ = await run_mode("buffer", args.turns, profile_context, site_links)
+    budget_sizes, manager = await run_mode("budget", args.turns, profile_context, site_links)
+
+    print(f"Prompt tokens per turn (estimated), budget {args.budget} tokens / {args.max_turns} turns")
+    print(f"{'turn':>5} | {'buffer':>8} | {'budget':>8}")
+    for turn in sorted({0, 1, 4, 9} | set(range(19, args.turns, 10)) | {args.turns - 1}):
+        print(f"{turn + 1:>5} | {buffer_sizes[turn]:>8} | {budget_sizes[turn]:>8}")
+
+    tail = budget_sizes[len(budget_sizes) // 2:]
+    print(f"\nbudget mode, second half of the chat: min {min(tail)} / max {max(tail)} tokens "
+          f"(spread {max(tail) - min(tail)}); buffer mode grew by {buffer_sizes[-1] - buffer_sizes[0]} tokens")
+    print(f"messages summarized: {manager.memory.summarized_count} of {len(manager.memory.chat_memory.messages)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
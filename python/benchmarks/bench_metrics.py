@@ -0,0 +1,90 @@
+"""
+Metrics Overhead Benchmark
+Cost of the per-stage timing instrumentation, and a sample of /metrics and
+/debug/timings after a few requests against the fake LLM backend
+
+1. overhead: start_request, the spans of a fully generated answer (11
+   stages) and finish_request, timed in a tight loop with metrics on and off
+2. endpoints: a handful of chat requests through main.py (in-process ASGI
+   client), then an excerpt of GET /metrics and the newest breakdown from
+   GET /debug/timings
+
+Usage:
+    python benchmarks/bench_metrics.py [--iterations 100000] [--requests 10]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Spans of an answered request (chain path, LLM relevance check)
+STAGES = [
+    "language_detection", "response_cache", "relevance_quick", "relevance_quick", "relevance_llm",
+    "ltm_context", "chain", "llm_call", "memory_write", "linkify", "memory_write",
+]
+
+
+def overhead(iterations):
+    from llm_chat.metrics import ChatMetrics
+
+    print(f"1. overhead ({iterations} requests, {len(STAGES)} spans each)")
+    for enabled in (False, True):
+        metrics = ChatMetrics(enabled=enabled)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            timings = metrics.start_request()
+            for stage in STAGES:
+                with metrics.span(stage):
+                    pass
+            metrics.chains.inc("reused")
+            metrics.finish_request(timings, "answered")
+        per_request = (time.perf_counter() - started) / iterations * 1e6
+        print(f"  metrics {'on ' if enabled else 'off'}  {per_request:6.2f} us per request")
+
+
+async def endpoints(requests):
+    import httpx
+    from main import app
+
+    print(f"2. endpoints ({requests} chat requests, fake backend)")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        questions = ["What is Kangbeen Ko's latest research?", "Which conference was it published at?",
+                     "What's the weather like today?"]
+        for index in range(requests):
+            await client.post("/api/chat", json={
+                "message": questions[index % len(questions)], "sessionId": f"bench-{index // 3}"})
+        text = (await client.get("/metrics")).text
+        lines = [line for line in text.splitlines()
+                 if not line.startswith("chat_stage_seconds_bucket") and not line.startswith("chat_request_seconds_bucket")]
+        print("  GET /metrics (without _bucket lines):")
+        print("    " + "\n    ".join(lines))
+        recent = (await client.get("/debug/timings", params={"limit": 1})).json()["recent"][0]
+        print(f"  GET /debug/timings (newest): {recent}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+
+    # llm_chat reads its config on first import, so set the environment first
+    os.environ.update(
+        CHAT_LLM_BACKEND="fake",
+        CHAT_SESSION_BACKEND="memory",
+        CHAT_FAKE_LLM_LATENCY="fixed:0.05",
+        CHAT_FAKE_LLM_TOKEN_RATE="0",
+    )
+    logging.disable(logging.CRITICAL)
+    overhead(args.iterations)
+    asyncio.run(endpoints(args.requests))
+
+
+if __name__ == "__main__":
+    main()
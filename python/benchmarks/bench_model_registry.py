@@ -0,0 +1,140 @@
+"""
+Model Registry Benchmark
+Per-request client setup with and without the process-wide model registry,
+against a local stub of the Gemini REST API (no API key or network needed)
+
+"before" builds a ChatGoogleGenerativeAI per session (as every new session
+did) or a GenerativeModel per call; "registry" reuses the shared models and
+their pooled keep-alive connections. Each request is treated as a new
+session, the worst case for per-session clients.
+
+Usage:
+    python benchmarks/bench_model_registry.py [--requests 200] [--threads 4]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+RESPONSE_BODY = json.dumps({
+    "candidates": [{"content": {"parts": [{"text": "ok"}], "role": "model"}, "finishReason": "STOP", "index": 0}]
+}).encode("utf-8")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every generateContent call at once, with HTTP/1.1 keep-alive"""
+
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out as separate writes; avoid delayed-ACK stalls
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with StubHandler.lock:
+            StubHandler.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE_BODY)))
+        self.end_headers()
+        self.wfile.write(RESPONSE_BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(label, setup, call, requests, threads):
+    """Time setup and call per request; report stub connections opened"""
+    setup_ms, call_ms = [], []
+    opened_before = StubHandler.connections
+
+    def one(index):
+        started = time.perf_counter()
+        client = setup()
+        built = time.perf_counter()
+        call(client, index)
+        setup_ms.append((built - started) * 1000)
+        call_ms.append((time.perf_counter() - built) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<40} setup {statistics.mean(setup_ms):7.3f} ms  call {statistics.mean(call_ms):6.2f} ms  "
+          f"total {elapsed / requests * 1000:6.2f} ms/req  connections {StubHandler.connections - opened_before}")
+    return statistics.mean(setup_ms) + statistics.mean(call_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_port}"
+    os.environ.update(GEMINI_API_KEY="stub-key", CHAT_LLM_TRANSPORT="rest", CHAT_LLM_API_ENDPOINT=endpoint)
+
+    import google.generativeai as genai
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from llm_chat.config import config
+    from llm_chat.llm_backends import get_model_registry
+
+    genai.configure(api_key="stub-key", transport="rest", client_options={"api_endpoint": endpoint})
+    registry = get_model_registry()
+
+    print(f"{args.requests} requests, {args.threads} threads, stub at {endpoint}")
+    print("LangChain chat model (conversation path)")
+    before = run(
+        "before: ChatGoogleGenerativeAI per session",
+        lambda: ChatGoogleGenerativeAI(
+            model="gemini-2.5-flash", google_api_key="stub-key", temperature=0.7,
+            transport="rest", client_options={"api_endpoint": endpoint}
+        ),
+        lambda model, index: model.invoke(f"question {index}"),
+        args.requests, args.threads
+    )
+    after = run(
+        "registry: shared chat model",
+        lambda: registry.get_chat_model("gemini-2.5-flash", temperature=0.7),
+        lambda model, index: model.invoke(f"question {index}"),
+        args.requests, args.threads
+    )
+    print(f"  saved {before - after:.2f} ms per request")
+
+    print("google.generativeai model (relevance check, rejections, direct prompt)")
+    before = run(
+        "before: GenerativeModel per call",
+        lambda: genai.GenerativeModel("gemini-2.0-flash-lite"),
+        lambda model, index: model.generate_content(f"question {index}").text,
+        args.requests, args.threads
+    )
+    after = run(
+        "registry: shared generative model",
+        lambda: registry.get_generative_model("gemini-2.0-flash-lite"),
+        lambda model, index: model.generate_content(f"question {index}").text,
+        args.requests, args.threads
+    )
+    print(f"  saved {before - after:.2f} ms per request")
+
+    print(f"\nregistry stats ({config.llm_transport}): {registry.get_stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
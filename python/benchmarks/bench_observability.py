@@ -0,0 +1,152 @@
+"""
+Observability Overhead Benchmark
+Request latency with logging and Langfuse tracing off, fully on, and
+sampled, against the fake LLM backend and a stand-in Langfuse client whose
+calls cost --langfuse-call-ms of CPU each (serialization in the real SDK)
+
+Modes (each runs in its own process, logs go to a temporary file):
+    off      CHAT_TRACING=false, CHAT_LOG_LEVEL=INFO
+    inline   DEBUG logging written synchronously and every trace exported
+             inline at the end of the request (the old behaviour)
+    on       DEBUG logging through the background thread, every trace
+             exported in batches by the background exporter
+    sampled  INFO logging, 10% head sampling, slow or failed requests kept
+
+Usage:
+    python benchmarks/bench_observability.py [--requests 300] [--concurrency 10] [--langfuse-call-ms 0.3]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+MODES = {
+    "off": {"CHAT_TRACING": "false", "CHAT_LOG_LEVEL": "INFO"},
+    "inline": {"CHAT_TRACING": "true", "CHAT_LOG_LEVEL": "DEBUG", "CHAT_LOG_ASYNC": "false"},
+    "on": {"CHAT_TRACING": "true", "CHAT_LOG_LEVEL": "DEBUG", "CHAT_LOG_ASYNC": "true"},
+    "sampled": {"CHAT_TRACING": "true", "CHAT_LOG_LEVEL": "INFO", "CHAT_TRACE_SAMPLE_RATE": "0.1",
+                "CHAT_TRACE_KEEP_SLOW_SECONDS": "1"},
+}
+
+QUESTIONS = ["Tell me about his education", "What projects has he worked on?", "Which one used LLMs?"]
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class FakeLangfuse:
+    """Langfuse client stand-in: every call burns call_seconds of CPU"""
+
+    def __init__(self, call_seconds):
+        self.call_seconds = call_seconds
+        self.calls = 0
+
+    def _work(self):
+        self.calls += 1
+        end = time.perf_counter() + self.call_seconds
+        while time.perf_counter() < end:
+            pass
+
+    def trace(self, **kwargs):
+        self._work()
+        return self
+
+    def update(self, **kwargs):
+        self._work()
+
+    def event(self, **kwargs):
+        self._work()
+
+    def generation(self, **kwargs):
+        self._work()
+
+
+async def child(args):
+    from llm_chat.chat_handler import handle_chat_request
+    from llm_chat.config import config
+    from llm_chat.observability import TraceExporter, get_trace_exporter, get_tracing_stats
+
+    client = FakeLangfuse(args.langfuse_call_ms / 1000)
+    config._langfuse_client = client
+    config._langfuse_loaded = True
+    if args.mode == "inline":
+        TraceExporter.submit = lambda self, trace: self._export([trace])
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def session(index):
+        async with semaphore:
+            for question in QUESTIONS:
+                started = time.perf_counter()
+                await handle_chat_request(message=f"{question} ({index})", session_id=f"s{index}")
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(session(index) for index in range(args.requests // len(QUESTIONS))))
+    elapsed = time.perf_counter() - started
+    get_trace_exporter().flush()
+    print(json.dumps({
+        "throughput": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "langfuse_calls": client.calls,
+        "sampling": get_tracing_stats()["sampling"],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--langfuse-call-ms", type=float, default=0.3)
+    parser.add_argument("--mode", choices=sorted(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        logging.getLogger("langchain").setLevel(logging.ERROR)
+        asyncio.run(child(args))
+        return
+
+    print(f"{args.requests} requests ({len(QUESTIONS)}-turn sessions), {args.concurrency} sessions at a time, "
+          f"fake LLM 20 ms, {args.langfuse_call_ms} ms per Langfuse call")
+    print(f"  {'mode':<8} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'lf calls':>9}  sampling")
+    for mode, env in MODES.items():
+        child_env = dict(
+            os.environ,
+            CHAT_LLM_BACKEND="fake",
+            CHAT_SESSION_BACKEND="memory",
+            CHAT_FAKE_LLM_LATENCY="fixed:0.02",
+            CHAT_FAKE_LLM_TOKEN_RATE="0",
+            # Every question is new, so the cache and single-flight do not skip work
+            CHAT_RESPONSE_CACHE="false",
+            **env
+        )
+        with tempfile.TemporaryFile() as log:
+            output = subprocess.run(
+                [sys.executable, "-W", "ignore", __file__, "--mode", mode,
+                 "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+                 "--langfuse-call-ms", str(args.langfuse_call_ms)],
+                env=child_env, stdout=subprocess.PIPE, stderr=log, text=True, check=True
+            ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        sampling = {key: value for key, value in result["sampling"].items() if value}
+        print(f"  {mode:<8} {result['throughput']:7.1f} {result['p50'] * 1000:8.1f} {result['p95'] * 1000:8.1f} "
+              f"{result['p99'] * 1000:8.1f} {result['langfuse_calls']:9d}  {sampling}")
+
+
+if __name__ == "__main__":
+    main()
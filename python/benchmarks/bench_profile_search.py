@@ -0,0 +1,168 @@
+"""
+Profile Search Benchmark
+Query latency of the snapshot's inverted index against the previous
+JSON-substring scan of LongTermMemory.search, on the real profile and on
+synthetic profiles scaled up with copies of every item whose words are
+replaced by made-up ones, so the vocabulary grows with the item count
+
+Usage:
+    python benchmarks/bench_profile_search.py [--scales 1 10] [--repeat 2000]
+"""
+
+import argparse
+import copy
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from llm_chat.long_term_memory import LongTermMemory  # noqa: E402
+from llm_chat.profile_index import SKIPPED_FIELDS, ProfileIndex  # noqa: E402
+
+# (query, search_ranked options)
+QUERIES = [
+    ("legolas", {}),
+    ("golf swing", {}),
+    ("llm OR wearable", {}),
+    ("deep learning", {"mode": "or"}),
+    ("pyth*", {}),
+    ("reinforcement learning agent", {"prefix": True}),
+    ("고려대학교", {}),
+    ("nonexistent term", {}),
+]
+
+
+_WORD_PATTERN = re.compile(r"[^\W\d_]+")
+_HANGUL_PATTERN = re.compile(r"[가-힣]")
+_SYLLABLES = [consonant + vowel for consonant in "bdfgklmnprstvz" for vowel in "aeiou"]
+
+
+class Vocabulary:
+    """Made-up words, one per (word, copy), never reusing a real or earlier word"""
+
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+        self.words = {}
+        self.used = set()
+
+    def reserve(self, text):
+        self.used.update(word.lower() for word in _WORD_PATTERN.findall(text))
+
+    def word(self, word, copy_index):
+        key = (word.lower(), copy_index)
+        if key not in self.words:
+            hangul = bool(_HANGUL_PATTERN.search(word))
+            length = max(1, len(word) if hangul else len(word) // 2)
+            while True:
+                if hangul:
+                    made_up = "".join(chr(0xAC00 + self.random.randrange(11172)) for _ in range(length))
+                else:
+                    made_up = "".join(self.random.choice(_SYLLABLES) for _ in range(length))
+                if made_up not in self.used:
+                    break
+                # Short words run out of combinations; grow on collisions
+                length += 1
+            self.used.add(made_up)
+            self.words[key] = made_up
+        return self.words[key]
+
+
+def _rewrite(value, rewrite_text):
+    if isinstance(value, str):
+        return rewrite_text(value)
+    if isinstance(value, list):
+        return [_rewrite(element, rewrite_text) for element in value]
+    if isinstance(value, dict):
+        return {
+            key: element if key in SKIPPED_FIELDS else _rewrite(element, rewrite_text)
+            for key, element in value.items()
+        }
+    return value
+
+
+def scale_profile(data, factor):
+    """
+    The profile plus factor - 1 copies of every item with made-up words
+
+    The same word maps to the same made-up word within a copy, so each copy
+    keeps the original's term frequencies; numbers (years) are kept.
+    """
+    vocabulary = Vocabulary()
+    vocabulary.reserve(json.dumps(data, ensure_ascii=False))
+    scaled = {}
+    for category, items in data.items():
+        if not isinstance(items, list):
+            scaled[category] = items
+            continue
+        scaled[category] = copy.deepcopy(items)
+        for copy_index in range(1, factor):
+            def rewrite_text(text):
+                return _WORD_PATTERN.sub(lambda match: vocabulary.word(match.group(), copy_index), text)
+            scaled[category].extend(_rewrite(item, rewrite_text) for item in items)
+    return scaled
+
+
+def legacy_search(data, query):
+    """LongTermMemory.search before the index: substring scan of serialized items"""
+    query_lower = query.lower()
+    results = {}
+    for category, items in data.items():
+        if not isinstance(items, list):
+            continue
+        matching_items = [item for item in items if query_lower in json.dumps(item, ensure_ascii=False).lower()]
+        if matching_items:
+            results[category] = matching_items
+    return results
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def timed(function, repeat):
+    """Per-call latencies in microseconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1e6)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    base = LongTermMemory(reload_interval=0).data
+    for scale in args.scales:
+        data = scale_profile(base, scale)
+        items = sum(len(items) for items in data.values() if isinstance(items, list))
+        started = time.perf_counter()
+        index = ProfileIndex(data)
+        build_ms = (time.perf_counter() - started) * 1000
+        print(f"\nscale x{scale}: {items} items, {index.term_count} terms, index built in {build_ms:.1f} ms")
+        print(f"  {'query':<44} {'hits':>5} {'scan mean':>11} {'index mean':>11} {'index p99':>10}")
+
+        worst_p99 = 0.0
+        for query, options in QUERIES:
+            hits = len(index.search(query, **options))
+            scan = timed(lambda: legacy_search(data, query), max(1, args.repeat // 10))
+            lookup = timed(lambda: index.search(query, **options), args.repeat)
+            worst_p99 = max(worst_p99, percentile(lookup, 0.99))
+            label = query + (f" {options}" if options else "")
+            print(f"  {label:<44} {hits:>5} {statistics.mean(scan):>9.1f}us "
+                  f"{statistics.mean(lookup):>9.1f}us {percentile(lookup, 0.99):>8.1f}us")
+        print(f"  worst index p99: {worst_p99 / 1000:.3f} ms ({'sub-millisecond' if worst_p99 < 1000 else 'over 1 ms'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Relevance Matcher Benchmark
+Per-call cost of quick_relevance_check: the previous list of 22 uncompiled
+re.search patterns versus the precompiled single-pass keyword matcher, and
+how both scale as the keyword lists grow. Checks the verdicts of EXPECTED
+first and exits with status 1 if any of them changed.
+
+Usage:
+    python benchmarks/bench_relevance_matcher.py [--iterations 20000]
+"""
+
+import argparse
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_chat.keyword_matcher import KeywordMatcher  # noqa: E402
+from llm_chat.relevance_filter import quick_relevance_check, get_relevance_matcher  # noqa: E402
+
+QUERIES = [
+    "What's the weather in Paris?",
+    "Tell me about his research",
+    "고강빈 연구는 뭐야?",
+    "Can pigs fly?",
+    "어떤 프로그래밍 언어를 써?",
+    "Where did he study and what degree does he have?",
+    "요즘 인기있는 영화 추천해줘",
+    "What programming languages and frameworks has Kangbeen used in his projects so far?",
+]
+
+# Verdicts quick_relevance_check must keep (None = left to the classifier or LLM)
+EXPECTED = [
+    ("What's the weather in Paris?", False),
+    ("요즘 인기있는 영화 추천해줘", False),
+    ("오늘 날씨 어때?", False),
+    ("Tell me about his research", True),
+    ("고강빈 연구는 뭐야?", True),
+    ("Can pigs fly?", None),
+    # Korean endings must not turn profile questions into rejections
+    ("그는 요즘 어떤 기술을 배우는 중이야?", True),
+    ("그 프로젝트에서 정치적인 문제는?", None),
+    ("게임 개발 프로젝트도 했어?", None),
+    # Verb endings must not attach to one-syllable keywords ("상" + "하이")
+    ("상하이 맛집 추천해줘", None),
+    ("상해 여행 일정 짜줘", None),
+    ("받은 상 알려줘", True),
+    ("상을 받은 적 있어?", True),
+]
+
+LEGACY_IRRELEVANT = [
+    r'\b(weather|날씨|기온|온도)\b',
+    r'\b(cooking|요리|레시피|음식)\b',
+    r'\b(sports|스포츠|축구|야구|농구)\b',
+    r'\b(movie|영화|드라마|배우)\b',
+    r'\b(music|음악|가수|노래)\b',
+    r'\b(game|게임|플레이)\b',
+    r'\b(stock|주식|투자|증권)\b',
+    r'\b(politics|정치|선거)\b',
+    r'\b(recipe|요리법)\b',
+    r'\b(how to cook|요리하는 방법)\b',
+    r'\b(what is the weather|날씨가 어때)\b',
+]
+
+LEGACY_RELEVANT = [
+    r'\b(kangbeen|고강빈|강빈)\b',
+    r'\b(research|연구|논문|paper|publication)\b',
+    r'\b(education|교육|학력|degree|학교)\b',
+    r'\b(experience|경력|work|직장|회사)\b',
+    r'\b(project|프로젝트)\b',
+    r'\b(skill|기술|능력|programming|개발)\b',
+    r'\b(award|수상|상|prize)\b',
+    r'\b(cv|이력서|resume)\b',
+    r'\b(background|배경|소개|introduction|about)\b',
+    r'\b(what do you|당신은|너는|you are|your)\b',
+    r'\b(hello|hi|안녕|인사)\b',
+]
+
+
+def legacy_quick_relevance_check(query, irrelevant=LEGACY_IRRELEVANT, relevant=LEGACY_RELEVANT):
+    """The previous implementation: one re.search per pattern string"""
+    if not query:
+        return None
+    query_lower = query.lower().strip()
+    for pattern in irrelevant:
+        if re.search(pattern, query_lower):
+            return False
+    for pattern in relevant:
+        if re.search(pattern, query_lower):
+            return True
+    return None
+
+
+def synthetic_keywords(count):
+    """Build `count` extra unmatched keywords split into groups of four"""
+    words = [f"term{index}x" for index in range(count)]
+    return [words[i:i + 4] for i in range(0, len(words), 4)]
+
+
+def check_expected():
+    """Print each expected verdict; returns the number of mismatches"""
+    failures = 0
+    print("Expected verdicts")
+    for query, expected in EXPECTED:
+        verdict = quick_relevance_check(query)
+        flag = "" if verdict == expected else f"  <-- expected {expected}"
+        failures += verdict != expected
+        print(f"  {str(verdict):<5} {query}{flag}")
+    return failures
+
+
+def per_call_us(function, iterations):
+    """Mean microseconds per call over QUERIES"""
+    total = timeit.timeit(lambda: [function(query) for query in QUERIES], number=iterations)
+    return total / (iterations * len(QUERIES)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    failures = check_expected()
+    if failures:
+        print(f"{failures} verdict(s) changed")
+        sys.exit(1)
+
+    matcher = get_relevance_matcher()
+    print(f"\nCurrent rules ({matcher.keyword_count} keywords)")
+    print(f"  legacy re.search list : {per_call_us(legacy_quick_relevance_check, args.iterations):8.2f} us/call")
+    print(f"  compiled matcher      : {per_call_us(quick_relevance_check, args.iterations):8.2f} us/call")
+
+    print("\nScaling with keyword count (synthetic keywords added to the relevant group)")
+    print(f"{'keywords':>9} | {'legacy us/call':>14} | {'matcher us/call':>15}")
+    iterations = max(1, args.iterations // 10)
+    for extra in (0, 100, 500, 2000):
+        groups = synthetic_keywords(extra)
+        legacy_relevant = LEGACY_RELEVANT + [rf"\b({'|'.join(group)})\b" for group in groups]
+        rules = {
+            "irrelevant": {"legacy": [w for p in LEGACY_IRRELEVANT for w in p[4:-3].split("|")]},
+            "relevant": {"legacy": [w for p in legacy_relevant for w in p[4:-3].split("|")]},
+        }
+        scaled_matcher = KeywordMatcher(rules, priority=["irrelevant", "relevant"])
+        legacy_us = per_call_us(lambda q: legacy_quick_relevance_check(q, relevant=legacy_relevant), iterations)
+        matcher_us = per_call_us(scaled_matcher.match, iterations)
+        print(f"{scaled_matcher.keyword_count:>9} | {legacy_us:>14.2f} | {matcher_us:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
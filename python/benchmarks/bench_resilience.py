@@ -0,0 +1,179 @@
+"""
+Generation Resilience Benchmark
+Hedged requests and the circuit breaker around answer generation, against a
+local stub of the Gemini REST API (no API key or network needed)
+
+1. hedging: every tenth stub call takes --slow seconds instead of --fast.
+   Direct-prompt generations are run with hedging off and on; the tail
+   latency drops once the hedge delay has learned the p95
+2. circuit breaker: the stub starts failing (HTTP 500). Once the error
+   rate over the last CHAT_BREAKER_WINDOW calls reaches
+   CHAT_BREAKER_ERROR_RATE the breaker opens, and requests get a degraded
+   answer (profile summary) without calling the stub. Once the stub
+   recovers and the cool-down passes, one probe closes it again
+
+Usage:
+    python benchmarks/bench_resilience.py [--requests 60] [--concurrency 4] [--fast 0.05] [--slow 2]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_llm_concurrency import QuietServer, RESPONSE_BODY  # noqa: E402
+
+ERROR_BODY = b'{"error": {"code": 500, "message": "Internal error", "status": "INTERNAL"}}'
+
+
+class FlakyStubHandler(BaseHTTPRequestHandler):
+    """Slow on every tenth call, or failing while `failing` is set"""
+
+    protocol_version = "HTTP/1.1"
+    fast = 0.05
+    slow = 2.0
+    failing = False
+    calls = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with FlakyStubHandler.lock:
+            FlakyStubHandler.calls += 1
+            slow = FlakyStubHandler.calls % 10 == 0
+        if FlakyStubHandler.failing:
+            status, body = 500, ERROR_BODY
+        else:
+            time.sleep(self.slow if slow else self.fast)
+            status, body = 200, RESPONSE_BODY
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+async def latency_run(label, requests, concurrency):
+    from llm_chat.response_generator import generate_response
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(index):
+        async with semaphore:
+            started = time.perf_counter()
+            await generate_response(f"What are Kangbeen's publications? ({index})", "")
+            latencies.append(time.perf_counter() - started)
+
+    calls_before = FlakyStubHandler.calls
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    print(f"  {label:<12} p50 {statistics.median(latencies) * 1000:6.0f} ms  "
+          f"p95 {percentile(latencies, 0.95) * 1000:6.0f} ms  max {max(latencies) * 1000:6.0f} ms  "
+          f"upstream calls {FlakyStubHandler.calls - calls_before}")
+
+
+async def hedging(args):
+    from llm_chat.config import config
+    from llm_chat.resilience import get_generation_hedger
+
+    print(f"1. hedging ({args.requests} generations, {args.concurrency} at a time, "
+          f"every 10th call {args.slow}s instead of {args.fast}s)")
+    config.hedge_enabled = False
+    await latency_run("hedging off", args.requests, args.concurrency)
+    config.hedge_enabled = True
+    # First run learns the latency distribution, second one uses it
+    await latency_run("hedging on", args.requests, args.concurrency)
+    await latency_run("hedging on", args.requests, args.concurrency)
+    print(f"  hedger: {get_generation_hedger().get_stats()}")
+
+
+async def breaker(args):
+    from llm_chat.config import config
+    from llm_chat.resilience import get_generation_breaker, get_resilience_stats
+    from llm_chat.response_generator import ERROR_MESSAGES, generate_response
+
+    print(f"2. circuit breaker (stub fails, then recovers; cool-down {config.breaker_cooldown_seconds}s)")
+
+    async def ask(label):
+        calls_before = FlakyStubHandler.calls
+        started = time.perf_counter()
+        response = await generate_response("Tell me about his publications", "")
+        elapsed = (time.perf_counter() - started) * 1000
+        kind = "error message" if response in ERROR_MESSAGES else (
+            "degraded" if response.startswith("I can't write a full answer") else "answer")
+        print(f"  {label:<10} {get_generation_breaker().state:<9} {kind:<13} {elapsed:6.0f} ms  "
+              f"upstream calls {FlakyStubHandler.calls - calls_before}")
+        return response
+
+    FlakyStubHandler.failing = True
+    # The window still holds the successes of the hedging runs
+    for index in range(config.breaker_window):
+        response = await ask("failing")
+        if get_generation_breaker().state == "open":
+            break
+    for index in range(3):
+        await ask("failing")
+    print("  degraded answer:\n    " + response.replace("\n", "\n    "))
+    FlakyStubHandler.failing = False
+    await ask("recovered")
+    await asyncio.sleep(config.breaker_cooldown_seconds)
+    await ask("cooled")
+    await ask("cooled")
+    stats = get_resilience_stats()
+    print("  transitions: " + "; ".join(
+        f"{t['from']} -> {t['to']} ({t['reason']})" for t in stats["breaker"]["transitions"]))
+    print(f"  degraded answers: {stats['degraded']}, rejected calls: {stats['breaker']['rejected']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--fast", type=float, default=0.05)
+    parser.add_argument("--slow", type=float, default=2.0)
+    args = parser.parse_args()
+
+    FlakyStubHandler.fast = args.fast
+    FlakyStubHandler.slow = args.slow
+    server = QuietServer(("127.0.0.1", 0), FlakyStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # llm_chat reads its config on first import, so set the environment first
+    os.environ.update(
+        GEMINI_API_KEY="stub-key",
+        CHAT_LLM_TRANSPORT="rest",
+        CHAT_LLM_API_ENDPOINT=f"http://127.0.0.1:{server.server_port}",
+        CHAT_SESSION_BACKEND="memory",
+        CHAT_HEDGE_MIN_SAMPLES="10",
+        CHAT_HEDGE_MIN_DELAY="0.1",
+        CHAT_HEDGE_INITIAL_DELAY="1",
+        CHAT_BREAKER_COOLDOWN="1",
+    )
+    logging.disable(logging.CRITICAL)
+
+    async def run():
+        await hedging(args)
+        await breaker(args)
+
+    asyncio.run(run())
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Response Cache Benchmark
+Which rephrasings of a cached first-turn question are answered from the
+response cache, and what a lookup costs (local only, no LLM)
+
+1. matching: pairs of (cached question, new question) that should share an
+   answer (case, punctuation, filler words, particles) or must not
+   (negation, an extra word, another year), with the cosine similarity;
+   exits with status 1 if any pair is not served as expected
+2. lookup: mean lookup time with --entries cached questions
+
+Usage:
+    python benchmarks/bench_response_cache.py [--entries 512] [--iterations 2000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_chat.response_cache import ResponseCache  # noqa: E402
+from llm_chat.text_utils import cosine_similarity, hash_embed, normalize_query  # noqa: E402
+
+PROFILE = "bench"
+
+# (language, cached question, new question, whether the answer is shared)
+PAIRS = [
+    ("en", "What are his skills?", "what are his skills", True),
+    ("en", "What are his skills?", "So what are all his skills?", True),
+    ("en", "What awards has he won?", "What awards has he won so far?", True),
+    ("en", "Tell me about his research", "Can you tell me about his research?", True),
+    ("ko", "고강빈의 논문 알려줘", "고강빈의 논문 좀 알려줘", True),
+    ("en", "What programming languages does he use", "What programming languages does he not use", False),
+    ("en", "Tell me about his research", "Tell me about his research failures", False),
+    ("en", "What papers did he publish in 2024?", "What papers did he publish in 2025?", False),
+    ("ko", "파이썬 써?", "파이썬 안 써?", False),
+]
+
+
+def matching():
+    """Returns the number of pairs not served as expected"""
+    print("1. matching (threshold 0.88)")
+    errors = 0
+    for language, cached, query, expected in PAIRS:
+        cache = ResponseCache(similarity_threshold=0.88)
+        cache.store(cached, language, PROFILE, f"answer to {cached}")
+        hit = cache.lookup(query, language, PROFILE) is not None
+        score = cosine_similarity(hash_embed(normalize_query(cached)), hash_embed(normalize_query(query)))
+        flag = "" if hit == expected else f"  <-- expected {'hit' if expected else 'miss'}"
+        errors += hit != expected
+        print(f"  {'hit' if hit else 'miss':<4} {score:5.3f}  {cached!r} -> {query!r}{flag}")
+    print(f"  {len(PAIRS) - errors}/{len(PAIRS)} as expected")
+    return errors
+
+
+def lookup(entries, iterations):
+    cache = ResponseCache(max_entries=entries, similarity_threshold=0.88)
+    for index in range(entries):
+        cache.store(f"What did he do in project number {index}?", "en", PROFILE, "answer")
+    started = time.perf_counter()
+    for _ in range(iterations):
+        cache.lookup("What did he work on in project number 7?", "en", PROFILE)
+    micros = (time.perf_counter() - started) / iterations * 1e6
+    print(f"2. lookup: {micros:.1f} us per semantic lookup over {entries} entries")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=512)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    errors = matching()
+    lookup(args.entries, max(1, args.iterations // 10))
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Session Store Benchmark
+Per-turn storage overhead of the shared session backends: the freshness
+check done on every request, appending a finished turn, and restoring the
+last N messages of a session another worker wrote
+
+Usage:
+    python benchmarks/bench_session_store.py [--sessions 2000] [--turns 20] [--redis-url redis://localhost:6379/0]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_chat.session_store import RedisSessionStore, SQLiteSessionStore  # noqa: E402
+
+USER_TEXT = "Tell me more about the LEGOLAS paper and what problem it solves."
+MODEL_TEXT = "LEGOLAS is a golf swing analysis study. " * 8
+
+
+def turn_messages(index):
+    """Messages of one turn as the registry stores them"""
+    timestamp = f"2025-01-01T00:00:{index % 60:02d}"
+    return [
+        {"role": "user", "content": f"{USER_TEXT} ({index})", "raw": None, "timestamp": timestamp},
+        {"role": "model", "content": MODEL_TEXT, "raw": MODEL_TEXT, "timestamp": timestamp},
+    ]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def timed(function, repeat):
+    """Per-call latencies in milliseconds"""
+    timings = []
+    for index in range(repeat):
+        started = time.perf_counter()
+        function(index)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def run(name, store, sessions, turns, history_limit, repeat):
+    """Populate a store and print latency of the per-request operations"""
+    session_ids = [uuid.uuid4().hex for _ in range(sessions)]
+    started = time.perf_counter()
+    for session_id in session_ids:
+        for turn in range(turns):
+            store.append_messages(session_id, turn_messages(turn), language="en")
+    populate_s = time.perf_counter() - started
+    print(f"\n{name}: {sessions} sessions x {turns} turns populated in {populate_s:.1f}s")
+
+    operations = [
+        ("version check (every request)", lambda i: store.version(session_ids[i % sessions])),
+        ("append turn (2 messages)", lambda i: store.append_messages(session_ids[i % sessions], turn_messages(i), "en")),
+        (f"load last {history_limit} messages", lambda i: store.load(session_ids[i % sessions], history_limit)),
+    ]
+    per_turn = 0.0
+    for label, operation in operations:
+        timings = timed(operation, repeat)
+        mean = statistics.mean(timings)
+        if not label.startswith("load"):
+            per_turn += mean
+        print(f"  {label:<32} mean {mean:7.3f} ms   p50 {percentile(timings, 0.5):7.3f}   p99 {percentile(timings, 0.99):7.3f}")
+    print(f"  per-turn overhead (check + append): {per_turn:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--history-limit", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--redis-url", default="", help="also benchmark a Redis-protocol server")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteSessionStore(os.path.join(directory, "sessions.db"))
+        run("SQLite (WAL, file)", store, args.sessions, args.turns, args.history_limit, args.repeat)
+        store.close()
+
+    if args.redis_url:
+        store = RedisSessionStore(args.redis_url, retention_seconds=600, prefix=f"bench:{uuid.uuid4().hex[:6]}:")
+        run("Redis", store, args.sessions, args.turns, args.history_limit, args.repeat)
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
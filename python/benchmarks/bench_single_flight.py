@@ -0,0 +1,132 @@
+"""
+Single-Flight Benchmark
+Concurrent identical first-turn questions against a slow local stub of the
+Gemini REST API (no API key or network needed), counting upstream calls
+
+A burst of N new sessions asks the same question (with different casing and
+punctuation) at once. With single-flight on, one generation runs and the
+other N-1 requests reuse its answer. Follow-up turns depend on each
+session's memory and are never merged. The response cache, the FAQ table
+and structured queries are off so that only in-flight coalescing is
+measured.
+
+The upstream call counts are checked (N with single-flight off, 1 with it
+on, N for the follow-up turn); the script exits with status 1 if any of
+them differs.
+
+Usage:
+    python benchmarks/bench_single_flight.py [--requests 20] [--delay 0.5]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_llm_concurrency import QuietServer, SlowStubHandler  # noqa: E402
+
+QUESTION_VARIANTS = [
+    "Tell me about Kangbeen's research",
+    "tell me about kangbeen's research?",
+    "Tell me about Kangbeen's research!",
+]
+
+
+class CountingStubHandler(SlowStubHandler):
+    """Slow stub that counts generateContent calls"""
+
+    calls = 0
+
+    def do_POST(self):
+        with SlowStubHandler.lock:
+            CountingStubHandler.calls += 1
+        super().do_POST()
+
+
+async def burst(label, make_call, requests, expected_calls):
+    """
+    Run requests calls at once; report wall time and upstream calls
+
+    Returns:
+        True if every request was answered and the upstream call count is expected_calls
+    """
+    calls_before = CountingStubHandler.calls
+    started = time.perf_counter()
+    results = await asyncio.gather(*(make_call(index) for index in range(requests)))
+    elapsed = time.perf_counter() - started
+    failures = sum("response" not in result for result in results)
+    answers = len({result.get("response") for result in results})
+    calls = CountingStubHandler.calls - calls_before
+    flag = "" if calls == expected_calls else f"  <-- expected {expected_calls} calls"
+    print(f"  {label:<40} {elapsed:6.2f} s  upstream calls {calls:>3}  "
+          f"distinct answers {answers}  failures {failures}{flag}")
+    return calls == expected_calls and failures == 0
+
+
+async def run(args):
+    from llm_chat.chat_handler import get_single_flight_stats, handle_chat_request
+    from llm_chat.config import config
+
+    def first_turn(prefix):
+        async def call(index):
+            question = QUESTION_VARIANTS[index % len(QUESTION_VARIANTS)]
+            return await handle_chat_request(question, session_id=f"{prefix}-{index}")
+        return call
+
+    # Imports and clients are built by the first request; keep them out of the timings
+    await handle_chat_request("What did Kangbeen study?", session_id="warm-up")
+
+    print(f"{args.requests} concurrent new sessions, stub delay {args.delay}s")
+    config.single_flight_enabled = False
+    passed = await burst("single-flight off: first turn", first_turn("off"), args.requests, args.requests)
+    config.single_flight_enabled = True
+    passed &= await burst("single-flight on: first turn", first_turn("on"), args.requests, 1)
+
+    async def follow_up(index):
+        return await handle_chat_request("What about his projects?", session_id=f"on-{index}")
+
+    passed &= await burst("single-flight on: follow-up turn", follow_up, args.requests, args.requests)
+    print(f"stats: {get_single_flight_stats()}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.5)
+    args = parser.parse_args()
+
+    SlowStubHandler.delay = args.delay
+    server = QuietServer(("127.0.0.1", 0), CountingStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    workers = str(max(args.requests, 1))
+    os.environ.update(
+        GEMINI_API_KEY="stub-key",
+        CHAT_LLM_TRANSPORT="rest",
+        CHAT_LLM_API_ENDPOINT=f"http://127.0.0.1:{server.server_port}",
+        CHAT_LLM_EXECUTOR_WORKERS=workers,
+        CHAT_LLM_POOL_SIZE=workers,
+        CHAT_SESSION_BACKEND="memory",
+        # Only in-flight coalescing may save upstream calls
+        CHAT_RESPONSE_CACHE="false",
+        CHAT_FAQ="false",
+        CHAT_FAQ_AUTO_REBUILD="false",
+        CHAT_STRUCTURED_QUERY="false",
+    )
+    logging.disable(logging.INFO)
+    passed = asyncio.run(run(args))
+    server.shutdown()
+    if not passed:
+        print("FAILED: unexpected upstream call counts")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
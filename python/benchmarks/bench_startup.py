@@ -0,0 +1,116 @@
+"""
+Startup Benchmark
+Import wall time and resident memory for each public entry point of the
+llm_chat package, measured in a fresh process per entry point
+
+Also lists which heavy dependencies each import pulled in, so a change that
+makes e.g. detect_language load langchain again shows up. Save a run with
+--json and pass it to --compare later to flag regressions.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--json > startup.json]
+    python benchmarks/bench_startup.py --compare startup.json [--tolerance 1.5]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PYTHON_DIR = Path(__file__).resolve().parent.parent
+
+# (label, import statement)
+ENTRY_POINTS = [
+    ("llm_chat", "import llm_chat"),
+    ("config", "from llm_chat import config"),
+    ("detect_language", "from llm_chat import detect_language"),
+    ("LongTermMemory", "from llm_chat import LongTermMemory"),
+    ("get_long_term_memory", "from llm_chat import get_long_term_memory"),
+    ("ShortTermMemory", "from llm_chat import ShortTermMemory"),
+    ("SessionManager", "from llm_chat import SessionManager"),
+    ("linkify_response", "from llm_chat import linkify_response"),
+    ("generate_response", "from llm_chat import generate_response"),
+    ("handle_chat_request", "from llm_chat import handle_chat_request"),
+    ("handle_chat_request (+ session)", "from llm_chat import handle_chat_request\n"
+                                        "from llm_chat.session_registry import SessionEntry\n"
+                                        "SessionEntry('bench')"),
+]
+
+HEAVY_MODULES = ["langchain", "langchain_google_genai", "google.generativeai", "langfuse", "numpy"]
+
+CHILD = r"""
+import json, resource, sys, time
+
+def rss_mb():
+    # Current RSS from /proc where available, peak RSS otherwise
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+before = rss_mb()
+started = time.perf_counter()
+exec(sys.argv[1])
+elapsed = (time.perf_counter() - started) * 1000
+print(json.dumps({
+    "import_ms": elapsed,
+    "rss_mb": rss_mb() - before,
+    "heavy": [name for name in json.loads(sys.argv[2]) if name in sys.modules],
+}))
+"""
+
+
+def measure(statement, runs):
+    samples = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-W", "ignore", "-c", CHILD, statement, json.dumps(HEAVY_MODULES)],
+            capture_output=True, text=True, cwd=PYTHON_DIR
+        )
+        if completed.returncode != 0:
+            raise SystemExit(f"{statement!r} failed:\n{completed.stderr[-2000:]}")
+        samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return {
+        "import_ms": statistics.median(sample["import_ms"] for sample in samples),
+        "rss_mb": statistics.median(sample["rss_mb"] for sample in samples),
+        "heavy": samples[-1]["heavy"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per entry point (median reported)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--compare", type=Path, help="earlier --json output to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="flag entry points slower than baseline x tolerance (with --compare)")
+    args = parser.parse_args()
+
+    results = {label: measure(statement, args.runs) for label, statement in ENTRY_POINTS}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else {}
+    print(f"{'entry point':<34} {'import':>10} {'RSS':>9}  heavy dependencies loaded")
+    regressions = []
+    for label, row in results.items():
+        line = f"{label:<34} {row['import_ms']:>7.1f} ms {row['rss_mb']:>6.1f} MB  {', '.join(row['heavy']) or '-'}"
+        old = baseline.get(label)
+        if old:
+            line += f"  (baseline {old['import_ms']:.1f} ms)"
+            # Ignore small absolute changes: process start-up noise is a few ms
+            if row["import_ms"] > old["import_ms"] * args.tolerance and row["import_ms"] - old["import_ms"] > 20:
+                regressions.append(label)
+                line += "  REGRESSION"
+        print(line)
+    if regressions:
+        raise SystemExit(f"startup regressions: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
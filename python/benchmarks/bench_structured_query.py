@@ -0,0 +1,147 @@
+"""
+Structured Query Benchmark
+How much traffic the structured query engine answers without an LLM call,
+how precise the routing is, and what a routed answer costs (fake LLM
+backend, no API key or network)
+
+1. labeled: queries that should be routed (with their intent) or left to
+   the LLM; every disagreement is flagged
+2. traffic: the relevance query set (data/relevance_queries.jsonl) as a
+   stand-in for real traffic: share routed, per intent, and parse+render time
+3. end to end: handle_chat_request latency for routed questions and for
+   questions answered live (fake LLM --latency seconds) after one warm-up
+   turn, with the routing shares reported by the metrics
+
+Usage:
+    python benchmarks/bench_structured_query.py [--latency 0.8] [--iterations 500]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+QUERIES_PATH = Path(__file__).resolve().parent.parent / "data" / "relevance_queries.jsonl"
+
+LABELED = [
+    ("list his publications from 2025", "publications.list"),
+    ("What awards did he win?", "awards.list"),
+    ("어떤 프로그래밍 언어를 써?", "skills.group"),
+    ("What awards did he win in 2023?", "awards.list"),
+    ("How many papers has Kangbeen published?", "publications.count"),
+    ("What is his latest paper?", "publications.latest"),
+    ("Kangbeen's projects since 2024", "projects.list"),
+    ("Does he know PyTorch and Docker?", "skills.skill_check"),
+    ("What frameworks does he use?", "skills.group"),
+    ("고강빈의 논문 알려줘", "publications.list"),
+    ("2023년에 받은 상은?", "awards.list"),
+    ("수상 경력이 몇 개야?", "awards.count"),
+    ("가장 최근 논문은 뭐야?", "publications.latest"),
+    ("Where did he study?", "education.list"),
+    ("Papers between 2022 and 2024", "publications.list"),
+    ("2022년부터 2024년까지 프로젝트", "projects.list"),
+    ("What are his recent projects?", "projects.recent"),
+    ("Which projects used PyTorch?", None),
+    ("What did the LEGOLAS paper find about golf swings?", None),
+    ("Tell me about the Soridam project", None),
+    ("Be With You 프로젝트 알려줘", None),
+    ("What has he done with Hugging Face?", None),
+    ("What was his role at GDGoC?", None),
+    ("What does he study?", None),
+    ("Who is Kangbeen Ko?", None),
+    ("What is the capital of France?", None),
+    ("LEGOLAS 논문의 실험 결과는?", None),
+]
+
+END_TO_END = {
+    "structured": ["What awards did he win in 2023?", "어떤 프로그래밍 언어를 써?", "Does he know Docker?"],
+    "live": ["What did the LEGOLAS paper find about golf swings?", "Which projects used PyTorch?"],
+}
+
+
+def labeled():
+    from llm_chat.language_detector import detect_language
+    from llm_chat.query_engine import get_query_engine
+
+    engine = get_query_engine()
+    errors = 0
+    print("1. labeled queries")
+    for query, expected in LABELED:
+        answer = engine.answer(query, detect_language(query))
+        intent = answer["intent"] if answer else None
+        flag = "" if intent == expected else f"  <-- expected {expected or 'llm'}"
+        errors += intent != expected
+        print(f"  {intent or 'llm':<22} {query}{flag}")
+    print(f"  {len(LABELED) - errors}/{len(LABELED)} as expected")
+
+
+def traffic(iterations):
+    from llm_chat.language_detector import detect_language
+    from llm_chat.query_engine import StructuredQueryEngine
+
+    with open(QUERIES_PATH, "r", encoding="utf-8") as f:
+        queries = [json.loads(line)["query"] for line in f if line.strip()]
+    queries = [(query, detect_language(query)) for query in queries]
+
+    engine = StructuredQueryEngine()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for query, language in queries:
+            engine.answer(query, language)
+    micros = (time.perf_counter() - started) / (iterations * len(queries)) * 1e6
+    stats = engine.get_stats()
+    print(f"2. traffic ({len(queries)} queries from {QUERIES_PATH.name})")
+    print(f"  routed {stats['routed'] // iterations}/{len(queries)} ({stats['share']:.1%}), "
+          f"{micros:.1f} us per query (parse, and render + linkify when routed)")
+    for intent, count in sorted(stats["by_intent"].items(), key=lambda entry: -entry[1]):
+        print(f"    {intent:<24} {count // iterations}")
+
+
+async def end_to_end():
+    from llm_chat.chat_handler import handle_chat_request
+    from llm_chat.metrics import get_chat_metrics
+
+    print("3. end to end")
+    # First request pays for imports and session setup
+    await handle_chat_request(message="What are his skills?", session_id="warm-up")
+    for label, queries in END_TO_END.items():
+        latencies = []
+        for index, query in enumerate(queries):
+            started = time.perf_counter()
+            await handle_chat_request(message=query, session_id=f"{label}-{index}")
+            latencies.append((time.perf_counter() - started) * 1000)
+        print(f"  {label:<11}" + "  ".join(f"{latency:8.2f} ms" for latency in latencies))
+    print(f"  routing: {get_chat_metrics().routing()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.8)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    # llm_chat reads its config on first import, so set the environment first
+    os.environ.update(
+        CHAT_LLM_BACKEND="fake",
+        CHAT_SESSION_BACKEND="memory",
+        CHAT_FAKE_LLM_LATENCY=f"fixed:{args.latency}",
+        CHAT_FAKE_LLM_TOKEN_RATE="0",
+        # Only the structured engine skips the LLM here
+        CHAT_FAQ="false",
+        CHAT_RESPONSE_CACHE="false",
+    )
+    logging.disable(logging.CRITICAL)
+
+    labeled()
+    traffic(args.iterations)
+    asyncio.run(end_to_end())
+
+
+if __name__ == "__main__":
+    main()
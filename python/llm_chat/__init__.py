@@ -1,13 +1,40 @@
 """
 LLM Chat Package
 Python-based LLM chat module for portfolio website with memory architecture
+
+Public names are resolved lazily: a submodule (and langchain or
+google.generativeai behind it) is imported the first time one of its
+names is accessed, so importing the package itself stays cheap.
 """
 
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+# Already light; imported eagerly because the llm_chat.config submodule and
+# the config instance share a name
 from .config import config
-from .long_term_memory import LongTermMemory, get_long_term_memory
-from .short_term_memory import ShortTermMemory, SessionManager, get_session_manager
-from .response_generator import generate_response, linkify_response
-from .chat_handler import handle_chat_request
+
+# Public name -> submodule that defines it
+_LAZY_EXPORTS = {
+    "LongTermMemory": "long_term_memory",
+    "get_long_term_memory": "long_term_memory",
+    "ShortTermMemory": "short_term_memory",
+    "SessionManager": "short_term_memory",
+    "get_session_manager": "short_term_memory",
+    "generate_response": "response_generator",
+    "generate_response_stream": "response_generator",
+    "linkify_response": "response_generator",
+    "handle_chat_request": "chat_handler",
+    "handle_chat_request_stream": "chat_handler",
+    "detect_language": "language_detector",
+}
+
+if TYPE_CHECKING:
+    from .chat_handler import handle_chat_request, handle_chat_request_stream
+    from .language_detector import detect_language
+    from .long_term_memory import LongTermMemory, get_long_term_memory
+    from .response_generator import generate_response, generate_response_stream, linkify_response
+    from .short_term_memory import ShortTermMemory, SessionManager, get_session_manager
 
 __all__ = [
     "config",
@@ -17,8 +44,25 @@ __all__ = [
     "SessionManager",
     "get_session_manager",
     "generate_response",
+    "generate_response_stream",
     "linkify_response",
     "handle_chat_request",
+    "handle_chat_request_stream",
+    "detect_language",
 ]
 
 __version__ = "2.0.0"
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    # Later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,158 @@
+"""
+Cache Module
+Small in-process LRU cache with per-entry TTL and hit/miss statistics
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+
+class TTLCache:
+    """
+    LRU cache whose entries also expire after a time-to-live
+
+    All operations are synchronous and guarded by a lock, so the cache can
+    be shared by asyncio tasks and executor threads alike.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: Optional[float] = 3600,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of entries before LRU eviction
+            ttl_seconds: Entry lifetime in seconds (None for no expiry)
+            on_evict: Optional callback invoked with (key, value) when an
+                entry is evicted or expires
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - stored_at > self.ttl_seconds
+
+    def _drop(self, key: Hashable, expired: bool):
+        _, value = self._entries.pop(key)
+        if expired:
+            self.expirations += 1
+        else:
+            self.evictions += 1
+        if self.on_evict:
+            self.on_evict(key, value)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a value and mark it as recently used
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if self._expired(entry[0], time.monotonic()):
+                self._drop(key, expired=True)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Get a live value without touching LRU order or statistics"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry[0], time.monotonic()):
+                return default
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        """
+        Store a value, evicting the least recently used entry if full
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = (time.monotonic(), value)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)), expired=False)
+
+    def delete(self, key: Hashable):
+        """Remove an entry if present"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def purge_expired(self) -> int:
+        """
+        Remove all expired entries
+
+        Returns:
+            Number of removed entries
+        """
+        with self._lock:
+            now = time.monotonic()
+            expired = [key for key, (stored_at, _) in self._entries.items() if self._expired(stored_at, now)]
+            for key in expired:
+                self._drop(key, expired=True)
+            return len(expired)
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Iterate over live (key, value) pairs, oldest first"""
+        with self._lock:
+            now = time.monotonic()
+            snapshot = [(key, value) for key, (stored_at, value) in self._entries.items()
+                        if not self._expired(stored_at, now)]
+        return iter(snapshot)
+
+    def clear(self):
+        """Remove all entries (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.peek(key) is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with size, hits, misses, hit_ratio, evictions and expirations
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -3,28 +3,370 @@ Chat Handler module
 Main handler for processing chat requests with memory-based system
 """
 
+import asyncio
+import time
 import uuid
-import sys
 import logging
-from typing import Dict, Any, List, Optional
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, AsyncIterator
 from .config import config
-from .response_generator import generate_response
-from .short_term_memory import get_session_manager
-from .relevance_filter import check_relevance, generate_rejection_message
+from .response_generator import generate_response, generate_response_stream, ERROR_MESSAGES
+from .response_cache import get_response_cache
+from .faq_table import get_faq_table
+from .query_engine import get_query_engine
+from .long_term_memory import get_long_term_memory
+from .metrics import get_chat_metrics, span
+from .observability import finish_trace, get_logger, start_trace
+from .retrieval import get_prompt_context
+from .relevance_filter import (
+    check_relevance, check_relevance_with_llm, generate_rejection_message, local_relevance_check
+)
 from .language_detector import detect_language
-from .langchain_memory import get_memory_manager
+from .session_registry import SessionEntry, get_session_registry
+from .text_utils import normalize_query
 
-# Set up logger
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+if TYPE_CHECKING:
+    from .langchain_memory import LangChainMemoryManager
 
-# Create console handler if not exists
-if not logger.handlers:
-    console_handler = logging.StreamHandler(sys.stderr)
-    console_handler.setLevel(logging.DEBUG)
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+# Set up logger (level from CHAT_LOG_LEVEL, written by a background thread)
+logger = get_logger(__name__)
+
+
+# Counters for speculative relevance checking
+# hits: generation overlapped a relevance check that passed
+# misses: generation was cancelled because the query was irrelevant
+_speculation_stats: Dict[str, float] = {
+    "hits": 0,
+    "misses": 0,
+    "saved_ms": 0.0,   # relevance latency hidden behind generation (hits)
+    "wasted_ms": 0.0,  # generation time thrown away (misses)
+}
+
+
+def get_speculation_stats() -> Dict[str, float]:
+    """
+    Get counters for speculative relevance checking
+
+    Returns:
+        Dictionary with hits, misses, saved_ms and wasted_ms
+    """
+    return dict(_speculation_stats)
+
+
+# First-turn generations in flight, keyed on (normalized message, language, profile hash)
+_inflight_generations: Dict[tuple, "asyncio.Future"] = {}
+
+# Counters for single-flight generation
+# leaders: generations that ran on behalf of concurrent identical requests
+# coalesced: requests that reused a leader's answer instead of calling the LLM
+_single_flight_stats: Dict[str, int] = {
+    "leaders": 0,
+    "coalesced": 0,
+}
+
+
+def get_single_flight_stats() -> Dict[str, int]:
+    """
+    Get counters for single-flight generation
+
+    Returns:
+        Dictionary with leaders, coalesced and in_flight
+    """
+    return dict(_single_flight_stats, in_flight=len(_inflight_generations))
+
+
+def _start_trace(session_id: str, user_id: str, streaming: bool = False) -> Optional[Any]:
+    """Start recording a Langfuse trace for the request (exported in the background, if sampled)"""
+    return start_trace(
+        name='chat-session',
+        user_id=user_id,
+        session_id=session_id,
+        metadata={
+            # Request start; the trace itself is created when the exporter sends it
+            "timestamp": datetime.utcnow().isoformat(),
+            "source": "python-memory-api",
+            "memoryType": "long-term + short-term",
+            "streaming": streaming
+        }
+    )
+
+
+def _create_chain(langchain_memory: "LangChainMemoryManager", message: str):
+    """
+    Create (or reuse) the session's ConversationChain with long-term memory
+
+    Args:
+        langchain_memory: LangChain memory manager of the session
+        message: User's message (selects passages in retrieval context mode)
+
+    Returns:
+        ConversationChain bound to the session memory
+    """
+    # One snapshot for context, links and version, even if a reload happens meanwhile
+    with span("ltm_context"):
+        snapshot = get_long_term_memory().snapshot()
+        profile_context, site_links = get_prompt_context(message, snapshot)
+    current_time = datetime.utcnow().isoformat()
+
+    # Create LangChain conversation chain with memory
+    # This ensures LLM automatically references conversation history
+    # Note: generate_response adds the turn to the chain's memory once it has an answer
+    with span("chain"):
+        return langchain_memory.create_chain(
+            profile_context=profile_context,
+            site_links=site_links,
+            current_time=current_time,
+            profile_version=snapshot.version
+        )
+
+
+def _quick_relevance(message: str) -> Optional[Dict[str, Any]]:
+    """Local relevance verdict (keyword rules, then classifier), or None if only the LLM can decide"""
+    with span("relevance_quick"):
+        return local_relevance_check(message)
+
+
+def _lookup_cached_response(
+    message: str,
+    language: str,
+    langchain_memory: "LangChainMemoryManager"
+) -> Optional[Dict[str, Any]]:
+    """
+    Look up a precomputed or cached answer for a first-turn question
+
+    The FAQ table (answers built offline for predictable questions) is
+    tried first, then the response cache.
+
+    Args:
+        message: User's message
+        language: Detected language of the message
+        langchain_memory: LangChain memory manager of the session
+
+    Returns:
+        Entry with 'response', 'raw_response' and 'source' ("faq" or
+        "cache"), or None on a miss or when the session already has history
+    """
+    if langchain_memory.checkpoint() > 0:
+        return None
+    if config.faq_enabled:
+        with span("faq"):
+            faq = get_faq_table().lookup(message, language)
+        get_chat_metrics().faq.inc("miss" if faq is None else "hit")
+        if faq is not None:
+            return dict(faq, source="faq")
+    if not config.response_cache_enabled:
+        return None
+    with span("response_cache"):
+        cached = get_response_cache().lookup(message, language, get_long_term_memory().content_hash)
+    get_chat_metrics().response_cache.inc("miss" if cached is None else "hit")
+    return dict(cached, source="cache") if cached is not None else None
+
+
+def _answer_structured(
+    message: str,
+    language: str,
+    langchain_memory: "LangChainMemoryManager"
+) -> Optional[Dict[str, Any]]:
+    """
+    Answer a list-style profile question from templates (no LLM call)
+
+    Only first turns are answered: follow-ups ("what about his projects?")
+    depend on the conversation, which the templates do not see.
+
+    Args:
+        message: User's message
+        language: Detected language of the message
+        langchain_memory: LangChain memory manager of the session
+
+    Returns:
+        Dictionary with 'response', 'raw_response' and 'intent', or None
+        when the question needs the LLM or the session already has history
+    """
+    if not config.structured_query_enabled or langchain_memory.checkpoint() > 0:
+        return None
+    with span("structured_query"):
+        answer = get_query_engine().answer(message, language)
+    get_chat_metrics().structured_query.inc("miss" if answer is None else "hit")
+    return answer
+
+
+async def _remember_turn(
+    message: str,
+    response: str,
+    raw_response: str,
+    session: SessionEntry
+):
+    """Write a turn that bypassed the ConversationChain into both memories and the session store"""
+    with span("memory_write"):
+        session.langchain_memory.add_user_message(message)
+        session.langchain_memory.add_ai_message(raw_response)
+    await _finish_turn(session, message, response, raw_response)
+
+
+async def _finish_turn(session: SessionEntry, message: str, response: str, raw_response: Optional[str] = None):
+    """
+    Record a finished turn outside LangChain memory
+
+    Adds it to short-term memory, appends it to the session store and lets
+    the budgeted memory summarize turns that left its window (in the
+    background).
+    """
+    with span("memory_write"):
+        session.stm.add_message("user", message)
+        session.stm.add_message("model", response)
+        await get_session_registry().persist_turn(session, message, response, raw_response)
+        session.langchain_memory.schedule_summary()
+
+
+def _store_cached_response(
+    message: str,
+    language: str,
+    response: str,
+    langchain_memory: "LangChainMemoryManager"
+):
+    """
+    Cache the answer of a first-turn question
+
+    Must be called right after generation, while the session memory holds
+    exactly this turn.
+    """
+    if not config.response_cache_enabled or response in ERROR_MESSAGES:
+        return
+    messages = langchain_memory.get_chat_history()
+    if len(messages) != 2:
+        return
+    get_response_cache().store(
+        message,
+        language,
+        get_long_term_memory().content_hash,
+        response,
+        raw_response=messages[-1].content
+    )
+
+
+async def _generate_single_flight(
+    message: str,
+    language: str,
+    langchain_memory: "LangChainMemoryManager",
+    langchain_chain: Any,
+    trace: Optional[Any]
+) -> str:
+    """
+    Generate an answer, sharing it with concurrent identical first-turn requests
+
+    Only history-free turns take part: the first caller for a (normalized
+    message, language, profile version) runs generate_response, and callers
+    arriving while it is in flight wait for its answer and write that turn
+    into their own session memory instead. If the leader fails or is
+    cancelled, waiting callers generate on their own.
+
+    Args:
+        message: User's message
+        language: Detected language of the message
+        langchain_memory: LangChain memory manager of the session
+        langchain_chain: The session's ConversationChain
+        trace: Langfuse trace object for logging
+
+    Returns:
+        Generated response text with HTML links
+    """
+    def generate():
+        return generate_response(
+            query=message,
+            session_history="",  # Not used when langchain_chain is provided
+            trace=trace,
+            langchain_chain=langchain_chain
+        )
+
+    if not config.single_flight_enabled or langchain_memory.checkpoint() > 0:
+        return await generate()
+    key = (normalize_query(message), language, get_long_term_memory().content_hash)
+
+    loop = asyncio.get_running_loop()
+    pending = _inflight_generations.get(key)
+    if pending is not None and pending.get_loop() is loop:
+        _single_flight_stats["coalesced"] += 1
+        shared = await asyncio.shield(pending)
+        if shared is None:
+            return await generate()
+        # Same memory writes as ConversationChain.apredict()
+        with span("memory_write"):
+            langchain_memory.add_user_message(message)
+            langchain_memory.add_ai_message(shared["raw_response"])
+        return shared["response"]
+
+    future = loop.create_future()
+    _inflight_generations[key] = future
+    _single_flight_stats["leaders"] += 1
+    shared = None
+    try:
+        response = await generate()
+        messages = langchain_memory.get_chat_history()
+        if response not in ERROR_MESSAGES and len(messages) == 2:
+            shared = {"response": response, "raw_response": messages[-1].content}
+        return response
+    finally:
+        if _inflight_generations.get(key) is future:
+            del _inflight_generations[key]
+        future.set_result(shared)
+
+
+async def _speculative_generate(
+    message: str,
+    language: str,
+    langchain_memory: "LangChainMemoryManager",
+    trace: Optional[Any]
+) -> tuple[Dict[str, Any], Optional[str]]:
+    """
+    Run the LLM relevance check and answer generation concurrently
+
+    Only for queries the local checks left open (see _quick_relevance), so
+    the relevance check goes straight to check_relevance_with_llm. If the
+    query turns out to be irrelevant the generation is cancelled and
+    anything it wrote to the session's LangChain memory is rolled back.
+
+    Args:
+        message: User's message
+        language: Detected language of the message
+        langchain_memory: LangChain memory manager of the session
+        trace: Langfuse trace object for logging
+
+    Returns:
+        Tuple of (relevance check result, generated response or None if rejected)
+    """
+    langchain_chain = _create_chain(langchain_memory, message)
+    checkpoint = langchain_memory.checkpoint()
+
+    started_at = time.perf_counter()
+    generation_task = asyncio.create_task(_generate_single_flight(
+        message, language, langchain_memory, langchain_chain, trace
+    ))
+
+    try:
+        relevance_check = await check_relevance_with_llm(message)
+    except BaseException:
+        generation_task.cancel()
+        langchain_memory.rollback(checkpoint)
+        raise
+    relevance_ms = (time.perf_counter() - started_at) * 1000
+
+    if not relevance_check["relevant"]:
+        generation_task.cancel()
+        try:
+            await generation_task
+        except asyncio.CancelledError:
+            pass
+        langchain_memory.rollback(checkpoint)
+        _speculation_stats["misses"] += 1
+        _speculation_stats["wasted_ms"] += (time.perf_counter() - started_at) * 1000
+        logger.debug("[SPECULATION] Cancelled generation for irrelevant query after %.0fms", relevance_ms)
+        return relevance_check, None
+
+    response = await generation_task
+    _speculation_stats["hits"] += 1
+    _speculation_stats["saved_ms"] += relevance_ms
+    logger.debug("[SPECULATION] Relevance check (%.0fms) overlapped generation", relevance_ms)
+    return relevance_check, response
 
 
 async def handle_chat_request(
@@ -54,32 +396,26 @@ async def handle_chat_request(
 
     user_id = f"user-{uuid.uuid4().hex[:8]}"
 
-        # Get session manager
-        session_manager = get_session_manager()
+    # Get or create the session (short-term memory + LangChain memory)
+    registry = get_session_registry()
+    session = await registry.pin(session_id)
+    stm = session.stm
 
-        # Get or create session's short-term memory
-        stm = session_manager.get_session(session_id)
-        
-        # Get LangChain memory manager for better context management
-        langchain_memory = get_memory_manager(session_id)
+    # LangChain memory manager for better context management
+    langchain_memory = session.langchain_memory
 
     # Initialize Langfuse trace
-    trace = None
-    if config.langfuse_client:
-        trace = config.langfuse_client.trace(
-            name='chat-session',
-            user_id=user_id,
-            session_id=session_id,
-            metadata={
-                "timestamp": None,  # Will be set automatically
-                "source": "python-memory-api",
-                "memoryType": "long-term + short-term"
-            }
-        )
+    trace = _start_trace(session_id, user_id)
+
+    # Per-stage timings (GET /metrics, GET /debug/timings)
+    metrics = get_chat_metrics()
+    timings = metrics.start_request()
+    outcome = "error"
 
     try:
         # Validate message
         if not message:
+            outcome = "invalid"
             error_response = {"error": "메시지가 없습니다."}
             if trace:
                 trace.event(
@@ -90,21 +426,66 @@ async def handle_chat_request(
             return error_response
 
         # Detect language from user message
-        detected_language = detect_language(message)
-        
+        with span("language_detection"):
+            detected_language = detect_language(message)
+
         # Update preferred language in short-term memory if not set or if detected language is different
         if not stm.preferred_language or detected_language != stm.preferred_language:
             stm.set_preferred_language(detected_language)
-        
+
         # Get preferred language from short-term memory
         preferred_language = stm.get_preferred_language()
 
+        # Predictable or repeated first-turn questions are answered from the
+        # FAQ table or the response cache
+        cached = _lookup_cached_response(message, detected_language, langchain_memory)
+        if cached is not None:
+            await _remember_turn(message, cached["response"], cached["raw_response"], session)
+            if trace:
+                trace.update(
+                    input=message,
+                    output=cached["response"],
+                    metadata={"cached": True, "source": cached["source"], "sessionId": session_id}
+                )
+            outcome = "faq" if cached["source"] == "faq" else "cached"
+            return {
+                "response": cached["response"],
+                "sessionId": session_id
+            }
+
+        # List-style first-turn questions are answered from the profile data
+        structured = _answer_structured(message, detected_language, langchain_memory)
+        if structured is not None:
+            await _remember_turn(message, structured["response"], structured["raw_response"], session)
+            if trace:
+                trace.update(
+                    input=message,
+                    output=structured["response"],
+                    metadata={"structured": True, "intent": structured["intent"], "sessionId": session_id}
+                )
+            outcome = "structured"
+            return {
+                "response": structured["response"],
+                "sessionId": session_id
+            }
+        first_turn = langchain_memory.checkpoint() == 0
+
         # Check if question is relevant to profile (only for uncertain cases)
         # For obviously relevant questions, skip this check to save time
-        relevance_check = await check_relevance(message)
+        # In speculative mode, queries only the LLM can decide start generating meanwhile
+        speculative_response = None
+        if config.speculative_relevance:
+            relevance_check = _quick_relevance(message)
+            if relevance_check is None:
+                relevance_check, speculative_response = await _speculative_generate(
+                    message, detected_language, langchain_memory, trace
+                )
+        else:
+            relevance_check = await check_relevance(message)
         if not relevance_check["relevant"]:
             # Generate rejection message using Gemini 2.5 Flash with preferred language
-            rejection_message = await generate_rejection_message(message, preferred_language)
+            with span("rejection"):
+                rejection_message = await generate_rejection_message(message, preferred_language)
             if trace:
                 trace.update(
                     input=message,
@@ -115,54 +496,44 @@ async def handle_chat_request(
                         "language": preferred_language
                     }
                 )
+            outcome = "rejected"
             return {
                 "response": rejection_message,
                 "sessionId": session_id
             }
 
-        # Get long-term memory for chain creation
-        from .long_term_memory import get_long_term_memory
-        ltm = get_long_term_memory()
-        profile_context = ltm.get_context_for_llm()
-        site_links = ltm.get_site_links()
-        from datetime import datetime
-        current_time = datetime.utcnow().isoformat()
-        
-        # Create LangChain conversation chain with memory
-        # This ensures LLM automatically references conversation history
-        # Note: ConversationChain automatically adds messages to memory when predict() is called
-        langchain_chain = langchain_memory.create_chain(
-            profile_context=profile_context,
-            site_links=site_links,
-            current_time=current_time
-        )
+        if speculative_response is not None:
+            # Already generated alongside the relevance check
+            response = speculative_response
+        else:
+            langchain_chain = _create_chain(langchain_memory, message)
 
-        # Debug: Check memory state before generating response
-        memory_before = langchain_memory.get_chat_history_string(limit=10)
-        logger.info(f"[MEMORY DEBUG] Session ID: {session_id}")
-        logger.info(f"[MEMORY DEBUG] Memory before response generation:")
-        logger.info(f"[MEMORY DEBUG] {memory_before}")
-        logger.info(f"[MEMORY DEBUG] Current user message: {message[:100]}...")
-        
-        # Generate response using LangChain chain (automatically includes conversation history)
-        # ConversationChain.predict() or apredict() automatically adds user message and AI response to memory
-        response = await generate_response(
-            query=message,
-            session_history="",  # Not used when langchain_chain is provided
-            trace=trace,
-            langchain_chain=langchain_chain
-        )
-        
-        # Debug: Check memory state after generating response
-        memory_after = langchain_memory.get_chat_history_string(limit=10)
-        logger.info(f"[MEMORY DEBUG] Memory after response generation:")
-        logger.info(f"[MEMORY DEBUG] {memory_after}")
-        logger.info(f"[MEMORY DEBUG] Generated response: {response[:100]}...")
+            # Debug: Check memory state before generating response (only rendered at DEBUG)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[MEMORY DEBUG] Session ID: %s", session_id)
+                logger.debug("[MEMORY DEBUG] Memory before response generation:")
+                logger.debug("[MEMORY DEBUG] %s", langchain_memory.get_chat_history_string(limit=10))
+                logger.debug("[MEMORY DEBUG] Current user message: %.100s...", message)
+
+            # Generate response using LangChain chain (automatically includes conversation history)
+            # generate_response adds the user message and AI response to LangChain memory
+            # Identical first-turn questions in flight share one generation
+            response = await _generate_single_flight(
+                message, detected_language, langchain_memory, langchain_chain, trace
+            )
+
+        # Debug: Check memory state after generating response (only rendered at DEBUG)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[MEMORY DEBUG] Memory after response generation:")
+            logger.debug("[MEMORY DEBUG] %s", langchain_memory.get_chat_history_string(limit=10))
+            logger.debug("[MEMORY DEBUG] Generated response: %.100s...", response)
+
+        if first_turn:
+            _store_cached_response(message, detected_language, response, langchain_memory)
 
         # Add messages to short-term memory for compatibility
-        # Note: ConversationChain already added both messages to LangChain memory automatically
-        stm.add_message("user", message)
-        stm.add_message("model", response)
+        # Note: generate_response already added both messages to LangChain memory
+        await _finish_turn(session, message, response)
 
         if trace:
             trace.update(
@@ -174,6 +545,7 @@ async def handle_chat_request(
                 }
             )
 
+        outcome = "answered"
         return {
             "response": response,
             "sessionId": session_id
@@ -189,3 +561,181 @@ async def handle_chat_request(
             )
 
         return {"error": "서버 오류가 발생했습니다."}
+
+    finally:
+        metrics.finish_request(timings, outcome)
+        finish_trace(trace, failed=outcome == "error")
+        registry.unpin(session)
+
+
+async def handle_chat_request_stream(
+    message: str,
+    history: List[Dict[str, Any]] = None,
+    session_id: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Handle a chat request and stream the answer as it is generated
+
+    Streaming counterpart of handle_chat_request. The finished turn is still
+    written to the session's LangChain memory and short-term memory.
+
+    Args:
+        message: User's message
+        history: Chat history (list of messages) - can be provided by client
+        session_id: Optional session ID from client
+
+    Yields:
+        Event dictionaries:
+            - {"type": "token", "text": str}: Next piece of the response
+            - {"type": "done", "response": str, "sessionId": str, "ttftMs": float}
+            - {"type": "error", "error": str}
+    """
+    if history is None:
+        history = []
+
+    if not session_id:
+        session_id = str(uuid.uuid4())
+
+    user_id = f"user-{uuid.uuid4().hex[:8]}"
+    started_at = time.perf_counter()
+
+    registry = get_session_registry()
+    session = await registry.pin(session_id)
+    stm = session.stm
+    langchain_memory = session.langchain_memory
+
+    trace = _start_trace(session_id, user_id, streaming=True)
+
+    metrics = get_chat_metrics()
+    timings = metrics.start_request(streaming=True)
+    outcome = "error"
+
+    try:
+        if not message:
+            outcome = "invalid"
+            yield {"type": "error", "error": "메시지가 없습니다."}
+            return
+
+        with span("language_detection"):
+            detected_language = detect_language(message)
+        if not stm.preferred_language or detected_language != stm.preferred_language:
+            stm.set_preferred_language(detected_language)
+        preferred_language = stm.get_preferred_language()
+
+        cached = _lookup_cached_response(message, detected_language, langchain_memory)
+        if cached is not None:
+            await _remember_turn(message, cached["response"], cached["raw_response"], session)
+            ttft_ms = (time.perf_counter() - started_at) * 1000
+            outcome = "faq" if cached["source"] == "faq" else "cached"
+            yield {"type": "token", "text": cached["response"]}
+            yield {
+                "type": "done",
+                "response": cached["response"],
+                "sessionId": session_id,
+                "ttftMs": round(ttft_ms, 1)
+            }
+            return
+
+        structured = _answer_structured(message, detected_language, langchain_memory)
+        if structured is not None:
+            await _remember_turn(message, structured["response"], structured["raw_response"], session)
+            if trace:
+                trace.update(
+                    input=message,
+                    output=structured["response"],
+                    metadata={"structured": True, "intent": structured["intent"], "sessionId": session_id}
+                )
+            ttft_ms = (time.perf_counter() - started_at) * 1000
+            outcome = "structured"
+            yield {"type": "token", "text": structured["response"]}
+            yield {
+                "type": "done",
+                "response": structured["response"],
+                "sessionId": session_id,
+                "ttftMs": round(ttft_ms, 1)
+            }
+            return
+        first_turn = langchain_memory.checkpoint() == 0
+
+        relevance_check = await check_relevance(message)
+        if not relevance_check["relevant"]:
+            with span("rejection"):
+                rejection_message = await generate_rejection_message(message, preferred_language)
+            if trace:
+                trace.update(
+                    input=message,
+                    output=rejection_message,
+                    metadata={
+                        "rejected": True,
+                        "reason": relevance_check.get("reason"),
+                        "language": preferred_language
+                    }
+                )
+            ttft_ms = (time.perf_counter() - started_at) * 1000
+            outcome = "rejected"
+            yield {"type": "token", "text": rejection_message}
+            yield {
+                "type": "done",
+                "response": rejection_message,
+                "sessionId": session_id,
+                "ttftMs": round(ttft_ms, 1)
+            }
+            return
+
+        langchain_chain = _create_chain(langchain_memory, message)
+
+        pieces: List[str] = []
+        ttft_ms = None
+        async for piece in generate_response_stream(
+            query=message,
+            session_history="",  # Not used when langchain_chain is provided
+            trace=trace,
+            langchain_chain=langchain_chain
+        ):
+            if ttft_ms is None:
+                ttft_ms = (time.perf_counter() - started_at) * 1000
+                logger.info("[STREAM] Session %s time to first token: %.0fms", session_id, ttft_ms)
+            pieces.append(piece)
+            yield {"type": "token", "text": piece}
+
+        response = "".join(pieces)
+        if first_turn:
+            _store_cached_response(message, detected_language, response, langchain_memory)
+
+        # LangChain memory was updated by generate_response_stream
+        await _finish_turn(session, message, response)
+
+        if trace:
+            trace.update(
+                input=message,
+                output=response,
+                metadata={
+                    "sessionMessageCount": stm.get_message_count(),
+                    "sessionId": session_id,
+                    "ttftMs": ttft_ms
+                }
+            )
+
+        outcome = "answered"
+        yield {
+            "type": "done",
+            "response": response,
+            "sessionId": session_id,
+            "ttftMs": round(ttft_ms, 1) if ttft_ms is not None else None
+        }
+
+    except Exception as error:
+        logger.error(f"Chat stream handler error: {error}", exc_info=True)
+
+        if trace:
+            trace.event(
+                name='error',
+                input={"type": "api-error", "message": str(error)}
+            )
+
+        yield {"type": "error", "error": "서버 오류가 발생했습니다."}
+
+    finally:
+        metrics.finish_request(timings, outcome)
+        finish_trace(trace, failed=outcome == "error")
+        registry.unpin(session)
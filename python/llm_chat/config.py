@@ -4,15 +4,34 @@ Manages environment variables and API clients initialization
 """
 
 import os
-from typing import Optional
-from google.generativeai import configure
+import threading
 
-try:
-    from langfuse import Langfuse
-    HAS_LANGFUSE = True
-except ImportError:
-    HAS_LANGFUSE = False
-    Langfuse = None
+# langfuse is imported on first use: it takes a large share of a cold start,
+# and many callers never need it
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    """Read a boolean flag from the environment ("1", "true", "yes", "on")"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment"""
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment"""
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
 
 
 class Config:
@@ -26,30 +45,201 @@ class Config:
         self.langfuse_public_key: str = os.getenv("LANGFUSE_PUBLIC_KEY", "")
         self.langfuse_secret_key: str = os.getenv("LANGFUSE_SECRET_KEY", "")
         self.langfuse_host: str = os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com")
+        # Langfuse tracing: on/off, share of requests traced up front (head sampling),
+        # and requests kept anyway when slower than keep_slow seconds or failed
+        # (tail sampling, 0 / false to disable)
+        self.tracing_enabled: bool = _env_bool("CHAT_TRACING", True)
+        self.trace_sample_rate: float = _env_float("CHAT_TRACE_SAMPLE_RATE", 1.0)
+        self.trace_keep_slow_seconds: float = _env_float("CHAT_TRACE_KEEP_SLOW_SECONDS", 10.0)
+        self.trace_keep_errors: bool = _env_bool("CHAT_TRACE_KEEP_ERRORS", True)
+        # Background export of kept traces: traces per batch, seconds between flushes
+        # and traces buffered before new ones are dropped
+        self.trace_batch_size: int = _env_int("CHAT_TRACE_BATCH_SIZE", 20)
+        self.trace_flush_interval_seconds: float = _env_float("CHAT_TRACE_FLUSH_INTERVAL", 2.0)
+        self.trace_queue_size: int = _env_int("CHAT_TRACE_QUEUE_SIZE", 1000)
+
+        # Log level of the llm_chat loggers (DEBUG shows memory dumps and per-stage
+        # detail) and whether records are written by a background thread (QueueHandler)
+        self.log_level: str = os.getenv("CHAT_LOG_LEVEL", "INFO").strip().upper()
+        self.log_async: bool = _env_bool("CHAT_LOG_ASYNC", True)
 
         # Model names
         self.chat_model_name: str = "gemini-pro"
 
+        # Shared LLM transport: "grpc" or "rest", endpoint override (e.g. a local
+        # stub server), HTTP connection pool size (rest) and keepalive ping interval (grpc)
+        self.llm_transport: str = os.getenv("CHAT_LLM_TRANSPORT", "grpc").strip().lower()
+        self.llm_api_endpoint: str = os.getenv("CHAT_LLM_API_ENDPOINT", "")
+        self.llm_pool_size: int = _env_int("CHAT_LLM_POOL_SIZE", 10)
+        self.llm_keepalive_seconds: int = _env_int("CHAT_LLM_KEEPALIVE", 30)
+        # Threads for blocking LLM calls (rest transport, sync-only code paths)
+        self.llm_executor_workers: int = _env_int("CHAT_LLM_EXECUTOR_WORKERS", 32)
+
+        # LLM backend: "gemini" or "fake" (deterministic local stand-in for load tests)
+        self.llm_backend: str = os.getenv("CHAT_LLM_BACKEND", "gemini").strip().lower()
+        # Fake backend: latency before the first token ("fixed:s", "uniform:low,high",
+        # "lognormal:median,sigma" or "exponential:mean"), output tokens per second,
+        # answer length in tokens, injected error and quota error (429) rates, random seed
+        self.fake_llm_latency: str = os.getenv("CHAT_FAKE_LLM_LATENCY", "lognormal:0.8,0.4")
+        self.fake_llm_token_rate: float = _env_float("CHAT_FAKE_LLM_TOKEN_RATE", 80.0)
+        self.fake_llm_response_tokens: int = _env_int("CHAT_FAKE_LLM_RESPONSE_TOKENS", 120)
+        self.fake_llm_error_rate: float = _env_float("CHAT_FAKE_LLM_ERROR_RATE", 0.0)
+        self.fake_llm_quota_error_rate: float = _env_float("CHAT_FAKE_LLM_QUOTA_ERROR_RATE", 0.0)
+        self.fake_llm_seed: int = _env_int("CHAT_FAKE_LLM_SEED", 0)
+
+        # Per-stage deadlines in seconds (0 disables); a stage that runs out is
+        # cancelled and falls back (relevant / stock rejection / error message)
+        self.relevance_timeout_seconds: float = _env_float("CHAT_RELEVANCE_TIMEOUT", 5.0)
+        self.rejection_timeout_seconds: float = _env_float("CHAT_REJECTION_TIMEOUT", 10.0)
+        self.generation_timeout_seconds: float = _env_float("CHAT_GENERATION_TIMEOUT", 30.0)
+
+        # Outbound quota per model ("model=rpm/tpm,...", "*" for the rest; empty = no limits)
+        # and retries with jittered exponential backoff after quota errors (429)
+        self.llm_rate_limits: str = os.getenv("CHAT_LLM_RATE_LIMITS", "")
+        self.llm_max_retries: int = _env_int("CHAT_LLM_MAX_RETRIES", 3)
+        self.llm_backoff_base_seconds: float = _env_float("CHAT_LLM_BACKOFF_BASE", 0.5)
+        self.llm_backoff_max_seconds: float = _env_float("CHAT_LLM_BACKOFF_MAX", 8.0)
+
+        # Hedged generation: a second request is sent when the first has not answered
+        # after the given percentile of recent latencies (initial delay until enough samples)
+        self.hedge_enabled: bool = _env_bool("CHAT_HEDGE", True)
+        self.hedge_percentile: float = _env_float("CHAT_HEDGE_PERCENTILE", 0.95)
+        self.hedge_min_delay_seconds: float = _env_float("CHAT_HEDGE_MIN_DELAY", 1.0)
+        self.hedge_initial_delay_seconds: float = _env_float("CHAT_HEDGE_INITIAL_DELAY", 8.0)
+        self.hedge_min_samples: int = _env_int("CHAT_HEDGE_MIN_SAMPLES", 20)
+
+        # Circuit breaker around generation: opens when the error rate or the share of
+        # slow calls over the last window calls crosses its threshold, then serves
+        # degraded answers (cached answer or profile summary) for the cool-down
+        self.breaker_enabled: bool = _env_bool("CHAT_BREAKER", True)
+        self.breaker_window: int = _env_int("CHAT_BREAKER_WINDOW", 20)
+        self.breaker_min_calls: int = _env_int("CHAT_BREAKER_MIN_CALLS", 5)
+        self.breaker_error_rate: float = _env_float("CHAT_BREAKER_ERROR_RATE", 0.5)
+        self.breaker_slow_seconds: float = _env_float("CHAT_BREAKER_SLOW_SECONDS", 15.0)
+        self.breaker_slow_rate: float = _env_float("CHAT_BREAKER_SLOW_RATE", 0.8)
+        self.breaker_cooldown_seconds: float = _env_float("CHAT_BREAKER_COOLDOWN", 30.0)
+        # Serve degraded answers instead of an error message when generation fails
+        self.degraded_answers_enabled: bool = _env_bool("CHAT_DEGRADED_ANSWERS", True)
+
+        # Per-stage latency histograms and counters (GET /metrics) and the number of
+        # recent per-request breakdowns kept for GET /debug/timings
+        self.metrics_enabled: bool = _env_bool("CHAT_METRICS", True)
+        self.metrics_recent_requests: int = _env_int("CHAT_METRICS_RECENT", 200)
+
+        # Seconds between profile_data.json change checks (0 disables hot reload)
+        self.profile_reload_interval_seconds: float = _env_float("CHAT_PROFILE_RELOAD_INTERVAL", 2.0)
+
+        # Link resolution: edit distance allowed for near-miss <link> labels (0 disables)
+        # and auto-linking of untagged publication/project titles in responses
+        self.link_fuzzy_max_distance: int = _env_int("CHAT_LINK_FUZZY_DISTANCE", 1)
+        self.link_auto_link: bool = _env_bool("CHAT_LINK_AUTO_LINK", True)
+
+        # Keyword rules for the heuristic relevance check (defaults to data/relevance_keywords.json)
+        self.relevance_keywords_path: str = os.getenv("CHAT_RELEVANCE_KEYWORDS_PATH", "")
+
+        # Local classifier between the heuristics and the LLM relevance check:
+        # P(relevant) >= relevant threshold or <= irrelevant threshold skips the LLM
+        self.relevance_classifier_enabled: bool = _env_bool("CHAT_RELEVANCE_CLASSIFIER", True)
+        self.relevance_classifier_path: str = os.getenv("CHAT_RELEVANCE_CLASSIFIER_PATH", "")
+        self.relevance_classifier_relevant_threshold: float = _env_float("CHAT_RELEVANCE_CLASSIFIER_RELEVANT", 0.8)
+        self.relevance_classifier_irrelevant_threshold: float = _env_float("CHAT_RELEVANCE_CLASSIFIER_IRRELEVANT", 0.15)
+
+        # Memo of LLM relevance verdicts keyed on normalized query text
+        self.relevance_memo_max_entries: int = _env_int("CHAT_RELEVANCE_MEMO_MAX_ENTRIES", 2048)
+        self.relevance_memo_ttl_seconds: int = _env_int("CHAT_RELEVANCE_MEMO_TTL", 86400)
+
+        # Pre-generated rejection messages (defaults to data/rejection_messages.json);
+        # a language without messages is filled with one bulk call of this size
+        self.rejection_pool_path: str = os.getenv("CHAT_REJECTION_POOL_PATH", "")
+        self.rejection_pool_batch_size: int = _env_int("CHAT_REJECTION_POOL_BATCH_SIZE", 8)
+
+        # Run the LLM relevance check and answer generation concurrently for
+        # queries the heuristics cannot decide (cancelled if irrelevant)
+        self.speculative_relevance: bool = _env_bool("CHAT_SPECULATIVE_RELEVANCE", False)
+
+        # Concurrent identical first-turn questions share one generation
+        self.single_flight_enabled: bool = _env_bool("CHAT_SINGLE_FLIGHT", True)
+
+        # Session registry bounds: LRU cap, idle TTL (0 disables) and sweep interval in seconds
+        self.session_max_sessions: int = _env_int("CHAT_SESSION_MAX", 1000)
+        self.session_idle_ttl_seconds: int = _env_int("CHAT_SESSION_IDLE_TTL", 86400)
+        self.session_sweep_interval_seconds: int = _env_int("CHAT_SESSION_SWEEP_INTERVAL", 60)
+
+        # Conversation memory replayed into prompts: "budget" (recent turns under a
+        # token budget + background summary of older turns) or "buffer" (everything)
+        self.memory_mode: str = os.getenv("CHAT_MEMORY_MODE", "budget").strip().lower()
+        self.memory_token_budget: int = _env_int("CHAT_MEMORY_TOKEN_BUDGET", 1200)
+        self.memory_max_turns: int = _env_int("CHAT_MEMORY_MAX_TURNS", 6)
+        self.memory_summary_enabled: bool = _env_bool("CHAT_MEMORY_SUMMARY", True)
+        self.memory_summary_min_messages: int = _env_int("CHAT_MEMORY_SUMMARY_MIN_MESSAGES", 4)
+
+        # Session storage shared by all workers: "sqlite" (default), "redis" or "memory"
+        self.session_backend: str = os.getenv("CHAT_SESSION_BACKEND", "sqlite").strip().lower()
+        self.session_sqlite_path: str = os.getenv("CHAT_SESSION_SQLITE_PATH", "")
+        self.session_redis_url: str = os.getenv("CHAT_SESSION_REDIS_URL", "redis://localhost:6379/0")
+        self.session_history_limit: int = _env_int("CHAT_SESSION_HISTORY_LIMIT", 40)
+        self.session_retention_seconds: int = _env_int("CHAT_SESSION_RETENTION", 7 * 86400)
+
+        # Semantic cache for first-turn answers
+        self.response_cache_enabled: bool = _env_bool("CHAT_RESPONSE_CACHE", True)
+        self.response_cache_threshold: float = _env_float("CHAT_RESPONSE_CACHE_THRESHOLD", 0.88)
+        self.response_cache_ttl_seconds: int = _env_int("CHAT_RESPONSE_CACHE_TTL", 3600)
+        self.response_cache_max_entries: int = _env_int("CHAT_RESPONSE_CACHE_MAX_ENTRIES", 512)
+
+        # Precomputed FAQ answers for first-turn questions (scripts/build_faq_table.py):
+        # table and question files (default data/faq_answers.json, data/faq_questions.json),
+        # minimum match similarity, and background rebuild when the profile changes
+        # (opt-in: costs one Gemini call per question and language, in one process at a time)
+        self.faq_enabled: bool = _env_bool("CHAT_FAQ", True)
+        self.faq_table_path: str = os.getenv("CHAT_FAQ_TABLE_PATH", "")
+        self.faq_questions_path: str = os.getenv("CHAT_FAQ_QUESTIONS_PATH", "")
+        self.faq_threshold: float = _env_float("CHAT_FAQ_THRESHOLD", 0.7)
+        self.faq_auto_rebuild: bool = _env_bool("CHAT_FAQ_AUTO_REBUILD", False)
+
+        # Answer list-style profile questions ("his publications from 2025",
+        # "어떤 프로그래밍 언어를 써?") from templates over the profile data, without an LLM call
+        self.structured_query_enabled: bool = _env_bool("CHAT_STRUCTURED_QUERY", True)
+
+        # Profile context in prompts: "full" (whole profile) or "retrieval" (top-k passages)
+        self.context_mode: str = os.getenv("CHAT_CONTEXT_MODE", "full").strip().lower()
+        self.retrieval_top_k: int = _env_int("CHAT_RETRIEVAL_TOP_K", 6)
+        self.retrieval_include_cv_markdown: bool = _env_bool("CHAT_RETRIEVAL_INCLUDE_CV_MARKDOWN", False)
+
         # Initialize clients
         self._init_clients()
 
     def _init_clients(self):
-        """Initialize API clients"""
-        # Configure Google Generative AI
-        if self.gemini_api_key:
-            configure(api_key=self.gemini_api_key)
-
-        # Initialize Langfuse (optional)
-        self.langfuse_client = None
-        if HAS_LANGFUSE and self.langfuse_public_key and self.langfuse_secret_key:
-            try:
-                self.langfuse_client = Langfuse(
-                    public_key=self.langfuse_public_key,
-                    secret_key=self.langfuse_secret_key,
-                    host=self.langfuse_host
-                )
-            except Exception as e:
-                print(f"Warning: Langfuse initialization failed: {e}")
+        """Prepare API clients (created on first use)"""
+        self._langfuse_client = None
+        self._langfuse_loaded = False
+        self._langfuse_lock = threading.Lock()
+
+    @property
+    def langfuse_client(self):
+        """Langfuse client, or None when keys are missing or langfuse is not installed"""
+        if not self._langfuse_loaded:
+            with self._langfuse_lock:
+                if not self._langfuse_loaded:
+                    self._langfuse_client = self._create_langfuse_client()
+                    self._langfuse_loaded = True
+        return self._langfuse_client
+
+    def _create_langfuse_client(self):
+        if not (self.langfuse_public_key and self.langfuse_secret_key):
+            return None
+        try:
+            from langfuse import Langfuse
+        except ImportError:
+            return None
+        try:
+            return Langfuse(
+                public_key=self.langfuse_public_key,
+                secret_key=self.langfuse_secret_key,
+                host=self.langfuse_host
+            )
+        except Exception as e:
+            print(f"Warning: Langfuse initialization failed: {e}")
+            return None
 
 
 # Global configuration instance
@@ -0,0 +1,361 @@
+"""
+Fake LLM Module
+Deterministic local stand-in for Gemini (CHAT_LLM_BACKEND=fake) with a
+configurable latency distribution, token rate and error injection, so the
+chat pipeline can be load-tested without an API key or network
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from .config import Config
+from .llm_backends import LLMBackend
+
+# Tokens per streamed chunk (Gemini streams several tokens at a time)
+STREAM_CHUNK_TOKENS = 8
+
+_ANSWER_SENTENCES = [
+    "Kangbeen Ko is an HCI and AI researcher who builds LLM-augmented systems.",
+    "His latest research is <link>LEGOLAS</link>, an LLM-augmented golf coaching system presented at CHI 2025.",
+    "You can find his publications in the <link>Papers</link> section.",
+    "He studied at GIST and has worked on voice-based health monitoring and 3D scene graphs.",
+    "His projects combine computer vision, speech and large language models.",
+    "More details on his background are on the <link>CV</link> page.",
+    "He has received several hackathon and competition awards for applied AI work.",
+    "He works mainly with Python, PyTorch and modern web frameworks.",
+]
+
+_REJECTION_MESSAGES = {
+    "Korean": "죄송하지만 그 질문에는 답변드리기 어렵습니다. 고강빈의 연구나 프로젝트에 대해 물어봐 주세요.",
+    "English": "Sorry, I can only answer questions about Kangbeen Ko's background, research, projects and career.",
+}
+
+
+class FakeLLMError(Exception):
+    """Injected upstream failure (like a 500 from Gemini)"""
+
+    code = 500
+
+
+class FakeQuotaError(Exception):
+    """Injected quota rejection (like a 429 ResourceExhausted from Gemini)"""
+
+    code = 429
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parse a latency distribution
+
+    Args:
+        spec: "fixed:s", "uniform:low,high", "lognormal:median,sigma" or
+            "exponential:mean" (seconds)
+
+    Returns:
+        Function drawing a latency in seconds from a random generator
+    """
+    kind, _, values = spec.strip().partition(":")
+    try:
+        params = [float(value) for value in values.split(",") if value.strip()]
+        if kind == "fixed":
+            return lambda rng: params[0]
+        if kind == "uniform":
+            return lambda rng: rng.uniform(params[0], params[1])
+        if kind == "lognormal":
+            return lambda rng: rng.lognormvariate(math.log(params[0]), params[1])
+        if kind == "exponential":
+            return lambda rng: rng.expovariate(1.0 / params[0])
+    except (IndexError, ValueError, ZeroDivisionError):
+        pass
+    print(f"Warning: Invalid fake LLM latency '{spec}', using fixed:0")
+    return lambda rng: 0.0
+
+
+def _split_tokens(text: str) -> List[str]:
+    """Words with their trailing whitespace (one word ~ one token)"""
+    return re.findall(r"\S+\s*", text)
+
+
+class FakeResponse:
+    """Result or streamed chunk of FakeGenerativeModel (only .text, like GenerateContentResponse)"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Deterministic fake of the Gemini models used by the chat pipeline
+
+    Answers depend only on the prompt: relevance checks get
+    {"relevant": true}, rejection batches a JSON array, summaries a short
+    summary and everything else a canned answer of response_tokens words
+    with <link> tags. Latencies and injected errors are drawn from one
+    seeded generator, so a run with the same call order is reproducible.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        token_rate: float = 0.0,
+        response_tokens: int = 120,
+        error_rate: float = 0.0,
+        quota_error_rate: float = 0.0,
+        seed: int = 0
+    ):
+        """
+        Initialize the backend
+
+        Args:
+            latency: Distribution of the time to the first token (see parse_latency)
+            token_rate: Output tokens per second after the first token (0 for instant)
+            response_tokens: Length of generated answers in tokens
+            error_rate: Share of calls failing with FakeLLMError
+            quota_error_rate: Share of calls failing with FakeQuotaError (429)
+            seed: Random seed
+        """
+        self.latency_spec = latency
+        self._latency = parse_latency(latency)
+        self.token_rate = token_rate
+        self.response_tokens = response_tokens
+        self.error_rate = error_rate
+        self.quota_error_rate = quota_error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.quota_errors = 0
+        self.tokens_out = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    @classmethod
+    def from_config(cls, settings: Config) -> "FakeLLMBackend":
+        """Build the backend from the CHAT_FAKE_LLM_* settings"""
+        return cls(
+            latency=settings.fake_llm_latency,
+            token_rate=settings.fake_llm_token_rate,
+            response_tokens=settings.fake_llm_response_tokens,
+            error_rate=settings.fake_llm_error_rate,
+            quota_error_rate=settings.fake_llm_quota_error_rate,
+            seed=settings.fake_llm_seed
+        )
+
+    def create_chat_model(self, registry, model, temperature, max_tokens):
+        return _fake_chat_model_class()(backend=self, model=model)
+
+    def create_generative_model(self, registry, model, temperature, max_tokens):
+        return FakeGenerativeModel(self, model)
+
+    def respond(self, prompt: str) -> str:
+        """
+        Deterministic answer to a prompt
+
+        Args:
+            prompt: Full prompt text
+
+        Returns:
+            Response text
+        """
+        if '"relevant"' in prompt:
+            return '{"relevant": true}'
+        if "JSON array of strings" in prompt:
+            match = re.search(r"Write (\d+) different", prompt)
+            language = "Korean" if "Korean" in prompt else "English"
+            count = int(match.group(1)) if match else 1
+            return json.dumps([f"{_REJECTION_MESSAGES[language]} ({index + 1})" for index in range(count)],
+                              ensure_ascii=False)
+        if "Progressively summarize" in prompt:
+            return "The visitor asked about Kangbeen Ko's research (LEGOLAS) and his projects."
+        start = zlib.crc32(prompt.encode("utf-8")) % len(_ANSWER_SENTENCES)
+        words: List[str] = []
+        index = start
+        while len(words) < self.response_tokens:
+            words.extend(_ANSWER_SENTENCES[index % len(_ANSWER_SENTENCES)].split())
+            index += 1
+        text = " ".join(words[:self.response_tokens])
+        # Do not cut a <link> tag in half
+        if text.count("<link>") > text.count("</link>"):
+            text = text[:text.rfind("<link>")].rstrip()
+        return text
+
+    def _draw(self) -> Tuple[float, Optional[Exception]]:
+        """Latency and injected error (if any) of the next call"""
+        with self._lock:
+            self.calls += 1
+            latency = max(self._latency(self._random), 0.0)
+            roll = self._random.random()
+            if roll < self.error_rate:
+                self.errors += 1
+                return latency, FakeLLMError("Injected fake LLM error")
+            if roll < self.error_rate + self.quota_error_rate:
+                self.quota_errors += 1
+                return latency, FakeQuotaError("Injected fake quota error (429)")
+            return latency, None
+
+    def _chunks(self, text: str) -> List[str]:
+        tokens = _split_tokens(text)
+        with self._lock:
+            self.tokens_out += len(tokens)
+        return [
+            "".join(tokens[index:index + STREAM_CHUNK_TOKENS])
+            for index in range(0, len(tokens), STREAM_CHUNK_TOKENS)
+        ] or [""]
+
+    def _chunk_seconds(self, chunk: str) -> float:
+        return len(_split_tokens(chunk)) / self.token_rate if self.token_rate > 0 else 0.0
+
+    def _enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    async def agenerate(self, prompt: str) -> str:
+        """Answer a prompt after the drawn latency plus generation time"""
+        latency, error = self._draw()
+        self._enter()
+        try:
+            await asyncio.sleep(latency)
+            if error is not None:
+                raise error
+            text = self.respond(prompt)
+            await asyncio.sleep(sum(self._chunk_seconds(chunk) for chunk in self._chunks(text)))
+            return text
+        finally:
+            self._exit()
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Stream an answer in chunks at token_rate after the drawn latency"""
+        latency, error = self._draw()
+        self._enter()
+        try:
+            await asyncio.sleep(latency)
+            if error is not None:
+                raise error
+            for chunk in self._chunks(self.respond(prompt)):
+                await asyncio.sleep(self._chunk_seconds(chunk))
+                yield chunk
+        finally:
+            self._exit()
+
+    def generate(self, prompt: str) -> str:
+        """Blocking counterpart of agenerate"""
+        latency, error = self._draw()
+        self._enter()
+        try:
+            time.sleep(latency)
+            if error is not None:
+                raise error
+            text = self.respond(prompt)
+            time.sleep(sum(self._chunk_seconds(chunk) for chunk in self._chunks(text)))
+            return text
+        finally:
+            self._exit()
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Blocking counterpart of astream"""
+        latency, error = self._draw()
+        self._enter()
+        try:
+            time.sleep(latency)
+            if error is not None:
+                raise error
+            for chunk in self._chunks(self.respond(prompt)):
+                time.sleep(self._chunk_seconds(chunk))
+                yield chunk
+        finally:
+            self._exit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get fake backend metrics
+
+        Returns:
+            Dictionary with latency spec, token_rate, calls, injected errors
+            and quota errors, tokens generated and calls in flight (current/peak)
+        """
+        return {
+            "latency": self.latency_spec,
+            "token_rate": self.token_rate,
+            "calls": self.calls,
+            "errors": self.errors,
+            "quota_errors": self.quota_errors,
+            "tokens_out": self.tokens_out,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+
+class FakeGenerativeModel:
+    """Stand-in for google.generativeai.GenerativeModel backed by FakeLLMBackend"""
+
+    def __init__(self, backend: FakeLLMBackend, model_name: str):
+        self.backend = backend
+        self.model_name = model_name
+
+    def generate_content(self, contents: Any, *, stream: bool = False, **kwargs):
+        if stream:
+            return (FakeResponse(chunk) for chunk in self.backend.stream(str(contents)))
+        return FakeResponse(self.backend.generate(str(contents)))
+
+    async def generate_content_async(self, contents: Any, *, stream: bool = False, **kwargs):
+        if stream:
+            return self._astream(str(contents))
+        return FakeResponse(await self.backend.agenerate(str(contents)))
+
+    async def _astream(self, prompt: str) -> AsyncIterator[FakeResponse]:
+        async for chunk in self.backend.astream(prompt):
+            yield FakeResponse(chunk)
+
+
+_fake_classes: Dict[str, type] = {}
+
+
+def _fake_chat_model_class() -> type:
+    """LangChain chat model backed by FakeLLMBackend (langchain imported on first use)"""
+    if "chat" not in _fake_classes:
+        from langchain_core.language_models.chat_models import BaseChatModel
+        from langchain_core.messages import AIMessage, AIMessageChunk
+        from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+        def prompt_text(messages) -> str:
+            return "\n".join(str(message.content) for message in messages)
+
+        class FakeChatModel(BaseChatModel):
+            backend: Any
+            model: str = "fake"
+
+            @property
+            def _llm_type(self) -> str:
+                return "fake-gemini"
+
+            def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+                text = self.backend.generate(prompt_text(messages))
+                return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+            async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+                text = await self.backend.agenerate(prompt_text(messages))
+                return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+            def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+                for chunk in self.backend.stream(prompt_text(messages)):
+                    yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+            async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+                async for chunk in self.backend.astream(prompt_text(messages)):
+                    yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+        _fake_classes["chat"] = FakeChatModel
+    return _fake_classes["chat"]
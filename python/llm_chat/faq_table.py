@@ -0,0 +1,443 @@
+"""
+FAQ Table Module
+Precomputed answers to predictable first-turn questions (publications,
+education, latest research, ...), generated offline once per profile
+version and matched locally at request time
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Dict, FrozenSet, List, Optional, Tuple
+from .config import config
+from .llm_backends import get_model_registry
+from .long_term_memory import get_long_term_memory
+from .text_utils import content_words, extract_numbers, hash_embed, normalize_query
+
+try:
+    import fcntl
+except ImportError:
+    # No cross-process rebuild lock on Windows
+    fcntl = None
+
+# Curated canonical questions ([{"id", "questions": {language: [canonical, paraphrases...]}}])
+DEFAULT_QUESTIONS_PATH = Path(__file__).parent.parent / "data" / "faq_questions.json"
+
+# Generated answer table
+DEFAULT_TABLE_PATH = Path(__file__).parent.parent / "data" / "faq_answers.json"
+
+# Seconds to wait before retrying a failed automatic rebuild
+RETRY_AFTER_SECONDS = 300
+
+# Seconds to wait before trying again while another process is rebuilding
+LOCKED_RETRY_SECONDS = 30
+
+
+def load_faq_questions(path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """
+    Load the curated FAQ questions
+
+    Args:
+        path: Questions file (defaults to CHAT_FAQ_QUESTIONS_PATH or data/faq_questions.json)
+
+    Returns:
+        List of {"id", "questions": {language: [questions]}}; the first
+        question per language is the one sent to the LLM
+    """
+    path = path or Path(config.faq_questions_path or DEFAULT_QUESTIONS_PATH)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+async def build_faq_table(questions: List[Dict[str, Any]], concurrency: int = 4) -> Dict[str, Any]:
+    """
+    Generate the answer table with the live prompt and model
+
+    Each canonical question is answered like the first turn of a new
+    session: a fresh LangChain memory and chain over the current profile
+    snapshot. The calls are background work (see
+    generate_background_response): they yield to user requests in the
+    scheduler and stay out of the circuit breaker and hedger stats.
+    Questions whose generation fails are left out.
+
+    Args:
+        questions: Curated questions (see load_faq_questions)
+        concurrency: Generations run at the same time
+
+    Returns:
+        Table with profile_hash, built_at and entries (id, language,
+        question, paraphrases, response, raw_response)
+    """
+    from .langchain_memory import LangChainMemoryManager
+    from .response_generator import generate_background_response, linkify_response
+    from .retrieval import get_prompt_context
+
+    snapshot = get_long_term_memory().snapshot()
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def answer(faq_id: str, language: str, variants: List[str]) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            memory = LangChainMemoryManager(f"faq-build-{faq_id}-{language}")
+            profile_context, site_links = get_prompt_context(variants[0], snapshot)
+            chain = memory.create_chain(
+                profile_context=profile_context,
+                site_links=site_links,
+                current_time=datetime.utcnow().isoformat(),
+                profile_version=snapshot.version
+            )
+            try:
+                raw_response = await generate_background_response(variants[0], chain)
+            except Exception as e:
+                print(f"Warning: FAQ answer for '{faq_id}' ({language}) could not be generated ({e})")
+                return None
+            return {
+                "id": faq_id,
+                "language": language,
+                "question": variants[0],
+                "paraphrases": variants[1:],
+                "response": linkify_response(raw_response, snapshot.site_links),
+                "raw_response": raw_response,
+            }
+
+    results = await asyncio.gather(*(
+        answer(item["id"], language, variants)
+        for item in questions
+        for language, variants in item["questions"].items()
+        if variants
+    ))
+    return {
+        "profile_hash": snapshot.version,
+        "built_at": datetime.utcnow().isoformat(),
+        "entries": [entry for entry in results if entry is not None],
+    }
+
+
+def save_faq_table(table: Dict[str, Any], path: Path):
+    """
+    Write the table atomically (readers never see a partial file)
+
+    Each writer gets its own temporary file next to the table, so
+    concurrent writers never interleave before the rename.
+    """
+    path = Path(path)
+    temporary = None
+    try:
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False
+        ) as f:
+            temporary = f.name
+            json.dump(table, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        os.replace(temporary, path)
+    except BaseException:
+        if temporary is not None and os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+
+
+class FaqMatcher:
+    """
+    Local matcher of queries against the FAQ questions and paraphrases
+
+    Exact normalized matches are a dictionary lookup. Otherwise the query's
+    hashing embedding is scored against every question of its language
+    through an inverted index (feature -> questions), which only touches
+    questions sharing a feature with the query. As in the response cache,
+    questions that differ in a number (year, count) never match. Character
+    overlap alone scores "earliest paper" close to "latest paper", so a
+    similar question only counts if every content word of the query occurs
+    in the questions of its entry (see content_words); queries without
+    content words only match exactly.
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        """
+        Index the table entries
+
+        Args:
+            entries: Entries of an answer table
+        """
+        self.entries = entries
+        self._exact: Dict[Tuple[str, str], int] = {}
+        # language -> feature -> [(question index, weight)]
+        self._index: Dict[str, Dict[int, List[Tuple[int, float]]]] = defaultdict(lambda: defaultdict(list))
+        # question index -> (entry index, numbers)
+        self._questions: List[Tuple[int, List[str]]] = []
+        # entry index -> content words of all its questions
+        self._vocabularies: List[FrozenSet[str]] = []
+        for entry_index, entry in enumerate(entries):
+            questions = [entry["question"]] + list(entry.get("paraphrases", []))
+            self._vocabularies.append(frozenset().union(*(content_words(question) for question in questions)))
+            for question in questions:
+                normalized = normalize_query(question)
+                if not normalized:
+                    continue
+                self._exact.setdefault((entry["language"], normalized), entry_index)
+                question_index = len(self._questions)
+                self._questions.append((entry_index, extract_numbers(normalized)))
+                for feature, weight in hash_embed(normalized).items():
+                    self._index[entry["language"]][feature].append((question_index, weight))
+
+    def match(self, query: str, language: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Find the closest FAQ entry
+
+        Args:
+            query: User's query
+            language: Detected language ("en" or "ko")
+
+        Returns:
+            Tuple of (entry, cosine similarity), or None if nothing shares a feature
+        """
+        normalized = normalize_query(query)
+        if not normalized:
+            return None
+        entry_index = self._exact.get((language, normalized))
+        if entry_index is not None:
+            return self.entries[entry_index], 1.0
+
+        index = self._index.get(language)
+        if not index:
+            return None
+        scores: Dict[int, float] = defaultdict(float)
+        for feature, weight in hash_embed(normalized).items():
+            for question_index, question_weight in index.get(feature, ()):
+                scores[question_index] += weight * question_weight
+        numbers = extract_numbers(normalized)
+        words = content_words(normalized)
+        if not words:
+            return None
+        best_index, best_score = None, 0.0
+        for question_index, score in scores.items():
+            if score <= best_score:
+                continue
+            entry_index, question_numbers = self._questions[question_index]
+            if question_numbers == numbers and words <= self._vocabularies[entry_index]:
+                best_index, best_score = question_index, score
+        if best_index is None:
+            return None
+        return self.entries[self._questions[best_index][0]], best_score
+
+
+class FaqTable:
+    """
+    Serves precomputed FAQ answers
+
+    The table is only used while its profile_hash equals the long-term
+    memory's content hash. Once profile_data.json changes, lookups miss.
+    A stale lookup first reloads the file if another process saved a new
+    table; with auto_rebuild, the table is then rebuilt in the background
+    as low-priority LLM work, saved, and swapped in. A flock on
+    "<table>.lock" makes sure only one process rebuilds at a time, and
+    the others pick up the saved file.
+    """
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_TABLE_PATH,
+        threshold: float = 0.7,
+        auto_rebuild: bool = False,
+        questions_path: Optional[Path] = None
+    ):
+        """
+        Initialize the FAQ table
+
+        Args:
+            path: Answer table file
+            threshold: Minimum similarity for serving an answer
+            auto_rebuild: Rebuild in the background when the table is missing or stale
+            questions_path: Curated questions used for rebuilds
+        """
+        self.path = Path(path)
+        self.threshold = threshold
+        self.auto_rebuild = auto_rebuild
+        self.questions_path = questions_path
+        self._table: Optional[Dict[str, Any]] = None
+        self._matcher: Optional[FaqMatcher] = None
+        # Modification time of the loaded file (None if nothing was loaded)
+        self._loaded_mtime: Optional[int] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+        # time.monotonic() before which no automatic rebuild is started
+        self._next_rebuild = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.below_threshold = 0
+        self.stale = 0
+        self.rebuilds = 0
+        self._load()
+
+    def _load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path, "r", encoding="utf-8") as f:
+                table = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: FAQ table not loaded ({e})")
+            return
+        self._loaded_mtime = mtime
+        self._install(table)
+
+    def _reload_if_changed(self):
+        """Load the table file again if it changed since it was loaded (saved by another process)"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._loaded_mtime:
+            self._load()
+
+    def _install(self, table: Dict[str, Any]):
+        # Matcher first, so a lookup never pairs a new table with an old matcher
+        matcher = FaqMatcher(table.get("entries", []))
+        self._table, self._matcher = table, matcher
+
+    def _is_current(self, table: Optional[Dict[str, Any]]) -> bool:
+        return table is not None and table.get("profile_hash") == get_long_term_memory().content_hash
+
+    def lookup(self, query: str, language: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a precomputed answer
+
+        Args:
+            query: User's query
+            language: Detected language ("en" or "ko")
+
+        Returns:
+            Entry with 'response' (linkified), 'raw_response' and 'score',
+            or None when there is no current table or no confident match
+        """
+        table, matcher = self._table, self._matcher
+        if not self._is_current(table):
+            self._reload_if_changed()
+            table, matcher = self._table, self._matcher
+            if not self._is_current(table):
+                self.stale += 1
+                self._schedule_rebuild()
+                return None
+        result = matcher.match(query, language)
+        if result is None:
+            self.misses += 1
+            return None
+        entry, score = result
+        if score < self.threshold:
+            self.below_threshold += 1
+            return None
+        self.hits += 1
+        return dict(entry, score=score)
+
+    def _schedule_rebuild(self):
+        if not self.auto_rebuild or (self._rebuild_task is not None and not self._rebuild_task.done()):
+            return
+        if time.monotonic() < self._next_rebuild or not get_model_registry().available:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._rebuild_task = loop.create_task(self.rebuild())
+
+    def _lock(self) -> Optional[IO[str]]:
+        """
+        Take the cross-process rebuild lock
+
+        Returns:
+            Open lock file (closing it releases the lock), or None if
+            another process holds it or the directory is not writable
+        """
+        try:
+            handle = open(f"{self.path}.lock", "a", encoding="utf-8")
+        except OSError as e:
+            # Read-only deployments (serverless) could not save the table either
+            print(f"Warning: FAQ table not rebuilt ({e})")
+            self._next_rebuild = time.monotonic() + RETRY_AFTER_SECONDS
+            return None
+        if fcntl is not None:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                self._next_rebuild = time.monotonic() + LOCKED_RETRY_SECONDS
+                return None
+        return handle
+
+    async def rebuild(self) -> bool:
+        """
+        Regenerate the table for the current profile, save it and swap it in
+
+        Returns:
+            True if a current table is installed (rebuilt here or saved by
+            another process); False if generation failed or another
+            process is still rebuilding
+        """
+        lock = self._lock()
+        if lock is None:
+            return False
+        try:
+            # Another process may have finished a rebuild just before the lock was free
+            self._reload_if_changed()
+            if self._is_current(self._table):
+                return True
+            self.rebuilds += 1
+            try:
+                table = await build_faq_table(load_faq_questions(self.questions_path))
+            except Exception as error:
+                print(f"Error rebuilding FAQ table: {error}")
+                self._next_rebuild = time.monotonic() + RETRY_AFTER_SECONDS
+                return False
+            if not table["entries"]:
+                self._next_rebuild = time.monotonic() + RETRY_AFTER_SECONDS
+                return False
+            self._install(table)
+            print(f"FAQ table rebuilt: {len(table['entries'])} answers for profile {table['profile_hash']}")
+            try:
+                save_faq_table(table, self.path)
+                self._loaded_mtime = os.stat(self.path).st_mtime_ns
+            except OSError as e:
+                print(f"Warning: FAQ table not saved ({e})")
+            return True
+        finally:
+            lock.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get FAQ table metrics
+
+        Returns:
+            Dictionary with entries, profile_hash, built_at, hits, misses,
+            below_threshold, stale lookups and rebuilds
+        """
+        table = self._table or {}
+        return {
+            "entries": len(table.get("entries", [])),
+            "profile_hash": table.get("profile_hash"),
+            "built_at": table.get("built_at"),
+            "hits": self.hits,
+            "misses": self.misses,
+            "below_threshold": self.below_threshold,
+            "stale": self.stale,
+            "rebuilds": self.rebuilds,
+        }
+
+
+# Global FAQ table instance
+_faq_table: Optional[FaqTable] = None
+
+
+def get_faq_table() -> FaqTable:
+    """Get or create the global FAQ table"""
+    global _faq_table
+    if _faq_table is None:
+        _faq_table = FaqTable(
+            path=Path(config.faq_table_path or DEFAULT_TABLE_PATH),
+            threshold=config.faq_threshold,
+            auto_rebuild=config.faq_auto_rebuild,
+            questions_path=Path(config.faq_questions_path) if config.faq_questions_path else None
+        )
+    return _faq_table
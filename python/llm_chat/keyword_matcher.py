@@ -0,0 +1,256 @@
+"""
+Keyword Matcher Module
+Single-pass multi-keyword matching (Aho-Corasick) with Korean-aware
+word boundaries
+"""
+
+import json
+import unicodedata
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Particles that may follow a Korean keyword ("연구는") without breaking the
+# word boundary
+KOREAN_PARTICLES = (
+    "은", "는", "이", "가", "을", "를", "에", "의", "도", "로", "으로", "과", "와",
+    "랑", "이랑", "만", "까지", "부터", "요", "야", "이야", "들", "께", "한테",
+    "이나", "나", "란", "이란",
+)
+
+# Verb endings that may follow a Korean keyword ("소개해줘"). Not after
+# one-syllable keywords: "상" + "하이" is Shanghai, not an award
+KOREAN_ENDINGS = ("해", "하", "했", "한", "할", "합", "적")
+
+KOREAN_SUFFIXES = KOREAN_PARTICLES + KOREAN_ENDINGS
+
+
+def _is_hangul(char: str) -> bool:
+    return "가" <= char <= "힣" or "ㄱ" <= char <= "ㆎ"
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton for finding many literal patterns in one pass
+
+    Matching cost depends on the text length and the number of matches,
+    not on the number of patterns.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]
+        self._depth: List[int] = [0]
+        self._built = False
+
+    def add(self, pattern: str, payload: Any = None):
+        """
+        Add a pattern
+
+        Args:
+            pattern: Literal text to find
+            payload: Value reported with every match of the pattern
+        """
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._depth.append(self._depth[state] + 1)
+            state = next_state
+        self._output[state].append((len(pattern), payload if payload is not None else pattern))
+        self._built = False
+
+    def build(self):
+        """Compute failure links (called automatically on first search)"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """
+        Find all (possibly overlapping) pattern occurrences
+
+        Args:
+            text: Text to search
+
+        Yields:
+            Tuples of (start index, end index, payload)
+        """
+        if not self._built:
+            self.build()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, payload in output[state]:
+                yield index - length + 1, index + 1, payload
+
+    def partial_lengths(self, text: str) -> List[int]:
+        """
+        Length of the longest pattern prefix ending at each position
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            One entry per character; 0 means no pattern occurrence can span
+            the boundary after that character
+        """
+        if not self._built:
+            self.build()
+        goto, fail, depth = self._goto, self._fail, self._depth
+        state = 0
+        lengths = []
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            lengths.append(depth[state])
+        return lengths
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+
+class KeywordMatcher:
+    """
+    Matches text against named keyword rules in a single pass
+
+    Rules are grouped by verdict (e.g. "irrelevant" and "relevant"). Latin
+    keywords need word boundaries on both sides. Korean keywords need a
+    boundary on the left and may be followed by a particle or, unless they
+    are a single syllable, a verb ending (see KOREAN_PARTICLES and
+    KOREAN_ENDINGS), which a regex \\b cannot express.
+    """
+
+    def __init__(self, rules: Dict[str, Dict[str, List[str]]], priority: Optional[List[str]] = None):
+        """
+        Build the matcher
+
+        Args:
+            rules: {group: {rule name: [keywords]}}
+            priority: Group order used when several groups match
+                (defaults to the order of `rules`)
+        """
+        self.priority = list(priority or rules.keys())
+        self.keyword_count = 0
+        self._automaton = AhoCorasick()
+        for group, group_rules in rules.items():
+            for rule, keywords in group_rules.items():
+                for keyword in keywords:
+                    keyword = self.normalize(keyword).strip()
+                    if keyword:
+                        self._automaton.add(keyword, (group, rule, keyword))
+                        self.keyword_count += 1
+        self._automaton.build()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize text the same way for keywords and queries"""
+        return unicodedata.normalize("NFKC", text).casefold()
+
+    @staticmethod
+    def _has_boundaries(text: str, start: int, end: int) -> bool:
+        if start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if end >= len(text) or not _is_word_char(text[end]):
+            return True
+        # Korean keyword followed by more Hangul: allow particles/endings only
+        # (particles only after one syllable, where endings make other words)
+        if _is_hangul(text[end - 1]) and _is_hangul(text[end]):
+            return text.startswith(KOREAN_SUFFIXES if end - start > 1 else KOREAN_PARTICLES, end)
+        return False
+
+    def find_spans(self, normalized: str) -> List[Tuple[int, int, str, str, str]]:
+        """
+        Find every rule that fires on already normalized text, with positions
+
+        Args:
+            normalized: Text passed through normalize()
+
+        Returns:
+            List of (start, end, group, rule, keyword) in order of match end
+        """
+        return [
+            (start, end, group, rule, keyword)
+            for start, end, (group, rule, keyword) in self._automaton.iter_matches(normalized)
+            if self._has_boundaries(normalized, start, end)
+        ]
+
+    def find_all(self, text: str) -> List[Dict[str, str]]:
+        """
+        Find every rule that fires on a text
+
+        Args:
+            text: Text to match
+
+        Returns:
+            List of {"group", "rule", "keyword"} in text order
+        """
+        return [
+            {"group": group, "rule": rule, "keyword": keyword}
+            for _, _, group, rule, keyword in self.find_spans(self.normalize(text))
+        ]
+
+    def match(self, text: str) -> Optional[Dict[str, str]]:
+        """
+        Find the deciding rule for a text
+
+        Args:
+            text: Text to match
+
+        Returns:
+            First match of the highest-priority group, or None
+        """
+        first_by_group: Dict[str, Dict[str, str]] = {}
+        for hit in self.find_all(text):
+            first_by_group.setdefault(hit["group"], hit)
+        for group in self.priority:
+            if group in first_by_group:
+                return first_by_group[group]
+        return None
+
+
+def load_keyword_matcher(path: Path, priority: Optional[List[str]] = None) -> KeywordMatcher:
+    """
+    Load keyword rules from a JSON file
+
+    The file maps group -> rule name -> list of keywords, e.g.
+    {"irrelevant": {"weather": ["weather", "날씨"]}, "relevant": {...}}
+
+    Args:
+        path: Path to the JSON rule file
+        priority: Group order used when several groups match
+
+    Returns:
+        KeywordMatcher instance
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    return KeywordMatcher(rules, priority=priority)
@@ -3,32 +3,110 @@ LangChain Memory Module
 Manages conversation history using LangChain's memory system
 """
 
+import asyncio
 import sys
-import logging
-from typing import Optional, List
+from typing import Optional, List, Mapping, Sequence, Tuple
 from langchain.memory import ConversationBufferMemory
-from langchain.schema import BaseMessage, HumanMessage, AIMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain.schema import BaseMessage, HumanMessage, AIMessage, SystemMessage
 from langchain.chains import ConversationChain
 from langchain.prompts import PromptTemplate
 from .config import config
+from .llm_backends import get_model_registry
+from .llm_scheduler import Priority, get_llm_scheduler
+from .long_term_memory import get_long_term_memory
+from .metrics import get_chat_metrics
+from .observability import get_logger
+from .text_utils import estimate_tokens
 
-# Set up logger
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+# Set up logger (level from CHAT_LOG_LEVEL, written by a background thread)
+logger = get_logger(__name__)
 
-# Create console handler if not exists
-if not logger.handlers:
-    console_handler = logging.StreamHandler(sys.stderr)
-    console_handler.setLevel(logging.DEBUG)
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+
+# Per-message overhead (role markers, separators) added to the text estimate
+MESSAGE_TOKEN_OVERHEAD = 4
+
+
+def estimate_message_tokens(message: BaseMessage) -> int:
+    """Approximate prompt tokens used by one chat message"""
+    return estimate_tokens(str(message.content)) + MESSAGE_TOKEN_OVERHEAD
+
+
+class TokenBudgetMemory(ConversationBufferMemory):
+    """
+    Conversation memory that replays only recent turns under a token budget
+
+    The full history stays in chat_memory (checkpoint/rollback and the
+    session store rely on it), but the prompt only gets the most recent
+    whole turns that fit max_token_limit (at most max_turns, and always
+    the latest turn), preceded by a running summary of older turns. The
+    summary is refreshed in the background by LangChainMemoryManager;
+    turns that left the window but are not summarized yet are omitted.
+    """
+
+    max_token_limit: int = 1200
+    max_turns: int = 6
+    summary: str = ""
+    summarized_count: int = 0
+
+    def window_start(self) -> int:
+        """
+        Index of the first message replayed verbatim
+
+        Returns:
+            Position in chat_memory.messages where the window begins
+        """
+        messages = self.chat_memory.messages
+        start = end = len(messages)
+        used = turns = 0
+        while end > 0 and turns < self.max_turns:
+            turn_start = end - 1
+            while turn_start > 0 and not isinstance(messages[turn_start], HumanMessage):
+                turn_start -= 1
+            cost = sum(estimate_message_tokens(message) for message in messages[turn_start:end])
+            if turns and used + cost > self.max_token_limit:
+                break
+            used += cost
+            turns += 1
+            start = end = turn_start
+        return start
+
+    def pending_summary_range(self) -> Tuple[int, int]:
+        """
+        Messages that left the window but are not in the summary yet
+
+        Returns:
+            (start, end) slice of chat_memory.messages
+        """
+        return self.summarized_count, max(self.summarized_count, self.window_start())
+
+    @property
+    def buffer_as_messages(self) -> List[BaseMessage]:
+        """Summary (if any) followed by the budgeted window of recent turns"""
+        window = self.chat_memory.messages[self.window_start():]
+        if self.summary:
+            return [SystemMessage(content=f"Summary of the earlier conversation: {self.summary}")] + window
+        return window
+
+    async def abuffer_as_messages(self) -> List[BaseMessage]:
+        return self.buffer_as_messages
+
+    @property
+    def buffer_as_str(self) -> str:
+        return self._buffer_as_str(self.buffer_as_messages)
+
+    async def abuffer_as_str(self) -> str:
+        return self.buffer_as_str
+
+    def clear(self) -> None:
+        super().clear()
+        self.summary = ""
+        self.summarized_count = 0
 
 
 class LangChainMemoryManager:
     """
-    Manages conversation memory using LangChain's ConversationBufferMemory
+    Manages conversation memory using LangChain's ConversationBufferMemory,
+    or TokenBudgetMemory in the "budget" memory mode
     """
     
     def __init__(self, session_id: str):
@@ -39,27 +117,40 @@ class LangChainMemoryManager:
             session_id: Unique session identifier
         """
         self.session_id = session_id
-        self.memory = ConversationBufferMemory(
-            return_messages=True,
-            memory_key="chat_history"
-        )
+        if config.memory_mode == "budget":
+            self.memory = TokenBudgetMemory(
+                return_messages=True,
+                memory_key="chat_history",
+                max_token_limit=config.memory_token_budget,
+                max_turns=config.memory_max_turns
+            )
+        else:
+            self.memory = ConversationBufferMemory(
+                return_messages=True,
+                memory_key="chat_history"
+            )
         self.llm = None
         self._cached_chain = None
+        self._cached_profile_version = None
         self._cached_profile_context = None
         self._cached_site_links = None
         self._cached_current_time = None
+        self._summary_task: Optional[asyncio.Task] = None
         self._init_llm()
     
     def _init_llm(self):
-        """Initialize LangChain ChatGoogleGenerativeAI"""
-        if config.gemini_api_key:
-            self.llm = ChatGoogleGenerativeAI(
-                model="gemini-2.5-flash",
-                google_api_key=config.gemini_api_key,
-                temperature=0.7,
-            )
+        """Use the process-wide ChatGoogleGenerativeAI shared by all sessions"""
+        registry = get_model_registry()
+        if registry.available:
+            self.llm = registry.get_chat_model("gemini-2.5-flash", temperature=0.7)
     
-    def create_chain(self, profile_context: str, site_links: List[dict], current_time: str) -> ConversationChain:
+    def create_chain(
+        self,
+        profile_context: str,
+        site_links: Sequence[Mapping[str, str]],
+        current_time: str,
+        profile_version: Optional[str] = None
+    ) -> ConversationChain:
         """
         Create or reuse a ConversationChain with custom prompt template
         
@@ -67,6 +158,8 @@ class LangChainMemoryManager:
             profile_context: Profile information context
             site_links: List of site links
             current_time: Current time string
+            profile_version: Long-term memory version the context was built
+                from (defaults to the current version)
             
         Returns:
             ConversationChain instance (reused if context hasn't changed)
@@ -75,20 +168,27 @@ class LangChainMemoryManager:
             raise ValueError("LLM not initialized")
         
         # Check if we can reuse cached chain (profile_context and site_links rarely change)
-        # Only recreate if context actually changed
-        site_links_str = "\n".join([f"- {link['label']}: {link['href']}" for link in site_links])
+        # Only recreate if the profile version or the context actually changed.
+        # Snapshot strings are shared, so the equality checks are identity checks
+        ltm = get_long_term_memory()
+        if profile_version is None:
+            profile_version = ltm.content_hash
+        site_links_str = ltm.get_site_links_text(site_links)
         can_reuse = (
             self._cached_chain is not None and
+            self._cached_profile_version == profile_version and
             self._cached_profile_context == profile_context and
             self._cached_site_links == site_links_str
         )
         
         if can_reuse:
             # Reuse cached chain (same memory object, so conversation history is preserved)
-            logger.debug(f"[LANGCHAIN MEMORY] Reusing cached chain for session {self.session_id}")
+            logger.debug("[LANGCHAIN MEMORY] Reusing cached chain for session %s", self.session_id)
+            get_chat_metrics().chains.inc("reused")
             return self._cached_chain
         
-        logger.debug(f"[LANGCHAIN MEMORY] Creating new chain for session {self.session_id}")
+        logger.debug("[LANGCHAIN MEMORY] Creating new chain for session %s", self.session_id)
+        get_chat_metrics().chains.inc("created")
         
         # Format site links as string
         # Create custom prompt template that includes profile context and site links
@@ -124,10 +224,10 @@ Answer the user's question using the provided profile information and conversati
 {current_time}
 
 ## Conversation History:
-{{chat_history}}
+{chat_history}
 
 ## User Question:
-{{input}}
+{input}
 
 ## Response:"""
 
@@ -152,6 +252,7 @@ Answer the user's question using the provided profile information and conversati
         
         # Cache the chain and context for potential reuse
         self._cached_chain = chain
+        self._cached_profile_version = profile_version
         self._cached_profile_context = profile_context
         self._cached_site_links = site_links_str
         self._cached_current_time = current_time
@@ -165,9 +266,9 @@ Answer the user's question using the provided profile information and conversati
         Args:
             message: User's message
         """
-        logger.debug(f"[LANGCHAIN MEMORY] Adding user message to session {self.session_id}: {message[:50]}...")
+        logger.debug("[LANGCHAIN MEMORY] Adding user message to session %s: %.50s...", self.session_id, message)
         self.memory.chat_memory.add_user_message(message)
-        logger.debug(f"[LANGCHAIN MEMORY] Total messages in memory: {len(self.memory.chat_memory.messages)}")
+        logger.debug("[LANGCHAIN MEMORY] Total messages in memory: %d", len(self.memory.chat_memory.messages))
     
     def add_ai_message(self, message: str):
         """
@@ -176,9 +277,9 @@ Answer the user's question using the provided profile information and conversati
         Args:
             message: AI's response
         """
-        logger.debug(f"[LANGCHAIN MEMORY] Adding AI message to session {self.session_id}: {message[:50]}...")
+        logger.debug("[LANGCHAIN MEMORY] Adding AI message to session %s: %.50s...", self.session_id, message)
         self.memory.chat_memory.add_ai_message(message)
-        logger.debug(f"[LANGCHAIN MEMORY] Total messages in memory: {len(self.memory.chat_memory.messages)}")
+        logger.debug("[LANGCHAIN MEMORY] Total messages in memory: %d", len(self.memory.chat_memory.messages))
     
     def get_chat_history(self) -> list[BaseMessage]:
         """
@@ -220,6 +321,130 @@ Answer the user's question using the provided profile information and conversati
     def clear(self):
         """Clear all conversation history"""
         self.memory.clear()
+
+    def schedule_summary(self) -> Optional[asyncio.Task]:
+        """
+        Refresh the running summary in the background if enough turns left the window
+
+        Only applies to TokenBudgetMemory. Does nothing without a running
+        event loop or while a refresh is already in progress.
+
+        Returns:
+            The started task, or None
+        """
+        if not isinstance(self.memory, TokenBudgetMemory) or not config.memory_summary_enabled or not self.llm:
+            return None
+        if self._summary_task is not None and not self._summary_task.done():
+            return None
+        start, end = self.memory.pending_summary_range()
+        if end - start < config.memory_summary_min_messages:
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        self._summary_task = loop.create_task(self._refresh_summary(start, end))
+        return self._summary_task
+
+    async def _refresh_summary(self, start: int, end: int):
+        """Fold messages[start:end] into the running summary"""
+        memory = self.memory
+        lines = memory._buffer_as_str(memory.chat_memory.messages[start:end])
+        prompt = f"""Progressively summarize a conversation between a visitor and Kangbeen Ko(고강빈)'s digital twin assistant.
+Keep the names of papers, projects and topics that were discussed, so later references like "that paper" can be resolved.
+Keep it under 120 words and write it in the language of the conversation.
+
+Current summary:
+{memory.summary or "(none)"}
+
+New lines of conversation:
+{lines}
+
+New summary:"""
+        try:
+            result = await get_llm_scheduler().submit(
+                "gemini-2.5-flash", lambda: self.llm.ainvoke(prompt), Priority.BACKGROUND, estimate_tokens(prompt)
+            )
+        except Exception as e:
+            logger.warning(f"[LANGCHAIN MEMORY] Summary refresh failed for session {self.session_id}: {e}")
+            return
+        # The history may have been cleared or restored meanwhile
+        if memory is not self.memory or memory.summarized_count != start or len(memory.chat_memory.messages) < end:
+            return
+        memory.summary = str(result.content).strip()
+        memory.summarized_count = end
+        logger.debug("[LANGCHAIN MEMORY] Summarized %d messages for session %s", end, self.session_id)
+
+    def restore(self, messages: List[dict]):
+        """
+        Replace the conversation with messages loaded from a session store
+
+        Args:
+            messages: Stored messages (role, content, raw), oldest first
+        """
+        self.memory.chat_memory.messages = [
+            HumanMessage(content=message["content"]) if message["role"] == "user"
+            else AIMessage(content=message.get("raw") or message["content"])
+            for message in messages
+        ]
+        if isinstance(self.memory, TokenBudgetMemory):
+            self.memory.summary = ""
+            self.memory.summarized_count = 0
+
+    def release(self):
+        """Drop the conversation, the cached chain and the LLM client"""
+        if self._summary_task is not None:
+            self._summary_task.cancel()
+            self._summary_task = None
+        self.memory.clear()
+        self._cached_chain = None
+        self._cached_profile_version = None
+        self._cached_profile_context = None
+        self._cached_site_links = None
+        self._cached_current_time = None
+        self.llm = None
+
+    def estimate_bytes(self) -> int:
+        """
+        Approximate memory held by this session's conversation and cached chain
+
+        Returns:
+            Size in bytes of stored messages and the cached prompt context
+        """
+        messages = self.memory.chat_memory.messages
+        size = sys.getsizeof(messages)
+        for message in messages:
+            size += sys.getsizeof(message) + sys.getsizeof(message.content)
+        if isinstance(self.memory, TokenBudgetMemory):
+            size += sys.getsizeof(self.memory.summary)
+        if self._cached_chain is not None:
+            size += sys.getsizeof(self._cached_profile_context or "")
+            size += sys.getsizeof(self._cached_site_links or "")
+            size += sys.getsizeof(self._cached_current_time or "")
+        return size
+
+    def checkpoint(self) -> int:
+        """
+        Mark the current end of the conversation history
+
+        Returns:
+            Number of messages currently stored (pass to rollback())
+        """
+        return len(self.memory.chat_memory.messages)
+
+    def rollback(self, checkpoint: int):
+        """
+        Drop every message added after a checkpoint
+
+        Args:
+            checkpoint: Value previously returned by checkpoint()
+        """
+        messages = self.memory.chat_memory.messages
+        if len(messages) > checkpoint:
+            logger.debug("[LANGCHAIN MEMORY] Rolling back session %s to %d messages", self.session_id, checkpoint)
+            self.memory.chat_memory.messages = messages[:checkpoint]
+            if isinstance(self.memory, TokenBudgetMemory):
+                self.memory.summarized_count = min(self.memory.summarized_count, checkpoint)
     
     def get_memory_variables(self) -> dict:
         """
@@ -231,13 +456,12 @@ Answer the user's question using the provided profile information and conversati
         return self.memory.load_memory_variables({})
 
 
-# Global memory managers by session
-_memory_managers: dict[str, LangChainMemoryManager] = {}
-
-
 def get_memory_manager(session_id: str) -> LangChainMemoryManager:
     """
     Get or create LangChain memory manager for a session
+
+    Managers live in the bounded SessionRegistry next to the session's
+    short-term memory (see session_registry.py).
     
     Args:
         session_id: Session identifier
@@ -245,13 +469,11 @@ def get_memory_manager(session_id: str) -> LangChainMemoryManager:
     Returns:
         LangChainMemoryManager instance
     """
-    if session_id not in _memory_managers:
-        _memory_managers[session_id] = LangChainMemoryManager(session_id)
-    return _memory_managers[session_id]
+    from .session_registry import get_session_registry
+    return get_session_registry().get(session_id).langchain_memory
 
 
 def clear_memory_manager(session_id: str):
     """Clear memory manager for a session"""
-    if session_id in _memory_managers:
-        del _memory_managers[session_id]
-
+    from .session_registry import get_session_registry
+    get_session_registry().evict(session_id, delete_stored=True)
@@ -0,0 +1,346 @@
+"""
+Link Resolver Module
+Resolves <link> labels written by the LLM to site links (exact, normalized,
+token-prefix and edit-distance matching) and finds untagged mentions of
+linkable titles in a single pass
+"""
+
+import re
+import unicodedata
+from itertools import chain, combinations
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+from .keyword_matcher import AhoCorasick, _is_word_char
+
+# Words the model wraps around a label ("the LEGOLAS paper", "CV page")
+LEADING_STOPWORDS = {"the", "a", "an", "our", "his", "my"}
+TRAILING_GENERIC_WORDS = {
+    "paper", "papers", "publication", "article", "study", "project", "page", "section", "site", "website",
+    "논문", "프로젝트", "페이지", "연구",
+}
+
+# Everyday words; a title made only of these ("Be With You") is ordinary prose
+# unless written with the title's own capitalization
+COMMON_WORDS = set("""
+    a an the and or but of in on at to for from with by as into about over under up out
+    be is are was were been am do does did have has had will would can could should may might
+    i you he she it we they me him her us them my your his its our their this that these those
+    all any every each some no not more most other such only just also very
+    what who when where why how which there here now then so if than too
+    new one two first last good great best time way day life world home love hope dream together
+""".split())
+
+# Shortest mention accepted by prefix/fuzzy matching and auto-linking
+MIN_FUZZY_LENGTH = 4
+# Longer labels are only matched exactly, by normalized words or by prefix
+MAX_FUZZY_LENGTH = 40
+# Resolved labels remembered per resolver (the LLM reuses the same labels)
+MEMO_SIZE = 4096
+
+# Separators between a title's short name and its subtitle
+_SUBTITLE_PATTERN = re.compile(r"\s*(?::|\s[-–—]\s)\s*")
+_NON_WORD_PATTERN = re.compile(r"[^\w]+")
+_LINK_TAG_PATTERN = re.compile(r"<link>[^<]*</link>")
+
+# Marks a key shared by several links
+_AMBIGUOUS = object()
+
+
+def casefold_label(text: str) -> str:
+    """Case- and width-insensitive form of a label"""
+    return unicodedata.normalize("NFKC", text).casefold().strip()
+
+
+def label_tokens(text: str) -> List[str]:
+    """
+    Words of a label without punctuation and generic wrapper words
+
+    Args:
+        text: Label or mention
+
+    Returns:
+        Normalized word list ("The LEGOLAS paper" -> ["legolas"])
+    """
+    tokens = _NON_WORD_PATTERN.sub(" ", casefold_label(text).replace("&", " and ")).split()
+    while len(tokens) > 1 and tokens[0] in LEADING_STOPWORDS:
+        tokens.pop(0)
+    while len(tokens) > 1 and tokens[-1] in TRAILING_GENERIC_WORDS:
+        tokens.pop()
+    return tokens
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance, cut short once it exceeds limit
+
+    Returns:
+        Distance, or limit + 1 if it is larger than limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _deletions(text: str, max_distance: int) -> Set[str]:
+    """Every string obtained by deleting up to max_distance characters"""
+    if max_distance == 1:
+        return {text[:index] + text[index + 1:] for index in range(len(text))} if len(text) > 1 else set()
+    variants = set()
+    for count in range(1, min(max_distance, len(text) - 1) + 1):
+        for positions in combinations(range(len(text)), count):
+            skip = set(positions)
+            variants.add("".join(char for index, char in enumerate(text) if index not in skip))
+    return variants
+
+
+def _put(table: Dict[Any, Any], key: Any, link: Tuple[str, str]):
+    existing = table.get(key)
+    if existing is None:
+        table[key] = link
+    elif existing is not _AMBIGUOUS and existing != link:
+        table[key] = _AMBIGUOUS
+
+
+class LinkResolver:
+    """
+    Precomputed lookups from label text to site links
+
+    Lookups try, in order: case-folded label, normalized words (punctuation
+    and wrapper words like "the ... paper" removed, or a title's short name
+    before ":"), a prefix of a label's words, and labels within
+    max_distance edits (symmetric-deletion index). Every step is a hash
+    lookup, so cost does not grow with the number of links; keys shared by
+    several links resolve to nothing rather than to a guess.
+    """
+
+    def __init__(
+        self,
+        links: Sequence[Mapping[str, str]],
+        auto_link_labels: Optional[Iterable[str]] = None,
+        max_distance: int = 1
+    ):
+        """
+        Build the lookup tables
+
+        Args:
+            links: Site links with 'label' and 'href'
+            auto_link_labels: Labels whose untagged mentions are linked
+                (defaults to every label with an external href)
+            max_distance: Edit distance allowed for near-miss labels (0 disables)
+        """
+        self.max_distance = max_distance
+        self.link_count = len(links)
+        self._exact: Dict[str, Any] = {}
+        self._normalized: Dict[str, Any] = {}
+        self._prefixes: Dict[Tuple[str, ...], Any] = {}
+        self._fuzzy_keys: Dict[str, Any] = {}
+        self._fuzzy_deletions: Dict[str, Set[str]] = {}
+        self._memo: Dict[str, Tuple[str, Any]] = {}
+        self.stats: Dict[str, int] = {
+            "exact": 0, "normalized": 0, "prefix": 0, "fuzzy": 0, "unresolved": 0, "auto_linked": 0
+        }
+
+        for link in links:
+            entry = (link["label"], link["href"])
+            self._exact.setdefault(casefold_label(link["label"]), entry)
+            names = [link["label"]]
+            short_name = _SUBTITLE_PATTERN.split(link["label"].strip(), maxsplit=1)[0]
+            if short_name != link["label"].strip():
+                names.append(short_name)
+            for name in names:
+                tokens = label_tokens(name)
+                if not tokens:
+                    continue
+                key = " ".join(tokens)
+                _put(self._normalized, key, entry)
+                for end in range(1, len(tokens)):
+                    if len(" ".join(tokens[:end])) >= MIN_FUZZY_LENGTH:
+                        _put(self._prefixes, tuple(tokens[:end]), entry)
+                if max_distance and MIN_FUZZY_LENGTH <= len(key) <= MAX_FUZZY_LENGTH:
+                    _put(self._fuzzy_keys, key, entry)
+                    for variant in _deletions(key, max_distance):
+                        self._fuzzy_deletions.setdefault(variant, set()).add(key)
+
+        if auto_link_labels is None:
+            auto_link_labels = [link["label"] for link in links if link["href"].startswith("http")]
+        self._auto_links = AhoCorasick()
+        # Names made only of common words, matched with their own capitalization
+        self._cased_auto_links = AhoCorasick()
+        self.auto_link_count = 0
+        for label in auto_link_labels:
+            entry = self._exact.get(casefold_label(label))
+            if entry is None:
+                continue
+            short_name = _SUBTITLE_PATTERN.split(label.strip(), maxsplit=1)[0]
+            for name in {label.strip(), short_name}:
+                pattern = casefold_label(name)
+                tokens = label_tokens(name)
+                if len(pattern) < MIN_FUZZY_LENGTH or self._normalized.get(" ".join(tokens)) != entry:
+                    continue
+                if all(token in COMMON_WORDS for token in tokens):
+                    self._cased_auto_links.add(unicodedata.normalize("NFKC", name.strip()), entry)
+                else:
+                    self._auto_links.add(pattern, entry)
+                self.auto_link_count += 1
+        self._auto_links.build()
+        self._cased_auto_links.build()
+
+    def resolve(self, label: str) -> Optional[Tuple[str, str]]:
+        """
+        Find the link a label refers to
+
+        Args:
+            label: Label text as written by the LLM
+
+        Returns:
+            (canonical label, href), or None if no link matches unambiguously
+        """
+        method, entry = self._lookup(label)
+        if entry is None or entry is _AMBIGUOUS:
+            self.stats["unresolved"] += 1
+            return None
+        self.stats[method] += 1
+        return entry
+
+    def _lookup(self, label: str) -> Tuple[str, Any]:
+        found = self._memo.get(label)
+        if found is None:
+            found = self._match(label)
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[label] = found
+        return found
+
+    def _match(self, label: str) -> Tuple[str, Any]:
+        entry = self._exact.get(casefold_label(label))
+        if entry is not None:
+            return "exact", entry
+        tokens = label_tokens(label)
+        key = " ".join(tokens)
+        entry = self._normalized.get(key)
+        if entry is not None:
+            return "normalized", entry
+        entry = self._prefixes.get(tuple(tokens))
+        if entry is not None:
+            return "prefix", entry
+        if self.max_distance and MIN_FUZZY_LENGTH <= len(key) <= MAX_FUZZY_LENGTH + self.max_distance:
+            return "fuzzy", self._fuzzy_lookup(key)
+        return "unresolved", None
+
+    def _fuzzy_lookup(self, key: str) -> Any:
+        # Two strings within d edits share a variant with at most d deletions
+        # each; candidates are confirmed with the exact distance
+        variants = {key} | _deletions(key, self.max_distance)
+        candidates = set()
+        for variant in variants:
+            if variant in self._fuzzy_keys:
+                candidates.add(variant)
+            candidates.update(self._fuzzy_deletions.get(variant, ()))
+        entries = {
+            self._fuzzy_keys[candidate] for candidate in candidates
+            if edit_distance(key, candidate, self.max_distance) <= self.max_distance
+        }
+        if len(entries) == 1:
+            return entries.pop()
+        return _AMBIGUOUS if entries else None
+
+    def find_mentions(self, text: str, skip: Optional[Set[str]] = None) -> List[Tuple[int, int, str, str]]:
+        """
+        Find untagged mentions of auto-link titles
+
+        Text inside <link> tags is ignored. Only the first mention of each
+        link is returned, leftmost-longest when mentions overlap. Titles
+        are matched in any case, except names made only of common words
+        (see COMMON_WORDS), which must keep their capitalization.
+
+        Args:
+            text: Response text (raw, with <link> tags)
+            skip: Labels already linked earlier in the response; updated
+                with the labels found
+
+        Returns:
+            List of (start, end, label, href) in text order
+        """
+        if not self.auto_link_count:
+            return []
+        normalized = unicodedata.normalize("NFKC", text)
+        folded = normalized.casefold()
+        if len(folded) != len(text) or len(normalized) != len(text):
+            # Offsets would not line up with the original text
+            return []
+        skip = set() if skip is None else skip
+        tags = [(match.start(), match.end(), match.group(0)[6:-7]) for match in _LINK_TAG_PATTERN.finditer(text)]
+
+        candidates = sorted(
+            (start, -end, entry)
+            for start, end, entry in chain(
+                self._auto_links.iter_matches(folded), self._cased_auto_links.iter_matches(normalized)
+            )
+            if (start == 0 or not _is_word_char(folded[start - 1]))
+            and (end == len(folded) or not _is_word_char(folded[end]))
+            and not any(tag_start < end and start < tag_end for tag_start, tag_end, _ in tags)
+        )
+        mentions = []
+        last_end = 0
+        next_tag = 0
+        for start, negative_end, (label, href) in candidates:
+            # Links tagged before this mention count as already linked
+            while next_tag < len(tags) and tags[next_tag][0] < start:
+                self._skip_tag(tags[next_tag][2], skip)
+                next_tag += 1
+            end = -negative_end
+            if start < last_end or label in skip:
+                continue
+            skip.add(label)
+            mentions.append((start, end, label, href))
+            last_end = end
+        for _, _, tag_label in tags[next_tag:]:
+            self._skip_tag(tag_label, skip)
+        self.stats["auto_linked"] += len(mentions)
+        return mentions
+
+    def _skip_tag(self, tag_label: str, skip: Set[str]):
+        entry = self._lookup(tag_label.strip())[1]
+        if entry is not None and entry is not _AMBIGUOUS:
+            skip.add(entry[0])
+
+    def stream_cut(self, text: str, limit: int) -> int:
+        """
+        Last position up to which text can be linked without seeing more
+
+        A cut is safe after a non-word character that no auto-link title
+        occurrence can span, outside complete <link> tags.
+
+        Args:
+            text: Buffered streamed text
+            limit: Upper bound (e.g. start of an unfinished tag)
+
+        Returns:
+            Cut position <= limit
+        """
+        if not self.auto_link_count or limit <= 0:
+            return limit
+        normalized = unicodedata.normalize("NFKC", text[:limit])
+        folded = normalized.casefold()
+        if len(folded) != limit or len(normalized) != limit:
+            return limit
+        inside_tag = bytearray(limit + 1)
+        for match in _LINK_TAG_PATTERN.finditer(text, 0, limit):
+            for position in range(match.start() + 1, match.end()):
+                inside_tag[position] = 1
+        lengths = [
+            max(folded_length, cased_length) for folded_length, cased_length in zip(
+                self._auto_links.partial_lengths(folded), self._cased_auto_links.partial_lengths(normalized)
+            )
+        ]
+        for position in range(limit, 0, -1):
+            if not inside_tag[position] and lengths[position - 1] == 0 and not _is_word_char(folded[position - 1]):
+                return position
+        return 0
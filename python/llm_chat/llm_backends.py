@@ -0,0 +1,442 @@
+"""
+LLM Backends Module
+Pluggable LLM backends and the process-wide model registry that shares
+their clients, connection pools and the blocking-call executor
+"""
+
+import asyncio
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+from .config import Config, config
+
+# google.generativeai and langchain_google_genai are imported on first use:
+# they take most of a cold start, and many callers never need them
+
+
+class LLMBackend(ABC):
+    """
+    Builds the LLM clients handed out by ModelRegistry
+
+    A backend provides a LangChain chat model (used by ConversationChain and
+    summaries) and a google.generativeai-compatible model (generate_content,
+    generate_content_async with .text results) per configuration.
+    """
+
+    name = "base"
+
+    @property
+    def available(self) -> bool:
+        """Whether the backend can serve calls (e.g. an API key is set)"""
+        return True
+
+    @abstractmethod
+    def create_chat_model(self, registry: "ModelRegistry", model: str, temperature: Optional[float], max_tokens: Optional[int]):
+        """Build a LangChain chat model"""
+
+    @abstractmethod
+    def create_generative_model(self, registry: "ModelRegistry", model: str, temperature: Optional[float], max_tokens: Optional[int]):
+        """Build a google.generativeai-compatible model"""
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Backend metrics"""
+        return {}
+
+
+class GeminiBackend(LLMBackend):
+    """Gemini clients that share the registry's pooled GenerativeService clients"""
+
+    name = "gemini"
+
+    def __init__(self, settings: Config):
+        self.settings = settings
+
+    @property
+    def available(self) -> bool:
+        return bool(self.settings.gemini_api_key)
+
+    def create_chat_model(self, registry, model, temperature, max_tokens):
+        chat_model = _pooled_chat_model_class()(
+            model=model,
+            google_api_key=self.settings.gemini_api_key,
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+            transport=self.settings.llm_transport,
+            client_options=registry.client_options(),
+        )
+        # Drop the client the constructor built; calls go through the shared one
+        chat_model.client = registry.generative_client()
+        return chat_model
+
+    def create_generative_model(self, registry, model, temperature, max_tokens):
+        generation_config = {}
+        if temperature is not None:
+            generation_config["temperature"] = temperature
+        if max_tokens is not None:
+            generation_config["max_output_tokens"] = max_tokens
+        generative_model = _pooled_generative_model_class()(
+            model, generation_config=generation_config or None
+        )
+        generative_model.registry = registry
+        return generative_model
+
+
+def _create_backend(settings: Config) -> LLMBackend:
+    """Backend selected by CHAT_LLM_BACKEND"""
+    if settings.llm_backend == "fake":
+        from .fake_llm import FakeLLMBackend
+        return FakeLLMBackend.from_config(settings)
+    if settings.llm_backend != "gemini":
+        print(f"Warning: Unknown LLM backend '{settings.llm_backend}', using gemini")
+    return GeminiBackend(settings)
+
+
+class ModelRegistry:
+    """
+    Process-wide LLM clients
+
+    Every (model, temperature, max_tokens) combination is built once, and
+    all of them (LangChain chat models and google.generativeai models
+    alike) send requests through one shared GenerativeService client, so
+    keep-alive connections are reused across sessions and calls instead of
+    each client opening its own. Async clients are bound to an event loop,
+    so there is one per running loop; they always use gRPC (with the rest
+    transport, LangChain's async calls run the sync client in an executor).
+    The models themselves come from a pluggable LLMBackend.
+    """
+
+    def __init__(self, settings: Config, backend: Optional[LLMBackend] = None):
+        """
+        Initialize the registry (clients are created on first use)
+
+        Args:
+            settings: Configuration with API key and transport settings
+            backend: LLM backend (defaults to the one selected by CHAT_LLM_BACKEND)
+        """
+        self.settings = settings
+        self.backend = backend or _create_backend(settings)
+        self._lock = threading.RLock()
+        self._chat_models: Dict[Tuple[str, Optional[float], Optional[int]], Any] = {}
+        self._generative_models: Dict[Tuple[str, Optional[float], Optional[int]], Any] = {}
+        self._client = None
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._adapters = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.lookups = 0
+        self.hits = 0
+        self.clients_created = 0
+
+    def set_backend(self, backend: LLMBackend):
+        """
+        Replace the LLM backend; models built by the previous one are dropped
+
+        Args:
+            backend: New LLM backend
+        """
+        with self._lock:
+            self.backend = backend
+            self._chat_models.clear()
+            self._generative_models.clear()
+
+    @property
+    def available(self) -> bool:
+        """Whether the backend can serve calls"""
+        return self.backend.available
+
+    def client_options(self) -> Dict[str, str]:
+        """API key and endpoint options for GenerativeService clients"""
+        options = {"api_key": self.settings.gemini_api_key or "unset"}
+        if self.settings.llm_api_endpoint:
+            options["api_endpoint"] = self.settings.llm_api_endpoint
+        return options
+
+    def _channel_options(self):
+        keepalive_ms = self.settings.llm_keepalive_seconds * 1000
+        return [
+            ("grpc.keepalive_time_ms", keepalive_ms),
+            ("grpc.keepalive_timeout_ms", 10000),
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.max_pings_without_data", 0),
+        ] if keepalive_ms > 0 else []
+
+    def _transport(self, asynchronous: bool):
+        """Transport factory with the shared pool/keepalive settings"""
+        from google.ai.generativelanguage_v1beta.services.generative_service import transports
+
+        if self.settings.llm_transport == "rest" and not asynchronous:
+            from requests.adapters import HTTPAdapter
+
+            def rest_transport(**kwargs):
+                transport = transports.GenerativeServiceRestTransport(**kwargs)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.settings.llm_pool_size)
+                transport._session.mount("https://", adapter)
+                transport._session.mount("http://", adapter)
+                self._adapters.append(adapter)
+                return transport
+            return rest_transport
+
+        # Async calls always use gRPC (asyncio)
+        transport_class = (
+            transports.GenerativeServiceGrpcAsyncIOTransport if asynchronous else transports.GenerativeServiceGrpcTransport
+        )
+        extra_options = self._channel_options()
+
+        def create_channel(*args, options=(), **kwargs):
+            return transport_class.create_channel(*args, options=list(options) + extra_options, **kwargs)
+
+        def grpc_transport(**kwargs):
+            return transport_class(channel=create_channel, **kwargs)
+        return grpc_transport
+
+    def generative_client(self):
+        """Shared synchronous GenerativeService client"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from google.ai.generativelanguage_v1beta import GenerativeServiceClient
+                    self._client = GenerativeServiceClient(
+                        transport=self._transport(asynchronous=False),
+                        client_options=self.client_options()
+                    )
+                    self.clients_created += 1
+        return self._client
+
+    def generative_async_client(self):
+        """
+        Shared asynchronous GenerativeService client of the running event loop
+
+        Returns:
+            Client, or None outside an event loop
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        client = self._async_clients.get(loop)
+        if client is None:
+            with self._lock:
+                client = self._async_clients.get(loop)
+                if client is None:
+                    from google.ai.generativelanguage_v1beta import GenerativeServiceAsyncClient
+                    client = GenerativeServiceAsyncClient(
+                        transport=self._transport(asynchronous=True),
+                        client_options=self.client_options()
+                    )
+                    self._async_clients[loop] = client
+                    self.clients_created += 1
+        return client
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Bounded thread pool for blocking LLM calls"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.settings.llm_executor_workers, thread_name_prefix="llm"
+                    )
+        return self._executor
+
+    async def run_blocking(self, function: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking call on the LLM executor without blocking the event loop
+
+        Args:
+            function: Callable to run
+            *args, **kwargs: Its arguments
+
+        Returns:
+            The call's result
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, lambda: function(*args, **kwargs))
+
+    async def iterate_blocking(self, iterator) -> AsyncIterator[Any]:
+        """
+        Consume a blocking iterator (e.g. a streamed response) on the LLM executor
+
+        Args:
+            iterator: Iterator whose next() may block
+
+        Yields:
+            Its items
+        """
+        done = object()
+        while True:
+            item = await self.run_blocking(next, iterator, done)
+            if item is done:
+                return
+            yield item
+
+    def get_chat_model(self, model: str, temperature: Optional[float] = 0.7, max_tokens: Optional[int] = None):
+        """
+        Get the shared LangChain chat model for a configuration
+
+        Args:
+            model: Gemini model name
+            temperature: Sampling temperature
+            max_tokens: Maximum output tokens (None for the model default)
+
+        Returns:
+            ChatGoogleGenerativeAI using the shared clients (or the
+            backend's equivalent)
+        """
+        key = (model, temperature, max_tokens)
+        with self._lock:
+            self.lookups += 1
+            chat_model = self._chat_models.get(key)
+            if chat_model is not None:
+                self.hits += 1
+                return chat_model
+            chat_model = self.backend.create_chat_model(self, model, temperature, max_tokens)
+            self._chat_models[key] = chat_model
+            return chat_model
+
+    def get_generative_model(self, model: str, temperature: Optional[float] = None, max_tokens: Optional[int] = None):
+        """
+        Get the shared google.generativeai model for a configuration
+
+        Args:
+            model: Gemini model name
+            temperature: Sampling temperature (None for the model default)
+            max_tokens: Maximum output tokens (None for the model default)
+
+        Returns:
+            GenerativeModel using the shared clients (or the backend's equivalent)
+        """
+        key = (model, temperature, max_tokens)
+        with self._lock:
+            self.lookups += 1
+            generative_model = self._generative_models.get(key)
+            if generative_model is not None:
+                self.hits += 1
+                return generative_model
+            generative_model = self.backend.create_generative_model(self, model, temperature, max_tokens)
+            self._generative_models[key] = generative_model
+            return generative_model
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get client pool statistics
+
+        Returns:
+            Dictionary with backend, transport settings, model and client
+            counts, lookups/hits and, for the rest transport, pooled
+            connections opened and requests sent over them
+        """
+        stats = {
+            "backend": self.backend.name,
+            "transport": self.settings.llm_transport,
+            "pool_size": self.settings.llm_pool_size,
+            "keepalive_seconds": self.settings.llm_keepalive_seconds,
+            "chat_models": len(self._chat_models),
+            "generative_models": len(self._generative_models),
+            "clients_created": self.clients_created,
+            "async_clients": len(self._async_clients),
+            "executor_workers": self.settings.llm_executor_workers,
+            "lookups": self.lookups,
+            "hits": self.hits,
+        }
+        if self._adapters:
+            pools = [
+                adapter.poolmanager.pools[key] for adapter in self._adapters for key in adapter.poolmanager.pools.keys()
+            ]
+            stats["connections_opened"] = sum(pool.num_connections for pool in pools)
+            stats["requests"] = sum(pool.num_requests for pool in pools)
+        backend_stats = self.backend.get_stats()
+        if backend_stats:
+            stats["backend_stats"] = backend_stats
+        return stats
+
+
+_pooled_classes: Dict[str, type] = {}
+
+
+def _pooled_chat_model_class() -> type:
+    """ChatGoogleGenerativeAI whose async client is the registry's (imported on first use)"""
+    if "chat" not in _pooled_classes:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        class PooledChatGoogleGenerativeAI(ChatGoogleGenerativeAI):
+            @property
+            def async_client(self):
+                registry = get_model_registry()
+                if registry.settings.llm_transport == "rest":
+                    return None
+                return registry.generative_async_client()
+
+            async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+                registry = get_model_registry()
+                if registry.settings.llm_transport != "rest":
+                    return await super()._agenerate(messages, stop, run_manager, **kwargs)
+                # Sync client on the bounded LLM executor instead of the loop's default one
+                sync_manager = run_manager.get_sync() if run_manager else None
+                return await registry.run_blocking(self._generate, messages, stop, sync_manager, **kwargs)
+
+            async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+                registry = get_model_registry()
+                if registry.settings.llm_transport != "rest":
+                    async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+                        yield chunk
+                    return
+                sync_manager = run_manager.get_sync() if run_manager else None
+                iterator = await registry.run_blocking(self._stream, messages, stop, sync_manager, **kwargs)
+                async for chunk in registry.iterate_blocking(iterator):
+                    yield chunk
+
+        _pooled_classes["chat"] = PooledChatGoogleGenerativeAI
+    return _pooled_classes["chat"]
+
+
+def _pooled_generative_model_class() -> type:
+    """GenerativeModel that sends requests through the registry's clients"""
+    if "generative" not in _pooled_classes:
+        import google.generativeai as genai
+
+        # Default client for any direct google.generativeai use
+        if config.gemini_api_key:
+            genai.configure(api_key=config.gemini_api_key)
+
+        class PooledGenerativeModel(genai.GenerativeModel):
+            registry: Optional[ModelRegistry] = None
+
+            @property
+            def _client(self):
+                return (self.registry or get_model_registry()).generative_client()
+
+            @_client.setter
+            def _client(self, value):
+                pass
+
+            @property
+            def _async_client(self):
+                return (self.registry or get_model_registry()).generative_async_client()
+
+            @_async_client.setter
+            def _async_client(self, value):
+                pass
+
+            async def generate_content_async(self, contents, *, stream: bool = False, **kwargs):
+                registry = self.registry or get_model_registry()
+                if registry.settings.llm_transport != "rest":
+                    return await super().generate_content_async(contents, stream=stream, **kwargs)
+                # Async gRPC cannot reach a rest-only endpoint; run the pooled sync client
+                response = await registry.run_blocking(self.generate_content, contents, stream=stream, **kwargs)
+                return registry.iterate_blocking(iter(response)) if stream else response
+
+        _pooled_classes["generative"] = PooledGenerativeModel
+    return _pooled_classes["generative"]
+
+
+# Global model registry
+_model_registry = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get or create global model registry instance"""
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = ModelRegistry(config)
+    return _model_registry
@@ -0,0 +1,442 @@
+"""
+LLM Scheduler Module
+Outbound scheduler for Gemini calls: per-model request (RPM) and estimated
+token (TPM) buckets, a priority queue that serves user-facing generation
+first, and jittered exponential backoff on quota errors (HTTP 429)
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+from .config import config
+
+T = TypeVar("T")
+
+# Wait times kept per priority for percentiles
+WAIT_SAMPLE_SIZE = 512
+
+
+class Priority(IntEnum):
+    """Queue priority of an LLM call (lower is served first)"""
+
+    GENERATION = 0
+    RELEVANCE = 1
+    BACKGROUND = 2
+
+
+class QuotaExceededError(Exception):
+    """An LLM call kept hitting quota limits after every retry"""
+
+    def __init__(self, model: str, attempts: int, error: Optional[BaseException] = None):
+        super().__init__(f"Quota exceeded for {model} after {attempts} attempts: {error}")
+        self.model = model
+        self.attempts = attempts
+        self.error = error
+
+
+def is_quota_error(error: BaseException) -> bool:
+    """
+    Whether an exception is a rate-limit/quota rejection
+
+    Matches google.api_core's ResourceExhausted and TooManyRequests (both
+    HTTP 429) without importing google.api_core.
+    """
+    code = getattr(error, "code", None)
+    if code == 429 or getattr(code, "value", None) == 429:
+        return True
+    return type(error).__name__ in ("ResourceExhausted", "TooManyRequests")
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """
+    Parse per-model limits ("model=rpm/tpm,model=rpm/tpm")
+
+    A missing or zero value means no limit; "*" sets the default for
+    models that are not listed.
+
+    Args:
+        spec: Limit specification, e.g. "gemini-2.5-flash=10/250000,*=30/0"
+
+    Returns:
+        Dictionary of model -> (requests per minute, tokens per minute)
+    """
+    limits = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        model, values = item.split("=", 1)
+        rpm, _, tpm = values.partition("/")
+        try:
+            limits[model.strip()] = (float(rpm or 0), float(tpm or 0))
+        except ValueError:
+            print(f"Warning: Ignoring invalid rate limit '{item.strip()}'")
+    return limits
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at rate_per_minute
+
+    Holds at most one minute of tokens, so a burst can use a full minute's
+    quota at once, as Gemini's per-minute limits allow.
+    """
+
+    def __init__(self, rate_per_minute: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize a full bucket
+
+        Args:
+            rate_per_minute: Refill rate and capacity
+            clock: Monotonic clock in seconds
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = rate_per_minute
+        self.clock = clock
+        self.tokens = rate_per_minute
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount tokens are available (0 if they are now)"""
+        self._refill()
+        # Larger requests than the capacity wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        """Remove tokens (call after wait_time returned 0)"""
+        self.tokens -= min(amount, self.capacity)
+
+
+class QuotaLimiter:
+    """
+    Interface of a quota limiter used by LLMScheduler
+
+    Implementations decide whether a call may start now; a fake limiter
+    can replace TokenBucketLimiter to drive the scheduler in tests.
+    """
+
+    def acquire(self, model: str, tokens: int) -> float:
+        """
+        Reserve quota for one call
+
+        Args:
+            model: Model name
+            tokens: Estimated prompt tokens
+
+        Returns:
+            0 if the quota was taken, otherwise seconds to wait before asking again
+        """
+        raise NotImplementedError
+
+    def penalize(self, model: str, seconds: float):
+        """Stop granting calls to a model for about seconds (after a 429)"""
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Limiter metrics"""
+        return {}
+
+
+class TokenBucketLimiter(QuotaLimiter):
+    """
+    Per-model RPM and TPM token buckets
+
+    Models without limits are only held back after a quota error.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Tuple[float, float]],
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the limiter
+
+        Args:
+            limits: Model -> (RPM, TPM); "*" applies to unlisted models,
+                and 0 disables a bucket
+            clock: Monotonic clock in seconds
+        """
+        self.limits = limits
+        self.clock = clock
+        self._buckets: Dict[str, Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self._blocked_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _model_buckets(self, model: str) -> Tuple[Optional[TokenBucket], Optional[TokenBucket]]:
+        buckets = self._buckets.get(model)
+        if buckets is None:
+            rpm, tpm = self.limits.get(model, self.limits.get("*", (0, 0)))
+            buckets = (
+                TokenBucket(rpm, self.clock) if rpm > 0 else None,
+                TokenBucket(tpm, self.clock) if tpm > 0 else None,
+            )
+            self._buckets[model] = buckets
+        return buckets
+
+    def acquire(self, model: str, tokens: int) -> float:
+        with self._lock:
+            requests, token_bucket = self._model_buckets(model)
+            wait = max(
+                self._blocked_until.get(model, 0.0) - self.clock(),
+                requests.wait_time(1) if requests else 0.0,
+                token_bucket.wait_time(tokens) if token_bucket else 0.0,
+            )
+            if wait > 0:
+                return wait
+            if requests:
+                requests.take(1)
+            if token_bucket:
+                token_bucket.take(tokens)
+            return 0.0
+
+    def penalize(self, model: str, seconds: float):
+        with self._lock:
+            self._blocked_until[model] = max(self._blocked_until.get(model, 0.0), self.clock() + seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = self.clock()
+            return {
+                model: {
+                    "requests_available": round(requests.tokens, 2) if requests else None,
+                    "tokens_available": round(token_bucket.tokens) if token_bucket else None,
+                    "blocked_seconds": round(max(self._blocked_until.get(model, 0.0) - now, 0.0), 3),
+                }
+                for model, (requests, token_bucket) in self._buckets.items()
+            }
+
+
+class _Waiter:
+    __slots__ = ("priority", "sequence", "tokens", "future", "enqueued")
+
+    def __init__(self, priority: int, sequence: int, tokens: int, future: "asyncio.Future", enqueued: float):
+        self.priority = priority
+        self.sequence = sequence
+        self.tokens = tokens
+        self.future = future
+        self.enqueued = enqueued
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+class LLMScheduler:
+    """
+    Admits LLM calls in priority order within the quota of each model
+
+    Calls wait in a per-model priority queue: user-facing generation is
+    served before relevance checks, and both before background work
+    (summaries, rejection messages). A call starts once the limiter grants
+    quota; one rejected with a quota error drains that model's buckets and
+    is retried with jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        limiter: Optional[QuotaLimiter] = None,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        jitter: Callable[[float, float], float] = random.uniform
+    ):
+        """
+        Initialize the scheduler
+
+        Args:
+            limiter: Quota limiter (None admits every call at once)
+            max_retries: Retries of a call after quota errors
+            backoff_base: First backoff cap in seconds (doubles per retry)
+            backoff_max: Largest backoff cap in seconds
+            clock: Monotonic clock in seconds (wait-time metrics)
+            sleep: Coroutine function used for backoff sleeps
+            jitter: Function (low, high) -> delay; full jitter by default
+        """
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self.sleep = sleep
+        self.jitter = jitter
+        self._queues: Dict[str, List[_Waiter]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._waits: Dict[int, Deque[float]] = {priority: deque(maxlen=WAIT_SAMPLE_SIZE) for priority in Priority}
+        self.calls = 0
+        self.retries = 0
+        self.quota_errors = 0
+        self.failures = 0
+
+    async def acquire(self, model: str, priority: int = Priority.GENERATION, tokens: int = 0):
+        """
+        Wait until a call to model may start
+
+        Args:
+            model: Model name
+            priority: Priority of the call
+            tokens: Estimated prompt tokens
+        """
+        started = self.clock()
+        if self.limiter is None:
+            self._record_wait(priority, 0.0)
+            return
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, next(self._sequence), tokens, loop.create_future(), started)
+        with self._lock:
+            heapq.heappush(self._queues.setdefault(model, []), waiter)
+        self._pump(model)
+        # A cancelled waiter is skipped by the next pump
+        await waiter.future
+
+    def _pump(self, model: str):
+        """Grant queued calls in priority order while the limiter allows"""
+        with self._lock:
+            queue = self._queues.get(model, [])
+            while queue:
+                waiter = queue[0]
+                if waiter.future.done():
+                    heapq.heappop(queue)
+                    continue
+                wait = self.limiter.acquire(model, waiter.tokens)
+                if wait > 0:
+                    self._schedule_pump(model, waiter.future.get_loop(), wait)
+                    return
+                heapq.heappop(queue)
+                self._record_wait(waiter.priority, self.clock() - waiter.enqueued)
+                loop = waiter.future.get_loop()
+                loop.call_soon_threadsafe(_grant, waiter.future)
+
+    def _schedule_pump(self, model: str, loop: asyncio.AbstractEventLoop, delay: float):
+        timer = self._timers.get(model)
+        if timer is not None and timer.when() <= loop.time() + delay:
+            return
+        if timer is not None:
+            timer.cancel()
+        self._timers[model] = loop.call_later(delay, self._on_timer, model)
+
+    def _on_timer(self, model: str):
+        self._timers.pop(model, None)
+        self._pump(model)
+
+    def _record_wait(self, priority: int, seconds: float):
+        self._waits[Priority(priority)].append(seconds)
+
+    async def submit(
+        self,
+        model: str,
+        call: Callable[[], Awaitable[T]],
+        priority: int = Priority.GENERATION,
+        tokens: int = 0
+    ) -> T:
+        """
+        Run an LLM call within quota, retrying quota errors
+
+        Args:
+            model: Model name
+            call: Zero-argument function returning the call's awaitable
+                (called again for every retry)
+            priority: Priority of the call
+            tokens: Estimated prompt tokens
+
+        Returns:
+            Result of the call
+
+        Raises:
+            QuotaExceededError: If the call still hit quota limits after max_retries retries
+        """
+        attempt = 0
+        while True:
+            await self.acquire(model, priority, tokens)
+            self.calls += 1
+            try:
+                return await call()
+            except Exception as error:
+                if not is_quota_error(error):
+                    raise
+                self.quota_errors += 1
+                if attempt >= self.max_retries:
+                    self.failures += 1
+                    raise QuotaExceededError(model, attempt + 1, error) from error
+                delay = self.jitter(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if self.limiter is not None:
+                    # The server says this model is out of quota; hold every queued call back
+                    self.limiter.penalize(model, delay)
+                attempt += 1
+                self.retries += 1
+                await self.sleep(delay)
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Queued calls per priority name"""
+        depths = {priority.name.lower(): 0 for priority in Priority}
+        with self._lock:
+            for queue in self._queues.values():
+                for waiter in queue:
+                    if not waiter.future.done():
+                        depths[Priority(waiter.priority).name.lower()] += 1
+        return depths
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler metrics
+
+        Returns:
+            Dictionary with calls, retries, quota_errors, failures, queued
+            calls per priority, wait times per priority (count, mean, p95
+            and max over recent calls, in ms) and limiter state
+        """
+        waits = {}
+        for priority, samples in self._waits.items():
+            ordered = sorted(samples)
+            waits[priority.name.lower()] = {
+                "count": len(ordered),
+                "mean_ms": sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+                "p95_ms": ordered[int(0.95 * (len(ordered) - 1))] * 1000 if ordered else 0.0,
+                "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+            }
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "quota_errors": self.quota_errors,
+            "failures": self.failures,
+            "queued": self.queue_depths(),
+            "wait": waits,
+            "limits": self.limiter.get_stats() if self.limiter else {},
+        }
+
+
+def _grant(future: "asyncio.Future"):
+    if not future.done():
+        future.set_result(None)
+
+
+# Global instance
+_llm_scheduler = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Get or create global LLM scheduler instance"""
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        _llm_scheduler = LLMScheduler(
+            limiter=TokenBucketLimiter(parse_rate_limits(config.llm_rate_limits)),
+            max_retries=config.llm_max_retries,
+            backoff_base=config.llm_backoff_base_seconds,
+            backoff_max=config.llm_backoff_max_seconds
+        )
+    return _llm_scheduler
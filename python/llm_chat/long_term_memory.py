@@ -3,24 +3,91 @@ Long-term Memory Module
 Manages static profile information (education, publications, projects, etc.)
 """
 
+import hashlib
 import json
 import os
-from typing import Dict, Any, List
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Sequence, Tuple
 from pathlib import Path
+from .config import config
+from .link_resolver import LinkResolver
+from .profile_index import ProfileIndex
+from .profile_views import ProfileViews
+
+
+class ProfileSnapshot:
+    """
+    Immutable view of one version of the profile data
+
+    Everything derived from the data (LLM context, site links and their
+    rendered form, label lookup and resolver, search index, structured
+    views) is built once per version and shared by reference; treat all
+    fields as read-only.
+    """
+
+    __slots__ = (
+        "data", "version", "context", "site_links", "site_links_text", "link_map", "link_resolver", "index",
+        "views", "mtime_ns", "loaded_at"
+    )
+
+    def __init__(self, data: Dict[str, Any], context: str, site_links: Tuple[Mapping[str, str], ...], mtime_ns: int = 0):
+        """
+        Build the snapshot
+
+        Args:
+            data: Parsed profile data
+            context: Formatted profile context for LLM prompts
+            site_links: Site links (label/href mappings)
+            mtime_ns: Modification time of the source file
+        """
+        serialized = json.dumps(data, sort_keys=True, ensure_ascii=False)
+        self.data = data
+        # Version of the profile content, used to invalidate derived caches
+        self.version = hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:16]
+        self.context = context
+        self.site_links = site_links
+        self.site_links_text = render_site_links(site_links)
+        self.link_map: Mapping[str, str] = MappingProxyType({link["label"]: link["href"] for link in site_links})
+        self.link_resolver = LinkResolver(site_links, max_distance=config.link_fuzzy_max_distance)
+        self.index = ProfileIndex(data)
+        self.views = ProfileViews(data)
+        self.mtime_ns = mtime_ns
+        self.loaded_at = time.time()
+
+
+def render_site_links(site_links: Sequence[Mapping[str, str]]) -> str:
+    """
+    Render site links as prompt lines ("- label: href")
+
+    Args:
+        site_links: Links with 'label' and 'href'
+
+    Returns:
+        One line per link
+    """
+    return "\n".join(f"- {link['label']}: {link['href']}" for link in site_links)
 
 
 class LongTermMemory:
     """
     Long-term memory stores all static profile information
-    This data is loaded once and remains constant throughout the session
+
+    The data is held in an immutable ProfileSnapshot. The source file's
+    mtime is checked at most every reload_interval seconds, and a changed
+    file is loaded into a new snapshot that replaces the old one
+    atomically, so edits to profile_data.json apply without a restart.
     """
 
-    def __init__(self, data_path: str = None):
+    def __init__(self, data_path: str = None, reload_interval: Optional[float] = None):
         """
         Initialize long-term memory
 
         Args:
             data_path: Path to profile data JSON file
+            reload_interval: Seconds between file change checks
+                (defaults to CHAT_PROFILE_RELOAD_INTERVAL; 0 disables reloading)
         """
         if data_path is None:
             # Default path relative to this file
@@ -28,21 +95,92 @@ class LongTermMemory:
             data_path = current_dir.parent / "data" / "profile_data.json"
 
         self.data_path = data_path
-        self.data: Dict[str, Any] = {}
-        self._load_data()
+        self.reload_interval = config.profile_reload_interval_seconds if reload_interval is None else reload_interval
+        self.reloads = 0
+        self._reload_lock = threading.Lock()
+        self._next_check = time.monotonic() + self.reload_interval
+        self._checked_mtime_ns = self._mtime_ns()
+        self._snapshot = self._build_snapshot(self._load_data() or {}, self._checked_mtime_ns)
+
+    def _mtime_ns(self) -> int:
+        try:
+            return os.stat(self.data_path).st_mtime_ns
+        except OSError:
+            return 0
 
-    def _load_data(self):
-        """Load profile data from JSON file"""
+    def _load_data(self) -> Optional[Dict[str, Any]]:
+        """Load profile data from JSON file (None if it cannot be read)"""
         try:
             with open(self.data_path, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
-            print(f"Long-term memory loaded: {len(self.data)} categories")
+                data = json.load(f)
+            print(f"Long-term memory loaded: {len(data)} categories")
+            return data
         except FileNotFoundError:
             print(f"Warning: Profile data file not found at {self.data_path}")
-            self.data = {}
         except json.JSONDecodeError as e:
             print(f"Error parsing profile data JSON: {e}")
-            self.data = {}
+        return None
+
+    def _build_snapshot(self, data: Dict[str, Any], mtime_ns: int = 0) -> ProfileSnapshot:
+        return ProfileSnapshot(
+            data,
+            self._format_context(data),
+            tuple(MappingProxyType(link) for link in self._collect_site_links(data)),
+            mtime_ns
+        )
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the data file if its mtime changed
+
+        A file that fails to parse keeps the current snapshot.
+
+        Returns:
+            True if a new snapshot was installed
+        """
+        with self._reload_lock:
+            mtime_ns = self._mtime_ns()
+            if mtime_ns == self._checked_mtime_ns:
+                return False
+            self._checked_mtime_ns = mtime_ns
+            data = self._load_data()
+            if data is None:
+                # Keep serving the last good version; retry after the next change
+                return False
+            snapshot = self._build_snapshot(data, mtime_ns)
+            if snapshot.version != self._snapshot.version:
+                self.reloads += 1
+                print(f"Long-term memory reloaded: version {self._snapshot.version} -> {snapshot.version}")
+            self._snapshot = snapshot
+            return True
+
+    def snapshot(self) -> ProfileSnapshot:
+        """
+        Get the current snapshot (checking the file at most every reload_interval)
+
+        Returns:
+            ProfileSnapshot shared by all readers
+        """
+        if self.reload_interval and time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.reload_interval
+            self.reload_if_changed()
+        return self._snapshot
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Profile data of the current snapshot (read-only)"""
+        return self.snapshot().data
+
+    @data.setter
+    def data(self, value: Dict[str, Any]):
+        # Replace the data in memory (e.g. synthetic profiles in benchmarks)
+        self.reload_interval = 0
+        self._snapshot = self._build_snapshot(value)
+
+    @property
+    def content_hash(self) -> str:
+        """Version of the current profile content"""
+        return self.snapshot().version
 
     def get_all(self) -> Dict[str, Any]:
         """Get all profile data"""
@@ -80,31 +218,45 @@ class LongTermMemory:
         """
         Search profile data for relevant information
 
+        Every word of the query must match (as a word prefix) somewhere in
+        an item; see search_ranked() for scores and query options. Unlike
+        the earlier substring scan of the serialized item, word order does
+        not matter, mid-word fragments and links do not match, and items
+        come best match first rather than in profile order.
+
         Args:
             query: Search query string
 
         Returns:
-            Dictionary with matching items from each category
+            Dictionary with matching items from each category, best match first
         """
-        query_lower = query.lower()
         results = {}
+        for hit in self.search_ranked(query, prefix=True):
+            results.setdefault(hit["category"], []).append(hit["item"])
+        return results
 
-        # Search in each category
-        for category, items in self.data.items():
-            if not isinstance(items, list):
-                continue
-
-            matching_items = []
-            for item in items:
-                # Convert item to string for searching
-                item_str = json.dumps(item, ensure_ascii=False).lower()
-                if query_lower in item_str:
-                    matching_items.append(item)
+    def search_ranked(
+        self,
+        query: str,
+        mode: str = "and",
+        prefix: bool = False,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search the snapshot's inverted index
 
-            if matching_items:
-                results[category] = matching_items
+        Args:
+            query: Search query; "A OR B" / "A | B" matches either side and
+                a trailing "*" makes a word a prefix
+            mode: Combine words with "and" (default) or "or"
+            prefix: Match every word as a prefix
+            limit: Maximum number of hits
 
-        return results
+        Returns:
+            Hits sorted by score, each with category, item, score and
+            matched_fields (titles weigh more than descriptions)
+        """
+        return self.snapshot().index.search(query, mode=mode, prefix=prefix, limit=limit)
 
     def get_context_for_llm(self) -> str:
         """
@@ -112,27 +264,33 @@ class LongTermMemory:
 
         Returns:
             Formatted string containing all profile information
+            (built once per data version)
         """
+        return self.snapshot().context
+
+    @staticmethod
+    def _format_context(data: Dict[str, Any]) -> str:
+        """Format profile data as the LLM context string"""
         sections = []
 
         # Education
-        if self.data.get('education'):
+        if data.get('education'):
             sections.append("## Education")
-            for edu in self.data['education']:
+            for edu in data['education']:
                 sections.append(f"- {edu.get('degree', '')} at {edu.get('school', '')} ({edu.get('time', '')})")
                 if edu.get('description'):
                     sections.append(f"  {edu['description']}")
 
         # Skills
-        if self.data.get('skills'):
+        if data.get('skills'):
             sections.append("\n## Skills")
-            for skill in self.data['skills']:
+            for skill in data['skills']:
                 sections.append(f"- {skill.get('title', '')}: {skill.get('description', '')}")
 
         # Publications
-        if self.data.get('publications'):
+        if data.get('publications'):
             sections.append("\n## Publications")
-            for pub in self.data['publications']:
+            for pub in data['publications']:
                 sections.append(f"- {pub.get('title', '')} ({pub.get('time', '')})")
                 sections.append(f"  Authors: {pub.get('authors', '')}")
                 sections.append(f"  Journal: {pub.get('journal', '')}")
@@ -140,36 +298,58 @@ class LongTermMemory:
                     sections.append(f"  Abstract: {pub['abstract'][:200]}...")
 
         # Experiences
-        if self.data.get('experiences'):
+        if data.get('experiences'):
             sections.append("\n## Work Experiences")
-            for exp in self.data['experiences']:
+            for exp in data['experiences']:
                 sections.append(f"- {exp.get('title', '')} at {exp.get('company', '')} ({exp.get('time', '')})")
                 if exp.get('description'):
                     sections.append(f"  {exp['description'][:200]}...")
 
         # Projects
-        if self.data.get('projects'):
+        if data.get('projects'):
             sections.append("\n## Projects")
-            for proj in self.data['projects']:
+            for proj in data['projects']:
                 sections.append(f"- {proj.get('title', '')} ({proj.get('time', '')})")
                 if proj.get('description'):
                     sections.append(f"  {proj['description'][:200]}...")
 
         # Awards
-        if self.data.get('awards'):
+        if data.get('awards'):
             sections.append("\n## Awards & Honors")
-            for award in self.data['awards']:
+            for award in data['awards']:
                 sections.append(f"- {award.get('title', '')} ({award.get('time', '')})")
 
         return "\n".join(sections)
 
-    def get_site_links(self) -> List[Dict[str, str]]:
+    def get_site_links_text(self, site_links: Optional[Sequence[Mapping[str, str]]] = None) -> str:
+        """
+        Get site links rendered for a prompt
+
+        Args:
+            site_links: Links to render (defaults to all site links); the
+                snapshot's own link sequence reuses its pre-rendered text
+
+        Returns:
+            One "- label: href" line per link
+        """
+        snapshot = self.snapshot()
+        if site_links is None or site_links is snapshot.site_links:
+            return snapshot.site_links_text
+        return render_site_links(site_links)
+
+    def get_site_links(self) -> Sequence[Mapping[str, str]]:
         """
         Get all available site links from profile data
 
         Returns:
-            List of dictionaries with 'label' and 'href' keys
+            Read-only sequence of mappings with 'label' and 'href' keys
+            (shared, built once per data version)
         """
+        return self.snapshot().site_links
+
+    @staticmethod
+    def _collect_site_links(data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Collect page, section, publication and project links"""
         links = []
 
         # Add main pages
@@ -190,7 +370,7 @@ class LongTermMemory:
         ])
 
         # Add publication links
-        for pub in self.data.get('publications', []):
+        for pub in data.get('publications', []):
             if pub.get('title') and pub.get('link'):
                 links.append({
                     "label": pub['title'],
@@ -198,7 +378,7 @@ class LongTermMemory:
                 })
 
         # Add project links
-        for proj in self.data.get('projects', []):
+        for proj in data.get('projects', []):
             if proj.get('title') and proj.get('link'):
                 links.append({
                     "label": proj['title'],
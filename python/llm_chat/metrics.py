@@ -0,0 +1,347 @@
+"""
+Metrics Module
+Per-stage latency histograms and counters for chat requests, rendered in
+Prometheus text format (GET /metrics) with a rolling window of per-request
+breakdowns (GET /debug/timings)
+"""
+
+import bisect
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .config import config
+
+# Histogram bucket upper bounds in seconds (stages range from microseconds to LLM calls)
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Request being timed in the current task (copied into tasks it creates)
+_current_timings: ContextVar[Optional["RequestTimings"]] = ContextVar("chat_request_timings", default=None)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one label (Prometheus semantics)"""
+
+    def __init__(self, name: str, help_text: str, label: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = tuple(buckets)
+        # label value -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[str, List[Any]] = {}
+
+    def observe(self, label_value: str, seconds: float):
+        series = self._series.get(label_value)
+        if series is None:
+            series = self._series.setdefault(label_value, [[0] * (len(self.buckets) + 1), 0.0, 0])
+        series[0][bisect.bisect_left(self.buckets, seconds)] += 1
+        series[1] += seconds
+        series[2] += 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, mean and bucket-estimated p50/p95 (ms) per label value"""
+        result = {}
+        for label_value, (counts, total, count) in sorted(self._series.items()):
+            result[label_value] = {
+                "count": count,
+                "mean_ms": round(total / count * 1000, 3) if count else 0.0,
+                "p50_ms": self._quantile_ms(counts, count, 0.5),
+                "p95_ms": self._quantile_ms(counts, count, 0.95),
+            }
+        return result
+
+    def _quantile_ms(self, counts: List[int], count: int, q: float) -> Optional[float]:
+        # Upper bound of the bucket holding the quantile
+        target = q * count
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            cumulative += bucket_count
+            if cumulative >= target and count:
+                return self.buckets[index] * 1000 if index < len(self.buckets) else None
+        return None
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_value, (counts, total, count) in sorted(self._series.items()):
+            label = f'{self.label}="{_escape(label_value)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label},le="{_format_value(bound)}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {_format_value(total)}")
+            lines.append(f"{self.name}_count{{{label}}} {count}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with one label"""
+
+    def __init__(self, name: str, help_text: str, label: str):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self._values: Dict[str, int] = {}
+
+    def inc(self, label_value: str, amount: int = 1):
+        self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def values(self) -> Dict[str, int]:
+        return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_value, value in sorted(self._values.items()):
+            lines.append(f'{self.name}{{{self.label}="{_escape(label_value)}"}} {value}')
+        return lines
+
+
+class _Span:
+    """Times one stage; use as a context manager"""
+
+    __slots__ = ("metrics", "timings", "stage", "started")
+
+    def __init__(self, metrics: "ChatMetrics", timings: Optional["RequestTimings"], stage: str):
+        self.metrics = metrics
+        self.timings = timings
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.started
+        self.metrics.stage_seconds.observe(self.stage, seconds)
+        if self.timings is not None:
+            stages = self.timings.stages
+            stages[self.stage] = stages.get(self.stage, 0.0) + seconds
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class RequestTimings:
+    """Stage durations of one chat request"""
+
+    __slots__ = ("started", "started_at", "streaming", "stages", "token")
+
+    def __init__(self, streaming: bool):
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.streaming = streaming
+        self.stages: Dict[str, float] = {}
+        self.token = None
+
+
+class ChatMetrics:
+    """
+    Latency histograms and counters of the chat pipeline
+
+    A request is timed between start_request() and finish_request(); span()
+    times a stage and works anywhere below it (the request is found through
+    a context variable, so tasks created by the handler report into the same
+    breakdown). Stages that run more than once per request are summed in the
+    breakdown but observed separately in the histogram. Spans are recorded
+    on the event loop, so no locking is needed.
+    """
+
+    def __init__(self, recent: int = 200, enabled: bool = True):
+        """
+        Initialize metrics
+
+        Args:
+            recent: Number of per-request breakdowns kept for /debug/timings
+            enabled: Record anything at all (spans are no-ops when False)
+        """
+        self.enabled = enabled
+        self.stage_seconds = Histogram("chat_stage_seconds", "Time spent in each chat request stage", "stage")
+        self.request_seconds = Histogram("chat_request_seconds", "End-to-end chat request time", "outcome")
+        self.response_cache = Counter("chat_response_cache_total", "Response cache lookups", "result")
+        self.faq = Counter("chat_faq_total", "FAQ table lookups", "result")
+        self.structured_query = Counter("chat_structured_query_total", "Structured query routing", "result")
+        self.chains = Counter("chat_chains_total", "ConversationChain creations and reuses", "result")
+        self.requests = Counter("chat_requests_total", "Chat requests by outcome", "outcome")
+        self._recent: deque = deque(maxlen=max(recent, 1))
+
+    def start_request(self, streaming: bool = False) -> Optional[RequestTimings]:
+        """
+        Start timing a request in the current context
+
+        Returns:
+            RequestTimings to pass to finish_request, or None when disabled
+        """
+        if not self.enabled:
+            return None
+        timings = RequestTimings(streaming)
+        timings.token = _current_timings.set(timings)
+        return timings
+
+    def finish_request(self, timings: Optional[RequestTimings], outcome: str):
+        """
+        Record a finished request
+
+        Args:
+            timings: Value returned by start_request
+            outcome: "answered", "faq", "cached", "structured", "rejected",
+                "invalid" or "error"
+        """
+        if timings is None:
+            return
+        total = time.perf_counter() - timings.started
+        self.request_seconds.observe(outcome, total)
+        self.requests.inc(outcome)
+        try:
+            _current_timings.reset(timings.token)
+        except ValueError:
+            # Finished from another context (e.g. a streaming generator closed elsewhere)
+            _current_timings.set(None)
+        self._recent.append((timings, outcome, total))
+
+    def observe(self, stage: str, seconds: float):
+        """
+        Record a stage timed by the caller (for stages that cannot be wrapped
+        in span(), like a stream that yields in between)
+
+        Args:
+            stage: Stage name
+            seconds: Duration
+        """
+        if not self.enabled:
+            return
+        self.stage_seconds.observe(stage, seconds)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.stages[stage] = timings.stages.get(stage, 0.0) + seconds
+
+    def span(self, stage: str):
+        """
+        Time a stage of the current request
+
+        Args:
+            stage: Stage name (label of chat_stage_seconds)
+
+        Returns:
+            Context manager
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, _current_timings.get(), stage)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Per-request breakdowns, newest first
+
+        Args:
+            limit: Maximum number of requests to return
+
+        Returns:
+            List of dictionaries with started_at, streaming, outcome, total_ms and stages_ms
+        """
+        entries = list(self._recent)[::-1][:limit]
+        return [
+            {
+                "started_at": round(timings.started_at, 3),
+                "streaming": timings.streaming,
+                "outcome": outcome,
+                "total_ms": round(total * 1000, 3),
+                "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in timings.stages.items()},
+            }
+            for timings, outcome, total in entries
+        ]
+
+    def routing(self) -> Dict[str, Any]:
+        """
+        Share of requests per outcome
+
+        Returns:
+            Dictionary with requests, share per outcome and without_llm
+            (share answered from the FAQ table, the response cache or the
+            structured query engine)
+        """
+        counts = self.requests.values()
+        total = sum(counts.values())
+        if not total:
+            return {"requests": 0, "shares": {}, "without_llm": 0.0}
+        without_llm = sum(counts.get(outcome, 0) for outcome in ("faq", "cached", "structured"))
+        return {
+            "requests": total,
+            "shares": {outcome: round(count / total, 4) for outcome, count in sorted(counts.items())},
+            "without_llm": round(without_llm / total, 4),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get aggregated timings
+
+        Returns:
+            Dictionary with per-stage and per-outcome count, mean, p50 and p95
+            (ms, p50/p95 are bucket upper bounds), routing shares and the counters
+        """
+        return {
+            "stages": self.stage_seconds.summary(),
+            "requests": self.request_seconds.summary(),
+            "routing": self.routing(),
+            "faq": self.faq.values(),
+            "structured_query": self.structured_query.values(),
+            "response_cache": self.response_cache.values(),
+            "chains": self.chains.values(),
+        }
+
+    def render(self, extra: Sequence[Tuple[str, str, str, float]] = ()) -> str:
+        """
+        Render all metrics in Prometheus text exposition format (version 0.0.4)
+
+        Args:
+            extra: Additional (name, type, help, value) samples, e.g. gauges
+                read from other components at scrape time
+
+        Returns:
+            Exposition text
+        """
+        lines: List[str] = []
+        for metric in (self.stage_seconds, self.request_seconds, self.requests,
+                       self.faq, self.structured_query, self.response_cache, self.chains):
+            lines.extend(metric.render())
+        for name, metric_type, help_text, value in extra:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics instance
+_chat_metrics: Optional[ChatMetrics] = None
+
+
+def get_chat_metrics() -> ChatMetrics:
+    """Get or create the global chat metrics"""
+    global _chat_metrics
+    if _chat_metrics is None:
+        _chat_metrics = ChatMetrics(recent=config.metrics_recent_requests, enabled=config.metrics_enabled)
+    return _chat_metrics
+
+
+def span(stage: str):
+    """Time a stage of the current request (see ChatMetrics.span)"""
+    return get_chat_metrics().span(stage)
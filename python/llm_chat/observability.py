@@ -0,0 +1,312 @@
+"""
+Observability Module
+Keeps logging and Langfuse tracing off the request path: llm_chat loggers
+hand records to a background thread (QueueHandler), and Langfuse calls are
+recorded per request, sampled when the request ends and exported in
+batches by a background thread
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from .config import config
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Trace events that mark a request as failed (kept by tail sampling)
+FAILURE_EVENTS = ("error", "degraded-response")
+
+_log_handler: Optional[logging.Handler] = None
+_log_listener: Optional[logging.handlers.QueueListener] = None
+_log_lock = threading.Lock()
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue is in-process, so the record is passed as is instead of
+        # being formatted here; log arguments are strings or numbers, which
+        # cannot change before the listener formats them
+        return record
+
+
+def _get_log_handler() -> logging.Handler:
+    """Handler shared by all llm_chat loggers (created on first use)"""
+    global _log_handler, _log_listener
+    if _log_handler is None:
+        with _log_lock:
+            if _log_handler is None:
+                console_handler = logging.StreamHandler(sys.stderr)
+                console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+                if config.log_async:
+                    records = queue.SimpleQueue()
+                    _log_listener = logging.handlers.QueueListener(records, console_handler)
+                    _log_listener.start()
+                    # Write out what is still queued when the process exits
+                    atexit.register(_log_listener.stop)
+                    _log_handler = _DeferredQueueHandler(records)
+                else:
+                    _log_handler = console_handler
+    return _log_handler
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get a logger at CHAT_LOG_LEVEL that writes to stderr
+
+    With CHAT_LOG_ASYNC (default) records are formatted and written by a
+    background thread. Pass arguments lazily (logger.debug("... %s", value))
+    so nothing is formatted for records below the level, and guard expensive
+    arguments with logger.isEnabledFor().
+
+    Args:
+        name: Logger name (module __name__)
+
+    Returns:
+        Configured logger
+    """
+    logger = logging.getLogger(name)
+    level = logging.getLevelName(config.log_level)
+    logger.setLevel(level if isinstance(level, int) else logging.INFO)
+    if not logger.handlers:
+        logger.addHandler(_get_log_handler())
+    return logger
+
+
+class TraceRecorder:
+    """
+    Stand-in for a Langfuse trace that records calls for later export
+
+    Supports the trace calls the chat pipeline makes (update, event and
+    generation). Calls are stored with their time, so exported traces keep
+    the original timing. Events named in FAILURE_EVENTS mark the request as
+    failed for tail sampling.
+    """
+
+    __slots__ = ("trace_kwargs", "calls", "sampled", "failed", "started")
+
+    def __init__(self, sampled: bool, trace_kwargs: Dict[str, Any]):
+        self.trace_kwargs = trace_kwargs
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+        self.sampled = sampled
+        self.failed = False
+        self.started = time.perf_counter()
+
+    def update(self, **kwargs):
+        self.calls.append(("update", kwargs))
+
+    def event(self, **kwargs):
+        kwargs.setdefault("start_time", datetime.now(timezone.utc))
+        if kwargs.get("name") in FAILURE_EVENTS:
+            self.failed = True
+        self.calls.append(("event", kwargs))
+
+    def generation(self, **kwargs):
+        kwargs.setdefault("end_time", datetime.now(timezone.utc))
+        self.calls.append(("generation", kwargs))
+
+
+class TraceExporter:
+    """
+    Background exporter of recorded traces to Langfuse
+
+    Traces are queued by finish_trace() and replayed onto the Langfuse
+    client by a daemon thread in batches of batch_size, or every
+    flush_interval seconds. When the queue is full new traces are dropped
+    rather than blocking the request.
+    """
+
+    def __init__(self, batch_size: int = 20, flush_interval: float = 2.0, max_queue: int = 1000):
+        """
+        Initialize the exporter
+
+        Args:
+            batch_size: Traces exported per batch
+            flush_interval: Seconds to wait for a batch to fill up
+            max_queue: Traces buffered before new ones are dropped
+        """
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max(max_queue, 1))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def submit(self, trace: TraceRecorder):
+        """Queue a finished trace for export (never blocks)"""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.flush)
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until queued traces are exported
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True when the queue was drained in time
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and self._thread is not None:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._export(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _export(self, batch: List[TraceRecorder]):
+        client = config.langfuse_client
+        self.batches += 1
+        for trace in batch:
+            try:
+                langfuse_trace = client.trace(**trace.trace_kwargs)
+                for method, kwargs in trace.calls:
+                    getattr(langfuse_trace, method)(**kwargs)
+                self.exported += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Warning: Langfuse trace export failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get exporter statistics
+
+        Returns:
+            Dictionary with queued, exported, dropped, failed and batches
+        """
+        return {
+            "queued": self._queue.qsize(),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+# Sampling decisions: traced (head sample), kept_slow / kept_error (tail sample),
+# discarded (recorded, then not kept) and skipped (not recorded at all)
+_sampling_stats: Dict[str, int] = {
+    "traced": 0,
+    "kept_slow": 0,
+    "kept_error": 0,
+    "discarded": 0,
+    "skipped": 0,
+}
+
+_trace_exporter: Optional[TraceExporter] = None
+
+
+def get_trace_exporter() -> TraceExporter:
+    """Get or create the global trace exporter"""
+    global _trace_exporter
+    if _trace_exporter is None:
+        _trace_exporter = TraceExporter(
+            batch_size=config.trace_batch_size,
+            flush_interval=config.trace_flush_interval_seconds,
+            max_queue=config.trace_queue_size
+        )
+    return _trace_exporter
+
+
+def start_trace(**trace_kwargs) -> Optional[TraceRecorder]:
+    """
+    Start recording a Langfuse trace for a request
+
+    The head sampling decision is made here. Requests that are not sampled
+    are still recorded when tail sampling may keep them.
+
+    Args:
+        **trace_kwargs: Arguments of Langfuse.trace()
+
+    Returns:
+        TraceRecorder, or None when tracing is off, Langfuse is not configured
+        or neither head nor tail sampling can keep the request
+    """
+    if not config.tracing_enabled or not config.langfuse_client:
+        return None
+    sampled = config.trace_sample_rate >= 1.0 or random.random() < config.trace_sample_rate
+    if not sampled and config.trace_keep_slow_seconds <= 0 and not config.trace_keep_errors:
+        _sampling_stats["skipped"] += 1
+        return None
+    return TraceRecorder(sampled, trace_kwargs)
+
+
+def finish_trace(trace: Optional[TraceRecorder], failed: bool = False):
+    """
+    Decide whether to keep a finished request's trace and queue it for export
+
+    Args:
+        trace: Value returned by start_trace
+        failed: Whether the request failed (in addition to failure events)
+    """
+    if trace is None:
+        return
+    seconds = time.perf_counter() - trace.started
+    if trace.sampled:
+        reason = "head"
+        _sampling_stats["traced"] += 1
+    elif config.trace_keep_errors and (failed or trace.failed):
+        reason = "error"
+        _sampling_stats["kept_error"] += 1
+    elif 0 < config.trace_keep_slow_seconds <= seconds:
+        reason = "slow"
+        _sampling_stats["kept_slow"] += 1
+    else:
+        _sampling_stats["discarded"] += 1
+        return
+    trace.trace_kwargs["metadata"] = dict(
+        trace.trace_kwargs.get("metadata") or {},
+        sampling=reason,
+        latencyMs=round(seconds * 1000, 1)
+    )
+    get_trace_exporter().submit(trace)
+
+
+def get_tracing_stats() -> Dict[str, Any]:
+    """
+    Get tracing statistics
+
+    Returns:
+        Dictionary with enabled, sample_rate, sampling decisions and exporter stats
+    """
+    return {
+        "enabled": bool(config.tracing_enabled and config.langfuse_client),
+        "sample_rate": config.trace_sample_rate,
+        "sampling": dict(_sampling_stats),
+        "exporter": get_trace_exporter().get_stats() if _trace_exporter is not None else None,
+    }
@@ -0,0 +1,232 @@
+"""
+Profile Index Module
+Tokenized inverted index over profile items with field boosting, prefix
+matching and AND/OR queries
+"""
+
+import bisect
+import math
+import re
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+from .keyword_matcher import KOREAN_SUFFIXES
+from .text_utils import tokenize, normalize_query
+
+# Weight of a match per field; unlisted fields weigh 1.0
+FIELD_BOOSTS = {
+    "title": 3.0,
+    "degree": 3.0,
+    "school": 3.0,
+    "company": 3.0,
+    "tags": 2.0,
+    "organization": 1.5,
+    "authors": 1.5,
+    "journal": 1.5,
+    "summary": 1.2,
+    "description": 1.0,
+    "abstract": 1.0,
+}
+
+# URLs and image paths are not searchable text
+SKIPPED_FIELDS = {"link", "schoolLink", "companyLink", "thumbnail", "image", "href"}
+
+_HANGUL_PATTERN = re.compile(r"[가-힣]")
+_OR_PATTERN = re.compile(r"\s+OR\s+|\s*\|\s*")
+
+# Particles/endings stripped from Hangul query words, longest first
+_SUFFIXES_BY_LENGTH = sorted(KOREAN_SUFFIXES, key=len, reverse=True)
+
+
+def _item_fields(item: Any) -> Iterator[Tuple[str, str]]:
+    """Yield (field name, text) pairs of a profile item"""
+    if isinstance(item, str):
+        yield "text", item
+        return
+    if not isinstance(item, dict):
+        return
+    for field, value in item.items():
+        if field in SKIPPED_FIELDS:
+            continue
+        if isinstance(value, str):
+            yield field, value
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield field, str(value)
+        elif isinstance(value, list):
+            text = " ".join(str(element) for element in value if isinstance(element, (str, int, float)))
+            if text:
+                yield field, text
+
+
+class ProfileIndex:
+    """
+    Inverted index over every list item of the profile data
+
+    Each token maps to the items containing it with a weight of
+    sum(field boost * (1 + log tf)) over the fields it occurs in. Queries
+    score items by sum(idf * weight) over matched terms.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Build the index
+
+        Args:
+            data: Profile data ({category: [items]})
+        """
+        self.documents: List[Tuple[str, Any]] = []
+        self._postings: Dict[str, Dict[int, Tuple[float, FrozenSet[str]]]] = {}
+        for category, items in data.items():
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                self._add(len(self.documents), item)
+                self.documents.append((category, item))
+        self._vocabulary = sorted(self._postings)
+        total = max(1, len(self.documents))
+        self._idf = {
+            term: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def _add(self, doc_id: int, item: Any):
+        counts: Dict[str, Dict[str, int]] = {}
+        for field, text in _item_fields(item):
+            for token in tokenize(text):
+                field_counts = counts.setdefault(token, {})
+                field_counts[field] = field_counts.get(field, 0) + 1
+        for token, field_counts in counts.items():
+            weight = sum(
+                FIELD_BOOSTS.get(field, 1.0) * (1 + math.log(count))
+                for field, count in field_counts.items()
+            )
+            self._postings.setdefault(token, {})[doc_id] = (weight, frozenset(field_counts))
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def _term_alternatives(self, word: str, prefix: bool) -> List[List[str]]:
+        """
+        Index terms a query word may match
+
+        Returns:
+            List of conjunctive groups; a document matches the word if it
+            contains all terms of any group
+        """
+        candidates = [word]
+        if _HANGUL_PATTERN.search(word):
+            for suffix in _SUFFIXES_BY_LENGTH:
+                if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+                    candidates.append(word[:-len(suffix)])
+                    break
+
+        terms: Set[str] = set()
+        for candidate in candidates:
+            if prefix:
+                terms.update(self._expand_prefix(candidate))
+            elif candidate in self._postings:
+                terms.add(candidate)
+        if terms:
+            return [[term] for term in sorted(terms)]
+
+        # Unknown long Hangul word: require all of its syllable bigrams
+        if len(word) > 2 and _HANGUL_PATTERN.search(word):
+            bigrams = sorted({word[i:i + 2] for i in range(len(word) - 1)})
+            if all(bigram in self._postings for bigram in bigrams):
+                return [bigrams]
+        return []
+
+    def _match_word(self, word: str, prefix: bool) -> Dict[int, Tuple[float, Set[str]]]:
+        """Score every document matching one query word"""
+        matches: Dict[int, Tuple[float, Set[str]]] = {}
+        for group in self._term_alternatives(word, prefix):
+            group_docs: Optional[Dict[int, Tuple[float, Set[str]]]] = None
+            for term in group:
+                idf = self._idf[term]
+                postings = self._postings[term]
+                if group_docs is None:
+                    group_docs = {doc: (idf * weight, set(fields)) for doc, (weight, fields) in postings.items()}
+                else:
+                    group_docs = {
+                        doc: (score + idf * postings[doc][0], fields | postings[doc][1])
+                        for doc, (score, fields) in group_docs.items() if doc in postings
+                    }
+            for doc, (score, fields) in (group_docs or {}).items():
+                best = matches.get(doc)
+                if best is None or score > best[0]:
+                    matches[doc] = (score, fields if best is None else fields | best[1])
+                else:
+                    best[1].update(fields)
+        return matches
+
+    def search(self, query: str, mode: str = "and", prefix: bool = False, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Find and rank items matching a query
+
+        "A OR B" (or "A | B") matches either side. Within a side, words are
+        combined with AND (default) or OR (mode="or"). A word ending in "*"
+        is a prefix; prefix=True treats every word as one.
+
+        Args:
+            query: Search query
+            mode: "and" or "or" for words within an OR-side
+            prefix: Match every word as a prefix
+            limit: Maximum number of hits (None for all)
+
+        Returns:
+            Hits sorted by score, each with category, item, score and
+            matched_fields
+        """
+        scores: Dict[int, Tuple[float, Set[str]]] = {}
+        for clause in _OR_PATTERN.split(query.strip()):
+            words = []
+            for raw_word in clause.split():
+                is_prefix = prefix or raw_word.endswith("*")
+                for word in normalize_query(raw_word.rstrip("*")).split():
+                    words.append((word, is_prefix))
+            if not words:
+                continue
+
+            clause_scores: Optional[Dict[int, Tuple[float, Set[str]]]] = None
+            for word, is_prefix in words:
+                matches = self._match_word(word, is_prefix)
+                if clause_scores is None:
+                    clause_scores = matches
+                elif mode == "or":
+                    for doc, (score, fields) in matches.items():
+                        previous = clause_scores.get(doc)
+                        clause_scores[doc] = (score, fields) if previous is None else (previous[0] + score, previous[1] | fields)
+                else:
+                    clause_scores = {
+                        doc: (score + matches[doc][0], fields | matches[doc][1])
+                        for doc, (score, fields) in clause_scores.items() if doc in matches
+                    }
+                if mode != "or" and not clause_scores:
+                    break
+
+            for doc, (score, fields) in (clause_scores or {}).items():
+                previous = scores.get(doc)
+                if previous is None or score > previous[0]:
+                    scores[doc] = (score, fields if previous is None else fields | previous[1])
+
+        ranked = sorted(scores.items(), key=lambda entry: (-entry[1][0], entry[0]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [
+            {
+                "category": self.documents[doc][0],
+                "item": self.documents[doc][1],
+                "score": round(score, 4),
+                "matched_fields": sorted(fields, key=lambda field: (-FIELD_BOOSTS.get(field, 1.0), field)),
+            }
+            for doc, (score, fields) in ranked
+        ]
+
+    @property
+    def term_count(self) -> int:
+        """Number of distinct indexed terms"""
+        return len(self._vocabulary)
@@ -0,0 +1,193 @@
+"""
+Profile Views Module
+Typed, indexed views of the profile data for structured queries: parsed
+time ranges, per-category year indexes and the skill inventory
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from .keyword_matcher import KeywordMatcher
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+# "Mar. 2025", "December 2022" or a bare year
+_DATE_PATTERN = re.compile(r"(?:([A-Za-z]{3,9})\.?\s+)?((?:19|20)\d{2})")
+_ONGOING_PATTERN = re.compile(r"present|current|now|현재", re.IGNORECASE)
+
+# "English (Fluent)" -> "English"
+_QUALIFIER_PATTERN = re.compile(r"\s*\([^)]*\)")
+
+# Item fields that name a specific item ("LEGOLAS: ...", "GDGoC GIST")
+_NAME_FIELDS = ("title", "company", "school")
+
+# "LEGOLAS: Learning & ..." is also mentioned as "LEGOLAS"
+_SUBTITLE_PATTERN = re.compile(r"\s*(?::|\s[-–—]\s)\s*")
+
+
+class TimeRange:
+    """
+    Parsed "time" field of a profile item
+
+    Months are counted as year * 12 + (month - 1). A bare year starts in
+    January and ends in December; ongoing ranges ("– Present") have no end.
+    """
+
+    __slots__ = ("start", "end", "ongoing")
+
+    def __init__(self, start: int, end: Optional[int], ongoing: bool = False):
+        self.start = start
+        self.end = end
+        self.ongoing = ongoing
+
+    @property
+    def start_year(self) -> int:
+        return self.start // 12
+
+    def end_year(self, current_year: Optional[int] = None) -> int:
+        """Last year of the range (the current year for ongoing ranges)"""
+        if self.end is None:
+            return max(current_year or datetime.now().year, self.start_year)
+        return self.end // 12
+
+
+def parse_time_range(text: Any) -> Optional[TimeRange]:
+    """
+    Parse a profile "time" string
+
+    Handles "Mar. 2025 – Present", "Mar. 2019 – Aug. 2024", "May 2025",
+    "2024-2025", "2022 – 2024" and "Latest: 2023".
+
+    Args:
+        text: Value of the "time" field
+
+    Returns:
+        TimeRange, or None if no year was found
+    """
+    if not isinstance(text, str):
+        return None
+    dates = []
+    for month_name, year in _DATE_PATTERN.findall(text):
+        month = _MONTHS.get(month_name[:3].lower()) if month_name else None
+        dates.append((int(year), month))
+    if not dates:
+        return None
+    start_year, start_month = dates[0]
+    start = start_year * 12 + (start_month or 1) - 1
+    if _ONGOING_PATTERN.search(text):
+        return TimeRange(start, None, ongoing=True)
+    end_year, end_month = dates[-1]
+    return TimeRange(start, end_year * 12 + (end_month or 12) - 1)
+
+
+class ProfileRecord:
+    """One profile item with its category, position and parsed time range"""
+
+    __slots__ = ("category", "position", "item", "time_range")
+
+    def __init__(self, category: str, position: int, item: Dict[str, Any]):
+        self.category = category
+        self.position = position
+        self.item = item
+        self.time_range = parse_time_range(item.get("time"))
+
+
+class ProfileViews:
+    """
+    Structured views of one profile version (built with the snapshot)
+
+    Records are kept per category in profile order, and every timed
+    category has a year index (year -> positions of the items active in
+    that year), so year filters only touch the matching items. Skill
+    groups are split into individual skill names, matched in queries with
+    a KeywordMatcher, and so are item names (titles and their short
+    forms, companies, schools), which mark questions about one item.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Build the views
+
+        Args:
+            data: Profile data ({category: [items]})
+        """
+        current_year = datetime.now().year
+        self.records: Dict[str, List[ProfileRecord]] = {}
+        self._years: Dict[str, Dict[int, List[int]]] = {}
+        for category, items in data.items():
+            if not isinstance(items, list):
+                continue
+            records = [ProfileRecord(category, position, item) for position, item in enumerate(items) if isinstance(item, dict)]
+            self.records[category] = records
+            years: Dict[int, List[int]] = {}
+            for index, record in enumerate(records):
+                if record.time_range is None:
+                    continue
+                for year in range(record.time_range.start_year, record.time_range.end_year(current_year) + 1):
+                    years.setdefault(year, []).append(index)
+            if years:
+                self._years[category] = years
+
+        # Skill group title -> individual skills ("Python", "C++", ...)
+        self.skill_groups: Dict[str, List[str]] = {}
+        for record in self.records.get("skills", []):
+            title = record.item.get("title")
+            if not title:
+                continue
+            names = [_QUALIFIER_PATTERN.sub("", name).strip() for name in str(record.item.get("description", "")).split(",")]
+            self.skill_groups[title] = [name for name in names if name]
+        self.skill_matcher = KeywordMatcher({"skill": self.skill_groups})
+
+        # Category -> names of its items
+        names: Dict[str, List[str]] = {}
+        for category, records in self.records.items():
+            if category == "skills":
+                continue
+            for record in records:
+                for field in _NAME_FIELDS:
+                    value = record.item.get(field)
+                    if isinstance(value, str) and value.strip():
+                        names.setdefault(category, []).append(value)
+                        short = _SUBTITLE_PATTERN.split(value, maxsplit=1)[0]
+                        if short != value and len(short) >= 4:
+                            names[category].append(short)
+        self.name_matcher = KeywordMatcher({"name": names})
+
+    def items(
+        self,
+        category: str,
+        first_year: Optional[int] = None,
+        last_year: Optional[int] = None
+    ) -> List[ProfileRecord]:
+        """
+        Records of a category, optionally limited to a year range
+
+        Args:
+            category: Profile category (e.g. "publications")
+            first_year: First year (inclusive, None = open)
+            last_year: Last year (inclusive, None = open)
+
+        Returns:
+            Matching records in profile order; with a year filter, items
+            without a parseable time are left out
+        """
+        records = self.records.get(category, [])
+        if first_year is None and last_year is None:
+            return list(records)
+        years = self._years.get(category, {})
+        if not years:
+            return []
+        low = max(first_year if first_year is not None else min(years), min(years))
+        high = min(last_year if last_year is not None else max(years), max(years))
+        positions = sorted({index for year in range(low, high + 1) for index in years.get(year, ())})
+        return [records[index] for index in positions]
+
+    def skill_group(self, title: str) -> Optional[ProfileRecord]:
+        """Record of a skill group by title"""
+        for record in self.records.get("skills", []):
+            if record.item.get("title") == title:
+                return record
+        return None
@@ -0,0 +1,455 @@
+"""
+Structured Query Engine Module
+Answers list-style questions about the profile ("his publications from
+2025", "what awards did he win", "어떤 프로그래밍 언어를 써?") with filters
+over the profile views and answer templates, without an LLM call
+"""
+
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+from .keyword_matcher import KeywordMatcher
+from .long_term_memory import ProfileSnapshot, get_long_term_memory
+from .profile_views import ProfileRecord, ProfileViews
+
+# Intent keywords: category, skill_group and modifier rules plus filler words
+DEFAULT_INTENTS_PATH = Path(__file__).parent.parent / "data" / "query_intents.json"
+
+# Items listed for "recent ..." questions
+RECENT_LIMIT = 3
+
+# Per category: English singular/plural, Korean noun and counter, site link label
+CATEGORY_TEXT = {
+    "publications": {"en": ("publication", "publications"), "ko": ("논문", "편"), "link": "Papers"},
+    "awards": {"en": ("award", "awards"), "ko": ("수상 경력", "건"), "link": "Awards"},
+    "projects": {"en": ("project", "projects"), "ko": ("프로젝트", "개"), "link": "Projects"},
+    "experiences": {"en": ("position", "positions"), "ko": ("경력", "건"), "link": "Experiences"},
+    "education": {"en": ("education entry", "education entries"), "ko": ("학력", "건"), "link": "Education"},
+    "skills": {"en": ("skill group", "skill groups"), "ko": ("기술", "개"), "link": "Skills"},
+    "otherExperiences": {"en": ("activity", "activities"), "ko": ("대외활동", "건"), "link": "CV"},
+}
+
+# Korean names of the skill groups in profile_data.json
+SKILL_GROUP_LABELS = {
+    "Programming Languages": "프로그래밍 언어",
+    "Frameworks": "프레임워크",
+    "Tools": "도구",
+    "Languages": "외국어",
+}
+
+# Item fields shown per category: (name, detail)
+_ITEM_FIELDS = {
+    "publications": ("title", "journal"),
+    "awards": ("title", "organization"),
+    "projects": ("title", None),
+    "experiences": ("title", "company"),
+    "education": ("degree", "school"),
+    "otherExperiences": ("title", "organization"),
+}
+
+_YEAR = r"((?:19|20)\d{2})"
+
+# Year expressions, tried in order; each matched expression is removed from the query
+_YEAR_PATTERNS = (
+    (re.compile(rf"(?:\b(?:between|from)\s+)?{_YEAR}\s*년?\s*(?:-|–|~|\bto\b|\band\b|\bthrough\b|부터)\s*{_YEAR}\s*년?\s*(?:까지|사이)?(?:에|의)?"), "range"),
+    (re.compile(rf"\b(?:since|starting)\s+{_YEAR}|{_YEAR}\s*(?:and later|or later|onwards?)\b|{_YEAR}\s*년?\s*(?:이후|부터)(?:에|로|의)?"), "since"),
+    (re.compile(rf"\bafter\s+{_YEAR}"), "after"),
+    (re.compile(rf"\b(?:before|prior to)\s+{_YEAR}|{_YEAR}\s*년?\s*(?:이전|전)(?:에|의)?"), "before"),
+    (re.compile(rf"\b(?:until|till|through|up to)\s+{_YEAR}|{_YEAR}\s*년?\s*까지(?:의)?"), "until"),
+    (re.compile(rf"(?:\b(?:in|from|during|of)\s+)?{_YEAR}\s*(?:년도?)?(?:에는|에|의|도)?"), "year"),
+    (re.compile(r"\bthis year\b|올해|금년"), "this_year"),
+    (re.compile(r"\blast year\b|작년|지난해"), "last_year"),
+)
+
+# "kangbeen's", "what's"
+_POSSESSIVE_PATTERN = re.compile(r"['’]s\b")
+_WORD_PATTERN = re.compile(r"\w")
+_HANGUL_PATTERN = re.compile(r"[가-힣]")
+
+# Yes/no questions ("does he know PyTorch?"); "what has he done with X" needs the LLM
+_YES_NO_PATTERN = re.compile(r"^\W*(?:does|do|did|has|have|is|can|could)\b")
+
+_ORDER_MODIFIERS = ("latest", "recent", "earliest")
+
+
+def _topic_particle(word: str) -> str:
+    """Korean topic particle (은/는) for the last syllable of a word"""
+    last = word[-1:] if word else ""
+    if not ("가" <= last <= "힣"):
+        return "은(는)"
+    return "은" if (ord(last) - 0xAC00) % 28 else "는"
+
+
+def _join_names(names: List[str]) -> str:
+    """"A", "A and B", "A, B and C\""""
+    if len(names) < 2:
+        return "".join(names)
+    return ", ".join(names[:-1]) + " and " + names[-1]
+
+
+def _extract_years(text: str) -> Tuple[str, Optional[Tuple[Optional[int], Optional[int]]], bool]:
+    """
+    Find the year filter of a query
+
+    Args:
+        text: Normalized query
+
+    Returns:
+        Tuple of (text with the year expression blanked out, (first year,
+        last year) or None, ambiguous); more than one year expression is
+        ambiguous
+    """
+    found: List[Tuple[Optional[int], Optional[int]]] = []
+
+    def replace(match: re.Match, kind: str) -> str:
+        years = [int(year) for year in match.groups() if year]
+        current_year = datetime.now().year
+        if kind == "range":
+            found.append((min(years), max(years)))
+        elif kind == "since":
+            found.append((years[0], None))
+        elif kind == "after":
+            found.append((years[0] + 1, None))
+        elif kind == "before":
+            found.append((None, years[0] - 1))
+        elif kind == "until":
+            found.append((None, years[0]))
+        elif kind == "year":
+            found.append((years[0], years[0]))
+        elif kind == "this_year":
+            found.append((current_year, current_year))
+        else:
+            found.append((current_year - 1, current_year - 1))
+        return " " * len(match.group(0))
+
+    for pattern, kind in _YEAR_PATTERNS:
+        text = pattern.sub(lambda match: replace(match, kind), text)
+    return text, (found[0] if found else None), len(found) > 1
+
+
+class StructuredQuery:
+    """Parsed question: category, intent and filters"""
+
+    __slots__ = ("category", "intent", "first_year", "last_year", "skill_groups", "skills")
+
+    def __init__(
+        self,
+        category: str,
+        intent: str,
+        first_year: Optional[int] = None,
+        last_year: Optional[int] = None,
+        skill_groups: Optional[List[str]] = None,
+        skills: Optional[List[Tuple[str, str]]] = None
+    ):
+        self.category = category
+        # "list", "count", "latest", "recent", "earliest", "group" or "skill_check"
+        self.intent = intent
+        self.first_year = first_year
+        self.last_year = last_year
+        self.skill_groups = skill_groups or []
+        # (skill name as in the profile, skill group)
+        self.skills = skills or []
+
+    @property
+    def label(self) -> str:
+        """Metric label, e.g. "publications.list\""""
+        return f"{self.category}.{self.intent}"
+
+
+class StructuredQueryEngine:
+    """
+    Rule- and keyword-based intent parser with template answers
+
+    A query is routed here only if every word of it is accounted for: a
+    category keyword ("papers", "수상"), a skill group or skill name from
+    the profile, a modifier ("latest", "how many", "최근"), a year
+    expression ("from 2025", "2023년 이후") or a filler word ("what",
+    "his", "알려줘"). Anything else ("about golf swings", "LEGOLAS") means
+    the question needs the LLM, and so does any mention of a specific item
+    ("the Soridam project"): precision comes first and the rest is left to
+    the normal pipeline.
+    """
+
+    def __init__(self, intents_path: Optional[Path] = None):
+        """
+        Load the intent keywords
+
+        Args:
+            intents_path: Intent keyword file (defaults to data/query_intents.json)
+        """
+        with open(intents_path or DEFAULT_INTENTS_PATH, "r", encoding="utf-8") as f:
+            intents = json.load(f)
+        self.matcher = KeywordMatcher(intents)
+        self.routed = 0
+        self.declined = 0
+        self.by_intent: Dict[str, int] = {}
+
+    def parse(self, query: str, views: ProfileViews) -> Optional[StructuredQuery]:
+        """
+        Parse a query into a structured query
+
+        Args:
+            query: User's query
+            views: Views of the profile version the answer will use
+
+        Returns:
+            StructuredQuery, or None if the query is not fully covered by
+            one category and its filters
+        """
+        text = _POSSESSIVE_PATTERN.sub("  ", KeywordMatcher.normalize(query))
+        text, years, ambiguous = _extract_years(text)
+        # Questions about one item ("the Be With You project") need the LLM
+        if ambiguous or views.name_matcher.find_spans(text):
+            return None
+
+        spans = self.matcher.find_spans(text) + views.skill_matcher.find_spans(text)
+        covered = bytearray(len(text))
+        categories: Set[str] = set()
+        groups: List[str] = []
+        skills: List[Tuple[str, str]] = []
+        modifiers: Set[str] = set()
+        # Longest matches first; keywords inside a longer match ("languages"
+        # in "programming languages") do not count on their own
+        for start, end, group, rule, keyword in sorted(spans, key=lambda span: (span[0] - span[1], span[0])):
+            if all(covered[start:end]):
+                continue
+            # Korean particles and endings after a keyword ("논문을", "써요")
+            while end < len(text) and _HANGUL_PATTERN.match(text[end]) and _HANGUL_PATTERN.match(text[end - 1]):
+                end += 1
+            covered[start:end] = b"\x01" * (end - start)
+            if group == "category":
+                categories.add(rule)
+            elif group == "skill_group" and rule not in groups:
+                groups.append(rule)
+            elif group == "skill":
+                skills.append((next(name for name in views.skill_groups[rule] if KeywordMatcher.normalize(name) == keyword), rule))
+            elif group == "modifier":
+                modifiers.add(rule)
+        if any(_WORD_PATTERN.match(char) for char, done in zip(text, covered) if not done):
+            return None
+
+        if groups or skills:
+            categories.add("skills")
+        if len(categories) != 1:
+            return None
+        category = categories.pop()
+        if not views.records.get(category):
+            return None
+        orders = [modifier for modifier in _ORDER_MODIFIERS if modifier in modifiers]
+        if len(orders) > 1:
+            return None
+
+        if category == "skills":
+            if years or orders or any(group not in views.skill_groups for group in groups):
+                return None
+            if skills:
+                if not _HANGUL_PATTERN.search(text) and not _YES_NO_PATTERN.match(text):
+                    return None
+                return StructuredQuery(category, "skill_check", skills=skills)
+            return StructuredQuery(category, "group" if groups else "list", skill_groups=groups)
+
+        intent = orders[0] if orders else ("count" if "count" in modifiers else "list")
+        first_year, last_year = years or (None, None)
+        return StructuredQuery(category, intent, first_year, last_year)
+
+    def execute(self, structured: StructuredQuery, views: ProfileViews) -> List[ProfileRecord]:
+        """
+        Select the records a structured query asks for
+
+        Args:
+            structured: Parsed query
+            views: Profile views
+
+        Returns:
+            Records in answer order
+        """
+        records = views.items(structured.category, structured.first_year, structured.last_year)
+        if structured.intent in _ORDER_MODIFIERS:
+            dated = [record for record in records if record.time_range is not None]
+            if structured.intent == "earliest":
+                dated.sort(key=lambda record: record.time_range.start)
+            else:
+                # Ongoing items first, then by end and start
+                dated.sort(key=lambda record: (
+                    record.time_range.end is None, record.time_range.end or 0, record.time_range.start
+                ), reverse=True)
+            return dated[:1] if structured.intent != "recent" else dated[:RECENT_LIMIT]
+        return records
+
+    def render(self, structured: StructuredQuery, records: List[ProfileRecord], views: ProfileViews, language: str) -> str:
+        """
+        Render the answer with <link> tags (resolved by linkify_response)
+
+        Args:
+            structured: Parsed query
+            records: Records from execute()
+            views: Profile views
+            language: "en" or "ko"
+
+        Returns:
+            Answer text
+        """
+        korean = language == "ko"
+        text = CATEGORY_TEXT[structured.category]
+        if structured.category == "skills":
+            lines = self._render_skills(structured, records, views, korean)
+        else:
+            lines = [self._headline(structured, len(records), korean)]
+            lines.extend(self._item_line(record) for record in records)
+        if korean:
+            footer = f"자세한 내용은 <link>{text['link']}</link>에서 확인할 수 있습니다."
+        else:
+            footer = f"See <link>{text['link']}</link> for details."
+        return "\n".join(lines) + "\n\n" + footer
+
+    @staticmethod
+    def _year_filter(structured: StructuredQuery, korean: bool) -> str:
+        first, last = structured.first_year, structured.last_year
+        if first is None and last is None:
+            return ""
+        if korean:
+            if first == last:
+                return f"{first}년 "
+            if first is not None and last is not None:
+                return f"{first}~{last}년 "
+            return f"{first}년 이후 " if first is not None else f"{last + 1}년 이전 "
+        if first == last:
+            return f" from {first}"
+        if first is not None and last is not None:
+            return f" from {first} to {last}"
+        return f" since {first}" if first is not None else f" before {last + 1}"
+
+    def _headline(self, structured: StructuredQuery, count: int, korean: bool) -> str:
+        text = CATEGORY_TEXT[structured.category]
+        years = self._year_filter(structured, korean)
+        singular, plural = text["en"]
+        noun, counter = text["ko"]
+        if count == 0:
+            if korean:
+                return f"프로필에 {years}{noun}{_topic_particle(noun)} 없습니다."
+            return f"There are no {plural}{years} on his profile."
+        if structured.intent in ("latest", "earliest"):
+            if korean:
+                order = "가장 최근" if structured.intent == "latest" else "가장 오래된"
+                return f"고강빈의 {years}{order} {noun}{_topic_particle(noun)} 다음과 같습니다:"
+            order = "latest" if structured.intent == "latest" else "earliest"
+            return f"His {order} {singular}{years}:"
+        if structured.intent == "recent":
+            if korean:
+                return f"고강빈의 {years}최근 {noun} {count}{counter}입니다:"
+            return f"His {count} most recent {singular if count == 1 else plural}{years}:"
+        if korean:
+            return f"고강빈의 {years}{noun}{_topic_particle(noun)} 총 {count}{counter}입니다:"
+        return f"Kangbeen Ko has {count} {singular if count == 1 else plural}{years}:"
+
+    @staticmethod
+    def _item_line(record: ProfileRecord) -> str:
+        item = record.item
+        name_field, detail_field = _ITEM_FIELDS.get(record.category, ("title", None))
+        name = item.get(name_field)
+        detail = item.get(detail_field) if detail_field else None
+        if not name:
+            # e.g. a lab stay without a degree: the school is the name
+            name, detail = detail or item.get("title") or "", None
+        # Titles with a site link (publications, projects) are tagged for linkify_response
+        if item.get("link") and record.category in ("publications", "projects"):
+            name = f"<link>{name}</link>"
+        line = f"- {name}"
+        if detail:
+            line += f", {detail}"
+        if item.get("time"):
+            line += f" ({item['time']})"
+        return line
+
+    @staticmethod
+    def _render_skills(
+        structured: StructuredQuery,
+        records: List[ProfileRecord],
+        views: ProfileViews,
+        korean: bool
+    ) -> List[str]:
+        def group_line(title: str) -> str:
+            record = views.skill_group(title)
+            label = SKILL_GROUP_LABELS.get(title, title) if korean else title
+            return f"- {label}: {record.item.get('description', '')}"
+
+        if structured.intent == "skill_check":
+            names = [name for name, _ in structured.skills]
+            groups = list(dict.fromkeys(group for _, group in structured.skills))
+            if korean:
+                headline = f"네, {', '.join(names)}{_topic_particle(names[-1])} 고강빈의 기술 스택에 포함되어 있습니다:"
+            else:
+                headline = f"Yes, {_join_names(names)} {'is' if len(names) == 1 else 'are'} part of his skill set:"
+            return [headline] + [group_line(group) for group in groups]
+
+        if structured.intent == "group" and len(structured.skill_groups) == 1:
+            title = structured.skill_groups[0]
+            description = views.skill_group(title).item.get("description", "")
+            if korean:
+                label = SKILL_GROUP_LABELS.get(title, title)
+                return [f"고강빈의 {label}{_topic_particle(label)} {description}입니다."]
+            return [f"His {title.lower()}: {description}."]
+
+        titles = structured.skill_groups or [record.item.get("title") for record in records if record.item.get("title")]
+        headline = "고강빈의 기술 스택입니다:" if korean else "His skills:"
+        return [headline] + [group_line(title) for title in titles]
+
+    def answer(self, query: str, language: str, snapshot: Optional[ProfileSnapshot] = None) -> Optional[Dict[str, Any]]:
+        """
+        Answer a query from the profile data if it is a structured question
+
+        Args:
+            query: User's query
+            language: Detected language ("en" or "ko")
+            snapshot: Profile snapshot (defaults to the current one)
+
+        Returns:
+            Dictionary with 'response' (linkified), 'raw_response' (with
+            <link> tags) and 'intent', or None when the LLM should answer
+        """
+        from .response_generator import linkify_response
+
+        snapshot = snapshot or get_long_term_memory().snapshot()
+        structured = self.parse(query, snapshot.views)
+        if structured is None:
+            self.declined += 1
+            return None
+        records = self.execute(structured, snapshot.views)
+        raw_response = self.render(structured, records, snapshot.views, language)
+        self.routed += 1
+        self.by_intent[structured.label] = self.by_intent.get(structured.label, 0) + 1
+        return {
+            "response": linkify_response(raw_response, snapshot.site_links),
+            "raw_response": raw_response,
+            "intent": structured.label,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get routing counters
+
+        Returns:
+            Dictionary with routed, declined, share (routed / queries seen)
+            and routed queries per intent
+        """
+        seen = self.routed + self.declined
+        return {
+            "routed": self.routed,
+            "declined": self.declined,
+            "share": round(self.routed / seen, 4) if seen else 0.0,
+            "by_intent": dict(self.by_intent),
+        }
+
+
+# Global engine instance
+_query_engine: Optional[StructuredQueryEngine] = None
+
+
+def get_query_engine() -> StructuredQueryEngine:
+    """Get or create the global structured query engine"""
+    global _query_engine
+    if _query_engine is None:
+        _query_engine = StructuredQueryEngine()
+    return _query_engine
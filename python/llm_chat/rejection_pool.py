@@ -0,0 +1,259 @@
+"""
+Rejection Pool Module
+Per-language pool of pre-generated rejection messages for irrelevant
+questions, rotated so the rejection path needs no LLM call
+"""
+
+import asyncio
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from .config import config
+from .llm_backends import get_model_registry
+from .llm_scheduler import Priority, get_llm_scheduler
+from .text_utils import estimate_tokens
+
+# Pre-generated messages (language -> list of messages)
+DEFAULT_POOL_PATH = Path(__file__).parent.parent / "data" / "rejection_messages.json"
+
+# Used when neither the pool file nor bulk generation provides messages
+FALLBACK_MESSAGES = {
+    "en": "Sorry, your question is not related to Kangbeen Ko's profile. Please ask about his background, education, research, publications, projects, or career.",
+    "ko": "죄송합니다. 질문이 고강빈의 프로필과 관련이 없습니다. 배경, 교육, 연구, 논문, 프로젝트, 경력에 대해 물어보세요."
+}
+
+LANGUAGE_NAMES = {"en": "English", "ko": "Korean"}
+
+# Seconds to wait before retrying a failed bulk generation for a language
+RETRY_AFTER_SECONDS = 300
+
+
+def _rejection_prompt(language: str, count: int) -> str:
+    return f"""
+You are Kangbeen Ko(고강빈)'s digital twin assistant. Users sometimes ask questions that are not related to Kangbeen Ko's profile.
+
+Write {count} different brief, polite rejection messages for such questions. Each message must:
+1. Politely decline to answer the unrelated question without repeating it
+2. Suggest asking about Kangbeen Ko's background, education, research, projects, or career
+3. Be concise (1-2 sentences)
+4. Be written in {LANGUAGE_NAMES.get(language, "English")}
+5. **IMPORTANT**: Do NOT use titles or any honorifics. Simply refer to "Kangbeen Ko" or "고강빈" without titles.
+
+Respond only with a JSON array of strings. Do **not** include explanations, markdown, or code blocks.
+"""
+
+
+def _parse_rejection_batch(response_text: str) -> List[str]:
+    response_text = response_text.strip()
+    response_text = re.sub(r'^```json\s*', '', response_text, flags=re.IGNORECASE)
+    response_text = re.sub(r'```$', '', response_text).strip()
+
+    messages = []
+    for message in json.loads(response_text):
+        message = re.sub(r'^["\']|["\']$', '', str(message)).strip()
+        if message and message not in messages:
+            messages.append(message)
+    return messages
+
+
+def generate_rejection_batch(language: str, count: int) -> List[str]:
+    """
+    Generate several rejection message variants with a single Gemini call
+
+    Args:
+        language: Language code ("en" or "ko")
+        count: Number of variants to request
+
+    Returns:
+        List of distinct messages (may be shorter than count)
+    """
+    model = get_model_registry().get_generative_model('gemini-3-flash')
+    result = model.generate_content(_rejection_prompt(language, count))
+    return _parse_rejection_batch(result.text)
+
+
+async def agenerate_rejection_batch(language: str, count: int, timeout: Optional[float] = None) -> List[str]:
+    """
+    Async version of generate_rejection_batch
+
+    Args:
+        language: Language code ("en" or "ko")
+        count: Number of variants to request
+        timeout: Request timeout in seconds passed to the client
+
+    Returns:
+        List of distinct messages (may be shorter than count)
+    """
+    model = get_model_registry().get_generative_model('gemini-3-flash')
+    prompt = _rejection_prompt(language, count)
+    result = await get_llm_scheduler().submit(
+        'gemini-3-flash',
+        lambda: model.generate_content_async(prompt, request_options={"timeout": timeout} if timeout else None),
+        Priority.BACKGROUND,
+        estimate_tokens(prompt)
+    )
+    return _parse_rejection_batch(result.text)
+
+
+class RejectionPool:
+    """
+    Rotates through pre-generated rejection messages per language
+
+    Messages come from data/rejection_messages.json. A language without
+    messages is filled once with a single bulk Gemini call; concurrent
+    requests for that language wait for the same call instead of
+    starting their own.
+    """
+
+    def __init__(
+        self,
+        messages: Optional[Dict[str, List[str]]] = None,
+        batch_size: int = 8,
+        timeout: Optional[float] = None
+    ):
+        """
+        Initialize the pool
+
+        Args:
+            messages: Initial messages per language
+            batch_size: Number of variants requested when filling a language
+            timeout: Deadline in seconds for a bulk generation (None for no limit)
+        """
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._messages: Dict[str, List[str]] = {
+            language: list(variants) for language, variants in (messages or {}).items() if variants
+        }
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._fill_locks: Dict[str, tuple] = {}
+        self._failed_at: Dict[str, float] = {}
+        self.served = 0
+        self.pool_hits = 0
+        self.generations = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def load(cls, path: Path, batch_size: int = 8, timeout: Optional[float] = None) -> "RejectionPool":
+        """
+        Create a pool from a JSON file ({language: [messages]})
+
+        Args:
+            path: Pool file; a missing or invalid file yields an empty pool
+            batch_size: Number of variants requested when filling a language
+            timeout: Deadline in seconds for a bulk generation
+
+        Returns:
+            RejectionPool instance
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                messages = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Rejection message pool not loaded ({e}); messages will be generated on demand")
+            messages = {}
+        return cls(messages, batch_size=batch_size, timeout=timeout)
+
+    def _take(self, language: str) -> Optional[str]:
+        with self._lock:
+            variants = self._messages.get(language)
+            if not variants:
+                return None
+            position = self._positions.get(language, 0)
+            self._positions[language] = (position + 1) % len(variants)
+            return variants[position]
+
+    async def _fill(self, language: str):
+        # asyncio locks are bound to the loop they are first used on (the FastAPI
+        # loop, or the serverless runtime's loop in api/chat.py), so keep one per loop
+        loop = asyncio.get_running_loop()
+        owner, lock = self._fill_locks.get(language, (None, None))
+        if owner is not loop:
+            lock = asyncio.Lock()
+            self._fill_locks[language] = (loop, lock)
+        async with lock:
+            if self._messages.get(language):
+                return
+            if time.monotonic() - self._failed_at.get(language, -RETRY_AFTER_SECONDS) < RETRY_AFTER_SECONDS:
+                return
+            self.generations += 1
+            try:
+                variants = await asyncio.wait_for(
+                    agenerate_rejection_batch(language, self.batch_size, self.timeout),
+                    self.timeout
+                )
+            except asyncio.TimeoutError:
+                print(f"Warning: Rejection message generation exceeded {self.timeout}s deadline")
+                self._failed_at[language] = time.monotonic()
+                return
+            except Exception as error:
+                print(f"Error generating rejection messages: {error}")
+                self._failed_at[language] = time.monotonic()
+                return
+            if variants:
+                with self._lock:
+                    self._messages[language] = variants
+
+    async def next_message(self, language: str = "en") -> str:
+        """
+        Get the next rejection message for a language
+
+        Args:
+            language: Language code ("en" or "ko")
+
+        Returns:
+            Rejection message string
+        """
+        self.served += 1
+        message = self._take(language)
+        if message is not None:
+            self.pool_hits += 1
+            return message
+
+        await self._fill(language)
+        message = self._take(language)
+        if message is not None:
+            return message
+
+        self.fallbacks += 1
+        return FALLBACK_MESSAGES.get(language, FALLBACK_MESSAGES["en"])
+
+    def languages(self) -> List[str]:
+        """Languages that currently have messages"""
+        return sorted(self._messages)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool metrics
+
+        Returns:
+            Dictionary with served, pool_hits, hit_ratio, generations
+            (network calls), fallbacks and pool sizes per language
+        """
+        return {
+            "served": self.served,
+            "pool_hits": self.pool_hits,
+            "hit_ratio": self.pool_hits / self.served if self.served else 0.0,
+            "generations": self.generations,
+            "fallbacks": self.fallbacks,
+            "sizes": {language: len(variants) for language, variants in self._messages.items()},
+        }
+
+
+# Global instance
+_rejection_pool = None
+
+
+def get_rejection_pool() -> RejectionPool:
+    """Get or create global rejection pool instance"""
+    global _rejection_pool
+    if _rejection_pool is None:
+        _rejection_pool = RejectionPool.load(
+            Path(config.rejection_pool_path or DEFAULT_POOL_PATH),
+            batch_size=config.rejection_pool_batch_size,
+            timeout=config.rejection_timeout_seconds or None
+        )
+    return _rejection_pool
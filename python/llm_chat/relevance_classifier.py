@@ -0,0 +1,186 @@
+"""
+Relevance Classifier Module
+Local logistic-regression classifier over hashed character n-grams that
+decides query relevance without an LLM call when it is confident
+"""
+
+import json
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .config import config
+from .text_utils import normalize_query, hash_embed
+
+# Hashing space of the classifier features
+FEATURE_DIM = 1 << 14
+
+DEFAULT_WEIGHTS_PATH = Path(__file__).parent.parent / "data" / "relevance_classifier.npz"
+
+
+def featurize(queries: Sequence[str], dim: int = FEATURE_DIM) -> np.ndarray:
+    """
+    Turn queries into a dense feature matrix
+
+    Args:
+        queries: Raw user queries
+        dim: Hashing space size
+
+    Returns:
+        Array of shape (len(queries), dim) with L2-normalized rows
+    """
+    features = np.zeros((len(queries), dim), dtype=np.float32)
+    for row, query in enumerate(queries):
+        for index, weight in hash_embed(normalize_query(query), dim=dim).items():
+            features[row, index] = weight
+    return features
+
+
+def _sigmoid(values: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(values, -30, 30)))
+
+
+class RelevanceClassifier:
+    """
+    Binary logistic regression: probability that a query is about the profile
+
+    Weights are stored sparsely (only features seen during training are
+    non-zero) in a small .npz file.
+    """
+
+    def __init__(self, weights: np.ndarray, bias: float, dim: int = FEATURE_DIM):
+        """
+        Initialize the classifier
+
+        Args:
+            weights: Dense weight vector of length dim
+            bias: Intercept
+            dim: Hashing space size
+        """
+        self.weights = weights.astype(np.float32)
+        self.bias = float(bias)
+        self.dim = dim
+
+    @classmethod
+    def train(
+        cls,
+        queries: Sequence[str],
+        labels: Sequence[bool],
+        epochs: int = 400,
+        learning_rate: float = 2.0,
+        l2: float = 1e-4,
+        dim: int = FEATURE_DIM
+    ) -> "RelevanceClassifier":
+        """
+        Fit the classifier with full-batch gradient descent
+
+        Args:
+            queries: Training queries
+            labels: True for relevant, False for irrelevant
+            epochs: Number of gradient steps
+            learning_rate: Step size
+            l2: L2 regularization strength
+            dim: Hashing space size
+
+        Returns:
+            Trained RelevanceClassifier
+        """
+        features = featurize(queries, dim)
+        targets = np.asarray(labels, dtype=np.float32)
+        # Balance classes so the bias does not simply follow the majority label
+        positive_ratio = targets.mean()
+        sample_weights = np.where(targets == 1, 0.5 / positive_ratio, 0.5 / (1 - positive_ratio)).astype(np.float32)
+
+        weights = np.zeros(dim, dtype=np.float32)
+        bias = 0.0
+        for _ in range(epochs):
+            errors = (_sigmoid(features @ weights + bias) - targets) * sample_weights
+            weights -= learning_rate * (features.T @ errors / len(targets) + l2 * weights)
+            bias -= learning_rate * float(errors.mean())
+        return cls(weights, bias, dim)
+
+    def predict_proba(self, query: str) -> float:
+        """
+        Probability that a query is relevant to the profile
+
+        Args:
+            query: User's query
+
+        Returns:
+            Probability in [0, 1]
+        """
+        score = self.bias
+        for index, weight in hash_embed(normalize_query(query), dim=self.dim).items():
+            score += self.weights[index] * weight
+        return float(_sigmoid(np.float32(score)))
+
+    def predict_proba_batch(self, queries: Sequence[str]) -> np.ndarray:
+        """Vectorized predict_proba for many queries"""
+        return _sigmoid(featurize(queries, self.dim) @ self.weights + self.bias)
+
+    def save(self, path: Path):
+        """
+        Persist the classifier as a compressed sparse .npz file
+
+        Args:
+            path: Destination file
+        """
+        indices = np.flatnonzero(self.weights).astype(np.int32)
+        np.savez_compressed(
+            path,
+            indices=indices,
+            values=self.weights[indices].astype(np.float32),
+            bias=np.float32(self.bias),
+            dim=np.int32(self.dim),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "RelevanceClassifier":
+        """
+        Load a classifier saved with save()
+
+        Args:
+            path: .npz file
+
+        Returns:
+            RelevanceClassifier instance
+        """
+        with np.load(path) as stored:
+            dim = int(stored["dim"])
+            weights = np.zeros(dim, dtype=np.float32)
+            weights[stored["indices"]] = stored["values"]
+            return cls(weights, float(stored["bias"]), dim)
+
+
+def load_labelled_queries(path: Path) -> List[dict]:
+    """
+    Read a labelled query file (one {"query": str, "relevant": bool} per line)
+
+    Args:
+        path: JSONL file
+
+    Returns:
+        List of records
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# Global instance (False once loading failed, so it is not retried per request)
+_relevance_classifier = None
+
+
+def get_relevance_classifier() -> Optional[RelevanceClassifier]:
+    """Get the trained classifier, or None if disabled or no weights file exists"""
+    global _relevance_classifier
+    if not config.relevance_classifier_enabled:
+        return None
+    if _relevance_classifier is None:
+        path = Path(config.relevance_classifier_path or DEFAULT_WEIGHTS_PATH)
+        try:
+            _relevance_classifier = RelevanceClassifier.load(path)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Warning: Relevance classifier not available ({e}); using LLM for uncertain queries")
+            _relevance_classifier = False
+    return _relevance_classifier or None
@@ -3,102 +3,197 @@ Relevance Filter Module
 Filters out questions that are not related to Kangbeen Ko's profile
 """
 
+import asyncio
 import json
 import re
+from pathlib import Path
 from typing import Dict, Any, Optional
-import google.generativeai as genai
+from .cache import TTLCache
 from .config import config
+from .llm_backends import get_model_registry
+from .keyword_matcher import KeywordMatcher, load_keyword_matcher
+from .llm_scheduler import Priority, QuotaExceededError, get_llm_scheduler
+from .metrics import span
+from .rejection_pool import get_rejection_pool
+from .relevance_classifier import get_relevance_classifier
+from .text_utils import estimate_tokens, normalize_query
+
+
+# Model used for LLM relevance checks
+RELEVANCE_MODEL = 'gemini-2.0-flash-lite'
+
+# Keyword rules for the heuristic check (group -> rule name -> keywords)
+DEFAULT_KEYWORDS_PATH = Path(__file__).parent.parent / "data" / "relevance_keywords.json"
+
+# Group order of KeywordMatcher.match(); match_relevance_rule() leaves
+# queries that fire rules of both groups undecided
+_RULE_PRIORITY = ["irrelevant", "relevant"]
+
+_relevance_matcher: Optional[KeywordMatcher] = None
+
+# LLM verdicts keyed on normalized query text
+_verdict_memo: Optional[TTLCache] = None
+
+# LLM checks in flight, so concurrent identical queries share one call
+_pending_verdicts: Dict[str, "asyncio.Future"] = {}
+_coalesced_verdicts = 0
+
+
+def get_relevance_matcher() -> KeywordMatcher:
+    """Get or build the compiled keyword matcher for quick relevance checks"""
+    global _relevance_matcher
+    if _relevance_matcher is None:
+        path = config.relevance_keywords_path or DEFAULT_KEYWORDS_PATH
+        _relevance_matcher = load_keyword_matcher(path, priority=_RULE_PRIORITY)
+    return _relevance_matcher
+
+
+def get_verdict_memo() -> TTLCache:
+    """Get or create the memo of LLM relevance verdicts"""
+    global _verdict_memo
+    if _verdict_memo is None:
+        _verdict_memo = TTLCache(
+            max_entries=config.relevance_memo_max_entries,
+            ttl_seconds=config.relevance_memo_ttl_seconds
+        )
+    return _verdict_memo
+
+
+def get_relevance_stats() -> Dict[str, Any]:
+    """
+    Get hit ratios of the relevance memo and the rejection message pool
+
+    Returns:
+        Dictionary with "verdicts" (memo statistics plus calls coalesced
+        with an identical in-flight check) and "rejections" (pool statistics)
+    """
+    return {
+        "verdicts": dict(get_verdict_memo().get_stats(), coalesced=_coalesced_verdicts),
+        "rejections": get_rejection_pool().get_stats(),
+    }
+
+
+def match_relevance_rule(query: str) -> Optional[Dict[str, Any]]:
+    """
+    Find the heuristic rule that decides a query, if any
+
+    A query that fires both an irrelevant and a relevant rule ("그
+    프로젝트에서 정치적인 문제는?") is not decided here: Korean keywords
+    also match with a particle or ending, so an irrelevant keyword next to
+    a profile topic is too weak a signal to reject without the classifier
+    or the LLM.
+
+    Args:
+        query: User's question
+
+    Returns:
+        None if no rule fired or the groups disagree, otherwise a dictionary with:
+            - relevant (bool): Verdict of the rule
+            - rule (str): Rule name, e.g. "irrelevant:weather"
+            - keyword (str): Keyword that matched
+    """
+    if not query:
+        return None
+    hits = get_relevance_matcher().find_all(query)
+    if not hits or len({hit["group"] for hit in hits}) > 1:
+        return None
+    hit = hits[0]
+    return {
+        "relevant": hit["group"] == "relevant",
+        "rule": f"{hit['group']}:{hit['rule']}",
+        "keyword": hit["keyword"],
+    }
 
 
 def quick_relevance_check(query: str) -> Optional[bool]:
     """
     Fast heuristic check for obviously irrelevant questions
     Returns None if uncertain (needs LLM check), True/False if certain
-    
+
     Args:
         query: User's question
-        
+
     Returns:
         None if uncertain, True if likely relevant, False if obviously irrelevant
     """
-    if not query:
+    rule = match_relevance_rule(query)
+    if rule is None:
+        # Uncertain - needs LLM check
         return None
-    
-    query_lower = query.lower().strip()
-    
-    # Obviously irrelevant patterns (fast rejection)
-    irrelevant_patterns = [
-        r'\b(weather|날씨|기온|온도)\b',
-        r'\b(cooking|요리|레시피|음식)\b',
-        r'\b(sports|스포츠|축구|야구|농구)\b',
-        r'\b(movie|영화|드라마|배우)\b',
-        r'\b(music|음악|가수|노래)\b',
-        r'\b(game|게임|플레이)\b',
-        r'\b(stock|주식|투자|증권)\b',
-        r'\b(politics|정치|선거)\b',
-        r'\b(recipe|요리법)\b',
-        r'\b(how to cook|요리하는 방법)\b',
-        r'\b(what is the weather|날씨가 어때)\b',
-    ]
-    
-    for pattern in irrelevant_patterns:
-        if re.search(pattern, query_lower):
-            return False
-    
-    # Obviously relevant patterns (fast acceptance)
-    relevant_patterns = [
-        r'\b(kangbeen|고강빈|강빈)\b',
-        r'\b(research|연구|논문|paper|publication)\b',
-        r'\b(education|교육|학력|degree|학교)\b',
-        r'\b(experience|경력|work|직장|회사)\b',
-        r'\b(project|프로젝트)\b',
-        r'\b(skill|기술|능력|programming|개발)\b',
-        r'\b(award|수상|상|prize)\b',
-        r'\b(cv|이력서|resume)\b',
-        r'\b(background|배경|소개|introduction|about)\b',
-        r'\b(what do you|당신은|너는|you are|your)\b',
-        r'\b(hello|hi|안녕|인사)\b',
-    ]
-    
-    for pattern in relevant_patterns:
-        if re.search(pattern, query_lower):
-            return True
-    
-    # Uncertain - needs LLM check
-    return None
+    return rule["relevant"]
 
 
-async def check_relevance(query: str) -> Dict[str, Any]:
+def local_relevance_check(query: str) -> Optional[Dict[str, Any]]:
     """
-    Check if the user's question is relevant to Kangbeen Ko's profile
-    
+    Decide relevance without any network call, if possible
+
+    Tries the keyword heuristics first, then the local classifier. The
+    classifier only decides when its probability falls outside the
+    configured confidence band.
+
     Args:
         query: User's question
-        
+
     Returns:
-        Dictionary with:
+        None if the LLM has to decide, otherwise a dictionary with:
             - relevant (bool): Whether the question is relevant
             - reason (str, optional): Reason for rejection if not relevant
+            - rule (str): "relevant:<rule>", "irrelevant:<rule>" or "classifier"
+            - confidence (float, optional): Classifier probability of relevance
     """
-    # Fast heuristic check first
-    quick_result = quick_relevance_check(query)
-    if quick_result is False:
+    rule = match_relevance_rule(query)
+    if rule is not None and not rule["relevant"]:
         return {
             "relevant": False,
-            "reason": "Question is clearly unrelated to the profile."
+            "reason": "Question is clearly unrelated to the profile.",
+            "rule": rule["rule"]
         }
-    if quick_result is True:
+    if rule is not None:
         return {
             "relevant": True,
-            "reason": None
+            "reason": None,
+            "rule": rule["rule"]
+        }
+
+    classifier = get_relevance_classifier()
+    if classifier is None or not query:
+        return None
+    probability = classifier.predict_proba(query)
+    if probability >= config.relevance_classifier_relevant_threshold:
+        return {
+            "relevant": True,
+            "reason": None,
+            "rule": "classifier",
+            "confidence": probability
+        }
+    if probability <= config.relevance_classifier_irrelevant_threshold:
+        return {
+            "relevant": False,
+            "reason": "Question is unrelated to the profile (local classifier).",
+            "rule": "classifier",
+            "confidence": probability
         }
+    return None
+
+
+async def _llm_relevance_check(query: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Ask Gemini whether a query is relevant
+
+    Args:
+        query: User's question
+        timeout: Request timeout in seconds passed to the client
+
+    Returns:
+        Dictionary with relevant (bool) and reason
+
+    Raises:
+        QuotaExceededError: If Gemini kept rejecting the call for quota
+        Exception: If the call fails or the response is not valid JSON
+    """
+    model = get_model_registry().get_generative_model(RELEVANCE_MODEL)
     
-    # If uncertain, use LLM
-    try:
-        # Use Gemini to determine relevance
-        model = genai.GenerativeModel('gemini-2.0-flash-lite')
-        
-        prompt = f"""
+    prompt = f"""
 Determine whether the user's question meets the following conditions:
 
 1. If the question is a simple greeting (e.g., "Hello", "Hi") or is asking about your name, identity, or general introduction, set "relevant" to true.
@@ -117,88 +212,174 @@ Example:
 Question: "{query}"
 """
 
-        result = model.generate_content(prompt)
-        response_text = result.text.strip()
+    result = await get_llm_scheduler().submit(
+        RELEVANCE_MODEL,
+        lambda: model.generate_content_async(prompt, request_options={"timeout": timeout} if timeout else None),
+        Priority.RELEVANCE,
+        estimate_tokens(prompt)
+    )
+    response_text = result.text.strip()
+    
+    # Clean up JSON response
+    response_text = re.sub(r'^```json\s*', '', response_text, flags=re.IGNORECASE)
+    response_text = re.sub(r'```$', '', response_text)
+    response_text = response_text.strip()
+    
+    parsed = json.loads(response_text)
+    relevant = bool(parsed.get('relevant', True))
+    
+    if not relevant:
+        reason = parsed.get('reason', 'This question is not related to Kangbeen Ko\'s profile.')
+    else:
+        reason = None
         
-        # Clean up JSON response
-        response_text = re.sub(r'^```json\s*', '', response_text, flags=re.IGNORECASE)
-        response_text = re.sub(r'```$', '', response_text)
-        response_text = response_text.strip()
+    return {
+        "relevant": relevant,
+        "reason": reason
+    }
+
+
+def _quota_fallback_verdict(query: str) -> Dict[str, Any]:
+    """
+    Verdict when the LLM check is out of quota
+
+    Uses the local classifier's probability at an even threshold (the
+    confidence band only decides when the LLM is available); assumes
+    relevant without a classifier. Not memoized.
+    """
+    classifier = get_relevance_classifier()
+    if classifier is None or not query:
+        return {"relevant": True, "reason": None, "rule": "quota"}
+    probability = classifier.predict_proba(query)
+    return {
+        "relevant": probability >= 0.5,
+        "reason": None if probability >= 0.5 else "Question is unrelated to the profile (local classifier).",
+        "rule": "quota",
+        "confidence": probability
+    }
+
+
+async def check_relevance(query: str) -> Dict[str, Any]:
+    """
+    Check if the user's question is relevant to Kangbeen Ko's profile
+
+    Local checks (keyword rules, then classifier) decide first; queries
+    they leave open go to check_relevance_with_llm.
+    
+    Args:
+        query: User's question
         
-        try:
-            parsed = json.loads(response_text)
-            relevant = bool(parsed.get('relevant', True))
-            
-            if not relevant:
-                reason = parsed.get('reason', 'This question is not related to Kangbeen Ko\'s profile.')
-            else:
-                reason = None
-                
-            return {
-                "relevant": relevant,
-                "reason": reason
-            }
-        except json.JSONDecodeError:
-            # Fallback: if JSON parsing fails, assume relevant (safer default)
-            print(f"Warning: Failed to parse relevance check response. Assuming relevant.")
-            return {
-                "relevant": True,
-                "reason": None
-            }
-            
+    Returns:
+        Dictionary with:
+            - relevant (bool): Whether the question is relevant
+            - reason (str, optional): Reason for rejection if not relevant
+    """
+    # Fast local checks first (keyword heuristics, then classifier)
+    with span("relevance_quick"):
+        local_result = local_relevance_check(query)
+    if local_result is not None:
+        return local_result
+    return await check_relevance_with_llm(query)
+
+
+async def check_relevance_with_llm(query: str) -> Dict[str, Any]:
+    """
+    LLM relevance verdict for a query the local checks left open
+
+    Callers that already ran local_relevance_check use this directly, so
+    the local tiers run (and are timed) once per request. Verdicts are
+    memoized on the normalized query text, and concurrent identical
+    queries wait for the same LLM call. If the request running that call
+    is cancelled, waiting requests check on their own.
+
+    Args:
+        query: User's question
+
+    Returns:
+        Same dictionary as check_relevance
+    """
+    key = normalize_query(query)
+    memo = get_verdict_memo()
+    cached = memo.get(key) if key else None
+    if cached is not None:
+        return dict(cached, rule="memo")
+
+    loop = asyncio.get_running_loop()
+    pending = _pending_verdicts.get(key)
+    if pending is not None and pending.get_loop() is loop:
+        global _coalesced_verdicts
+        _coalesced_verdicts += 1
+        while pending is not None and pending.get_loop() is loop:
+            shared = await asyncio.shield(pending)
+            if shared is not None:
+                return dict(shared, rule="memo")
+            # The leading request was cancelled: the first waiter to resume
+            # runs the check, the others wait for it
+            pending = _pending_verdicts.get(key)
+
+    future = loop.create_future()
+    if key:
+        _pending_verdicts[key] = future
+    
+    # If uncertain, use LLM (within the relevance stage deadline)
+    timeout = config.relevance_timeout_seconds or None
+    try:
+        with span("relevance_llm"):
+            result = await asyncio.wait_for(_llm_relevance_check(query, timeout), timeout)
+        if key:
+            memo.set(key, result)
+        future.set_result(result)
+    except asyncio.TimeoutError:
+        print(f"Warning: Relevance check exceeded {timeout}s deadline. Assuming relevant.")
+        result = {
+            "relevant": True,
+            "reason": None
+        }
+        future.set_result(result)
+    except QuotaExceededError as error:
+        # Out of quota: let the local classifier decide if it can lean either way
+        result = _quota_fallback_verdict(query)
+        print(f"Warning: Relevance check out of quota ({error}). Classifier verdict: {result['relevant']}")
+        future.set_result(result)
+    except json.JSONDecodeError:
+        # Fallback: if JSON parsing fails, assume relevant (safer default)
+        print(f"Warning: Failed to parse relevance check response. Assuming relevant.")
+        result = {
+            "relevant": True,
+            "reason": None
+        }
+        future.set_result(result)
     except Exception as error:
         print(f"Error checking relevance: {error}")
         # On error, assume relevant (safer default)
-        return {
+        result = {
             "relevant": True,
             "reason": None
         }
+        future.set_result(result)
+    finally:
+        if _pending_verdicts.get(key) is future:
+            del _pending_verdicts[key]
+        # Cancelled before a verdict: tell waiting requests to check on their own
+        if not future.done():
+            future.set_result(None)
+
+    return result
 
 
 async def generate_rejection_message(query: str, language: str = "en") -> str:
     """
-    Generate a rejection message for irrelevant questions using Gemini
+    Get a rejection message for irrelevant questions
+
+    Messages are rotated from a per-language pool generated in bulk ahead
+    of time (see rejection_pool.py), so this makes no LLM call once the
+    pool for the language is filled.
     
     Args:
         query: User's question that was rejected
         language: Language code ("en" or "ko")
         
     Returns:
-        Generated rejection message string
+        Rejection message string
     """
-    try:
-        # Use Gemini 2.5 Flash to generate a simple, polite rejection message
-        model = genai.GenerativeModel('gemini-3-flash')
-        
-        prompt = f"""
-You are Kangbeen Ko(고강빈)'s digital twin assistant. A user asked a question that is not related to Kangbeen Ko's profile.
-
-Generate a brief, polite rejection message that:
-1. Politely declines to answer the unrelated question
-2. Keeps it concise (1-2 sentences)
-3. Responds in {"Korean" if language == "ko" else "English"}
-4. **IMPORTANT**: Do NOT use titles or any honorifics. Simply refer to "Kangbeen Ko" or "고강빈" without titles.
-    
-User's question: "{query}"
-
-Rejection message:
-"""
-        
-        result = model.generate_content(prompt)
-        rejection_message = result.text.strip()
-        
-        # Clean up any markdown or extra formatting
-        rejection_message = re.sub(r'^["\']|["\']$', '', rejection_message)  # Remove quotes
-        rejection_message = rejection_message.strip()
-        
-        return rejection_message
-        
-    except Exception as error:
-        print(f"Error generating rejection message: {error}")
-        # Fallback to default message
-        messages = {
-            "en": "Sorry, your question is not related to Kangbeen Ko's profile. Please ask about his background, education, research, publications, projects, or career.",
-            "ko": "죄송합니다. 질문이 고강빈의 프로필과 관련이 없습니다. 배경, 교육, 연구, 논문, 프로젝트, 경력에 대해 물어보세요."
-        }
-        return messages.get(language, messages["en"])
-
+    return await get_rejection_pool().next_message(language)
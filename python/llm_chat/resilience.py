@@ -0,0 +1,402 @@
+"""
+Resilience Module
+Hedged requests and a circuit breaker for answer generation, plus degraded
+answers (cached answer or profile summary) served while Gemini is failing
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+from .config import config
+from .language_detector import detect_language
+from .long_term_memory import get_long_term_memory
+from .response_cache import get_response_cache
+from .retrieval import _section_title, get_profile_retriever
+
+T = TypeVar("T")
+
+# Latencies kept for the hedge delay percentile
+LATENCY_SAMPLE_SIZE = 200
+
+# State transitions kept for /health
+TRANSITION_HISTORY = 20
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Site link pointing at each profile section (degraded answers)
+_SECTION_LINKS = {
+    "education": "Education",
+    "skills": "Skills",
+    "publications": "Papers",
+    "experiences": "Experiences",
+    "projects": "Projects",
+    "awards": "Awards",
+}
+
+_DEGRADED_TEMPLATES = {
+    "ko": (
+        "지금은 답변을 생성하기 어려워 관련 프로필 정보를 대신 보여드립니다.\n\n"
+        "{section}\n{items}\n\n자세한 내용은 <link>{link}</link>에서 확인하실 수 있습니다."
+    ),
+    "en": (
+        "I can't write a full answer right now, so here is the related part of Kangbeen's profile.\n\n"
+        "{section}\n{items}\n\nYou can find more details in <link>{link}</link>."
+    ),
+}
+
+
+class Hedger:
+    """
+    Sends a second (hedge) request when the first one is slow
+
+    The hedge delay is a percentile of recent successful call latencies, so
+    only the slowest few percent of calls are duplicated. Whichever request
+    answers first wins; the other is cancelled.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_delay: float = 1.0,
+        initial_delay: float = 8.0,
+        min_samples: int = 20,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the hedger
+
+        Args:
+            percentile: Latency percentile used as hedge delay
+            min_delay: Smallest hedge delay in seconds
+            initial_delay: Hedge delay until min_samples latencies are known
+            min_samples: Latencies needed before the percentile is used
+            clock: Monotonic clock in seconds
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.clock = clock
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLE_SIZE)
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def delay(self) -> float:
+        """Seconds to wait before sending the hedge request"""
+        if len(self._latencies) < self.min_samples:
+            return max(self.initial_delay, self.min_delay)
+        ordered = sorted(self._latencies)
+        return max(ordered[int(self.percentile * (len(ordered) - 1))], self.min_delay)
+
+    def record(self, seconds: float):
+        """Add the latency of a successful call"""
+        self._latencies.append(seconds)
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a call, hedging it after delay()
+
+        Args:
+            call: Zero-argument function returning the call's awaitable;
+                called a second time for the hedge, so it must be safe to repeat
+
+        Returns:
+            Result of the first request that succeeds
+
+        Raises:
+            Exception: The last error, if every request failed
+        """
+        self.calls += 1
+        delay = self.delay()
+        started = [self.clock()]
+        tasks: List["asyncio.Task"] = [asyncio.ensure_future(call())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            # A fast failure is not hedged: the scheduler already retried quota errors
+            if not done:
+                self.hedged += 1
+                started.append(self.clock())
+                tasks.append(asyncio.ensure_future(call()))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        index = tasks.index(task)
+                        self.hedge_wins += index
+                        self.record(self.clock() - started[index])
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hedging metrics
+
+        Returns:
+            Dictionary with calls, hedged, hedge_wins, hedge_rate,
+            current delay_ms and latency samples
+        """
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": self.hedged / self.calls if self.calls else 0.0,
+            "delay_ms": self.delay() * 1000,
+            "samples": len(self._latencies),
+        }
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing upstream for a cool-down period
+
+    Closed: calls go through, and the outcome of the last `window` calls is
+    kept. The breaker opens when at least min_calls are recorded and the
+    error rate or the share of slow calls reaches its threshold. Open:
+    calls are refused until the cool-down has passed. Half-open: a single
+    probe call is let through; success closes the breaker, failure opens it
+    again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        error_rate: float = 0.5,
+        slow_seconds: float = 15.0,
+        slow_rate: float = 0.8,
+        cooldown_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize a closed breaker
+
+        Args:
+            name: Name used in logs
+            window: Number of recent calls the rates are computed over
+            min_calls: Calls needed in the window before the breaker can open
+            error_rate: Error rate that opens the breaker
+            slow_seconds: Latency from which a successful call counts as slow
+            slow_rate: Share of slow calls that opens the breaker
+            cooldown_seconds: Time the breaker stays open before a probe
+            clock: Monotonic clock in seconds
+        """
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_seconds = slow_seconds
+        self.slow_rate = slow_rate
+        self.cooldown_seconds = cooldown_seconds
+        self.clock = clock
+        self.state = CLOSED
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)  # (failed, slow)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._transitions: Deque[Dict[str, Any]] = deque(maxlen=TRANSITION_HISTORY)
+        self.opened = 0
+        self.rejected = 0
+
+    def _rates(self) -> Tuple[float, float]:
+        if not self._outcomes:
+            return 0.0, 0.0
+        failed = sum(1 for outcome in self._outcomes if outcome[0])
+        slow = sum(1 for outcome in self._outcomes if outcome[1])
+        return failed / len(self._outcomes), slow / len(self._outcomes)
+
+    def _transition(self, state: str, reason: str):
+        self._transitions.append({"from": self.state, "to": state, "reason": reason, "at": time.time()})
+        print(f"Warning: Circuit breaker '{self.name}' {self.state} -> {state} ({reason})")
+        self.state = state
+        if state == OPEN:
+            self.opened += 1
+            self._opened_at = self.clock()
+        elif state == CLOSED:
+            self._outcomes.clear()
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go upstream now
+
+        A True result in the half-open state reserves the probe, so it must
+        be followed by record_success, record_failure or release.
+        """
+        with self._lock:
+            if self.state == OPEN and self.clock() - self._opened_at >= self.cooldown_seconds:
+                self._transition(HALF_OPEN, "cool-down over")
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, seconds: float):
+        """Record a call that succeeded after seconds"""
+        with self._lock:
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN:
+                self._transition(CLOSED, f"probe answered in {seconds:.1f}s")
+                return
+            self._outcomes.append((False, seconds >= self.slow_seconds))
+            self._check()
+
+    def record_failure(self):
+        """Record a call that failed or ran out of time"""
+        with self._lock:
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN:
+                self._transition(OPEN, "probe failed")
+                return
+            self._outcomes.append((True, False))
+            self._check()
+
+    def release(self):
+        """Forget a call that was cancelled before it finished"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _check(self):
+        if self.state != CLOSED or len(self._outcomes) < self.min_calls:
+            return
+        error_rate, slow_rate = self._rates()
+        if error_rate >= self.error_rate:
+            self._transition(OPEN, f"error rate {error_rate:.0%} over {len(self._outcomes)} calls")
+        elif slow_rate >= self.slow_rate:
+            self._transition(OPEN, f"{slow_rate:.0%} of {len(self._outcomes)} calls slower than {self.slow_seconds}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get breaker metrics
+
+        Returns:
+            Dictionary with state, error_rate and slow_rate over the window,
+            calls in the window, times opened, calls rejected, seconds until
+            the next probe (when open) and recent transitions
+        """
+        with self._lock:
+            error_rate, slow_rate = self._rates()
+            retry_in = 0.0
+            if self.state == OPEN:
+                retry_in = max(self.cooldown_seconds - (self.clock() - self._opened_at), 0.0)
+            return {
+                "state": self.state,
+                "error_rate": error_rate,
+                "slow_rate": slow_rate,
+                "window_calls": len(self._outcomes),
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "retry_in_seconds": round(retry_in, 1),
+                "transitions": list(self._transitions),
+            }
+
+
+# Degraded answers served, by source
+_degraded_stats: Dict[str, int] = {
+    "cache": 0,
+    "profile": 0,
+    "unavailable": 0,
+}
+
+
+def build_degraded_answer(query: str) -> Optional[Tuple[str, str]]:
+    """
+    Answer a query without the LLM
+
+    Uses the cached answer of the same (or a similar) first-turn question if
+    there is one, otherwise a templated summary of the best matching
+    long-term memory section.
+
+    Args:
+        query: User's query
+
+    Returns:
+        Tuple of (answer, source) where source is "cache" (answer already
+        linkified) or "profile" (answer with <link> tags), or None if no
+        profile section matches
+    """
+    language = detect_language(query)
+    ltm = get_long_term_memory()
+    if config.response_cache_enabled:
+        # Not a first-turn lookup, so it stays out of the cache's hit/miss stats
+        cached = get_response_cache().peek(query, language, ltm.content_hash)
+        if cached is not None:
+            _degraded_stats["cache"] += 1
+            return cached["response"], "cache"
+
+    passages = get_profile_retriever().retrieve(query, config.retrieval_top_k)
+    if not passages:
+        _degraded_stats["unavailable"] += 1
+        return None
+    category = passages[0]["category"]
+    # First line of each passage: title, venue or company, and date
+    items = [passage["text"].split("\n", 1)[0] for passage in passages if passage["category"] == category]
+    _degraded_stats["profile"] += 1
+    answer = _DEGRADED_TEMPLATES.get(language, _DEGRADED_TEMPLATES["en"]).format(
+        section=_section_title(category),
+        items="\n".join(items),
+        link=_SECTION_LINKS.get(category, "CV"),
+    )
+    return answer, "profile"
+
+
+# Global instances
+_generation_hedger = None
+_generation_breaker = None
+
+
+def get_generation_hedger() -> Hedger:
+    """Get or create global hedger for answer generation"""
+    global _generation_hedger
+    if _generation_hedger is None:
+        _generation_hedger = Hedger(
+            percentile=config.hedge_percentile,
+            min_delay=config.hedge_min_delay_seconds,
+            initial_delay=config.hedge_initial_delay_seconds,
+            min_samples=config.hedge_min_samples
+        )
+    return _generation_hedger
+
+
+def get_generation_breaker() -> CircuitBreaker:
+    """Get or create global circuit breaker for answer generation"""
+    global _generation_breaker
+    if _generation_breaker is None:
+        _generation_breaker = CircuitBreaker(
+            "generation",
+            window=config.breaker_window,
+            min_calls=config.breaker_min_calls,
+            error_rate=config.breaker_error_rate,
+            slow_seconds=config.breaker_slow_seconds,
+            slow_rate=config.breaker_slow_rate,
+            cooldown_seconds=config.breaker_cooldown_seconds
+        )
+    return _generation_breaker
+
+
+def get_resilience_stats() -> Dict[str, Any]:
+    """
+    Get hedging, circuit breaker and degraded answer metrics
+
+    Returns:
+        Dictionary with hedging, breaker and degraded (answers by source)
+    """
+    return {
+        "hedging": get_generation_hedger().get_stats(),
+        "breaker": get_generation_breaker().get_stats(),
+        "degraded": dict(_degraded_stats),
+    }
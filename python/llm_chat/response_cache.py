@@ -0,0 +1,193 @@
+"""
+Response Cache Module
+Semantic cache for first-turn answers, keyed on normalized query, language
+and profile version
+"""
+
+from typing import Any, Dict, Optional, Tuple
+from .cache import TTLCache
+from .config import config
+from .text_utils import normalize_query, hash_embed, cosine_similarity, content_words, extract_numbers
+
+
+class ResponseCache:
+    """
+    Caches generated answers for history-free questions
+
+    A lookup first tries the exact normalized query, then falls back to the
+    most similar cached query (hashing char-n-gram embeddings) if its cosine
+    similarity clears the threshold. Entries are scoped by language and
+    profile content hash, so editing profile_data.json invalidates them.
+    A semantic hit also needs the same numbers and the same content words
+    (see content_words): "does he use" and "does he not use" share almost
+    every n-gram.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: Optional[float] = 3600,
+        similarity_threshold: float = 0.88
+    ):
+        """
+        Initialize the response cache
+
+        Args:
+            max_entries: Maximum number of cached answers (LRU eviction)
+            ttl_seconds: Lifetime of a cached answer in seconds
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+        """
+        self.similarity_threshold = similarity_threshold
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def _find(self, normalized: str, language: str, profile_hash: str) -> Tuple[Optional[Tuple[str, str, str]], bool]:
+        """
+        Find the key of the best cached answer
+
+        Returns:
+            Tuple of (key or None, whether the match is exact)
+        """
+        key = (language, profile_hash, normalized)
+        if self._cache.peek(key) is not None:
+            return key, True
+
+        vector = hash_embed(normalized)
+        numbers = extract_numbers(normalized)
+        words = content_words(normalized)
+        best_key, best_score = None, self.similarity_threshold
+        for key, candidate in self._cache.items():
+            if key[0] != language or key[1] != profile_hash:
+                continue
+            # Queries that differ only by a year or count must not share answers
+            if candidate["numbers"] != numbers:
+                continue
+            # Nor queries that differ by a negation or a word such as "failures"
+            if candidate["words"] != words:
+                continue
+            score = cosine_similarity(vector, candidate["vector"])
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key, False
+
+    def lookup(self, query: str, language: str, profile_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached answer for a query
+
+        Args:
+            query: User's query
+            language: Detected language ("en" or "ko")
+            profile_hash: Content hash of the long-term memory
+
+        Returns:
+            Cached entry with 'response' (linkified) and 'raw_response', or None
+        """
+        normalized = normalize_query(query)
+        key, exact = self._find(normalized, language, profile_hash) if normalized else (None, False)
+        if key is None:
+            self.misses += 1
+            return None
+        if exact:
+            self.exact_hits += 1
+        else:
+            self.semantic_hits += 1
+        # Also refreshes the LRU position
+        return self._cache.get(key)
+
+    def peek(self, query: str, language: str, profile_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached answer without counting a hit or miss or touching LRU order
+
+        Used for degraded answers, which are not cache lookups of a
+        first-turn request.
+
+        Args:
+            query: User's query
+            language: Detected language ("en" or "ko")
+            profile_hash: Content hash of the long-term memory
+
+        Returns:
+            Cached entry with 'response' (linkified) and 'raw_response', or None
+        """
+        normalized = normalize_query(query)
+        if not normalized:
+            return None
+        key, _ = self._find(normalized, language, profile_hash)
+        return self._cache.peek(key) if key is not None else None
+
+    def store(
+        self,
+        query: str,
+        language: str,
+        profile_hash: str,
+        response: str,
+        raw_response: Optional[str] = None
+    ):
+        """
+        Cache an answer
+
+        Args:
+            query: User's query
+            language: Detected language ("en" or "ko")
+            profile_hash: Content hash of the long-term memory
+            response: Linkified response returned to the user
+            raw_response: Response as stored in conversation memory (with <link> tags)
+        """
+        normalized = normalize_query(query)
+        if not normalized:
+            return
+        self._cache.set((language, profile_hash, normalized), {
+            "query": normalized,
+            "vector": hash_embed(normalized),
+            "numbers": extract_numbers(normalized),
+            "words": content_words(normalized),
+            "response": response,
+            "raw_response": raw_response if raw_response is not None else response,
+        })
+        self.stores += 1
+
+    def clear(self):
+        """Remove every cached answer"""
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss metrics
+
+        Returns:
+            Dictionary with hits (exact/semantic), misses, hit_ratio, stores,
+            size, evictions and expirations
+        """
+        hits = self.exact_hits + self.semantic_hits
+        lookups = hits + self.misses
+        storage = self._cache.get_stats()
+        return {
+            "hits": hits,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "size": storage["size"],
+            "evictions": storage["evictions"],
+            "expirations": storage["expirations"],
+        }
+
+
+# Global instance
+_response_cache = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get or create global response cache instance"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_entries=config.response_cache_max_entries,
+            ttl_seconds=config.response_cache_ttl_seconds,
+            similarity_threshold=config.response_cache_threshold
+        )
+    return _response_cache
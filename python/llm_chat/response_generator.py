@@ -3,129 +3,213 @@ Response Generator module
 Generates chat responses using Google Generative AI with long-term memory context
 """
 
+import asyncio
 import re
-import sys
-import logging
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Awaitable, Callable, Mapping, Optional, AsyncIterator, Sequence, Set, Tuple
 from datetime import datetime
-import google.generativeai as genai
 from .config import config
+from .llm_backends import get_model_registry
+from .link_resolver import LinkResolver
+from .llm_scheduler import Priority, QuotaExceededError, get_llm_scheduler
 from .long_term_memory import get_long_term_memory
+from .metrics import get_chat_metrics, span
+from .observability import get_logger
+from .resilience import build_degraded_answer, get_generation_breaker, get_generation_hedger
+from .retrieval import get_prompt_context
+from .text_utils import estimate_tokens
 
-# Set up logger
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+# Set up logger (level from CHAT_LOG_LEVEL, written by a background thread)
+logger = get_logger(__name__)
 
-# Create console handler if not exists
-if not logger.handlers:
-    console_handler = logging.StreamHandler(sys.stderr)
-    console_handler.setLevel(logging.DEBUG)
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
+# Returned when the LLM call fails
+GENERATION_ERROR_MESSAGE = "죄송합니다. 응답을 생성하는 중에 오류가 발생했습니다. 다시 시도해주세요."
 
-def linkify_response(response_text: str, links: List[Dict[str, str]]) -> str:
+# Returned when Gemini keeps rejecting the call for quota (429) after retries
+QUOTA_ERROR_MESSAGE = "죄송합니다. 지금은 요청이 많아 답변할 수 없습니다. 잠시 후 다시 시도해주세요."
+
+# Responses that are not answers (never cached or shared)
+ERROR_MESSAGES = (GENERATION_ERROR_MESSAGE, QUOTA_ERROR_MESSAGE)
+
+# Model used for answers (LangChain chains and direct prompts)
+GENERATION_MODEL = 'gemini-2.5-flash'
+
+
+# <link>label</link> tags written by the LLM
+_LINK_TAG_PATTERN = re.compile(r'<link>([^<]+)</link>')
+
+
+def _anchor(text: str, href: str) -> str:
+    """HTML anchor for a resolved link (external links open in a new tab)"""
+    if href.startswith('http'):
+        return f'<a href="{href}" target="_blank" rel="noopener noreferrer" class="text-blue-600 underline font-bold hover:text-blue-800">{text}</a>'
+    return f'<a href="{href}" class="text-blue-600 underline font-bold hover:text-blue-800">{text}</a>'
+
+
+# Resolvers for link lists other than the snapshot's: id(links) -> (links, resolver)
+_link_resolvers: Dict[int, Tuple[Sequence[Mapping[str, str]], LinkResolver]] = {}
+_LINK_RESOLVER_CACHE_SIZE = 8
+
+
+def get_link_resolver(links: Sequence[Mapping[str, str]]) -> LinkResolver:
     """
-    Parse <link> tags from LLM response and convert them to HTML links
+    Get the resolver for a link list
 
     Args:
-        response_text: Original response text with <link>label</link> tags
-        links: List of site map links with 'label' and 'href'
+        links: Site links with 'label' and 'href' (not modified afterwards)
 
     Returns:
-        Response text with HTML links added
+        The profile snapshot's prebuilt resolver for its own site links,
+        otherwise a resolver cached per link list object
     """
+    snapshot = get_long_term_memory().snapshot()
+    if links is snapshot.site_links:
+        return snapshot.link_resolver
+    cached = _link_resolvers.get(id(links))
+    if cached is not None and cached[0] is links:
+        return cached[1]
+    resolver = LinkResolver(links, max_distance=config.link_fuzzy_max_distance)
+    if len(_link_resolvers) >= _LINK_RESOLVER_CACHE_SIZE:
+        _link_resolvers.pop(next(iter(_link_resolvers)))
+    _link_resolvers[id(links)] = (links, resolver)
+    return resolver
+
+
+def _linkify(response_text: str, resolver: LinkResolver, auto_link: bool, linked: Optional[Set[str]] = None) -> str:
     result = response_text
-    
-    # Create a mapping of labels to hrefs for quick lookup
-    link_map = {link["label"]: link["href"] for link in links}
-    
-    # Pattern to match <link>label</link> tags
-    link_pattern = re.compile(r'<link>([^<]+)</link>')
-    
+    if auto_link:
+        # Wrap untagged title mentions first, right to left to keep offsets valid
+        for start, end, _, href in reversed(resolver.find_mentions(result, linked)):
+            result = result[:start] + _anchor(result[start:end], href) + result[end:]
+
     def replace_link(match):
         label = match.group(1).strip()
-        
-        # Find matching link (case-insensitive, exact match preferred)
-        href = None
-        for link_label, link_href in link_map.items():
-            if link_label.lower() == label.lower():
-                href = link_href
-                break
-        
-        # If no exact match found, return the original text without link tag
-        if href is None:
+        resolved = resolver.resolve(label)
+        # Unknown labels are shown without a link
+        if resolved is None:
             return label
-        
-        # Determine if external link
-        is_external = href.startswith('http')
-        
-        # Create anchor tag
-        if is_external:
-            return f'<a href="{href}" target="_blank" rel="noopener noreferrer" class="text-blue-600 underline font-bold hover:text-blue-800">{label}</a>'
-        else:
-            return f'<a href="{href}" class="text-blue-600 underline font-bold hover:text-blue-800">{label}</a>'
-    
-    # Replace all <link> tags with HTML anchor tags
-    result = link_pattern.sub(replace_link, result)
-    
-    return result
+        return _anchor(label, resolved[1])
 
+    return _LINK_TAG_PATTERN.sub(replace_link, result)
 
-async def generate_response(
+
+def linkify_response(response_text: str, links: Sequence[Mapping[str, str]], auto_link: Optional[bool] = None) -> str:
+    """
+    Parse <link> tags from LLM response and convert them to HTML links
+
+    Labels are matched case-insensitively, then by normalized words, word
+    prefix and edit distance (see LinkResolver), so "the LEGOLAS paper"
+    still links to the LEGOLAS publication.
+
+    Args:
+        response_text: Original response text with <link>label</link> tags
+        links: List of site map links with 'label' and 'href'
+        auto_link: Also link the first untagged mention of each
+            publication/project title (defaults to CHAT_LINK_AUTO_LINK)
+
+    Returns:
+        Response text with HTML links added
+    """
+    resolver = get_link_resolver(links)
+    return _linkify(response_text, resolver, config.link_auto_link if auto_link is None else auto_link)
+
+
+# Opening tag that may still be incomplete at the end of a streamed chunk
+_LINK_OPEN_TAG = "<link>"
+
+
+class StreamingLinkifier:
+    """
+    Incrementally applies linkify_response to streamed text
+
+    Text is released as soon as it cannot be part of an unfinished
+    <link>...</link> tag, so concatenating every returned piece gives the
+    same result as calling linkify_response on the full response.
+    """
+
+    def __init__(self, links: Sequence[Mapping[str, str]], auto_link: Optional[bool] = None):
+        """
+        Initialize the linkifier
+
+        Args:
+            links: List of site map links with 'label' and 'href'
+            auto_link: Link untagged title mentions (defaults to CHAT_LINK_AUTO_LINK)
+        """
+        self.links = links
+        self.auto_link = config.link_auto_link if auto_link is None else auto_link
+        self._resolver = get_link_resolver(links)
+        # Labels linked so far, so only the first mention is auto-linked
+        self._linked: Set[str] = set()
+        self._buffer = ""
+
+    def _safe_cut(self) -> int:
+        """Index up to which the buffer contains only complete tags"""
+        buffer = self._buffer
+
+        # An opened <link> without its closing tag must wait for more text
+        open_index = buffer.rfind(_LINK_OPEN_TAG)
+        if open_index != -1 and buffer.find("</link>", open_index) == -1:
+            return open_index
+
+        # The buffer may end with the first characters of "<link>"
+        cut = len(buffer)
+        tail_start = buffer.rfind("<", max(0, len(buffer) - len(_LINK_OPEN_TAG) + 1))
+        if tail_start != -1 and _LINK_OPEN_TAG.startswith(buffer[tail_start:]):
+            cut = tail_start
+
+        # A title mention may continue in the next chunk
+        if self.auto_link:
+            cut = self._resolver.stream_cut(buffer, cut)
+        return cut
+
+    def feed(self, chunk: str) -> str:
+        """
+        Add a streamed chunk
+
+        Args:
+            chunk: Raw text produced by the LLM
+
+        Returns:
+            Linkified text that is ready to be sent (may be empty)
+        """
+        self._buffer += chunk
+        cut = self._safe_cut()
+        ready, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        return _linkify(ready, self._resolver, self.auto_link, self._linked) if ready else ""
+
+    def flush(self) -> str:
+        """
+        Release whatever is left in the buffer
+
+        Returns:
+            Remaining linkified text
+        """
+        ready, self._buffer = self._buffer, ""
+        return _linkify(ready, self._resolver, self.auto_link, self._linked) if ready else ""
+
+
+def _build_direct_prompt(
     query: str,
     session_history: str,
-    trace: Optional[Any] = None,
-    langchain_chain: Optional[Any] = None
+    profile_context: str,
+    site_links: List[Dict[str, str]],
+    current_time: str
 ) -> str:
     """
-    Generate chat response using Gemini with long-term memory
+    Build the single-shot prompt used when no LangChain chain is available
 
     Args:
         query: User's query
         session_history: Formatted session conversation history
-        trace: Langfuse trace object for logging
+        profile_context: Profile information context
+        site_links: List of site links
+        current_time: Current time string
 
     Returns:
-        Generated response text with HTML links
+        Prompt string
     """
-    try:
-        # Get long-term memory
-        ltm = get_long_term_memory()
-
-        # Get profile context from long-term memory
-        profile_context = ltm.get_context_for_llm()
-
-        # Get site links
-        site_links = ltm.get_site_links()
-
-        # Current time
-        current_time = datetime.utcnow().isoformat()
-
-        # Use LangChain chain if provided (better context management)
-        if langchain_chain:
-            # LangChain chain automatically includes conversation history
-            # ConversationChain.predict() automatically adds user message and AI response to memory
-            # Try to use apredict() if available (async version), otherwise use executor
-            logger.debug(f"[RESPONSE GEN] Using LangChain chain for query: {query[:50]}...")
-            import asyncio
-            if hasattr(langchain_chain, 'apredict'):
-                # Use async version if available
-                logger.debug("[RESPONSE GEN] Using apredict() (async)")
-                response_text = await langchain_chain.apredict(input=query)
-            else:
-                # Fallback to sync version in executor
-                logger.debug("[RESPONSE GEN] Using predict() in executor (sync)")
-                loop = asyncio.get_event_loop()
-                response_text = await loop.run_in_executor(
-                    None,
-                    lambda: langchain_chain.predict(input=query)
-                )
-            logger.debug(f"[RESPONSE GEN] Generated response: {response_text[:100]}...")
-        else:
-            # Fallback to direct prompt (for backward compatibility)
-            prompt = f"""
+    return f"""
 You are Kangbeen Ko(고강빈)'s digital twin assistant.
 You help visitors learn more about his academic and professional background using information from his personal website.
 
@@ -139,7 +223,7 @@ Answer the user's question using the provided profile information. Always includ
 {session_history if session_history and session_history.strip() != "No previous conversation." else "No previous conversation. This is the start of the conversation."}
 
 ## Available Site Links:
-{chr(10).join([f"- {link['label']}: {link['href']}" for link in site_links])}
+{get_long_term_memory().get_site_links_text(site_links)}
 
 ## Instructions:
 1. **CRITICAL - Context Resolution**: When the user uses references like "this paper", "that project", "it", "that research", "the latest one", "the paper I just asked about", etc., you MUST check the conversation history above to identify what they are referring to. Use the EXACT names from the conversation history.
@@ -167,25 +251,235 @@ Answer the user's question using the provided profile information. Always includ
 ## Response:
 """
 
+
+def _chain_prompt_tokens(langchain_chain: Any, query: str) -> int:
+    """Estimated prompt tokens of a ConversationChain call (template, context, memory and query)"""
+    prompt = langchain_chain.prompt
+    fixed = prompt.template + "".join(str(value) for value in prompt.partial_variables.values())
+    return estimate_tokens(fixed) + estimate_tokens(langchain_chain.memory.buffer_as_str) + estimate_tokens(query)
+
+
+def _request_options(timeout: Optional[float]) -> Optional[Dict[str, Any]]:
+    """Client request options carrying the stage deadline"""
+    return {"timeout": timeout} if timeout else None
+
+
+async def _iterate_with_deadline(stream: Any, deadline: Optional[float]) -> AsyncIterator[Any]:
+    """
+    Iterate an async stream, raising asyncio.TimeoutError once deadline passes
+
+    Args:
+        stream: Async iterable of chunks
+        deadline: time.monotonic() value to stop at (None for no limit)
+
+    Yields:
+        Chunks of the stream
+    """
+    iterator = stream.__aiter__()
+    while True:
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            chunk = await asyncio.wait_for(iterator.__anext__(), remaining)
+        except StopAsyncIteration:
+            return
+        yield chunk
+
+
+def _chain_call(langchain_chain: Any, query: str) -> Callable[[], Awaitable[str]]:
+    """
+    Repeatable call of a ConversationChain's prompt and LLM
+
+    Unlike apredict() it does not write to the chain's memory, so the call
+    can be retried or hedged; the caller saves the finished turn once.
+    """
+    inputs = langchain_chain.memory.load_memory_variables({})
+    inputs[langchain_chain.input_key] = query
+    runnable = langchain_chain.prompt | langchain_chain.llm
+
+    async def call() -> str:
+        message = await runnable.ainvoke(inputs)
+        return message.content
+
+    return call
+
+
+async def _scheduled_generation(call: Callable[[], Awaitable[str]], tokens: int) -> str:
+    """Run a generation call through the quota scheduler, hedged if enabled"""
+    def submit():
+        # Queued ahead of relevance checks and background work when over quota
+        return get_llm_scheduler().submit(GENERATION_MODEL, call, Priority.GENERATION, tokens)
+
+    if config.hedge_enabled:
+        return await get_generation_hedger().run(submit)
+    return await submit()
+
+
+async def generate_background_response(query: str, langchain_chain: Any) -> str:
+    """
+    Answer a query as background work (e.g. FAQ table rebuilds)
+
+    The call waits in the scheduler at Priority.BACKGROUND, behind user
+    traffic, and is neither hedged nor counted by the circuit breaker.
+    Failures are raised instead of answered with a degraded response, and
+    the chain's memory is not written.
+
+    Args:
+        query: Question to answer
+        langchain_chain: ConversationChain of a fresh session
+
+    Returns:
+        Raw response text (with <link> tags)
+    """
+    chain_call = _chain_call(langchain_chain, query)
+    # The deadline covers the call itself, not the time spent queued behind user requests
+    timeout = config.generation_timeout_seconds or None
+
+    async def call() -> str:
+        return await asyncio.wait_for(chain_call(), timeout)
+
+    return await get_llm_scheduler().submit(
+        GENERATION_MODEL, call, Priority.BACKGROUND, _chain_prompt_tokens(langchain_chain, query)
+    )
+
+
+def _fallback_response(
+    query: str,
+    site_links: Sequence[Mapping[str, str]],
+    message: str,
+    reason: str,
+    trace: Optional[Any] = None
+) -> str:
+    """
+    Answer to return when generation failed or the circuit breaker is open
+
+    Args:
+        query: User's query
+        site_links: List of site map links with 'label' and 'href'
+        message: Error message used when no degraded answer is available
+        reason: Why generation was skipped (logged to Langfuse)
+        trace: Langfuse trace object for logging
+
+    Returns:
+        Degraded answer (cached answer or profile summary) or message
+    """
+    degraded = build_degraded_answer(query) if config.degraded_answers_enabled else None
+    if trace:
+        trace.event(
+            name='degraded-response',
+            input={"reason": reason},
+            metadata={"source": degraded[1] if degraded else None}
+        )
+    if degraded is None:
+        return message
+    answer, source = degraded
+    return answer if source == "cache" else linkify_response(answer, site_links)
+
+
+async def generate_response(
+    query: str,
+    session_history: str,
+    trace: Optional[Any] = None,
+    langchain_chain: Optional[Any] = None
+) -> str:
+    """
+    Generate chat response using Gemini with long-term memory
+
+    The call is hedged after a p95-derived delay and guarded by a circuit
+    breaker; when it fails or the breaker is open, a degraded answer is
+    returned. Degraded answers are not written to the chain's memory.
+
+    Args:
+        query: User's query
+        session_history: Formatted session conversation history
+        trace: Langfuse trace object for logging
+
+    Returns:
+        Generated response text with HTML links
+    """
+    # Get long-term memory
+    ltm = get_long_term_memory()
+
+    # Get site links
+    site_links = ltm.get_site_links()
+
+    breaker = get_generation_breaker() if config.breaker_enabled else None
+    if breaker is not None and not breaker.allow():
+        logger.warning("Generation circuit breaker is open, serving a degraded answer")
+        return _fallback_response(query, site_links, GENERATION_ERROR_MESSAGE, "breaker-open", trace)
+
+    try:
+        # Deadline for the generation stage (None for no limit)
+        timeout = config.generation_timeout_seconds or None
+
+        # Use LangChain chain if provided (better context management)
+        if langchain_chain:
+            # The chain's prompt includes conversation history; the turn is saved
+            # into its memory below, the same way ConversationChain.apredict() does
+            logger.debug("[RESPONSE GEN] Using LangChain chain for query: %.50s...", query)
+            prompt = None
+            call = _chain_call(langchain_chain, query)
+            tokens = _chain_prompt_tokens(langchain_chain, query)
+        else:
+            # Profile context from long-term memory (whole profile or retrieved
+            # passages); the chain above got it when it was created
+            profile_context, prompt_links = get_prompt_context(query)
+
+            # Fallback to direct prompt (for backward compatibility)
+            prompt = _build_direct_prompt(
+                query,
+                session_history,
+                profile_context,
+                prompt_links,
+                datetime.utcnow().isoformat()
+            )
+
             # Generate response using Gemini 2.5 Flash (faster than Pro)
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            result = model.generate_content(prompt)
-            response_text = result.text
+            model = get_model_registry().get_generative_model(GENERATION_MODEL)
+
+            async def call() -> str:
+                result = await model.generate_content_async(prompt, request_options=_request_options(timeout))
+                return result.text
+
+            tokens = estimate_tokens(prompt)
+
+        started = time.monotonic()
+        try:
+            with span("llm_call"):
+                response_text = await asyncio.wait_for(_scheduled_generation(call, tokens), timeout)
+        except asyncio.CancelledError:
+            if breaker is not None:
+                breaker.release()
+            raise
+        except Exception:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        if breaker is not None:
+            breaker.record_success(time.monotonic() - started)
+        logger.debug("[RESPONSE GEN] Generated response: %.100s...", response_text)
+
+        if langchain_chain:
+            with span("memory_write"):
+                langchain_chain.memory.save_context(
+                    {langchain_chain.input_key: query},
+                    {langchain_chain.output_key: response_text}
+                )
 
         # Add links to response
-        linked_response = linkify_response(response_text, site_links)
+        with span("linkify"):
+            linked_response = linkify_response(response_text, site_links)
 
         # Log to Langfuse
         if trace:
             trace.generation(
                 name='chat-response',
-                model='gemini-2.5-flash',
+                model=GENERATION_MODEL,
                 model_parameters={
                     "temperature": 0.7,
                     "maxTokens": 512
                 },
                 input=query,
-                prompt=[{"role": "user", "content": prompt}],
+                prompt=[{"role": "user", "content": prompt or query}],
                 output=response_text,
                 metadata={
                     "memoryType": "long-term + short-term",
@@ -195,6 +489,163 @@ Answer the user's question using the provided profile information. Always includ
 
         return linked_response
 
+    except asyncio.TimeoutError:
+        logger.warning(f"Response generation exceeded {config.generation_timeout_seconds}s deadline")
+        return _fallback_response(query, site_links, GENERATION_ERROR_MESSAGE, "timeout", trace)
+    except QuotaExceededError as error:
+        logger.warning(f"Response generation out of quota: {error}")
+        return _fallback_response(query, site_links, QUOTA_ERROR_MESSAGE, "quota", trace)
     except Exception as error:
         logger.error(f"Error generating response: {error}", exc_info=True)
-        return "죄송합니다. 응답을 생성하는 중에 오류가 발생했습니다. 다시 시도해주세요."
+        return _fallback_response(query, site_links, GENERATION_ERROR_MESSAGE, "error", trace)
+
+
+async def generate_response_stream(
+    query: str,
+    session_history: str,
+    trace: Optional[Any] = None,
+    langchain_chain: Optional[Any] = None
+) -> AsyncIterator[str]:
+    """
+    Stream a chat response token by token
+
+    Streaming counterpart of generate_response. When a ConversationChain is
+    given, its prompt and LLM are streamed directly and the finished turn is
+    saved into the chain's memory, just like apredict() would do. The stream
+    is guarded by the circuit breaker (time to first chunk counts as its
+    latency) but not hedged.
+
+    Args:
+        query: User's query
+        session_history: Formatted session conversation history
+        trace: Langfuse trace object for logging
+        langchain_chain: Optional ConversationChain with memory
+
+    Yields:
+        Linkified pieces of the response; joined together they equal the
+        output of generate_response for the same text
+    """
+    ltm = get_long_term_memory()
+    site_links = ltm.get_site_links()
+    linkifier = StreamingLinkifier(site_links)
+    chunks: List[str] = []
+    emitted = False
+    timeout = config.generation_timeout_seconds or None
+    started = time.monotonic()
+    deadline = started + timeout if timeout else None
+
+    breaker = get_generation_breaker() if config.breaker_enabled else None
+    if breaker is not None and not breaker.allow():
+        logger.warning("Generation circuit breaker is open, serving a degraded answer")
+        yield _fallback_response(query, site_links, GENERATION_ERROR_MESSAGE, "breaker-open", trace)
+        return
+    # Outcome reported to the breaker: None (cancelled), time to first chunk, or False (failed)
+    outcome: Any = None
+
+    try:
+        if langchain_chain:
+            logger.debug("[RESPONSE GEN] Streaming LangChain chain for query: %.50s...", query)
+            inputs = langchain_chain.memory.load_memory_variables({})
+            inputs[langchain_chain.input_key] = query
+            prompt = None
+            # Quota errors surface mid-stream here, so the call is admitted but not retried
+            await asyncio.wait_for(
+                get_llm_scheduler().acquire(
+                    GENERATION_MODEL, Priority.GENERATION, _chain_prompt_tokens(langchain_chain, query)
+                ),
+                timeout
+            )
+            token_stream = (langchain_chain.prompt | langchain_chain.llm).astream(inputs)
+        else:
+            profile_context, prompt_links = get_prompt_context(query)
+            prompt = _build_direct_prompt(
+                query,
+                session_history,
+                profile_context,
+                prompt_links,
+                datetime.utcnow().isoformat()
+            )
+            model = get_model_registry().get_generative_model(GENERATION_MODEL)
+            token_stream = await asyncio.wait_for(
+                get_llm_scheduler().submit(
+                    GENERATION_MODEL,
+                    lambda: model.generate_content_async(prompt, stream=True, request_options=_request_options(timeout)),
+                    Priority.GENERATION,
+                    estimate_tokens(prompt)
+                ),
+                timeout
+            )
+
+        first_chunk_seconds = None
+        async for chunk in _iterate_with_deadline(token_stream, deadline):
+            if first_chunk_seconds is None:
+                first_chunk_seconds = time.monotonic() - started
+            text = chunk.content if hasattr(chunk, "content") else chunk.text
+            if not text:
+                continue
+            chunks.append(text)
+            piece = linkifier.feed(text)
+            if piece:
+                emitted = True
+                yield piece
+
+        piece = linkifier.flush()
+        if piece:
+            emitted = True
+            yield piece
+
+        response_text = "".join(chunks)
+        outcome = first_chunk_seconds if first_chunk_seconds is not None else time.monotonic() - started
+        # Includes time the consumer took between chunks
+        get_chat_metrics().observe("llm_call", time.monotonic() - started)
+
+        # Persist the finished turn the same way ConversationChain.apredict() does
+        if langchain_chain:
+            with span("memory_write"):
+                langchain_chain.memory.save_context(
+                    {langchain_chain.input_key: query},
+                    {langchain_chain.output_key: response_text}
+                )
+
+        if trace:
+            trace.generation(
+                name='chat-response',
+                model=GENERATION_MODEL,
+                model_parameters={
+                    "temperature": 0.7,
+                    "stream": True
+                },
+                input=query,
+                prompt=[{"role": "user", "content": prompt or query}],
+                output=response_text,
+                metadata={
+                    "memoryType": "long-term + short-term",
+                    "profileDataCategories": list(ltm.get_all().keys()),
+                }
+            )
+
+    except asyncio.TimeoutError:
+        outcome = False
+        logger.warning(f"Streaming response exceeded {config.generation_timeout_seconds}s deadline")
+        if emitted:
+            raise
+        yield _fallback_response(query, site_links, GENERATION_ERROR_MESSAGE, "timeout", trace)
+    except QuotaExceededError as error:
+        outcome = False
+        logger.warning(f"Streaming response out of quota: {error}")
+        yield _fallback_response(query, site_links, QUOTA_ERROR_MESSAGE, "quota", trace)
+    except Exception as error:
+        outcome = False
+        logger.error(f"Error streaming response: {error}", exc_info=True)
+        if emitted:
+            # Part of the answer is already on the wire; let the caller report it
+            raise
+        yield _fallback_response(query, site_links, GENERATION_ERROR_MESSAGE, "error", trace)
+    finally:
+        if breaker is not None:
+            if outcome is False:
+                breaker.record_failure()
+            elif outcome is None:
+                breaker.release()
+            else:
+                breaker.record_success(outcome)
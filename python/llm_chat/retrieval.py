@@ -0,0 +1,390 @@
+"""
+Retrieval Module
+Selects the profile passages relevant to a query (BM25 + dense hashing
+embeddings) so prompts stay flat as the profile grows
+"""
+
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import config
+from .long_term_memory import ProfileSnapshot, get_long_term_memory
+from .text_utils import tokenize, normalize_query, hash_embed
+
+# Dimensionality of the dense hashing embeddings
+DENSE_DIM = 2048
+
+# Reciprocal-rank-fusion constant used to merge BM25 and dense rankings
+RRF_K = 60
+
+# Markdown sources that duplicate profile_data.json as a whole
+_SKIPPED_MARKDOWN = {"full-cv.md"}
+
+_FRONT_MATTER_PATTERN = re.compile(r"^---\n.*?\n---\n", re.DOTALL)
+
+# Section headers used when rendering passages (same as get_context_for_llm)
+_CATEGORY_TITLES = {
+    "education": "Education",
+    "skills": "Skills",
+    "publications": "Publications",
+    "experiences": "Work Experiences",
+    "projects": "Projects",
+    "awards": "Awards & Honors",
+    "otherExperiences": "Other Experiences",
+}
+
+
+# Korean section keywords expanded to the English words used in the profile
+_QUERY_EXPANSIONS = {
+    "학력": "education degree school",
+    "학교": "education school",
+    "교육": "education",
+    "기술": "skills",
+    "스킬": "skills",
+    "언어": "languages programming",
+    "논문": "publications paper",
+    "연구": "publications research",
+    "출판": "publications",
+    "경력": "work experiences",
+    "경험": "experiences",
+    "인턴": "intern",
+    "프로젝트": "projects",
+    "수상": "awards honors",
+    "상": "awards",
+}
+
+
+def _expand_query(query: str) -> str:
+    """Append English section words for Korean section keywords in the query"""
+    tokens = set(tokenize(query))
+    extra = [words for keyword, words in _QUERY_EXPANSIONS.items() if keyword in tokens]
+    return f"{query} {' '.join(extra)}" if extra else query
+
+
+def _render_item(category: str, item: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Render one profile item as a passage
+
+    Returns:
+        Tuple of (title, text)
+    """
+    if category == "education":
+        title = f"{item.get('degree', '')} at {item.get('school', '')}".strip()
+        lines = [f"- {title} ({item.get('time', '')})"]
+        if item.get("description"):
+            lines.append(f"  {item['description']}")
+    elif category == "skills":
+        title = item.get("title", "")
+        lines = [f"- {title}: {item.get('description', '')}"]
+    elif category == "publications":
+        title = item.get("title", "")
+        lines = [
+            f"- {title} ({item.get('time', '')})",
+            f"  Authors: {item.get('authors', '')}",
+            f"  Journal: {item.get('journal', '')}",
+        ]
+        if item.get("abstract"):
+            lines.append(f"  Abstract: {item['abstract'][:600]}")
+    elif category == "experiences":
+        title = f"{item.get('title', '')} at {item.get('company', '')}"
+        lines = [f"- {title} ({item.get('time', '')})"]
+        if item.get("description"):
+            lines.append(f"  {item['description'][:600]}")
+    else:
+        title = item.get("title", "")
+        lines = [f"- {title} ({item.get('time', '')})"]
+        if item.get("description"):
+            lines.append(f"  {item['description'][:600]}")
+    return title, "\n".join(lines)
+
+
+def build_profile_passages(data: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    Chunk profile data into one passage per item
+
+    Args:
+        data: Profile data (LongTermMemory.data)
+
+    Returns:
+        List of passages with 'category', 'title' and 'text'
+    """
+    passages = []
+    for category, items in data.items():
+        if not isinstance(items, list):
+            continue
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            title, text = _render_item(category, item)
+            passages.append({
+                "category": category,
+                "title": title,
+                "text": text,
+                "href": item.get("link", ""),
+            })
+    return passages
+
+
+def build_markdown_passages(cv_dir: Path) -> List[Dict[str, str]]:
+    """
+    Chunk content/cv/*.md into one passage per "## " section
+
+    Args:
+        cv_dir: Directory containing the CV markdown files
+
+    Returns:
+        List of passages with 'category', 'title' and 'text'
+    """
+    passages = []
+    if not cv_dir.is_dir():
+        return passages
+    for path in sorted(cv_dir.glob("*.md")):
+        if path.name in _SKIPPED_MARKDOWN:
+            continue
+        content = _FRONT_MATTER_PATTERN.sub("", path.read_text(encoding="utf-8"))
+        for section in re.split(r"^## ", content, flags=re.MULTILINE)[1:]:
+            heading, _, body = section.partition("\n")
+            body = re.sub(r"!\[[^\]]*\]\([^)]*\)", "", body)  # drop images
+            body = re.sub(r"\n-{3,}\n", "\n", body)
+            text = "\n".join(line for line in body.splitlines() if line.strip())
+            passages.append({
+                "category": f"cv:{path.stem}",
+                "title": heading.strip(),
+                "text": f"- {heading.strip()}\n{text}",
+            })
+    return passages
+
+
+class BM25Index:
+    """Okapi BM25 over tokenized passages"""
+
+    def __init__(self, documents: List[List[str]], k1: float = 1.5, b: float = 0.75):
+        """
+        Build the index
+
+        Args:
+            documents: Token lists, one per passage
+            k1: Term frequency saturation
+            b: Length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.doc_lengths = [len(doc) for doc in documents]
+        self.avg_length = sum(self.doc_lengths) / len(documents) if documents else 0.0
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_id, doc in enumerate(documents):
+            for term, freq in Counter(doc).items():
+                self.postings.setdefault(term, []).append((doc_id, freq))
+        total = len(documents)
+        self.idf = {
+            term: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def scores(self, query_tokens: List[str]) -> Dict[int, float]:
+        """
+        Score passages against a query
+
+        Args:
+            query_tokens: Tokenized query
+
+        Returns:
+            {passage index: BM25 score} for passages sharing at least one term
+        """
+        scores: Dict[int, float] = {}
+        for term in set(query_tokens):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf[term]
+            for doc_id, freq in postings:
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / (self.avg_length or 1)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + self.k1 * length_norm)
+        return scores
+
+
+def _dense_vector(text: str) -> np.ndarray:
+    """Dense L2-normalized hashing embedding of a text"""
+    vector = np.zeros(DENSE_DIM, dtype=np.float32)
+    for index, weight in hash_embed(normalize_query(text), dim=DENSE_DIM).items():
+        vector[index] = weight
+    return vector
+
+
+class ProfileRetriever:
+    """
+    Hybrid BM25 + dense retriever over profile passages
+
+    Rankings of both indexes are merged with reciprocal rank fusion.
+    """
+
+    def __init__(self, passages: List[Dict[str, str]], version: str = ""):
+        """
+        Build both indexes
+
+        Args:
+            passages: Passages from build_profile_passages/build_markdown_passages
+            version: Profile content hash the passages were built from
+        """
+        self.passages = passages
+        self.version = version
+        # Titles are repeated so they weigh more than descriptions; the section
+        # name lets queries like "awards" reach every item of that section
+        self.bm25 = BM25Index([
+            tokenize(f"{_section_title(p['category'])} {p['title']} {p['title']} {p['text']}")
+            for p in passages
+        ])
+        if passages:
+            self.embeddings = np.vstack([_dense_vector(f"{p['title']} {p['text']}") for p in passages])
+        else:
+            self.embeddings = np.zeros((0, DENSE_DIM), dtype=np.float32)
+
+    def retrieve(self, query: str, top_k: int = 6) -> List[Dict[str, str]]:
+        """
+        Get the most relevant passages for a query
+
+        Args:
+            query: User's query
+            top_k: Number of passages to return
+
+        Returns:
+            Passages ordered by fused relevance
+        """
+        if not self.passages:
+            return []
+
+        fused: Dict[int, float] = {}
+        query = _expand_query(query)
+
+        bm25_scores = self.bm25.scores(tokenize(query))
+        for rank, doc_id in enumerate(sorted(bm25_scores, key=bm25_scores.get, reverse=True)):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+        similarities = self.embeddings @ _dense_vector(query)
+        candidates = min(len(self.passages), top_k * 4)
+        for rank, doc_id in enumerate(np.argsort(-similarities)[:candidates]):
+            if similarities[doc_id] <= 0:
+                break
+            fused[int(doc_id)] = fused.get(int(doc_id), 0.0) + 1.0 / (RRF_K + rank + 1)
+
+        ranked = sorted(fused, key=fused.get, reverse=True)[:top_k]
+        return [self.passages[doc_id] for doc_id in ranked]
+
+    def get_context(self, query: str, top_k: int = 6) -> str:
+        """
+        Get formatted context containing only the relevant passages
+
+        Args:
+            query: User's query
+            top_k: Number of passages to include
+
+        Returns:
+            Context string grouped by profile section
+        """
+        return format_passages(self.retrieve(query, top_k))
+
+
+def _section_title(category: str) -> str:
+    """Human-readable section name of a passage category"""
+    return _CATEGORY_TITLES.get(category, category.split(":")[-1].replace("-", " ").title())
+
+
+def format_passages(passages: List[Dict[str, str]]) -> str:
+    """
+    Render retrieved passages as prompt context, grouped by section
+
+    Args:
+        passages: Passages from ProfileRetriever.retrieve
+
+    Returns:
+        Context string
+    """
+    grouped: Dict[str, List[str]] = {}
+    for passage in passages:
+        grouped.setdefault(_section_title(passage["category"]), []).append(passage["text"])
+
+    if not grouped:
+        return "No matching profile information. Refer to the site links."
+
+    sections = []
+    for heading, texts in grouped.items():
+        sections.append(f"## {heading}")
+        sections.extend(texts)
+    return "\n".join(sections)
+
+
+def select_prompt_links(passages: List[Dict[str, str]], site_links: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Keep the site's own pages plus the external links of retrieved items
+
+    Args:
+        passages: Retrieved passages
+        site_links: Full site link list
+
+    Returns:
+        Links to show in the prompt
+    """
+    retrieved_hrefs = {passage.get("href") for passage in passages if passage.get("href")}
+    return [
+        link for link in site_links
+        if link["href"].startswith("/") or link["href"] in retrieved_hrefs
+    ]
+
+
+# Global instance, rebuilt when the profile content changes
+_profile_retriever: Optional[ProfileRetriever] = None
+
+
+def get_profile_retriever(snapshot: Optional[ProfileSnapshot] = None) -> ProfileRetriever:
+    """
+    Get or build the retriever for the current profile data
+
+    Args:
+        snapshot: Long-term memory snapshot to index (defaults to the current one)
+
+    Returns:
+        ProfileRetriever for the snapshot's version
+    """
+    global _profile_retriever
+    snapshot = snapshot or get_long_term_memory().snapshot()
+    if _profile_retriever is None or _profile_retriever.version != snapshot.version:
+        passages = build_profile_passages(snapshot.data)
+        if config.retrieval_include_cv_markdown:
+            cv_dir = Path(__file__).resolve().parent.parent.parent / "content" / "cv"
+            passages.extend(build_markdown_passages(cv_dir))
+        _profile_retriever = ProfileRetriever(passages, version=snapshot.version)
+    return _profile_retriever
+
+
+def get_prompt_context(
+    query: str,
+    snapshot: Optional[ProfileSnapshot] = None
+) -> Tuple[str, Sequence[Mapping[str, str]]]:
+    """
+    Get the profile context and site links to put into the prompt for a query
+
+    In "full" context mode (CHAT_CONTEXT_MODE) this is the whole profile and
+    every site link. In "retrieval" mode only the top-k retrieved passages
+    are included, together with the page/section links and the links of the
+    retrieved items, so the prompt stays flat as the profile grows.
+    linkify_response should still receive the full link list.
+
+    Args:
+        query: User's query
+        snapshot: Long-term memory snapshot to use (defaults to the current one)
+
+    Returns:
+        Tuple of (profile context, site links for the prompt)
+    """
+    snapshot = snapshot or get_long_term_memory().snapshot()
+    site_links = snapshot.site_links
+    if config.context_mode != "retrieval":
+        return snapshot.context, site_links
+
+    passages = get_profile_retriever(snapshot).retrieve(query, config.retrieval_top_k)
+    return format_passages(passages), select_prompt_links(passages, site_links)
@@ -0,0 +1,245 @@
+"""
+Serverless Runtime Module
+Event loop that lives as long as the container, plus pre-warming of
+module-level state, for per-request entry points such as api/chat.py
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Timings of the process-wide warm-up (step -> milliseconds), once it ran
+_warm_up_timings: Optional[Dict[str, float]] = None
+_warm_up_lock = threading.Lock()
+
+
+def _warm_profile():
+    from .long_term_memory import get_long_term_memory
+    from .response_generator import get_link_resolver
+    from .retrieval import get_prompt_context
+
+    ltm = get_long_term_memory()
+    get_link_resolver(ltm.get_site_links())
+    get_prompt_context("warm up")
+
+
+def _warm_text():
+    # Compiles the keyword automata and classifier, and the regexes they use on first call
+    from .language_detector import detect_language
+    from .long_term_memory import get_long_term_memory
+    from .query_engine import get_query_engine
+    from .relevance_filter import get_verdict_memo, local_relevance_check
+    from .rejection_pool import get_rejection_pool
+    from .response_cache import get_response_cache
+    from .text_utils import normalize_query
+
+    views = get_long_term_memory().snapshot().views
+    for text in ("Hello, what do you research?", "안녕하세요, 어떤 연구를 하나요?"):
+        detect_language(text)
+        normalize_query(text)
+        local_relevance_check(text)
+        get_query_engine().parse(text, views)
+    get_verdict_memo()
+    get_rejection_pool()
+    get_response_cache()
+
+
+def _warm_sessions():
+    from .chat_handler import handle_chat_request  # noqa: F401 (imports langchain)
+    from .session_registry import get_session_registry
+
+    get_session_registry()
+
+
+def _warm_llm_clients():
+    from .llm_backends import get_model_registry
+
+    registry = get_model_registry()
+    if not registry.available:
+        return
+    if registry.backend.name == "gemini":
+        registry.generative_client()
+    registry.get_chat_model("gemini-2.5-flash", temperature=0.7)
+    for model in ("gemini-2.0-flash-lite", "gemini-2.5-flash", "gemini-3-flash"):
+        registry.get_generative_model(model)
+
+
+# Warm-up steps in order (name, function)
+WARM_UP_STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("profile", _warm_profile),
+    ("text", _warm_text),
+    ("sessions", _warm_sessions),
+    ("llm_clients", _warm_llm_clients),
+]
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Build module-level state before the first request needs it
+
+    Loads the profile snapshot (index and link resolver), compiles keyword
+    matchers and regexes, opens the session store, imports LangChain and
+    creates the shared LLM clients. Runs once per process; later calls
+    return the recorded timings. A failing step is reported and skipped,
+    since the request path builds the same state on demand.
+
+    Returns:
+        Milliseconds per step, plus "total"
+    """
+    global _warm_up_timings
+    with _warm_up_lock:
+        if _warm_up_timings is not None:
+            return _warm_up_timings
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        for name, step in WARM_UP_STEPS:
+            step_started = time.perf_counter()
+            try:
+                step()
+            except Exception as error:
+                print(f"Warning: Warm-up step '{name}' failed: {error}")
+            timings[name] = (time.perf_counter() - step_started) * 1000
+        timings["total"] = (time.perf_counter() - started) * 1000
+        _warm_up_timings = timings
+        return timings
+
+
+class ServerlessRuntime:
+    """
+    Background event loop shared by every request of a container
+
+    asyncio.run() per request closes the loop and with it every loop-bound
+    resource (async gRPC channels, pending summary tasks, in-flight
+    coalescing futures). Here coroutines are submitted to one loop running
+    in a daemon thread, so those survive between requests.
+    """
+
+    def __init__(self):
+        """Initialize the runtime (the loop thread starts on first use)"""
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._warm_up_thread: Optional[threading.Thread] = None
+        self.requests = 0
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running background loop"""
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    ready = threading.Event()
+
+                    def run_loop():
+                        asyncio.set_event_loop(loop)
+                        loop.call_soon(ready.set)
+                        loop.run_forever()
+
+                    self._thread = threading.Thread(target=run_loop, name="serverless-loop", daemon=True)
+                    self._thread.start()
+                    ready.wait()
+                    self._loop = loop
+        return self._loop
+
+    def run(self, coroutine: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the background loop and wait for its result
+
+        Args:
+            coroutine: Coroutine to run
+            timeout: Seconds to wait (None for no limit); the coroutine is
+                cancelled when it runs out
+
+        Returns:
+            Result of the coroutine
+        """
+        self.requests += 1
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def iterate(self, iterator: AsyncIterator[Any]) -> Iterator[Any]:
+        """
+        Consume an async iterator from synchronous code
+
+        Args:
+            iterator: Async iterator (e.g. an async generator)
+
+        Yields:
+            Items of the iterator, each produced on the background loop
+        """
+        self.requests += 1
+        try:
+            while True:
+                try:
+                    yield asyncio.run_coroutine_threadsafe(iterator.__anext__(), self.loop).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                asyncio.run_coroutine_threadsafe(aclose(), self.loop).result()
+
+    def start_warm_up(self) -> threading.Thread:
+        """
+        Run warm_up() in a background thread
+
+        Requests do not wait for it; a request that needs something the
+        warm-up has not built yet builds it itself.
+
+        Returns:
+            The warm-up thread
+        """
+        with self._lock:
+            if self._warm_up_thread is None:
+                self._warm_up_thread = threading.Thread(target=self._warm_up, name="serverless-warm-up", daemon=True)
+                self._warm_up_thread.start()
+            return self._warm_up_thread
+
+    def _warm_up(self):
+        warm_up()
+        try:
+            # Async clients are bound to a loop; create the one requests will use
+            asyncio.run_coroutine_threadsafe(self._warm_async_clients(), self.loop).result()
+        except Exception as error:
+            print(f"Warning: Warm-up of async LLM clients failed: {error}")
+
+    @staticmethod
+    async def _warm_async_clients():
+        from .config import config
+        from .llm_backends import get_model_registry
+
+        registry = get_model_registry()
+        if registry.available and registry.backend.name == "gemini" and config.llm_transport != "rest":
+            registry.generative_async_client()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get runtime metrics
+
+        Returns:
+            Dictionary with loop_running, requests and warm_up timings
+            (None until the warm-up finished)
+        """
+        return {
+            "loop_running": self._loop is not None and self._loop.is_running(),
+            "requests": self.requests,
+            "warm_up": _warm_up_timings,
+        }
+
+
+# Global instance
+_serverless_runtime = None
+
+
+def get_serverless_runtime() -> ServerlessRuntime:
+    """Get or create global serverless runtime instance"""
+    global _serverless_runtime
+    if _serverless_runtime is None:
+        _serverless_runtime = ServerlessRuntime()
+    return _serverless_runtime
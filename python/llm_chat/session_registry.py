@@ -0,0 +1,422 @@
+"""
+Session Registry Module
+Single bounded store for per-session state (short-term memory, LangChain
+memory and its cached chain) with LRU eviction, idle expiry and memory
+accounting. With a SessionStore attached, it acts as a per-process cache
+in front of storage shared by all workers.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+from .config import config
+from .short_term_memory import ShortTermMemory
+from .session_store import SessionStore, create_session_store
+
+
+class SessionEntry:
+    """
+    Everything kept for one chat session
+    """
+
+    def __init__(self, session_id: str):
+        """
+        Create the state of a new session
+
+        Args:
+            session_id: Session identifier
+        """
+        # LangChain is imported with the first session, not with this module
+        from .langchain_memory import LangChainMemoryManager
+
+        self.session_id = session_id
+        self.stm = ShortTermMemory(session_id)
+        self.langchain_memory = LangChainMemoryManager(session_id)
+        self.last_access = time.monotonic()
+        # Store version this copy reflects (-1 forces a reload)
+        self.version = 0
+        # Requests currently using the entry (see SessionRegistry.pin)
+        self.active = 0
+        # Removed from the registry while in use; released once the last request is done
+        self.dropped = False
+
+    def estimate_bytes(self) -> int:
+        """Approximate memory held by the session's conversation data"""
+        return self.stm.estimate_bytes() + self.langchain_memory.estimate_bytes()
+
+    def release(self):
+        """Free the session's history, LangChain memory and cached chain"""
+        self.stm.clear()
+        self.langchain_memory.release()
+
+
+class SessionRegistry:
+    """
+    Bounded registry of chat sessions
+
+    Sessions are created on first access and evicted in LRU order once
+    max_sessions is exceeded, or when idle for longer than
+    idle_ttl_seconds. Evicting a session releases its short-term memory,
+    LangChain memory and cached chain together. Requests pin the entry
+    they work on (pin/unpin); an entry evicted while pinned leaves the
+    registry at once but is only released when its last request is done.
+
+    With a store, a session missing from the process (or changed by
+    another worker since it was cached) is loaded from the store, and each
+    finished turn is appended to it. pin() and persist_turn() run the
+    store I/O on a worker thread, so a busy SQLite lock never stalls the
+    event loop. Store failures are logged and the session keeps working
+    from process memory.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        idle_ttl_seconds: Optional[float] = 86400,
+        sweep_interval_seconds: float = 60,
+        store: Optional[SessionStore] = None,
+        history_limit: int = 40,
+        retention_seconds: Optional[float] = None
+    ):
+        """
+        Initialize the registry
+
+        Args:
+            max_sessions: Maximum number of live sessions
+            idle_ttl_seconds: Idle time after which a session expires (None to disable)
+            sweep_interval_seconds: Minimum time between idle sweeps
+            store: Shared session storage (None keeps sessions in this process only)
+            history_limit: Messages loaded from the store when a session is restored
+            retention_seconds: Age after which the sweeper purges stored sessions
+        """
+        self.store = store
+        self.history_limit = history_limit
+        self.retention_seconds = retention_seconds
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._sessions: "OrderedDict[str, SessionEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._last_sweep = time.monotonic()
+        self._sweeper: Optional[asyncio.Task] = None
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.restores = 0
+        self.store_errors = 0
+
+    def get(self, session_id: str) -> SessionEntry:
+        """
+        Get or create a session and mark it as recently used
+
+        Reads the store on the calling thread; request handlers use pin().
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            SessionEntry for the session
+        """
+        entry = self._touch(session_id)
+        if self.store is not None:
+            self._sync(entry)
+        return entry
+
+    async def pin(self, session_id: str) -> SessionEntry:
+        """
+        Get or create a session for a request and keep it alive until unpin()
+
+        The store is read on a worker thread.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            SessionEntry for the session
+        """
+        entry = self._touch(session_id)
+        entry.active += 1
+        if self.store is not None:
+            try:
+                stored = await asyncio.to_thread(self._read_store, entry.session_id, entry.version)
+            except Exception as e:
+                self._read_failed(entry, e)
+            except BaseException:
+                self.unpin(entry)
+                raise
+            else:
+                self._apply_stored(entry, stored)
+        return entry
+
+    def unpin(self, entry: SessionEntry):
+        """
+        Mark a request on a pinned entry as done
+
+        Args:
+            entry: Entry returned by pin()
+        """
+        with self._lock:
+            entry.active -= 1
+            release = entry.active == 0 and entry.dropped
+        if release:
+            entry.release()
+
+    def _touch(self, session_id: str) -> SessionEntry:
+        self._maybe_sweep()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                entry = SessionEntry(session_id)
+                entry.version = -1
+                self._sessions[session_id] = entry
+                self.created += 1
+                while len(self._sessions) > self.max_sessions:
+                    self._drop(next(iter(self._sessions)), expired=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            entry.last_access = time.monotonic()
+        return entry
+
+    def _read_store(self, session_id: str, version: int) -> Optional[Dict[str, Any]]:
+        # Reload from the store when this process has never seen the
+        # session or another worker appended to it since
+        if version >= 0 and self.store.version(session_id) == version:
+            return None
+        return self.store.load(session_id, self.history_limit)
+
+    def _read_failed(self, entry: SessionEntry, error: Exception):
+        self.store_errors += 1
+        print(f"Warning: Session store read failed for {entry.session_id}: {error}")
+
+    def _sync(self, entry: SessionEntry):
+        try:
+            stored = self._read_store(entry.session_id, entry.version)
+        except Exception as e:
+            self._read_failed(entry, e)
+            return
+        self._apply_stored(entry, stored)
+
+    def _apply_stored(self, entry: SessionEntry, stored: Optional[Dict[str, Any]]):
+        if stored is None:
+            return
+        if stored["version"] or entry.version >= 0:
+            entry.stm.restore(stored["messages"], stored["language"])
+            entry.langchain_memory.restore(stored["messages"])
+            self.restores += 1
+        entry.version = stored["version"]
+
+    async def persist_turn(self, entry: SessionEntry, message: str, response: str, raw_response: Optional[str] = None):
+        """
+        Append a finished turn to the shared store (on a worker thread)
+
+        Args:
+            entry: Session the turn belongs to
+            message: User's message
+            response: Response shown to the user
+            raw_response: Response as kept in LangChain memory (defaults to
+                the last AI message in the session's LangChain memory)
+        """
+        if self.store is None:
+            return
+        if raw_response is None:
+            history = entry.langchain_memory.get_chat_history()
+            raw_response = history[-1].content if history else response
+        timestamp = datetime.utcnow().isoformat()
+        messages = [
+            {"role": "user", "content": message, "raw": None, "timestamp": timestamp},
+            {"role": "model", "content": response, "raw": raw_response, "timestamp": timestamp},
+        ]
+        try:
+            version = await asyncio.to_thread(
+                self.store.append_messages, entry.session_id, messages, entry.stm.preferred_language
+            )
+        except Exception as e:
+            self.store_errors += 1
+            print(f"Warning: Session store write failed for {entry.session_id}: {e}")
+            return
+        # If another worker wrote in between, reload on the next access
+        entry.version = version if version - len(messages) == entry.version else -1
+
+    def peek(self, session_id: str) -> Optional[SessionEntry]:
+        """Get a session if it exists, without creating or touching it"""
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def evict(self, session_id: str, delete_stored: bool = False) -> bool:
+        """
+        Remove a session from this process and release its state
+
+        Args:
+            session_id: Session identifier
+            delete_stored: Also delete the session from the shared store
+
+        Returns:
+            True if the session was live in this process
+        """
+        if delete_stored and self.store is not None:
+            try:
+                self.store.delete(session_id)
+            except Exception as e:
+                self.store_errors += 1
+                print(f"Warning: Session store delete failed for {session_id}: {e}")
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._drop(session_id, expired=False)
+            return True
+
+    def _drop(self, session_id: str, expired: bool):
+        entry = self._sessions.pop(session_id)
+        if expired:
+            self.expirations += 1
+        else:
+            self.evictions += 1
+        self._release(entry)
+
+    def _release(self, entry: SessionEntry):
+        # A request still running on the entry would lose its LLM; it is
+        # released by unpin() instead
+        if entry.active:
+            entry.dropped = True
+        else:
+            entry.release()
+
+    def sweep(self, max_idle_seconds: Optional[float] = None) -> int:
+        """
+        Remove sessions idle for longer than the TTL
+
+        Args:
+            max_idle_seconds: Idle limit (defaults to idle_ttl_seconds)
+
+        Returns:
+            Number of removed sessions
+        """
+        limit = self.idle_ttl_seconds if max_idle_seconds is None else max_idle_seconds
+        with self._lock:
+            self._last_sweep = time.monotonic()
+            if limit is None:
+                return 0
+            cutoff = self._last_sweep - limit
+            # Entries are in access order, so idle sessions are at the front
+            expired = []
+            for session_id, entry in self._sessions.items():
+                if entry.last_access > cutoff:
+                    break
+                expired.append(session_id)
+            for session_id in expired:
+                self._drop(session_id, expired=True)
+            return len(expired)
+
+    def _maybe_sweep(self):
+        # Opportunistic sweep for deployments without a background task (serverless)
+        if time.monotonic() - self._last_sweep >= self.sweep_interval_seconds:
+            self.sweep()
+
+    async def run_sweeper(self):
+        """Sweep idle sessions periodically until cancelled"""
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            removed = self.sweep()
+            if removed:
+                print(f"Session sweeper expired {removed} idle sessions ({len(self)} live)")
+            if self.store is not None and self.retention_seconds:
+                try:
+                    await asyncio.to_thread(self.store.purge, self.retention_seconds)
+                except Exception as e:
+                    self.store_errors += 1
+                    print(f"Warning: Session store purge failed: {e}")
+
+    def start_sweeper(self) -> asyncio.Task:
+        """
+        Start the background sweeper on the running event loop
+
+        Returns:
+            The sweeper task (started once)
+        """
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self.run_sweeper())
+        return self._sweeper
+
+    async def stop_sweeper(self):
+        """Cancel the background sweeper"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    def items(self) -> Iterator[Tuple[str, SessionEntry]]:
+        """Iterate over (session_id, entry), least recently used first"""
+        with self._lock:
+            snapshot = list(self._sessions.items())
+        return iter(snapshot)
+
+    def clear(self):
+        """Release and remove every session"""
+        with self._lock:
+            for entry in self._sessions.values():
+                self._release(entry)
+            self._sessions.clear()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def get_memory_usage(self) -> Dict[str, Any]:
+        """
+        Get approximate memory held by session data
+
+        Returns:
+            Dictionary with total_bytes and sessions ({session_id: bytes})
+        """
+        per_session = {session_id: entry.estimate_bytes() for session_id, entry in self.items()}
+        return {
+            "total_bytes": sum(per_session.values()),
+            "sessions": per_session,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get registry statistics
+
+        Returns:
+            Dictionary with backend, sessions, max_sessions, created,
+            evictions, expirations, restores, store_errors and total_bytes
+        """
+        return {
+            "backend": type(self.store).__name__ if self.store is not None else "memory",
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "created": self.created,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "restores": self.restores,
+            "store_errors": self.store_errors,
+            "total_bytes": self.get_memory_usage()["total_bytes"],
+        }
+
+
+# Global instance
+_session_registry = None
+
+
+def get_session_registry() -> SessionRegistry:
+    """Get or create global session registry instance"""
+    global _session_registry
+    if _session_registry is None:
+        _session_registry = SessionRegistry(
+            max_sessions=config.session_max_sessions,
+            idle_ttl_seconds=config.session_idle_ttl_seconds or None,
+            sweep_interval_seconds=config.session_sweep_interval_seconds,
+            store=create_session_store(config.session_backend),
+            history_limit=config.session_history_limit,
+            retention_seconds=config.session_retention_seconds or None
+        )
+    return _session_registry
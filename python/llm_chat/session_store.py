@@ -0,0 +1,297 @@
+"""
+Session Store Module
+Persistent session storage shared by all worker processes: append-only
+message log with per-session preferred language. SQLite (WAL) is the
+default backend; a Redis backend is available when the redis package is
+installed.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+    redis = None
+
+from .config import config
+
+DEFAULT_SQLITE_PATH = os.path.join(tempfile.gettempdir(), "llm_chat_sessions.db")
+
+
+class SessionStore(ABC):
+    """
+    Interface of a session storage backend
+
+    Messages are dictionaries with role ("user" or "model"), content (text
+    shown to the user), raw (text kept in LangChain memory, e.g. with
+    <link> tags) and timestamp. version() grows with every appended
+    message, so a process can tell whether its cached copy is stale.
+    """
+
+    @abstractmethod
+    def append_messages(self, session_id: str, messages: List[Dict[str, Any]], language: Optional[str] = None) -> int:
+        """
+        Append messages to a session (one transaction)
+
+        Args:
+            session_id: Session identifier
+            messages: Messages to append, oldest first
+            language: Preferred language to store with the session
+
+        Returns:
+            Session version after the append
+        """
+
+    @abstractmethod
+    def load(self, session_id: str, limit: int) -> Dict[str, Any]:
+        """
+        Read the most recent messages of a session
+
+        Args:
+            session_id: Session identifier
+            limit: Maximum number of messages
+
+        Returns:
+            Dictionary with messages (oldest first), language and version
+        """
+
+    @abstractmethod
+    def version(self, session_id: str) -> int:
+        """Current version of a session (0 if it has no messages)"""
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        """Remove a session and its messages"""
+
+    @abstractmethod
+    def purge(self, max_age_seconds: float) -> int:
+        """
+        Remove sessions not updated for a while
+
+        Args:
+            max_age_seconds: Retention period
+
+        Returns:
+            Number of removed sessions (-1 if the backend expires keys itself)
+        """
+
+    def close(self):
+        """Release backend resources"""
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Session store in an embedded SQLite database in WAL mode
+
+    WAL lets the uvicorn workers read concurrently while one writes. The
+    recent-messages read is a single range scan on the (session_id, id)
+    primary key.
+    """
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH):
+        """
+        Open (and create if needed) the database
+
+        Args:
+            path: Database file path (":memory:" for a private in-memory store)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                preferred_language TEXT,
+                version INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+            CREATE TABLE IF NOT EXISTS messages (
+                session_id TEXT NOT NULL,
+                id INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                raw TEXT,
+                timestamp TEXT,
+                PRIMARY KEY (session_id, id)
+            ) WITHOUT ROWID;
+        """)
+
+    def append_messages(self, session_id: str, messages: List[Dict[str, Any]], language: Optional[str] = None) -> int:
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.execute(
+                    "INSERT INTO sessions (session_id, preferred_language, version, updated_at) VALUES (?, ?, 0, ?) "
+                    "ON CONFLICT(session_id) DO UPDATE SET "
+                    "preferred_language = COALESCE(excluded.preferred_language, preferred_language), "
+                    "updated_at = excluded.updated_at",
+                    (session_id, language, time.time())
+                )
+                version = cursor.execute(
+                    "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()[0]
+                rows = []
+                for message in messages:
+                    version += 1
+                    rows.append((
+                        session_id, version, message["role"], message["content"],
+                        message.get("raw"), message.get("timestamp")
+                    ))
+                cursor.executemany(
+                    "INSERT INTO messages (session_id, id, role, content, raw, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                cursor.execute("UPDATE sessions SET version = ? WHERE session_id = ?", (version, session_id))
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            return version
+
+    def load(self, session_id: str, limit: int) -> Dict[str, Any]:
+        with self._lock:
+            session = self._connection.execute(
+                "SELECT preferred_language, version FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if session is None:
+                return {"messages": [], "language": None, "version": 0}
+            rows = self._connection.execute(
+                "SELECT role, content, raw, timestamp FROM messages WHERE session_id = ? AND id > ? ORDER BY id",
+                (session_id, session[1] - limit)
+            ).fetchall()
+        return {
+            "messages": [
+                {"role": role, "content": content, "raw": raw, "timestamp": timestamp}
+                for role, content, raw, timestamp in rows
+            ],
+            "language": session[0],
+            "version": session[1],
+        }
+
+    def version(self, session_id: str) -> int:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            self._connection.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._connection.execute("COMMIT")
+
+    def purge(self, max_age_seconds: float) -> int:
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            self._connection.execute(
+                "DELETE FROM messages WHERE session_id IN (SELECT session_id FROM sessions WHERE updated_at < ?)",
+                (cutoff,)
+            )
+            removed = self._connection.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,)).rowcount
+            self._connection.execute("COMMIT")
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Session store on a Redis-protocol server (Redis, Valkey, KeyDB, ...)
+
+    Each session is a list of JSON messages plus a hash with the preferred
+    language; both keys expire after the retention period.
+    """
+
+    def __init__(self, url: str, retention_seconds: Optional[int] = None, prefix: str = "llm_chat:session:"):
+        """
+        Connect to the server
+
+        Args:
+            url: Connection URL, e.g. redis://localhost:6379/0
+            retention_seconds: Key lifetime refreshed on every append
+            prefix: Key prefix
+        """
+        if not HAS_REDIS:
+            raise ImportError("The redis package is required for the Redis session backend")
+        self.retention_seconds = retention_seconds
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def _keys(self, session_id: str):
+        return f"{self.prefix}{session_id}:messages", f"{self.prefix}{session_id}:meta"
+
+    def append_messages(self, session_id: str, messages: List[Dict[str, Any]], language: Optional[str] = None) -> int:
+        messages_key, meta_key = self._keys(session_id)
+        pipeline = self._client.pipeline(transaction=True)
+        pipeline.rpush(messages_key, *[json.dumps(message, ensure_ascii=False) for message in messages])
+        if language:
+            pipeline.hset(meta_key, "language", language)
+        if self.retention_seconds:
+            pipeline.expire(messages_key, self.retention_seconds)
+            pipeline.expire(meta_key, self.retention_seconds)
+        return pipeline.execute()[0]
+
+    def load(self, session_id: str, limit: int) -> Dict[str, Any]:
+        messages_key, meta_key = self._keys(session_id)
+        pipeline = self._client.pipeline(transaction=True)
+        pipeline.lrange(messages_key, -limit, -1)
+        pipeline.llen(messages_key)
+        pipeline.hget(meta_key, "language")
+        raw_messages, version, language = pipeline.execute()
+        return {
+            "messages": [json.loads(message) for message in raw_messages],
+            "language": language,
+            "version": version,
+        }
+
+    def version(self, session_id: str) -> int:
+        return self._client.llen(self._keys(session_id)[0])
+
+    def delete(self, session_id: str):
+        self._client.delete(*self._keys(session_id))
+
+    def purge(self, max_age_seconds: float) -> int:
+        # Keys expire on their own
+        return -1
+
+    def close(self):
+        self._client.close()
+
+
+def create_session_store(backend: str) -> Optional[SessionStore]:
+    """
+    Create the configured session store
+
+    Args:
+        backend: "sqlite", "redis" or "memory" (no shared storage)
+
+    Returns:
+        SessionStore instance, or None for in-process sessions only
+    """
+    if backend == "memory":
+        return None
+    try:
+        if backend == "redis":
+            return RedisSessionStore(config.session_redis_url, retention_seconds=config.session_retention_seconds or None)
+        return SQLiteSessionStore(config.session_sqlite_path or DEFAULT_SQLITE_PATH)
+    except Exception as e:
+        print(f"Warning: Session store '{backend}' unavailable ({e}); sessions will not be shared across workers")
+        return None
@@ -5,6 +5,7 @@ Manages conversation history for each session
 
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+import sys
 import uuid
 
 
@@ -128,6 +129,40 @@ class ShortTermMemory:
         """
         return self.preferred_language or "en"
 
+    def restore(self, messages: List[Dict[str, Any]], preferred_language: Optional[str] = None):
+        """
+        Replace the history with messages loaded from a session store
+
+        Args:
+            messages: Stored messages (role, content, timestamp), oldest first
+            preferred_language: Stored preferred language, if any
+        """
+        self.history = [
+            {
+                "role": message["role"],
+                "parts": [{"text": message["content"]}],
+                "timestamp": message.get("timestamp") or datetime.utcnow().isoformat(),
+            }
+            for message in messages
+        ]
+        if preferred_language in ["en", "ko"]:
+            self.preferred_language = preferred_language
+        self.last_updated = datetime.utcnow()
+
+    def estimate_bytes(self) -> int:
+        """
+        Approximate memory held by this session's history
+
+        Returns:
+            Size in bytes of the history list, message dicts and texts
+        """
+        size = sys.getsizeof(self.history)
+        for message in self.history:
+            size += sys.getsizeof(message) + sys.getsizeof(message.get("timestamp", ""))
+            for part in message.get("parts", []):
+                size += sys.getsizeof(part) + sys.getsizeof(part.get("text", ""))
+        return size
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization"""
         return {
@@ -143,10 +178,16 @@ class ShortTermMemory:
 class SessionManager:
     """
     Manages multiple short-term memory sessions
+
+    Sessions are stored in the bounded SessionRegistry (see
+    session_registry.py), which also owns each session's LangChain memory.
     """
 
-    def __init__(self):
-        self.sessions: Dict[str, ShortTermMemory] = {}
+    @property
+    def sessions(self) -> Dict[str, ShortTermMemory]:
+        """Snapshot of live sessions by ID"""
+        from .session_registry import get_session_registry
+        return {session_id: entry.stm for session_id, entry in get_session_registry().items()}
 
     def get_session(self, session_id: str) -> ShortTermMemory:
         """
@@ -158,14 +199,13 @@ class SessionManager:
         Returns:
             ShortTermMemory instance for the session
         """
-        if session_id not in self.sessions:
-            self.sessions[session_id] = ShortTermMemory(session_id)
-        return self.sessions[session_id]
+        from .session_registry import get_session_registry
+        return get_session_registry().get(session_id).stm
 
     def delete_session(self, session_id: str):
         """Delete a session"""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        from .session_registry import get_session_registry
+        get_session_registry().evict(session_id, delete_stored=True)
 
     def clear_old_sessions(self, max_age_hours: int = 24):
         """
@@ -174,23 +214,15 @@ class SessionManager:
         Args:
             max_age_hours: Maximum age in hours
         """
-        current_time = datetime.utcnow()
-        to_delete = []
-
-        for session_id, session in self.sessions.items():
-            age = (current_time - session.last_updated).total_seconds() / 3600
-            if age > max_age_hours:
-                to_delete.append(session_id)
-
-        for session_id in to_delete:
-            del self.sessions[session_id]
-
-        if to_delete:
-            print(f"Cleared {len(to_delete)} old sessions")
+        from .session_registry import get_session_registry
+        cleared = get_session_registry().sweep(max_idle_seconds=max_age_hours * 3600)
+        if cleared:
+            print(f"Cleared {cleared} old sessions")
 
     def get_session_count(self) -> int:
         """Get total number of active sessions"""
-        return len(self.sessions)
+        from .session_registry import get_session_registry
+        return len(get_session_registry())
 
 
 # Global session manager
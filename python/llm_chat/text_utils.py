@@ -0,0 +1,213 @@
+"""
+Text Utilities Module
+Query normalization and local (network-free) hashing embeddings
+"""
+
+import math
+import re
+import unicodedata
+import zlib
+from collections import Counter
+from typing import Dict, FrozenSet, List
+
+# Default dimensionality of the hashing space
+HASH_DIM = 1 << 20
+
+_PUNCTUATION_PATTERN = re.compile(r"[^\w\s]", re.UNICODE)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_DIGITS_PATTERN = re.compile(r"\d+")
+_HANGUL_PATTERN = re.compile(r"[\uac00-\ud7a3]")
+
+# Function words of questions about the profile. Negations ("not", "never",
+# "안", "못") are deliberately missing: they flip what a question asks
+_STOPWORDS = frozenset("""
+    a an the of in on at for to from by with about into and or
+    what which who whom whose where when why how
+    is are was were be been being am do does did has have had
+    can could would will should may might
+    he him his she her they them their it its this that these those there
+    i me my we us our you your
+    tell show give list share please let
+    any some all ever so far also just
+    kangbeen ko kangbeens
+    고강빈 강빈 그 어떤 무슨 무엇 무엇인가요 뭐 뭐야 뭔가요 뭐예요 뭐니
+    알려줘 알려주세요 알려줄래 보여줘 보여주세요 말해줘 해줘 해주세요 줘 주세요
+    있나요 있어 있어요 있니 되나요 인가요 이에요 예요 입니까 어떻게 좀 요
+""".split())
+
+# Particles stripped from Hangul words before comparing them, longest first
+_KOREAN_PARTICLES = (
+    "에서는", "에서", "에는", "으로", "이랑", "까지", "부터",
+    "은", "는", "이", "가", "을", "를", "에", "의", "도", "로", "과", "와", "랑", "만",
+)
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize a user query for caching and matching
+
+    Applies NFKC normalization (composes decomposed Hangul jamo and folds
+    full-width characters), case folding, punctuation removal and
+    whitespace collapsing.
+
+    Args:
+        text: Raw user text
+
+    Returns:
+        Normalized text
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _PUNCTUATION_PATTERN.sub(" ", text)
+    return _WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def extract_numbers(text: str) -> List[str]:
+    """
+    Get the digit sequences of a text in order
+
+    Used to keep queries such as "papers from 2024" and "papers from 2025"
+    apart even though their embeddings are almost identical.
+    """
+    return _DIGITS_PATTERN.findall(text)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into search tokens
+
+    Every normalized word is a token. Hangul words additionally contribute
+    their syllable bigrams, so "연구는" and "연구를" both match "연구"
+    despite the attached particles.
+
+    Args:
+        text: Raw or normalized text
+
+    Returns:
+        List of tokens (with repetitions)
+    """
+    tokens = []
+    for word in normalize_query(text).split():
+        tokens.append(word)
+        if len(word) > 2 and _HANGUL_PATTERN.search(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def content_words(text: str) -> FrozenSet[str]:
+    """
+    Get the words that carry a query's meaning
+
+    Normalized words minus question and filler words ("what", "his",
+    "알려줘", ...), with the particle of Hangul words stripped ("논문이" ->
+    "논문"). Negations stay, so "does he use" and "does he not use" differ.
+    Used next to hashing embeddings, which score "earliest paper" close to
+    "latest paper" on shared characters alone.
+
+    Args:
+        text: Raw or normalized text
+
+    Returns:
+        Set of content words
+    """
+    words = set()
+    for word in normalize_query(text).split():
+        if _HANGUL_PATTERN.search(word):
+            for particle in _KOREAN_PARTICLES:
+                if word.endswith(particle) and len(word) > len(particle):
+                    word = word[:-len(particle)]
+                    break
+        elif len(word) < 2:
+            # "s" and "t" left over from "what's" and "doesn't"
+            continue
+        if word not in _STOPWORDS:
+            words.add(word)
+    return frozenset(words)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate the LLM token count of a text without a tokenizer
+
+    Roughly four Latin characters per token and one token per Hangul/CJK
+    character, which tracks Gemini's tokenizer closely enough for budgeting.
+
+    Args:
+        text: Any text
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for char in text if ord(char) > 0x7F and not char.isspace())
+    return math.ceil((len(text) - non_ascii) / 4) + non_ascii
+
+
+def char_ngrams(text: str, min_n: int = 2, max_n: int = 4) -> List[str]:
+    """
+    Extract character n-grams from normalized text
+
+    N-grams are taken per word (padded with spaces) so that Korean particles
+    attached to a word ("연구는", "연구를") still share most n-grams with the
+    bare word.
+
+    Args:
+        text: Normalized text
+        min_n: Smallest n-gram size
+        max_n: Largest n-gram size
+
+    Returns:
+        List of n-grams (with repetitions)
+    """
+    grams = []
+    for word in text.split():
+        padded = f" {word} "
+        for n in range(min_n, max_n + 1):
+            if len(padded) < n:
+                break
+            grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+def hash_embed(text: str, dim: int = HASH_DIM) -> Dict[int, float]:
+    """
+    Embed text as an L2-normalized sparse vector of hashed features
+
+    Features are word unigrams plus character n-grams, hashed with CRC32 so
+    vectors are stable across processes.
+
+    Args:
+        text: Normalized text
+        dim: Size of the hashing space
+
+    Returns:
+        Sparse vector as {feature index: weight}
+    """
+    features = Counter()
+    for word in text.split():
+        features[zlib.crc32(f"w:{word}".encode("utf-8")) % dim] += 1.0
+    for gram in char_ngrams(text):
+        features[zlib.crc32(f"c:{gram}".encode("utf-8")) % dim] += 1.0
+
+    norm = math.sqrt(sum(value * value for value in features.values()))
+    if norm == 0:
+        return {}
+    return {index: value / norm for index, value in features.items()}
+
+
+def cosine_similarity(a: Dict[int, float], b: Dict[int, float]) -> float:
+    """
+    Cosine similarity of two L2-normalized sparse vectors
+
+    Args:
+        a: Sparse vector from hash_embed
+        b: Sparse vector from hash_embed
+
+    Returns:
+        Similarity in [0, 1]
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(index, 0.0) for index, value in a.items())
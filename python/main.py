@@ -3,19 +3,44 @@ FastAPI Server for LLM Chat
 Provides REST API endpoints for chat functionality
 """
 
+import json
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import uvicorn
 
-from llm_chat import handle_chat_request
+from llm_chat import handle_chat_request, handle_chat_request_stream
+from llm_chat.chat_handler import get_single_flight_stats, get_speculation_stats
+from llm_chat.llm_backends import get_model_registry
+from llm_chat.faq_table import get_faq_table
+from llm_chat.llm_scheduler import get_llm_scheduler
+from llm_chat.metrics import get_chat_metrics
+from llm_chat.observability import get_tracing_stats
+from llm_chat.query_engine import get_query_engine
+from llm_chat.relevance_filter import get_relevance_stats
+from llm_chat.resilience import get_resilience_stats
+from llm_chat.response_cache import get_response_cache
+from llm_chat.session_registry import get_session_registry
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the idle-session sweeper while the server is up"""
+    registry = get_session_registry()
+    registry.start_sweeper()
+    yield
+    await registry.stop_sweeper()
+
 
 # Create FastAPI app
 app = FastAPI(
     title="LLM Chat API",
     description="Python-based LLM chat API for portfolio website",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -61,7 +86,82 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "sessions": get_session_registry().get_stats(),
+        "llm": get_model_registry().get_stats(),
+        "single_flight": get_single_flight_stats(),
+        "speculation": get_speculation_stats(),
+        "relevance": get_relevance_stats(),
+        "llm_scheduler": get_llm_scheduler().get_stats(),
+        "generation": get_resilience_stats(),
+        "tracing": get_tracing_stats(),
+        "response_cache": get_response_cache().get_stats(),
+        "faq": get_faq_table().get_stats(),
+        "structured_query": get_query_engine().get_stats(),
+        "routing": get_chat_metrics().routing(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: per-stage latency histograms, counters and session gauges"""
+    sessions = get_session_registry().get_stats()
+    single_flight = get_single_flight_stats()
+    routing = get_chat_metrics().routing()
+    relevance = get_relevance_stats()
+    speculation = get_speculation_stats()
+    response_cache = get_response_cache().get_stats()
+    extra = [
+        ("chat_sessions_active", "gauge", "Sessions held in memory", sessions["sessions"]),
+        ("chat_sessions_created_total", "counter", "Sessions created", sessions["created"]),
+        ("chat_sessions_evicted_total", "counter", "Sessions evicted (LRU or idle)",
+         sessions["evictions"] + sessions["expirations"]),
+        ("chat_single_flight_coalesced_total", "counter", "Requests that shared another request's generation",
+         single_flight["coalesced"]),
+        ("chat_response_cache_entries", "gauge", "Answers held in the response cache", response_cache["size"]),
+        ("chat_response_cache_evictions_total", "counter", "Response cache entries evicted or expired",
+         response_cache["evictions"] + response_cache["expirations"]),
+        ("chat_speculation_hits_total", "counter", "Speculative generations kept (query was relevant)",
+         speculation["hits"]),
+        ("chat_speculation_misses_total", "counter", "Speculative generations cancelled (query was irrelevant)",
+         speculation["misses"]),
+        ("chat_speculation_saved_seconds_total", "counter", "Relevance check time hidden behind kept generations",
+         speculation["saved_ms"] / 1000),
+        ("chat_speculation_wasted_seconds_total", "counter", "Generation time thrown away by cancelled speculations",
+         speculation["wasted_ms"] / 1000),
+        ("chat_relevance_memo_hits_total", "counter", "LLM relevance verdicts served from the memo",
+         relevance["verdicts"]["hits"]),
+        ("chat_relevance_memo_misses_total", "counter", "Relevance memo lookups that missed",
+         relevance["verdicts"]["misses"]),
+        ("chat_relevance_coalesced_total", "counter", "Relevance checks that shared an identical in-flight check",
+         relevance["verdicts"]["coalesced"]),
+        ("chat_rejections_served_total", "counter", "Rejection messages served", relevance["rejections"]["served"]),
+        ("chat_rejection_pool_hits_total", "counter", "Rejection messages served from the pool",
+         relevance["rejections"]["pool_hits"]),
+        ("chat_requests_without_llm_ratio", "gauge",
+         "Share of requests answered from the FAQ table, response cache or structured queries",
+         routing["without_llm"]),
+    ]
+    return PlainTextResponse(
+        get_chat_metrics().render(extra),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/debug/timings")
+async def debug_timings(limit: int = 50):
+    """
+    Per-stage timings of recent chat requests
+
+    Args:
+        limit: Number of recent requests to return (newest first)
+
+    Returns:
+        Aggregated stage timings and recent per-request breakdowns
+    """
+    chat_metrics = get_chat_metrics()
+    return dict(chat_metrics.get_stats(), recent=chat_metrics.recent(limit))
 
 
 @app.post("/api/chat", response_model=ChatResponse)
@@ -93,6 +193,41 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat endpoint (Server-Sent Events)
+
+    Emits `token` events while the answer is generated, followed by a single
+    `done` event carrying the full response and sessionId (or an `error` event).
+
+    Args:
+        request: ChatRequest with message, history, and optional sessionId
+
+    Returns:
+        StreamingResponse with text/event-stream content
+    """
+    history = [msg.dict() for msg in request.history] if request.history else []
+
+    async def event_stream():
+        async for event in handle_chat_request_stream(
+            message=request.message,
+            history=history,
+            session_id=request.sessionId
+        ):
+            event_type = event.pop("type")
+            yield f"event: {event_type}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable proxy buffering so tokens flush immediately
+        }
+    )
+
+
 if __name__ == "__main__":
     # Run server
     uvicorn.run(
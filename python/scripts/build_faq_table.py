@@ -0,0 +1,50 @@
+"""
+Build the FAQ answer table
+
+Runs every curated question in data/faq_questions.json (both languages)
+through the live prompt and model once and writes the linkified answers,
+tagged with the profile content hash, to data/faq_answers.json. The server
+answers matching first-turn questions from this table; run this again
+after editing profile_data.json (or set CHAT_FAQ_AUTO_REBUILD=true to let
+the server rebuild it). Needs GEMINI_API_KEY (or CHAT_LLM_BACKEND=fake for
+a dry run).
+
+Usage:
+    python scripts/build_faq_table.py [--questions data/faq_questions.json] [--output data/faq_answers.json]
+        [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_chat.faq_table import (  # noqa: E402
+    DEFAULT_QUESTIONS_PATH, DEFAULT_TABLE_PATH, build_faq_table, load_faq_questions, save_faq_table
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=Path, default=DEFAULT_QUESTIONS_PATH)
+    parser.add_argument("--output", type=Path, default=DEFAULT_TABLE_PATH)
+    parser.add_argument("--concurrency", type=int, default=4, help="generations at a time")
+    args = parser.parse_args()
+
+    questions = load_faq_questions(args.questions)
+    table = asyncio.run(build_faq_table(questions, concurrency=args.concurrency))
+    expected = sum(1 for item in questions for variants in item["questions"].values() if variants)
+    for entry in table["entries"]:
+        print(f"{entry['id']} ({entry['language']}): {entry['question']}")
+        print(f"  {entry['raw_response'][:120]}...")
+    if not table["entries"]:
+        print("No answers generated, table not written")
+        sys.exit(1)
+    save_faq_table(table, args.output)
+    print(f"Wrote {len(table['entries'])}/{expected} answers for profile {table['profile_hash']} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Generate the rejection message pool
+
+Makes one bulk Gemini call per language and writes the variants to
+data/rejection_messages.json, which the server rotates through instead
+of generating a rejection message per request. Needs GEMINI_API_KEY.
+
+Usage:
+    python scripts/generate_rejection_messages.py [--languages en ko] [--count 8]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_chat.rejection_pool import DEFAULT_POOL_PATH, generate_rejection_batch  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--languages", nargs="+", default=["en", "ko"])
+    parser.add_argument("--count", type=int, default=8, help="variants per language")
+    parser.add_argument("--output", type=Path, default=DEFAULT_POOL_PATH)
+    args = parser.parse_args()
+
+    pool = {}
+    if args.output.exists():
+        with open(args.output, "r", encoding="utf-8") as f:
+            pool = json.load(f)
+
+    for language in args.languages:
+        messages = generate_rejection_batch(language, args.count)
+        if not messages:
+            print(f"{language}: no messages generated, keeping existing ones")
+            continue
+        pool[language] = messages
+        print(f"{language}: {len(messages)} messages")
+        for message in messages:
+            print(f"  - {message}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(pool, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
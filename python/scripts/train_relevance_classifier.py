@@ -0,0 +1,102 @@
+"""
+Train and evaluate the local relevance classifier
+
+Reads data/relevance_queries.jsonl, reports precision/recall on a held-out
+split and the share of LLM relevance calls the classifier would avoid,
+then trains on all data and writes data/relevance_classifier.npz.
+
+Usage:
+    python scripts/train_relevance_classifier.py [--eval-only] [--test-ratio 0.25]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_chat.config import config  # noqa: E402
+from llm_chat.relevance_classifier import (  # noqa: E402
+    RelevanceClassifier,
+    DEFAULT_WEIGHTS_PATH,
+    load_labelled_queries,
+)
+from llm_chat.relevance_filter import quick_relevance_check  # noqa: E402
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "relevance_queries.jsonl"
+
+
+def stratified_split(records, test_ratio, seed):
+    """Split records into train/test keeping the label ratio"""
+    rng = np.random.default_rng(seed)
+    train, test = [], []
+    for label in (True, False):
+        group = [record for record in records if record["relevant"] == label]
+        order = rng.permutation(len(group))
+        cut = int(round(len(group) * test_ratio))
+        test.extend(group[i] for i in order[:cut])
+        train.extend(group[i] for i in order[cut:])
+    return train, test
+
+
+def evaluate(classifier, records, relevant_threshold, irrelevant_threshold):
+    """Print precision/recall and LLM-call savings on labelled records"""
+    queries = [record["query"] for record in records]
+    labels = np.array([record["relevant"] for record in records])
+    probabilities = classifier.predict_proba_batch(queries)
+
+    predictions = probabilities >= 0.5
+    true_positive = int(np.sum(predictions & labels))
+    precision = true_positive / max(1, int(predictions.sum()))
+    recall = true_positive / max(1, int(labels.sum()))
+    irrelevant_recall = int(np.sum(~predictions & ~labels)) / max(1, int((~labels).sum()))
+    print(f"  threshold 0.5: precision={precision:.3f} recall={recall:.3f} "
+          f"irrelevant-recall={irrelevant_recall:.3f} accuracy={np.mean(predictions == labels):.3f}")
+
+    # Only queries the keyword heuristics cannot decide would reach the LLM
+    uncertain = np.array([quick_relevance_check(query) is None for query in queries])
+    confident = (probabilities >= relevant_threshold) | (probabilities <= irrelevant_threshold)
+    decided = uncertain & confident
+    decided_correct = int(np.sum(decided & ((probabilities >= relevant_threshold) == labels)))
+    wrong_rejections = int(np.sum(decided & (probabilities <= irrelevant_threshold) & labels))
+    print(f"  heuristics undecided: {int(uncertain.sum())}/{len(records)} queries")
+    print(f"  confidence bands [<= {irrelevant_threshold}, >= {relevant_threshold}]: "
+          f"LLM calls avoided {int(decided.sum())}/{max(1, int(uncertain.sum()))} "
+          f"({decided.sum() / max(1, uncertain.sum()):.1%}), "
+          f"accuracy of avoided calls {decided_correct / max(1, int(decided.sum())):.3f}, "
+          f"relevant queries wrongly rejected {wrong_rejections}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", type=Path, default=DATA_PATH)
+    parser.add_argument("--output", type=Path, default=DEFAULT_WEIGHTS_PATH)
+    parser.add_argument("--test-ratio", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--eval-only", action="store_true", help="do not write the weights file")
+    args = parser.parse_args()
+
+    relevant_threshold = config.relevance_classifier_relevant_threshold
+    irrelevant_threshold = config.relevance_classifier_irrelevant_threshold
+
+    records = load_labelled_queries(args.data)
+    train, test = stratified_split(records, args.test_ratio, args.seed)
+    print(f"Loaded {len(records)} labelled queries ({len(train)} train / {len(test)} held-out)")
+
+    classifier = RelevanceClassifier.train([r["query"] for r in train], [r["relevant"] for r in train])
+    print("Held-out evaluation:")
+    evaluate(classifier, test, relevant_threshold, irrelevant_threshold)
+
+    if args.eval_only:
+        return
+
+    final = RelevanceClassifier.train([r["query"] for r in records], [r["relevant"] for r in records])
+    final.save(args.output)
+    print(f"Wrote {args.output} ({args.output.stat().st_size / 1024:.1f} KiB, "
+          f"{int(np.count_nonzero(final.weights))} non-zero weights)")
+
+
+if __name__ == "__main__":
+    main()